@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (C) 2026 Signal Messenger, LLC.
+# SPDX-License-Identifier: AGPL-3.0-only
+#
+
+"""
+Generate per-function call-overhead microbenchmarks for the Java and Node bridges.
+
+The declarations collected by gen_decls.py give the Rust-level signature of every bridged
+function, and tell us which of them are exposed through JNI and which through Node. From that,
+this script writes a Java class and a TypeScript module that call each benchmarkable function with
+synthetic inputs and report the average latency and allocation per call, one JSON object per line:
+
+    {"bridge": "java", "function": "Foo_Bar", "size": 1024, "ns_per_call": 812.4, "bytes_per_call": 1120}
+
+A function is benchmarkable if it is synchronous, looks side-effect-free (see SKIP_PATTERN), and
+every argument can be synthesized:
+
+- byte slices and vectors are filled with `size` bytes, for each of the --sizes given;
+- fixed-size byte arrays, integers, booleans and strings get a constant;
+- borrowed handles (`&Foo`) come from a fixture constructor, i.e. a bridged `Foo_Generate` or
+  `Foo_New` that takes no arguments and returns `Foo`.
+
+Everything else is listed as skipped at the top of each generated file.
+"""
+
+import argparse
+import collections
+import os
+import re
+import sys
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import gen_decls
+from gen_decls import gen_ts_decl
+
+# Functions that talk to the network, to stores or to the logger, or that exist only to manage
+# object lifetimes, aren't interesting to microbenchmark and may not be safe to call in a loop.
+SKIP_PATTERN = re.compile(
+    r'(Store|Destroy|Clone|Logger|initialize|Connect|Chat|Cdsi|Svr|Registration|TokioAsyncContext|'
+    r'ConnectionManager|Panic|Error|Test|Debug|Listener|InputStream)')
+
+BYTES_TYPES = {'&[u8]', 'Vec<u8>', 'Box<[u8]>', 'Option<&[u8]>'}
+FIXTURE_SUFFIXES = ('_Generate', '_New')
+
+# `name` is the Node name; `java` is the name of the matching Java method, or None if there isn't one.
+BridgedFn = collections.namedtuple('BridgedFn', ['name', 'args', 'ret', 'java', 'node'])
+Arg = collections.namedtuple('Arg', ['name', 'kind', 'detail'])
+
+
+def java_name_from_symbol(symbol: str) -> str:
+    return symbol[len(gen_decls.JNI_PREFIX):].replace('_1', '_')
+
+
+def join_key(decl: gen_decls.Decl, name: str) -> Tuple[Optional[str], str]:
+    """Match entry points generated from the same bridge_fn, even if one bridge renamed it."""
+    if decl.rust_fn is None:
+        return (None, name)
+    # The batched variant is generated alongside the function it batches.
+    return (decl.rust_fn, 'batch' if name.endswith('_Batch') else '')
+
+
+def bridged_functions(model: Iterable[gen_decls.Decl]) -> List[BridgedFn]:
+    """Join the Rust-level `ts:` signatures with the JNI exports of the same Rust function."""
+    java_names = {}
+    for decl in model:
+        if decl.kind != 'c' or decl.crate != gen_decls.BRIDGE.name or not decl.symbol.startswith(gen_decls.JNI_PREFIX):
+            continue
+        java_name = java_name_from_symbol(decl.symbol)
+        # The ByteBuffer variant from jni_direct_buffers sits next to the regular one.
+        if not java_name.endswith('_Direct'):
+            java_names[join_key(decl, java_name)] = java_name
+    functions = []
+    for decl in model:
+        if decl.kind != 'ts' or decl.crate != gen_decls.BRIDGE.name:
+            continue
+        match = gen_ts_decl.FUNCTION_SIG.match(decl.text)
+        if match is None or not match.group(1).startswith('export function '):
+            continue
+        (prefix, fn_args, ret_type) = match.groups()
+        name = prefix[len('export function '):]
+        args = [(arg_name, arg_type.replace(' ', '')) for (arg_name, arg_type) in gen_ts_decl.split_rust_args(fn_args)]
+        functions.append(BridgedFn(name, args, ret_type.strip().rstrip(';').replace(' ', ''),
+                                   java_names.get(join_key(decl, name)), True))
+    return sorted(functions, key=lambda fn: fn.name)
+
+
+def strip_result(ret_type: str) -> str:
+    if ret_type.startswith('Result<') and ret_type.endswith('>'):
+        return ret_type[7:-1].split(',')[0]
+    return ret_type
+
+
+def find_fixtures(functions: Sequence[BridgedFn]) -> Dict[str, BridgedFn]:
+    fixtures = {}
+    for fn in functions:
+        if fn.args or not fn.name.endswith(FIXTURE_SUFFIXES):
+            continue
+        type_name = strip_result(fn.ret)
+        if fn.name.startswith(type_name + '_'):
+            fixtures.setdefault(type_name, fn)
+    return fixtures
+
+
+def classify_arg(arg_name: str, rust_type: str, fixtures: Dict[str, BridgedFn]) -> Optional[Arg]:
+    if rust_type in BYTES_TYPES:
+        return Arg(arg_name, 'bytes', None)
+    if (fixed := re.fullmatch(r'&?\[u8;(\d+)\]', rust_type)) is not None:
+        return Arg(arg_name, 'fixed_bytes', int(fixed.group(1)))
+    if rust_type in ('u8', 'u16', 'u32', 'i32', 'u64', 'bool', 'String', '&str'):
+        return Arg(arg_name, 'scalar', rust_type)
+    if rust_type.startswith('&') and not rust_type.startswith(('&mut', '&[', '&dyn')) and rust_type[1:] in fixtures:
+        return Arg(arg_name, 'handle', rust_type[1:])
+    return None
+
+
+Plan = collections.namedtuple('Plan', ['fn', 'args', 'sized'])
+
+
+def plan_benchmarks(functions: Sequence[BridgedFn]) -> Tuple[List[Plan], List[str]]:
+    fixtures = find_fixtures(functions)
+    plans = []
+    skipped = []
+    for fn in functions:
+        if SKIP_PATTERN.search(fn.name):
+            continue
+        if fn.ret.startswith(('Promise<', 'CancellablePromise<')):
+            skipped.append(f'{fn.name}: async')
+            continue
+        args = [classify_arg(arg_name, arg_type, fixtures) for (arg_name, arg_type) in fn.args]
+        unsupported = [arg_type for ((_name, arg_type), arg) in zip(fn.args, args) if arg is None]
+        if unsupported:
+            skipped.append(f'{fn.name}: cannot synthesize {", ".join(unsupported)}')
+            continue
+        plans.append(Plan(fn, args, any(arg.kind == 'bytes' for arg in args)))
+    return (plans, skipped)
+
+
+JAVA_SCALARS = {'u8': '1', 'u16': '1', 'u32': '1', 'i32': '1', 'u64': '1L', 'bool': 'true',
+                'String': '"bench"', '&str': '"bench"'}
+NODE_SCALARS = {'u8': '1', 'u16': '1', 'u32': '1', 'i32': '1', 'u64': '1n', 'bool': 'true',
+                'String': "'bench'", '&str': "'bench'"}
+
+
+def java_arg_expr(arg: Arg) -> str:
+    if arg.kind == 'bytes':
+        return 'input'
+    if arg.kind == 'fixed_bytes':
+        return f'filled({arg.detail})'
+    if arg.kind == 'scalar':
+        return JAVA_SCALARS[arg.detail]
+    return f'fixture_{arg.detail}'
+
+
+def node_arg_expr(arg: Arg) -> str:
+    if arg.kind == 'bytes':
+        return 'input'
+    if arg.kind == 'fixed_bytes':
+        return f'filled({arg.detail})'
+    if arg.kind == 'scalar':
+        return NODE_SCALARS[arg.detail]
+    return f'{{ _nativeHandle: fixture_{arg.detail} }}'
+
+
+def used_fixtures(plans: Iterable[Plan]) -> List[str]:
+    return sorted({arg.detail for plan in plans for arg in plan.args if arg.kind == 'handle'})
+
+
+def render_java(plans: Sequence[Plan], skipped: Sequence[str], sizes: Sequence[int], fixtures: Dict[str, BridgedFn]) -> str:
+    lines = JAVA_HEADER.format(sizes=', '.join(str(size) for size in sizes)).split('\n')
+    lines += [f'  // skipped {entry}' for entry in skipped]
+    lines.append('')
+    lines.append('  public static void main(String[] args) throws Exception {')
+    lines.append('    int iterations = args.length > 0 ? Integer.parseInt(args[0]) : 10_000;')
+    # Each fixture needs a Java constructor as well.
+    plans = [plan for plan in plans
+             if plan.fn.java and all(fixtures[type_name].java for type_name in used_fixtures([plan]))]
+    for type_name in used_fixtures(plans):
+        lines.append(f'    long fixture_{type_name} = Native.{fixtures[type_name].java}();')
+    for plan in plans:
+        # Results are labelled with the Node name, so that both bridges' numbers line up.
+        call = 'Native.%s(%s)' % (plan.fn.java, ', '.join(java_arg_expr(arg) for arg in plan.args))
+        if plan.sized:
+            lines.append('    for (int size : SIZES) {')
+            lines.append('      byte[] input = filled(size);')
+            lines.append(f'      bench("{plan.fn.name}", size, iterations, () -> {call});')
+            lines.append('    }')
+        else:
+            lines.append(f'    bench("{plan.fn.name}", 0, iterations, () -> {call});')
+    lines.append('  }')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_node(plans: Sequence[Plan], skipped: Sequence[str], sizes: Sequence[int], fixtures: Dict[str, BridgedFn]) -> str:
+    lines = NODE_HEADER.format(sizes=', '.join(str(size) for size in sizes)).split('\n')
+    lines += [f'// skipped {entry}' for entry in skipped]
+    lines.append('')
+    lines.append('function main(): void {')
+    lines.append('  const iterations = process.argv.length > 2 ? parseInt(process.argv[2], 10) : 10_000;')
+    for type_name in used_fixtures(plan for plan in plans if plan.fn.node):
+        lines.append(f'  const fixture_{type_name} = Native.{fixtures[type_name].name}();')
+    for plan in plans:
+        if not plan.fn.node:
+            continue
+        call = 'Native.%s(%s)' % (plan.fn.name, ', '.join(node_arg_expr(arg) for arg in plan.args))
+        if plan.sized:
+            lines.append('  for (const size of SIZES) {')
+            lines.append('    const input = filled(size);')
+            lines.append(f"    bench('{plan.fn.name}', size, iterations, () => {call});")
+            lines.append('  }')
+        else:
+            lines.append(f"  bench('{plan.fn.name}', 0, iterations, () => {call});")
+    lines.append('}')
+    lines.append('')
+    lines.append('main();')
+    return '\n'.join(lines) + '\n'
+
+
+JAVA_HEADER = '''\
+//
+// Copyright (C) 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+// WARNING: this file was automatically generated by gen_call_benchmarks.py
+
+package org.signal.libsignal.internal;
+
+import java.lang.management.ManagementFactory;
+import java.util.Arrays;
+
+public final class NativeCallBenchmark {{
+  private static final int[] SIZES = {{{sizes}}};
+
+  private static final com.sun.management.ThreadMXBean THREADS =
+      (com.sun.management.ThreadMXBean) ManagementFactory.getThreadMXBean();
+
+  private interface Call {{
+    void run() throws Exception;
+  }}
+
+  private static byte[] filled(int size) {{
+    byte[] result = new byte[size];
+    Arrays.fill(result, (byte) 0x5a);
+    return result;
+  }}
+
+  private static void bench(String function, int size, int iterations, Call call) {{
+    try {{
+      // Warm up, and find out early whether synthetic inputs are rejected.
+      for (int i = 0; i < Math.max(1, iterations / 10); i++) {{
+        call.run();
+      }}
+      long threadId = Thread.currentThread().getId();
+      long allocatedBefore = THREADS.getThreadAllocatedBytes(threadId);
+      long start = System.nanoTime();
+      for (int i = 0; i < iterations; i++) {{
+        call.run();
+      }}
+      long elapsed = System.nanoTime() - start;
+      long allocated = THREADS.getThreadAllocatedBytes(threadId) - allocatedBefore;
+      System.out.printf(
+          "{{\\"bridge\\": \\"java\\", \\"function\\": \\"%s\\", \\"size\\": %d, \\"ns_per_call\\": %.1f, \\"bytes_per_call\\": %d}}%n",
+          function, size, (double) elapsed / iterations, allocated / iterations);
+    }} catch (Exception e) {{
+      System.err.printf("%s(size=%d) rejected synthetic input: %s%n", function, size, e);
+    }}
+  }}
+'''
+
+NODE_HEADER = '''\
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+// WARNING: this file was automatically generated by gen_call_benchmarks.py
+
+/* eslint-disable @typescript-eslint/naming-convention */
+
+import * as Native from '../../Native';
+
+const SIZES = [{sizes}];
+
+function filled(size: number): Uint8Array {{
+  return new Uint8Array(size).fill(0x5a);
+}}
+
+function bench(
+  fn: string,
+  size: number,
+  iterations: number,
+  call: () => unknown
+): void {{
+  try {{
+    // Warm up, and find out early whether synthetic inputs are rejected.
+    for (let i = 0; i < Math.max(1, iterations / 10); i++) {{
+      call();
+    }}
+    const before = process.memoryUsage();
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < iterations; i++) {{
+      call();
+    }}
+    const elapsed = process.hrtime.bigint() - start;
+    const after = process.memoryUsage();
+    // Without a GC in between, growth in the JS heap and in external memory approximates
+    // what was allocated.
+    const allocated =
+      after.heapUsed - before.heapUsed + (after.external - before.external);
+    console.log(
+      JSON.stringify({{
+        bridge: 'node',
+        function: fn,
+        size,
+        ns_per_call: Number(elapsed) / iterations,
+        bytes_per_call: Math.max(0, Math.round(allocated / iterations)),
+      }})
+    );
+  }} catch (e) {{
+    console.error(`${{fn}}(size=${{size}}) rejected synthetic input: ${{e}}`);
+  }}
+}}
+'''
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--out-dir', required=True,
+                        help='directory to write NativeCallBenchmark.java and native-call-benchmark.ts into')
+    parser.add_argument('--sizes', default='1024,65536,4194304',
+                        help='comma-separated byte-array sizes for slice arguments (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    model = gen_decls.collect_model([gen_decls.BRIDGE])
+    functions = bridged_functions(model)
+    fixtures = find_fixtures(functions)
+    (plans, skipped) = plan_benchmarks(functions)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    with open(os.path.join(args.out_dir, 'NativeCallBenchmark.java'), 'w') as fh:
+        fh.write(render_java(plans, skipped, sizes, fixtures))
+    with open(os.path.join(args.out_dir, 'native-call-benchmark.ts'), 'w') as fh:
+        fh.write(render_node(plans, skipped, sizes, fixtures))
+
+    print(f'{len(plans)} functions benchmarked, {len(skipped)} skipped', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,665 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (C) 2026 Signal Messenger, LLC.
+# SPDX-License-Identifier: AGPL-3.0-only
+#
+
+"""
+Regenerate every bridge declaration file from a single expansion of each bridge crate.
+
+gen_ts_decl.py and gen_java_decl.py each compile the bridge crates on their own (and cbindgen
+expands libsignal-bridge once more for every Java class). This driver expands each crate exactly
+once, with all bridge features enabled, and pulls a shared list of declarations out of the
+expanded source:
+
+- `ts:` doc comments left behind by the Node bridge macros, and
+- every `extern "C"` entry point, rendered as the one-line C prototype cbindgen would produce.
+
+Native.d.ts, Native.java and NativeTesting.java are rendered from that list using the same
+translation code as the single-language scripts. The Swift headers still come from cbindgen,
+since they also carry type definitions from crates outside the bridge, but they are generated
+(and verified) together with everything else and cross-checked against the same list.
+
+Each generated file gets a manifest next to it recording, per crate, a hash of the sources that
+were expanded and a hash of every declaration line the crate contributed. --verify consults the
+manifest first: a crate whose sources are unchanged is not expanded at all, and when declarations
+do change only the lines belonging to the affected crates are reported.
+"""
+
+import argparse
+import collections
+import difflib
+import glob
+import hashlib
+import json
+import os
+import re
+import itertools
+import subprocess
+import sys
+import time
+import tomllib
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+OUR_ABS_DIR = os.path.dirname(os.path.realpath(__file__))
+BRIDGE_DIR = os.path.join(OUR_ABS_DIR, '..')
+REPO_ROOT = os.path.join(BRIDGE_DIR, '..', '..')
+
+sys.path.insert(0, os.path.join(BRIDGE_DIR, 'node', 'bin'))
+sys.path.insert(0, os.path.join(BRIDGE_DIR, 'jni', 'bin'))
+
+import gen_java_decl  # noqa: E402
+import gen_ts_decl  # noqa: E402
+
+ALL_BRIDGE_FEATURES = ('ffi', 'jni', 'node', 'signal-media')
+
+BridgeCrate = collections.namedtuple('BridgeCrate', ['name', 'path', 'features'], defaults=[()])
+
+BRIDGE = BridgeCrate('libsignal-bridge', os.path.join(BRIDGE_DIR, 'shared'), ALL_BRIDGE_FEATURES)
+BRIDGE_TYPES = BridgeCrate('libsignal-bridge-types', os.path.join(BRIDGE_DIR, 'shared', 'types'), ALL_BRIDGE_FEATURES)
+BRIDGE_TESTING = BridgeCrate('libsignal-bridge-testing', os.path.join(BRIDGE_DIR, 'shared', 'testing'), ALL_BRIDGE_FEATURES)
+NODE = BridgeCrate('libsignal-node', os.path.join(BRIDGE_DIR, 'node'))
+JNI_IMPL = BridgeCrate('libsignal-jni-impl', os.path.join(BRIDGE_DIR, 'jni', 'impl'))
+JNI_TESTING = BridgeCrate('libsignal-jni-testing', os.path.join(BRIDGE_DIR, 'jni', 'testing'))
+
+ALL_CRATES = [BRIDGE, BRIDGE_TYPES, BRIDGE_TESTING, NODE, JNI_IMPL, JNI_TESTING]
+
+# The shared intermediate model. `kind` is 'ts' for a raw `ts:` declaration (still in terms of Rust
+# types), or 'c' for an exported C-ABI function. JNI entry points are rendered in cbindgen's
+# one-line prototype style; for everything else the text is just the symbol.
+# `rust_fn` names the Rust function a bridge_fn entry point wraps, so that entry points renamed for
+# one bridge can still be matched up with the others; it's None for hand-written entry points.
+Decl = collections.namedtuple('Decl', ['crate', 'kind', 'symbol', 'text', 'rust_fn'], defaults=[None])
+
+JNI_PREFIX = 'Java_org_signal_libsignal_internal_Native_'
+JNI_TESTING_PREFIX = 'Java_org_signal_libsignal_internal_NativeTesting_'
+FFI_PREFIX = 'signal_'
+
+EXTERN_C_FN = re.compile(r'''
+    (?P<docs>(?:(?:\#\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\]|///[^\n]*)\s*)*?)  # Doc comments and attributes,
+    (?:\#\[export_name\s*=\s*"(?P<export_name>[^"]+)"\]                 # then either an explicit symbol name
+      |\#\[(?:unsafe\()?no_mangle\)?\])                                 # or the function's own name,
+    \s*(?P<attrs>(?:\#\[[^\]]*\]\s*)*)                                 # any other attributes,
+    pub\s+(?:unsafe\s+)?extern\s+"C"\s+fn\s+(?P<fn_name>\w+)
+    \s*(?:<[^>]*>)?                                                      # lifetime parameters,
+    \s*\((?P<args>.*?)\)                                                 # the arguments,
+    \s*(?:->\s*(?P<ret>[^{]*?))?\s*\{                                    # and an optional return type.
+    ''', re.VERBOSE | re.DOTALL)
+
+# bridge_fn emits the function it wraps just ahead of its entry points, marked like this, so every
+# entry point in an expansion belongs to the closest such function before it.
+BRIDGED_RUST_FN = re.compile(r'''
+    \#\[allow\(non_snake_case,\s*clippy\s*::\s*needless_pass_by_ref_mut\)\]\s*  # The marker,
+    \#\[inline\(always\)\]\s*
+    (?:(?:\#\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\]|///.*)\s*)*                  # the function's own attributes,
+    (?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?fn\s+(?P<name>\w+)                  # and its name.
+    ''', re.VERBOSE)
+
+CBINDGEN_IGNORE = 'cbindgen:ignore'
+
+LIFETIME = re.compile(r"'\w+\s*,?\s*")
+PATH_PREFIX = re.compile(r'(?:\b\w+)?::')
+
+
+# The parts of a JNI package's cbindgen.toml that affect how its prototypes are spelled.
+CbindgenConfig = collections.namedtuple('CbindgenConfig', ['renames', 'rename_args'])
+
+
+def load_cbindgen_config(config_path: str) -> CbindgenConfig:
+    with open(config_path, 'rb') as fh:
+        config = tomllib.load(fh)
+    rename_args = config.get('fn', {}).get('rename_args', 'None')
+    if rename_args not in ('None', 'camelCase'):
+        sys.exit(f'error: {config_path}: unsupported rename_args = "{rename_args}"')
+    return CbindgenConfig(config.get('export', {}).get('rename', {}), rename_args)
+
+
+# Native and NativeTesting were each generated by running cbindgen in their own package, so each
+# keeps that package's rules.
+JNI_CONFIGS = [
+    (JNI_TESTING_PREFIX, load_cbindgen_config(os.path.join(JNI_TESTING.path, 'cbindgen.toml'))),
+    (JNI_PREFIX, load_cbindgen_config(os.path.join(JNI_IMPL.path, 'cbindgen.toml'))),
+]
+
+
+def jni_config(symbol: str) -> CbindgenConfig:
+    return next(config for (prefix, config) in JNI_CONFIGS if symbol.startswith(prefix))
+
+
+def c_type_name(rust_type: str, config: CbindgenConfig) -> str:
+    """Spell an expanded Rust type the way cbindgen names it in a prototype."""
+    typ = LIFETIME.sub('', rust_type).replace(' ', '').replace('<>', '')
+    typ = PATH_PREFIX.sub('', typ)
+    if typ == '()':
+        return 'void'
+    # cbindgen drops unit type arguments, leaving a bare `Throwing` for `Throwing<()>`.
+    typ = typ.replace('<()>', '')
+    return re.sub(r'\w+', lambda m: config.renames.get(m.group(0), m.group(0)), typ)
+
+
+def c_arg_name(rust_name: str, config: CbindgenConfig) -> str:
+    return gen_ts_decl.camelcase(rust_name) if config.rename_args == 'camelCase' else rust_name
+
+
+def jni_prototype(symbol: str, rust_args: str, rust_ret: str) -> str:
+    config = jni_config(symbol)
+    # Drop paths before splitting, since split_rust_args splits on the first colon.
+    rust_args = PATH_PREFIX.sub('', rust_args)
+    args = [
+        '%s %s' % (c_type_name(arg_type, config), c_arg_name(arg_name, config))
+        for (arg_name, arg_type) in gen_ts_decl.split_rust_args(rust_args)
+    ]
+    # cbindgen always spells the implicit JNI arguments like this, and gen_java_decl's JAVA_DECL
+    # pattern depends on it.
+    args[:2] = ['JNIEnv env', 'JClass class_']
+    return '%s %s(%s);' % (c_type_name(rust_ret, config), symbol, ', '.join(args))
+
+
+def extract_c_decls(crate: BridgeCrate, expanded_source: str) -> Iterator[Decl]:
+    for match in EXTERN_C_FN.finditer(expanded_source):
+        # cbindgen skips these, and so did gen_java_decl; they're declared by hand in the templates.
+        if CBINDGEN_IGNORE in match.group('docs') or CBINDGEN_IGNORE in match.group('attrs'):
+            continue
+        symbol = match.group('export_name') or match.group('fn_name')
+        if symbol.startswith('Java_'):
+            text = jni_prototype(symbol, match.group('args'), match.group('ret') or '()')
+        else:
+            # The Swift headers come straight from cbindgen; only the symbol is needed.
+            text = symbol
+        yield Decl(crate.name, 'c', symbol, text)
+
+
+def bridged_sections(expanded_source: str) -> Iterator[Tuple[Optional[str], str]]:
+    """Split expanded source at each function bridge_fn wraps, along with that function's name."""
+    (rust_fn, start) = (None, 0)
+    for match in BRIDGED_RUST_FN.finditer(expanded_source):
+        yield (rust_fn, expanded_source[start:match.start()])
+        (rust_fn, start) = (match.group('name'), match.start())
+    yield (rust_fn, expanded_source[start:])
+
+
+def extract_decls(crate: BridgeCrate, expanded_source: str) -> Iterator[Decl]:
+    for (rust_fn, section) in bridged_sections(expanded_source):
+        for decl in gen_ts_decl.extract_raw_ts_decls(section):
+            yield Decl(crate.name, 'ts', decl, decl, rust_fn)
+        for decl in extract_c_decls(crate, section):
+            yield decl._replace(rust_fn=rust_fn)
+
+
+def collect_crate_decls(crate: BridgeCrate) -> List[Decl]:
+    print(f'expanding {crate.name}...', file=sys.stderr)
+    return list(extract_decls(crate, gen_ts_decl.expand_crate(crate.path, crate.features)))
+
+
+def collect_model(crates: Iterable[BridgeCrate]) -> List[Decl]:
+    return list(itertools.chain.from_iterable(collect_crate_decls(crate) for crate in crates))
+
+
+def select(model: Iterable[Decl], crates: Sequence[BridgeCrate], kind: str, prefix: str = '') -> List[Decl]:
+    names = {crate.name for crate in crates}
+    return [decl for decl in model if decl.crate in names and decl.kind == kind and decl.symbol.startswith(prefix)]
+
+
+TS_CRATES = [NODE, BRIDGE, BRIDGE_TYPES, BRIDGE_TESTING]
+
+
+def typescript_decl_lines(model: Sequence[Decl]) -> List[str]:
+    return [gen_ts_decl.translate_ts_decl(decl.text) for decl in select(model, TS_CRATES, 'ts')]
+
+
+def render_typescript(model: Sequence[Decl]) -> str:
+    return gen_ts_decl.expand_template(
+        os.path.join(BRIDGE_DIR, 'node', 'bin', 'Native.d.ts.in'),
+        typescript_decl_lines(model))
+
+
+def java_decl_lines(model: Sequence[Decl], crates: Sequence[BridgeCrate], prefix: str) -> List[str]:
+    decls = sorted(select(model, crates, 'c', prefix), key=lambda decl: decl.symbol)
+    prototypes = '\n'.join(decl.text for decl in decls)
+    return list(gen_java_decl.parse_decls(prototypes))
+
+
+def render_java(model: Sequence[Decl], crates: Sequence[BridgeCrate], prefix: str, template_name: str) -> str:
+    return gen_java_decl.expand_template(
+        os.path.join(BRIDGE_DIR, 'jni', 'bin', template_name),
+        java_decl_lines(model, crates, prefix))
+
+
+def render_ffi_header(model: Sequence[Decl], crates: Sequence[BridgeCrate], config_name: str) -> str:
+    ffi_dir = os.path.join(BRIDGE_DIR, 'ffi')
+    cbindgen = subprocess.run(
+        ['cbindgen', '--profile', 'release', '--config', os.path.join(ffi_dir, config_name), ffi_dir],
+        cwd=ffi_dir, capture_output=True, text=True)
+    if cbindgen.returncode != 0:
+        sys.stderr.write(cbindgen.stderr)
+        sys.exit(f'error: cbindgen failed for {config_name}')
+
+    header = cbindgen.stdout
+    missing = [decl.symbol for decl in select(model, crates, 'c', FFI_PREFIX) if decl.symbol not in header]
+    if missing:
+        sys.exit(f'error: cbindgen ({config_name}) did not emit {", ".join(sorted(missing))}')
+    return header
+
+
+def workspace_crate_dirs() -> Dict[str, str]:
+    dirs = {}
+    for cargo_toml in glob.glob(os.path.join(REPO_ROOT, 'rust', '**', 'Cargo.toml'), recursive=True):
+        with open(cargo_toml, 'rb') as fh:
+            name = tomllib.load(fh).get('package', {}).get('name')
+        if name is not None:
+            dirs[name] = os.path.dirname(cargo_toml)
+    return dirs
+
+
+def cbindgen_inputs(config_path: str) -> List[str]:
+    """The config plus the sources of every crate cbindgen pulls type definitions from."""
+    with open(config_path, 'rb') as fh:
+        included = tomllib.load(fh).get('parse', {}).get('include', [])
+    crate_dirs = workspace_crate_dirs()
+    return [config_path, os.path.join(BRIDGE_DIR, 'ffi', 'src')] + [
+        os.path.join(crate_dirs[name], 'src') for name in included if name in crate_dirs
+    ]
+
+
+# `crates` lists the crates whose declarations feed into the output, so that --watch knows what to
+# regenerate. `inputs` are the non-Rust files that also shape the output (templates, configs).
+# `decl_lines` renders the declaration lines for part of the model, so that a mismatch can be
+# reported per crate; it's None for the Swift headers, which only cbindgen can render.
+Target = collections.namedtuple('Target', ['output', 'crates', 'render', 'inputs', 'decl_lines'])
+
+
+def all_targets() -> List[Target]:
+    java_dir = os.path.join(REPO_ROOT, 'java', 'shared', 'java', 'org', 'signal', 'libsignal', 'internal')
+    ffi_header_dir = os.path.join(REPO_ROOT, 'swift', 'Sources', 'SignalFfi')
+    jni_bin = os.path.join(BRIDGE_DIR, 'jni', 'bin')
+    ffi_dir = os.path.join(BRIDGE_DIR, 'ffi')
+    return [
+        Target(os.path.join(REPO_ROOT, 'node', 'Native.d.ts'),
+               TS_CRATES,
+               render_typescript,
+               [os.path.join(BRIDGE_DIR, 'node', 'bin', 'Native.d.ts.in')],
+               typescript_decl_lines),
+        Target(os.path.join(java_dir, 'Native.java'),
+               [JNI_IMPL, BRIDGE],
+               lambda model: render_java(model, [JNI_IMPL, BRIDGE], JNI_PREFIX, 'Native.java.in'),
+               [os.path.join(jni_bin, 'Native.java.in'), os.path.join(JNI_IMPL.path, 'cbindgen.toml')],
+               lambda model: java_decl_lines(model, [JNI_IMPL, BRIDGE], JNI_PREFIX)),
+        Target(os.path.join(java_dir, 'NativeTesting.java'),
+               [JNI_TESTING, BRIDGE_TESTING],
+               lambda model: render_java(model, [JNI_TESTING, BRIDGE_TESTING], JNI_TESTING_PREFIX,
+                                         'NativeTesting.java.in'),
+               [os.path.join(jni_bin, 'NativeTesting.java.in'), os.path.join(JNI_TESTING.path, 'cbindgen.toml')],
+               lambda model: java_decl_lines(model, [JNI_TESTING, BRIDGE_TESTING], JNI_TESTING_PREFIX)),
+        Target(os.path.join(ffi_header_dir, 'signal_ffi.h'),
+               [BRIDGE],
+               lambda model: render_ffi_header(model, [BRIDGE], 'cbindgen.toml'),
+               cbindgen_inputs(os.path.join(ffi_dir, 'cbindgen.toml')),
+               None),
+        Target(os.path.join(ffi_header_dir, 'signal_ffi_testing.h'),
+               [BRIDGE_TESTING],
+               lambda model: render_ffi_header(model, [BRIDGE_TESTING], 'cbindgen-testing.toml'),
+               cbindgen_inputs(os.path.join(ffi_dir, 'cbindgen-testing.toml')),
+               None),
+    ]
+
+
+def diff_contents(output_file: str, expected_contents: str) -> bool:
+    """Print a diff against the checked-in file, and return whether there was one."""
+    with open(output_file) as fh:
+        current_contents = fh.readlines()
+    diff = difflib.unified_diff(current_contents, expected_contents.splitlines(keepends=True),
+                                fromfile=output_file, tofile=output_file)
+    first_line = next(diff, None)
+    if first_line is None:
+        return False
+    sys.stdout.write(first_line)
+    sys.stdout.writelines(diff)
+    return True
+
+
+MACROS_SRC = os.path.join(BRIDGE_DIR, 'shared', 'macros', 'src')
+BRIDGE_TYPES_SRC = os.path.join(BRIDGE_TYPES.path, 'src')
+
+
+def watched_paths(crate: BridgeCrate) -> List[str]:
+    """Files and directories whose contents show up in the expansion of `crate`."""
+    # Every crate expands the bridge_fn proc-macros and the argument/result type macro_rules
+    # defined in libsignal-bridge-types, so those sources feed into all of them.
+    return [
+        os.path.join(crate.path, 'src'),
+        os.path.join(crate.path, 'Cargo.toml'),
+        MACROS_SRC,
+        BRIDGE_TYPES_SRC,
+    ]
+
+
+def source_files(paths: Iterable[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        for (dirpath, _dirnames, filenames) in os.walk(path):
+            for filename in filenames:
+                if filename.endswith('.rs'):
+                    yield os.path.join(dirpath, filename)
+
+
+def snapshot_mtimes(paths: Iterable[str]) -> Dict[str, float]:
+    return {path: os.stat(path).st_mtime for path in source_files(paths)}
+
+
+# Bump this whenever the manifest format changes, to force one full comparison.
+MANIFEST_VERSION = 1
+
+GENERATOR_SCRIPTS = [os.path.realpath(__file__), gen_ts_decl.__file__, gen_java_decl.__file__]
+
+
+def hash_files(paths: Iterable[str], salt: Iterable[str] = ()) -> str:
+    sha = hashlib.sha256()
+    for item in salt:
+        sha.update(item.encode() + b'\0')
+    for path in sorted(source_files(paths)):
+        sha.update(os.path.relpath(path, BRIDGE_DIR).encode() + b'\0')
+        with open(path, 'rb') as fh:
+            sha.update(hashlib.sha256(fh.read()).digest())
+    return sha.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def hash_line(line: str) -> str:
+    # Declaration lines are short and only compared within one crate; a truncated hash is plenty.
+    return hash_text(line.strip())[:16]
+
+
+def crate_sources_hash(crate: BridgeCrate) -> str:
+    return hash_files(watched_paths(crate), salt=crate.features)
+
+
+def target_inputs_hash(target: Target) -> str:
+    return hash_files(list(target.inputs) + GENERATOR_SCRIPTS)
+
+
+class CrateCache:
+    """
+    Expanded declarations per crate, each with a hash of the sources it was expanded from.
+
+    Crates are only expanded when their declarations are first asked for.
+    """
+
+    def __init__(self) -> None:
+        self._decls: Dict[str, List[Decl]] = {}
+        self._sources: Dict[str, str] = {}
+
+    def sources_hash(self, crate: BridgeCrate) -> str:
+        if crate.name not in self._sources:
+            self._sources[crate.name] = crate_sources_hash(crate)
+        return self._sources[crate.name]
+
+    def decls(self, crate: BridgeCrate) -> List[Decl]:
+        if crate.name not in self._decls:
+            self.refresh(crate)
+        return self._decls[crate.name]
+
+    def refresh(self, crate: BridgeCrate) -> None:
+        # Hash before expanding, so that an edit made in the meantime makes the manifest stale
+        # rather than being recorded as already accounted for.
+        sources = crate_sources_hash(crate)
+        self._decls[crate.name] = collect_crate_decls(crate)
+        self._sources[crate.name] = sources
+
+    def model(self, crates: Iterable[BridgeCrate]) -> List[Decl]:
+        return list(itertools.chain.from_iterable(self.decls(crate) for crate in crates))
+
+
+def crate_decl_lines(target: Target, decls: Sequence[Decl]) -> List[str]:
+    """The lines `decls` (from a single crate) contribute to `target`, for hashing."""
+    if target.decl_lines is None:
+        return [decl.symbol for decl in select(decls, target.crates, 'c', FFI_PREFIX)]
+    return [line.strip() for line in target.decl_lines(decls) if line.strip()]
+
+
+def manifest_path(output_file: str) -> str:
+    (dirname, basename) = os.path.split(output_file)
+    return os.path.join(dirname, f'.{basename}.decls.json')
+
+
+def load_manifest(target: Target) -> Optional[dict]:
+    try:
+        with open(manifest_path(target.output)) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(target: Target, contents: str, cache: CrateCache) -> None:
+    crates = {}
+    for crate in target.crates:
+        crates[crate.name] = {
+            'sources': cache.sources_hash(crate),
+            'decls': [hash_line(line) for line in crate_decl_lines(target, cache.decls(crate))],
+        }
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'inputs': target_inputs_hash(target),
+        'output': hash_text(contents),
+        'crates': crates,
+    }
+    with open(manifest_path(target.output), 'w') as fh:
+        json.dump(manifest, fh, indent=1, sort_keys=True)
+        fh.write('\n')
+
+
+def write_target(target: Target, contents: str, cache: CrateCache) -> None:
+    with open(target.output, 'w') as fh:
+        fh.write(contents)
+    write_manifest(target, contents, cache)
+
+
+def print_section_diff(output_file: str, current_contents: str, crate: BridgeCrate,
+                       old_hashes: Sequence[str], new_lines: Sequence[str]) -> None:
+    """Print the declaration lines from `crate` that were added to or removed from `output_file`."""
+    old = set(old_hashes)
+    new = {hash_line(line) for line in new_lines}
+    print(f'--- {output_file} (declarations from {crate.name})')
+    for line in current_contents.splitlines():
+        if line.strip() and hash_line(line) in old - new:
+            print('-' + line)
+    for line in new_lines:
+        if hash_line(line) not in old:
+            print('+' + line)
+
+
+def verify_target(target: Target, cache: CrateCache) -> bool:
+    """
+    Check `target` against its manifest, falling back to a full diff, and return whether it is up
+    to date.
+
+    Only crates whose sources have changed since the manifest was written get expanded, and a
+    header is re-run through cbindgen whenever any of its crates has changed.
+    """
+    with open(target.output) as fh:
+        current_contents = fh.read()
+    manifest = load_manifest(target)
+    if (manifest is None
+            or manifest['inputs'] != target_inputs_hash(target)
+            or manifest['output'] != hash_text(current_contents)):
+        # No manifest, a different template or generator, or a hand-edited output.
+        return not diff_contents(target.output, target.render(cache.model(target.crates)))
+
+    stale = [crate for crate in target.crates
+             if manifest['crates'].get(crate.name, {}).get('sources') != cache.sources_hash(crate)]
+    if not stale:
+        return True
+
+    if target.decl_lines is None:
+        # Only cbindgen can say what the header should look like: the symbols recorded for it don't
+        # capture argument, return or type definition changes.
+        return not diff_contents(target.output, target.render(cache.model(target.crates)))
+
+    changed: Dict[BridgeCrate, List[str]] = {}
+    for crate in stale:
+        new_lines = crate_decl_lines(target, cache.decls(crate))
+        if [hash_line(line) for line in new_lines] != manifest['crates'].get(crate.name, {}).get('decls'):
+            changed[crate] = new_lines
+    if not changed:
+        return True
+    for (crate, new_lines) in changed.items():
+        print_section_diff(target.output, current_contents, crate,
+                           manifest['crates'].get(crate.name, {}).get('decls', []), new_lines)
+    return False
+
+
+def crates_affected_by(changed_files: Iterable[str], crates: Iterable[BridgeCrate]) -> Set[BridgeCrate]:
+    affected = set()
+    for crate in crates:
+        roots = watched_paths(crate)
+        if any(f == root or f.startswith(root + os.sep) for f in changed_files for root in roots):
+            affected.add(crate)
+    return affected
+
+
+def print_decl_diff(output_file: str, old_contents: str, new_contents: str) -> None:
+    diff = difflib.unified_diff(old_contents.splitlines(), new_contents.splitlines(), n=0, lineterm='')
+    print(f'updated {os.path.relpath(output_file)}:')
+    for line in diff:
+        if line.startswith(('+', '-')) and not line.startswith(('+++', '---')):
+            print('  ' + line)
+
+
+def refresh_targets(targets: Sequence[Target], cache: CrateCache, changed: Set[BridgeCrate]) -> None:
+    """Re-render the targets that depend on `changed`, patching any output whose contents differ."""
+    changed_names = {crate.name for crate in changed}
+    for target in targets:
+        if not changed_names.intersection(crate.name for crate in target.crates):
+            continue
+        try:
+            contents = target.render(cache.model(target.crates))
+        except SystemExit as e:
+            print(e, file=sys.stderr)
+            continue
+        with open(target.output) as fh:
+            old_contents = fh.read()
+        if contents == old_contents:
+            # The sources changed even if the output didn't; keep the manifest in step.
+            write_manifest(target, contents, cache)
+            continue
+        write_target(target, contents, cache)
+        print_decl_diff(target.output, old_contents, contents)
+
+
+def regenerate(targets: Sequence[Target], cache: CrateCache, changed: Set[BridgeCrate]) -> Set[BridgeCrate]:
+    """Re-expand `changed` and re-render what depends on it, returning the crates that failed to expand."""
+    failed = set()
+    for crate in sorted(changed, key=lambda crate: crate.name):
+        try:
+            cache.refresh(crate)
+        except SystemExit:
+            # Most likely the crate doesn't compile yet; keep the last good declarations.
+            print(f'{crate.name} failed to expand; retrying after the next change', file=sys.stderr)
+            failed.add(crate)
+    refresh_targets(targets, cache, changed - failed)
+    return failed
+
+
+class Debouncer:
+    """
+    Crates waiting to be regenerated.
+
+    A burst of changes is coalesced: nothing is ready until the sources have been quiet for
+    `debounce` seconds. Crates that failed to expand are retried along with the next change.
+    """
+
+    def __init__(self, debounce: float) -> None:
+        self.debounce = debounce
+        self.pending: Set[BridgeCrate] = set()
+        self.failed: Set[BridgeCrate] = set()
+        self.last_change = 0.0
+
+    def changed(self, crates: Set[BridgeCrate], now: float) -> None:
+        self.pending |= crates | self.failed
+        self.failed = set()
+        self.last_change = now
+
+    def ready(self, now: float) -> Set[BridgeCrate]:
+        if not self.pending or now - self.last_change < self.debounce:
+            return set()
+        (ready, self.pending) = (self.pending, set())
+        return ready
+
+
+def watch(targets: Sequence[Target], poll_interval: float, debounce: float) -> None:
+    """
+    Poll the bridge sources and regenerate only the crates that changed.
+
+    A burst of saves is coalesced: nothing is regenerated until the sources have been quiet for
+    `debounce` seconds.
+    """
+    all_paths = sorted(set(itertools.chain.from_iterable(watched_paths(crate) for crate in ALL_CRATES)))
+    cache = CrateCache()
+    refresh_targets(targets, cache, set(ALL_CRATES))
+    print(f'watching {len(all_paths)} paths for changes (Ctrl-C to stop)', file=sys.stderr)
+
+    mtimes = snapshot_mtimes(all_paths)
+    debouncer = Debouncer(debounce)
+    while True:
+        time.sleep(poll_interval)
+        current = snapshot_mtimes(all_paths)
+        changed_files = {path for path in mtimes.keys() | current.keys() if mtimes.get(path) != current.get(path)}
+        mtimes = current
+        if changed_files:
+            debouncer.changed(crates_affected_by(changed_files, ALL_CRATES), time.monotonic())
+        elif ready := debouncer.ready(time.monotonic()):
+            debouncer.failed |= regenerate(targets, cache, ready)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--verify', action='store_true',
+                      help='check that every generated file is up to date instead of writing it')
+    mode.add_argument('--watch', action='store_true',
+                      help='keep running, regenerating affected files whenever bridge sources change')
+    parser.add_argument('--poll-interval', type=float, default=0.5, metavar='SECONDS',
+                        help='how often --watch checks for modified sources (default: %(default)s)')
+    parser.add_argument('--debounce', type=float, default=1.0, metavar='SECONDS',
+                        help='how long sources must be unchanged before --watch regenerates (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    targets = all_targets()
+
+    for target in targets:
+        if not os.access(target.output, os.F_OK):
+            raise Exception(f"Didn't find {target.output} where it was expected")
+
+    if args.watch:
+        try:
+            watch(targets, args.poll_interval, args.debounce)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    cache = CrateCache()
+    out_of_date = []
+    for target in targets:
+        if not args.verify:
+            write_target(target, target.render(cache.model(target.crates)), cache)
+        elif not verify_target(target, cache):
+            out_of_date.append(os.path.basename(target.output))
+
+    if out_of_date:
+        sys.exit(f"error: {', '.join(out_of_date)} not up to date; re-run {sys.argv[0]}!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (C) 2026 Signal Messenger, LLC.
+# SPDX-License-Identifier: AGPL-3.0-only
+#
+
+"""
+Check that gen_call_benchmarks.py pairs up entry points that were renamed for one bridge.
+"""
+
+import unittest
+
+import gen_call_benchmarks
+import gen_decls
+
+# The expansion of `#[bridge_fn(node = "PublicKey_Verify", batch = [message, signature])]` on
+# ECPublicKey_Verify, followed by an unrelated function bridged under its own name (trimmed to the
+# parts gen_decls looks at).
+EXPANDED = '''
+#[allow(non_snake_case, clippy::needless_pass_by_ref_mut)]
+#[inline(always)]
+fn ECPublicKey_Verify(key: &PublicKey, message: &[u8], signature: &[u8]) -> bool {
+    key.verify_signature(message, signature)
+}
+#[export_name = "Java_org_signal_libsignal_internal_Native_ECPublicKey_1Verify"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_ECPublicKey_1Verify<'local>(mut env: ::jni::JNIEnv<'local>,
+    _class: ::jni::objects::JClass, key: ::libsignal_bridge_types::jni::ObjectHandle,
+    message: ::jni::objects::JByteArray<'local>, signature: ::jni::objects::JByteArray<'local>)
+    -> ::jni::sys::jboolean {
+}
+#[allow(non_snake_case)]
+#[doc = "ts: export function PublicKey_Verify(key: &PublicKey, message: &[u8], signature: &[u8]): bool"]
+pub fn node_PublicKey_Verify(mut cx: node::FunctionContext) -> node::JsResult<node::JsValue> {
+}
+#[allow(non_snake_case, clippy::needless_pass_by_ref_mut)]
+fn ECPublicKey_Verify_batch(key: &PublicKey, message: Vec<&[u8]>, signature: Vec<&[u8]>) -> Box<[bool]> {
+}
+#[export_name = "Java_org_signal_libsignal_internal_Native_ECPublicKey_1Verify_1Batch"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_ECPublicKey_1Verify_1Batch<'local>(mut env: ::jni::JNIEnv<'local>,
+    _class: ::jni::objects::JClass, key: ::libsignal_bridge_types::jni::ObjectHandle,
+    message: jni::JavaByteBufferArray<'local>, signature: jni::JavaByteBufferArray<'local>)
+    -> ::jni::objects::JBooleanArray<'local> {
+}
+#[allow(non_snake_case)]
+#[doc = "ts: export function PublicKey_Verify_Batch(key: &PublicKey, message: Vec<&[u8]>, signature: Vec<&[u8]>): Box<[bool]>"]
+pub fn node_PublicKey_Verify_Batch(mut cx: node::FunctionContext) -> node::JsResult<node::JsValue> {
+}
+#[allow(non_snake_case, clippy::needless_pass_by_ref_mut)]
+#[inline(always)]
+/// Computes a checksum.
+#[doc = "Not [bridged] to Java."]
+fn Buffer_Checksum(buffer: &[u8]) -> u64 {
+}
+#[allow(non_snake_case)]
+#[doc = "ts: export function Buffer_Checksum(buffer: &[u8]): u64"]
+pub fn node_Buffer_Checksum(mut cx: node::FunctionContext) -> node::JsResult<node::JsValue> {
+}
+'''
+
+
+class BridgedFunctionsJoinOnRustFunction(unittest.TestCase):
+    def test_renamed_functions_are_benchmarked_through_java(self):
+        model = list(gen_decls.extract_decls(gen_decls.BRIDGE, EXPANDED))
+        functions = gen_call_benchmarks.bridged_functions(model)
+        self.assertEqual([(fn.name, fn.java) for fn in functions], [
+            ('Buffer_Checksum', None),
+            ('PublicKey_Verify', 'ECPublicKey_Verify'),
+            ('PublicKey_Verify_Batch', 'ECPublicKey_Verify_Batch'),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+
+#
+# Copyright (C) 2026 Signal Messenger, LLC.
+# SPDX-License-Identifier: AGPL-3.0-only
+#
+
+"""
+Check gen_decls.py's JNI prototypes against the lines cbindgen produced for the same functions, and
+its manifest-based --verify and --watch modes.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import gen_decls
+import gen_java_decl
+
+# (expanded bridge_fn wrapper, cbindgen's prototype for it, gen_java_decl's rendering of that)
+FIXTURES = [
+    # Throwing<…> around a value, with camelCased argument names.
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_Native_Aes256GcmSiv_1Decrypt"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_Aes256GcmSiv_Decrypt<'local>(mut env: ::jni::JNIEnv<'local>,
+    _class: ::jni::objects::JClass, aes_gcm_siv: ::libsignal_bridge_types::jni::ObjectHandle,
+    ctext: ::jni::objects::JByteArray<'local>, nonce: ::jni::objects::JByteArray<'local>,
+    associated_data: ::jni::objects::JByteArray<'local>)
+    -> ::libsignal_bridge_types::jni::Throwing<::jni::objects::JByteArray<'local>> {
+''',
+     'Throwing<JByteArray> Java_org_signal_libsignal_internal_Native_Aes256GcmSiv_1Decrypt(JNIEnv env, '
+     'JClass class_, ObjectHandle aesGcmSiv, JByteArray ctext, JByteArray nonce, JByteArray associatedData);',
+     ['  public static native byte[] Aes256GcmSiv_Decrypt(long aesGcmSiv, byte[] ctext, byte[] nonce, '
+      'byte[] associatedData) throws Exception;']),
+    # JavaCompletableFuture<…> from bridge_io, around a Throwing<()>.
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_Native_RegistrationService_1RequestPushChallenge"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_RegistrationService_RequestPushChallenge<'local>(mut env:
+        ::jni::JNIEnv<'local>, _class: ::jni::objects::JClass,
+    async_runtime: ::libsignal_bridge_types::jni::ObjectHandle,
+    service: ::libsignal_bridge_types::jni::ObjectHandle,
+    push_token: ::jni::objects::JString<'local>)
+    -> jni::JavaCompletableFuture<'local, ::libsignal_bridge_types::jni::Throwing<()>> {
+''',
+     'JavaCompletableFuture<Throwing> Java_org_signal_libsignal_internal_Native_RegistrationService_1RequestPushChallenge'
+     '(JNIEnv env, JClass class_, ObjectHandle asyncRuntime, ObjectHandle service, JString pushToken);',
+     ['  public static native CompletableFuture<Void> RegistrationService_RequestPushChallenge(long asyncRuntime, '
+      'long service, String pushToken);']),
+    # A ByteBuffer from jni_direct_buffers, with a bare Throwing for Result<()>.
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_Native_OnlineBackupValidator_1AddFrame_1Direct"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_direct_OnlineBackupValidator_AddFrame<'local>(mut env:
+        ::jni::JNIEnv<'local>, _class: ::jni::objects::JClass,
+    backup: ::libsignal_bridge_types::jni::ObjectHandle,
+    frame: jni::JavaByteBuffer<'local>) -> ::libsignal_bridge_types::jni::Throwing<()> {
+''',
+     'Throwing Java_org_signal_libsignal_internal_Native_OnlineBackupValidator_1AddFrame_1Direct(JNIEnv env, '
+     'JClass class_, ObjectHandle backup, JavaByteBuffer frame);',
+     ['  public static native void OnlineBackupValidator_AddFrame_Direct(long backup, ByteBuffer frame) '
+      'throws Exception;',
+      '  public static void OnlineBackupValidator_AddFrame(long backup, ByteBuffer frame) throws Exception '
+      '{ OnlineBackupValidator_AddFrame_Direct(backup, frame); }']),
+    # An array of ByteBuffers in.
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_Native_GroupSendEndorsement_1Combine"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_GroupSendEndorsement_Combine<'local>(mut env:
+        ::jni::JNIEnv<'local>, _class: ::jni::objects::JClass,
+    endorsements: jni::JavaByteBufferArray<'local>) -> ::jni::objects::JByteArray<'local> {
+''',
+     'JByteArray Java_org_signal_libsignal_internal_Native_GroupSendEndorsement_1Combine(JNIEnv env, '
+     'JClass class_, JavaByteBufferArray endorsements);',
+     ['  public static native byte[] GroupSendEndorsement_Combine(ByteBuffer[] endorsements);']),
+    # An array of byte arrays out, from the testing package.
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_NativeTesting_TESTING_1ProcessBytestringArray"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_TESTING_ProcessBytestringArray<'local>(mut env:
+        ::jni::JNIEnv<'local>, _class: ::jni::objects::JClass,
+    input: jni::JavaByteBufferArray<'local>)
+    -> ::libsignal_bridge_types::jni::JavaArrayOfByteArray<'local> {
+''',
+     'JavaArrayOfByteArray Java_org_signal_libsignal_internal_NativeTesting_TESTING_1ProcessBytestringArray('
+     'JNIEnv env, JClass class_, JavaByteBufferArray input);',
+     ['  public static native byte[][] TESTING_ProcessBytestringArray(ByteBuffer[] input);']),
+    # A type renamed by [export.rename].
+    ('''
+#[export_name = "Java_org_signal_libsignal_internal_Native_WebpSanitizer_1Sanitize"]
+#[allow(non_snake_case)]
+pub unsafe extern "C" fn __bridge_fn_jni_WebpSanitizer_Sanitize<'local>(mut env: ::jni::JNIEnv<'local>,
+    _class: ::jni::objects::JClass, input: jni::JavaSyncInputStream<'local>)
+    -> ::libsignal_bridge_types::jni::Throwing<()> {
+''',
+     'Throwing Java_org_signal_libsignal_internal_Native_WebpSanitizer_1Sanitize(JNIEnv env, JClass class_, '
+     'JavaInputStream input);',
+     ['  public static native void WebpSanitizer_Sanitize(InputStream input) throws Exception;']),
+]
+
+# rust/bridge/jni/impl's hand-written keepAlive, which Native.java.in declares itself, with its docs
+# in both of the forms expansion may print them in.
+KEEP_ALIVE = [
+    '''
+/// An optimization barrier / guard against garbage collection.
+///
+/// cbindgen:ignore
+#[no_mangle]
+pub unsafe extern "C" fn Java_org_signal_libsignal_internal_Native_keepAlive(_env: JNIEnv,
+    _class: JClass, _obj: JObject) {}
+''',
+    '''
+#[doc = r" An optimization barrier / guard against garbage collection."]
+#[doc = r""]
+#[doc = r" cbindgen:ignore"]
+#[no_mangle]
+pub unsafe extern "C" fn Java_org_signal_libsignal_internal_Native_keepAlive(_env: JNIEnv,
+    _class: JClass, _obj: JObject) {}
+''',
+]
+
+
+class JniPrototypesMatchCbindgen(unittest.TestCase):
+    def test_prototypes(self):
+        for (expanded, cbindgen_line, _java_lines) in FIXTURES:
+            decls = list(gen_decls.extract_c_decls(gen_decls.JNI_IMPL, expanded))
+            self.assertEqual([decl.text for decl in decls], [cbindgen_line])
+
+    def test_cbindgen_ignore(self):
+        for expanded in KEEP_ALIVE:
+            # Alongside a regular entry point, to make sure only keepAlive is skipped.
+            decls = list(gen_decls.extract_c_decls(gen_decls.JNI_IMPL, FIXTURES[0][0] + expanded))
+            self.assertEqual([decl.text for decl in decls], [FIXTURES[0][1]])
+
+    def test_java_decls(self):
+        for (_expanded, cbindgen_line, java_lines) in FIXTURES:
+            self.assertEqual(list(gen_java_decl.parse_decls(cbindgen_line)), [''] + java_lines)
+
+    def test_each_package_uses_its_own_config(self):
+        for (crate, prefix) in [(gen_decls.JNI_IMPL, gen_decls.JNI_PREFIX),
+                                (gen_decls.JNI_TESTING, gen_decls.JNI_TESTING_PREFIX)]:
+            config_path = os.path.join(crate.path, 'cbindgen.toml')
+            self.assertEqual(gen_decls.jni_config(prefix + 'Foo'), gen_decls.load_cbindgen_config(config_path))
+            (target,) = [target for target in gen_decls.all_targets()
+                         if target.crates[0] == crate and target.output.endswith('.java')]
+            self.assertIn(config_path, target.inputs)
+
+
+class FakeCache(gen_decls.CrateCache):
+    """A CrateCache whose expansions and source hashes are supplied by the test."""
+
+    def __init__(self, decls, sources):
+        super().__init__()
+        self.fake_decls = decls
+        self.fake_sources = sources
+        self.expanded = []
+        self.broken = set()
+
+    def sources_hash(self, crate):
+        return self.fake_sources[crate.name]
+
+    def refresh(self, crate):
+        if crate.name in self.broken:
+            sys.exit(f'error: could not expand {crate.name}')
+        self.expanded.append(crate.name)
+        self._decls[crate.name] = self.fake_decls[crate.name]
+        self._sources[crate.name] = self.fake_sources[crate.name]
+
+
+class ManifestFastPath(unittest.TestCase):
+    def setUp(self):
+        work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(work_dir.cleanup)
+        self.dir = work_dir.name
+        self.crate = gen_decls.BridgeCrate('demo', self.dir)
+        template = os.path.join(self.dir, 'template.in')
+        with open(template, 'w') as fh:
+            fh.write('template\n')
+        self.renders = 0
+
+        def render(model):
+            self.renders += 1
+            return ''.join(decl.text + '\n' for decl in model)
+
+        self.java_target = gen_decls.Target(os.path.join(self.dir, 'Native.java'), [self.crate], render,
+                                            [template], lambda model: [decl.text for decl in model])
+        self.header_target = gen_decls.Target(os.path.join(self.dir, 'signal_ffi.h'), [self.crate], render,
+                                              [template], None)
+
+    def cache(self, sources, *texts):
+        decls = [gen_decls.Decl(self.crate.name, 'c', 'signal_foo', text) for text in texts]
+        return FakeCache({self.crate.name: decls}, {self.crate.name: sources})
+
+    def generate(self, *texts):
+        cache = self.cache('v1', *texts)
+        for target in (self.java_target, self.header_target):
+            gen_decls.write_target(target, target.render(cache.model(target.crates)), cache)
+        self.renders = 0
+
+    def verify(self, target, cache):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            up_to_date = gen_decls.verify_target(target, cache)
+        return (up_to_date, output.getvalue())
+
+    def test_unchanged_tree(self):
+        self.generate('void signal_foo(int32_t x);')
+        for target in (self.java_target, self.header_target):
+            cache = self.cache('v1', 'void signal_foo(int32_t x);')
+            self.assertEqual(self.verify(target, cache), (True, ''))
+            self.assertEqual(cache.expanded, [])
+            self.assertEqual(self.renders, 0)
+
+    def test_signature_only_change(self):
+        self.generate('void signal_foo(int32_t x);')
+        for target in (self.java_target, self.header_target):
+            cache = self.cache('v2', 'void signal_foo(int64_t x);')
+            (up_to_date, output) = self.verify(target, cache)
+            self.assertFalse(up_to_date)
+            self.assertIn('+void signal_foo(int64_t x);', output)
+
+    def test_source_change_with_same_declarations(self):
+        self.generate('void signal_foo(int32_t x);')
+        cache = self.cache('v2', 'void signal_foo(int32_t x);')
+        self.assertEqual(self.verify(self.java_target, cache), (True, ''))
+        self.assertEqual(cache.expanded, [self.crate.name])
+        self.assertEqual(self.renders, 0)
+        # The header is always re-rendered, since only cbindgen knows everything that goes in it.
+        self.assertEqual(self.verify(self.header_target, cache), (True, ''))
+        self.assertEqual(self.renders, 1)
+
+    def test_missing_or_stale_manifest(self):
+        self.generate('void signal_foo(int32_t x);')
+        manifest_path = gen_decls.manifest_path(self.java_target.output)
+        with open(manifest_path) as fh:
+            manifest = json.load(fh)
+
+        os.remove(manifest_path)
+        self.assertEqual(self.verify(self.java_target, self.cache('v1', 'void signal_foo(int32_t x);')),
+                         (True, ''))
+        self.assertEqual(self.renders, 1)
+        (up_to_date, output) = self.verify(self.java_target, self.cache('v1', 'void signal_foo(int64_t x);'))
+        self.assertFalse(up_to_date)
+        self.assertIn('+void signal_foo(int64_t x);', output)
+
+        # A manifest from an older format, or one recording different inputs, is ignored too, even
+        # though its recorded source hash would otherwise skip the expansion.
+        for stale in ({**manifest, 'version': gen_decls.MANIFEST_VERSION - 1}, {**manifest, 'inputs': ''}):
+            with open(manifest_path, 'w') as fh:
+                json.dump(stale, fh)
+            (up_to_date, _output) = self.verify(self.java_target, self.cache('v1', 'void signal_foo(int64_t x);'))
+            self.assertFalse(up_to_date)
+
+
+class WatchMode(unittest.TestCase):
+    def test_debounce(self):
+        debouncer = gen_decls.Debouncer(debounce=1.0)
+        self.assertEqual(debouncer.ready(now=5.0), set())
+        debouncer.changed({gen_decls.BRIDGE}, now=10.0)
+        debouncer.changed({gen_decls.NODE}, now=10.6)
+        # Still within a second of the last change.
+        self.assertEqual(debouncer.ready(now=11.5), set())
+        self.assertEqual(debouncer.ready(now=11.6), {gen_decls.BRIDGE, gen_decls.NODE})
+        self.assertEqual(debouncer.ready(now=20.0), set())
+
+    def test_failed_expansion_then_good_one(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            crates = [gen_decls.BridgeCrate(name, work_dir) for name in ('broken', 'fine')]
+            targets = []
+            for crate in crates:
+                output = os.path.join(work_dir, crate.name + '.out')
+                with open(output, 'w') as fh:
+                    fh.write('old\n')
+                targets.append(gen_decls.Target(
+                    output, [crate], lambda model: ''.join(decl.text + '\n' for decl in model), [], None))
+            cache = FakeCache({crate.name: [gen_decls.Decl(crate.name, 'c', 'signal_foo', 'new')]
+                               for crate in crates},
+                              {crate.name: 'v2' for crate in crates})
+            cache.broken = {'broken'}
+            debouncer = gen_decls.Debouncer(debounce=1.0)
+
+            def contents():
+                result = []
+                for target in targets:
+                    with open(target.output) as fh:
+                        result.append(fh.read())
+                return result
+
+            debouncer.changed(set(crates), now=0.0)
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                debouncer.failed |= gen_decls.regenerate(targets, cache, debouncer.ready(now=1.0))
+            # The crate that did expand is rendered right away; the other one waits.
+            self.assertEqual(contents(), ['old\n', 'new\n'])
+            self.assertEqual(debouncer.ready(now=5.0), set())
+
+            # Once it's fixed, any change brings it back.
+            cache.broken = set()
+            debouncer.changed(set(), now=10.0)
+            with contextlib.redirect_stdout(io.StringIO()):
+                gen_decls.regenerate(targets, cache, debouncer.ready(now=11.0))
+            self.assertEqual(contents(), ['new\n', 'new\n'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -77,6 +77,11 @@ pub unsafe extern "C" fn signal_free_bytestring_array(array: BytestringArray) {
     drop(array.into_boxed_parts())
 }
 
+#[no_mangle]
+pub unsafe extern "C" fn signal_free_list_of_bools(buffer: OwnedBufferOf<bool>) {
+    drop(buffer.into_box())
+}
+
 #[no_mangle]
 pub unsafe extern "C" fn signal_error_free(err: *mut SignalFfiError) {
     if !err.is_null() {
@@ -0,0 +1,106 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+package org.signal.libsignal.internal;
+
+import java.nio.ByteBuffer;
+
+/**
+ * Compares verifying N signatures with N calls to {@code ECPublicKey_Verify} against one call to
+ * {@code ECPublicKey_Verify_Batch} (which is generated by {@code bridge_fn(batch = [message,
+ * signature])}).
+ *
+ * <p>Build it against the libsignal client jar and run it with the native library on the
+ * library path:
+ *
+ * <pre>
+ * javac -cp libsignal-client.jar -d out rust/bridge/jni/benches/BatchedCallBenchmark.java
+ * java -cp libsignal-client.jar:out org.signal.libsignal.internal.BatchedCallBenchmark
+ * </pre>
+ *
+ * Each line of output reports the average time per item for one batch size and path.
+ */
+public final class BatchedCallBenchmark {
+  private static final int[] BATCH_SIZES = {1, 16, 256, 4096};
+  private static final int MESSAGE_SIZE = 64;
+
+  private interface Verify {
+    void run() throws Exception;
+  }
+
+  private static double nanosPerItem(int count, Verify verify) throws Exception {
+    // Scale the iteration count so that each measurement covers roughly the same number of items.
+    int iterations = Math.max(5, 20_000 / count);
+    for (int i = 0; i < iterations / 10; i++) {
+      verify.run();
+    }
+    long start = System.nanoTime();
+    for (int i = 0; i < iterations; i++) {
+      verify.run();
+    }
+    return (double) (System.nanoTime() - start) / iterations / count;
+  }
+
+  private static ByteBuffer direct(byte[] bytes) {
+    ByteBuffer buffer = ByteBuffer.allocateDirect(bytes.length);
+    buffer.put(bytes).flip();
+    return buffer;
+  }
+
+  public static void main(String[] args) throws Exception {
+    long privateKey = Native.ECPrivateKey_Generate();
+    long publicKey = Native.ECPrivateKey_GetPublicKey(privateKey);
+    try {
+      int maxCount = BATCH_SIZES[BATCH_SIZES.length - 1];
+      byte[][] messages = new byte[maxCount][];
+      byte[][] signatures = new byte[maxCount][];
+      for (int i = 0; i < maxCount; i++) {
+        messages[i] = new byte[MESSAGE_SIZE];
+        messages[i][0] = (byte) i;
+        messages[i][1] = (byte) (i >> 8);
+        signatures[i] = Native.ECPrivateKey_Sign(privateKey, messages[i]);
+      }
+
+      for (int count : BATCH_SIZES) {
+        ByteBuffer[] messageBuffers = new ByteBuffer[count];
+        ByteBuffer[] signatureBuffers = new ByteBuffer[count];
+        for (int i = 0; i < count; i++) {
+          messageBuffers[i] = direct(messages[i]);
+          signatureBuffers[i] = direct(signatures[i]);
+        }
+
+        double singleNanos =
+            nanosPerItem(
+                count,
+                () -> {
+                  for (int i = 0; i < count; i++) {
+                    if (!Native.ECPublicKey_Verify(publicKey, messages[i], signatures[i])) {
+                      throw new AssertionError("signature " + i + " did not verify");
+                    }
+                  }
+                });
+        double batchedNanos =
+            nanosPerItem(
+                count,
+                () -> {
+                  boolean[] results =
+                      Native.ECPublicKey_Verify_Batch(publicKey, messageBuffers, signatureBuffers);
+                  for (int i = 0; i < count; i++) {
+                    if (!results[i]) {
+                      throw new AssertionError("signature " + i + " did not verify");
+                    }
+                  }
+                });
+
+        System.out.printf(
+            "%6d items  single calls %10.1f ns/item  batched call %10.1f ns/item  (%.2fx)%n",
+            count, singleNanos, batchedNanos, singleNanos / batchedNanos);
+      }
+    } finally {
+      Native.ECPublicKey_Destroy(publicKey);
+      Native.ECPrivateKey_Destroy(privateKey);
+    }
+  }
+}
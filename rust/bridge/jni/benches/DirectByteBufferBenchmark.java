@@ -0,0 +1,70 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+package org.signal.libsignal.internal;
+
+import java.nio.ByteBuffer;
+import java.util.Arrays;
+
+/**
+ * Compares passing a payload to Rust as a {@code byte[]} against passing it as a direct
+ * {@code ByteBuffer}, using {@code IncrementalMac_Update} (which is declared with
+ * {@code bridge_fn(jni_direct_buffers = true)}).
+ *
+ * <p>Build it against the libsignal client jar and run it with the native library on the
+ * library path:
+ *
+ * <pre>
+ * javac -cp libsignal-client.jar -d out rust/bridge/jni/benches/DirectByteBufferBenchmark.java
+ * java -cp libsignal-client.jar:out org.signal.libsignal.internal.DirectByteBufferBenchmark
+ * </pre>
+ *
+ * Each line of output reports the average time per call for one payload size and path.
+ */
+public final class DirectByteBufferBenchmark {
+  private static final int[] SIZES = {1 << 10, 64 << 10, 4 << 20};
+  private static final byte[] KEY = new byte[32];
+  private static final int CHUNK_SIZE = 64 << 10;
+
+  private interface Update {
+    void run(long mac, int size) throws Exception;
+  }
+
+  private static double nanosPerCall(int size, Update update) throws Exception {
+    // Scale the iteration count so that each measurement covers roughly the same number of bytes.
+    int iterations = Math.max(20, (256 << 20) / size);
+    long mac = Native.IncrementalMac_Initialize(KEY, CHUNK_SIZE);
+    try {
+      for (int i = 0; i < iterations / 10; i++) {
+        update.run(mac, size);
+      }
+      long start = System.nanoTime();
+      for (int i = 0; i < iterations; i++) {
+        update.run(mac, size);
+      }
+      return (double) (System.nanoTime() - start) / iterations;
+    } finally {
+      Native.IncrementalMac_Destroy(mac);
+    }
+  }
+
+  public static void main(String[] args) throws Exception {
+    for (int size : SIZES) {
+      byte[] array = new byte[size];
+      Arrays.fill(array, (byte) 0x5a);
+      ByteBuffer direct = ByteBuffer.allocateDirect(size);
+      direct.put(array).flip();
+
+      double arrayNanos =
+          nanosPerCall(size, (mac, len) -> Native.IncrementalMac_Update(mac, array, 0, len));
+      double directNanos =
+          nanosPerCall(size, (mac, len) -> Native.IncrementalMac_Update(mac, direct, 0, len));
+
+      System.out.printf(
+          "%8d bytes  byte[] %12.1f ns/call  direct ByteBuffer %12.1f ns/call  (%.2fx)%n",
+          size, arrayNanos, directNanos, arrayNanos / directNanos);
+    }
+  }
+}
@@ -98,6 +98,7 @@ def translate_to_java(typ: str) -> Tuple[str, bool]:
         "JClass": "Class",
         "JByteArray": "byte[]",
         "JLongArray": "long[]",
+        "JBooleanArray": "boolean[]",
         "JObjectArray": "Object[]",
         "ObjectHandle": "long",
         "jint": "int",
@@ -105,6 +106,7 @@ def translate_to_java(typ: str) -> Tuple[str, bool]:
         "jboolean": "boolean",
         "JavaArrayOfByteArray": "byte[][]",
         "JavaByteBufferArray": "ByteBuffer[]",
+        "JavaByteBuffer": "ByteBuffer",
     }
 
     if typ in type_map:
@@ -160,18 +162,33 @@ def parse_decls(cbindgen_output: str) -> Iterator[str]:
         java_fn_name = method_name.replace('_1', '_')
         (java_ret_type, is_throwing) = translate_to_java(ret_type)
         java_args = []
+        java_arg_names = []
 
         if args is not None:
             for arg in args.split(', ')[1:]:
                 (arg_type, arg_name) = arg.split(' ')
                 (java_arg_type, _is_throwing) = translate_to_java(arg_type)
                 java_args.append('%s %s' % (java_arg_type, arg_name))
+                java_arg_names.append(arg_name)
 
+        throws_clause = " throws Exception" if is_throwing else ""
         yield ("  public static native %s %s(%s)%s;" % (
             java_ret_type,
             java_fn_name,
             ", ".join(java_args),
-            " throws Exception" if is_throwing else ""))
+            throws_clause))
+
+        # bridge_fn(jni_direct_buffers = true) entry points take ByteBuffers where the original
+        # takes byte[]s; expose them as an overload of the original name as well.
+        if (overloaded_name := java_fn_name.removesuffix('_Direct')) != java_fn_name:
+            yield ("  public static %s %s(%s)%s { %s%s(%s); }" % (
+                java_ret_type,
+                overloaded_name,
+                ", ".join(java_args),
+                throws_clause,
+                "" if java_ret_type == 'void' else "return ",
+                java_fn_name,
+                ", ".join(java_arg_names)))
 
 
 def expand_template(template_file: str, decls: Iterable[str]) -> str:
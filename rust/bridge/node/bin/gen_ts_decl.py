@@ -175,7 +175,7 @@ def camelcase(arg: str) -> str:
         arg)
 
 
-def collect_decls(crate_dir: str, features: Iterable[str] = ()) -> Iterator[str]:
+def expand_crate(crate_dir: str, features: Iterable[str] = ()) -> str:
     args = [
         'cargo',
         'rustc',
@@ -208,38 +208,58 @@ def collect_decls(crate_dir: str, features: Iterable[str] = ()) -> Iterator[str]
         print("Exiting with error")
         sys.exit(1)
 
+    return stdout
+
+
+def extract_raw_ts_decls(expanded_source: str) -> Iterator[str]:
+    """
+    Find the `ts:` declarations left in expanded source by the bridge macros.
+
+    The declarations are returned as written, i.e. still using Rust types.
+    """
     comment_decl = re.compile(r'\s*///\s*ts: (.+)')
     # Note that the doc attribute is sometimes wrapped onto two lines.
     attr_decl = re.compile(r'\s*(?:#\[doc\s*=\s*)?"ts: (.+)"\]')
 
-    # Make sure /not/ to match arguments with nested parentheses,
-    # which won't survive textual splitting below.
-    function_sig = re.compile(r'(.+)\(([^()]*)\): (.+);?')
-
-    for line in stdout.split('\n'):
+    for line in expanded_source.split('\n'):
         match = comment_decl.match(line) or attr_decl.match(line)
         if match is None:
             continue
 
         (decl,) = match.groups()
+        yield decl
 
-        function_match = function_sig.match(decl)
-        if function_match is None:
-            yield decl
-            continue
 
-        (prefix, fn_args, ret_type) = function_match.groups()
+# Make sure /not/ to match arguments with nested parentheses,
+# which won't survive textual splitting below.
+FUNCTION_SIG = re.compile(r'(.+)\(([^()]*)\): (.+);?')
 
-        ts_ret_type = translate_to_ts(ret_type)
-        ts_args = []
-        if '::' in fn_args:
-            raise Exception(f'Paths are not supported. Use alias for the type of \'{fn_args}\'')
 
-        for (arg_name, arg_type) in split_rust_args(fn_args):
-            ts_arg_type = translate_to_ts(arg_type)
-            ts_args.append('%s: %s' % (camelcase(arg_name.strip()), ts_arg_type))
+def translate_ts_decl(decl: str) -> str:
+    function_match = FUNCTION_SIG.match(decl)
+    if function_match is None:
+        return decl
 
-        yield '%s(%s): %s;' % (prefix, ', '.join(ts_args), ts_ret_type)
+    (prefix, fn_args, ret_type) = function_match.groups()
+
+    ts_ret_type = translate_to_ts(ret_type)
+    ts_args = []
+    if '::' in fn_args:
+        raise Exception(f'Paths are not supported. Use alias for the type of \'{fn_args}\'')
+
+    for (arg_name, arg_type) in split_rust_args(fn_args):
+        ts_arg_type = translate_to_ts(arg_type)
+        ts_args.append('%s: %s' % (camelcase(arg_name.strip()), ts_arg_type))
+
+    return '%s(%s): %s;' % (prefix, ', '.join(ts_args), ts_ret_type)
+
+
+def parse_ts_decls(expanded_source: str) -> Iterator[str]:
+    return (translate_ts_decl(decl) for decl in extract_raw_ts_decls(expanded_source))
+
+
+def collect_decls(crate_dir: str, features: Iterable[str] = ()) -> Iterator[str]:
+    return parse_ts_decls(expand_crate(crate_dir, features))
 
 
 def expand_template(template_file: str, decls: Iterable[str]) -> str:
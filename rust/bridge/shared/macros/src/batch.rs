@@ -0,0 +1,268 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+use quote::*;
+use syn::spanned::Spanned;
+use syn::*;
+use syn_mid::ItemFn;
+
+use crate::util::{extract_arg_names_and_types, is_borrowed_byte_slice};
+
+/// Parses the value of `bridge_fn(batch = [arg, ...])` into the names of the batched arguments.
+pub(crate) fn batched_arg_names(value: &Expr) -> Result<Vec<Ident>> {
+    let Expr::Array(array) = value else {
+        return Err(Error::new(
+            value.span(),
+            "batch must be a list of argument names, like [message, signature]",
+        ));
+    };
+    if array.elems.is_empty() {
+        return Err(Error::new(
+            array.span(),
+            "batch must name at least one argument",
+        ));
+    }
+    array
+        .elems
+        .iter()
+        .map(|elem| match elem {
+            Expr::Path(path) if path.qself.is_none() => path
+                .path
+                .get_ident()
+                .cloned()
+                .ok_or_else(|| Error::new(elem.span(), "expected an argument name")),
+            _ => Err(Error::new(elem.span(), "expected an argument name")),
+        })
+        .collect()
+}
+
+/// The type a batched argument of type `ty` is passed as: `&[u8]` becomes `Vec<&[u8]>`, and a
+/// bridged handle `&T` becomes `&[&T]`.
+fn batched_arg_type(name: &Ident, ty: &Type) -> Result<Type> {
+    if is_borrowed_byte_slice(ty) {
+        return Ok(parse_quote!(Vec<&[u8]>));
+    }
+    if let Type::Reference(TypeReference {
+        mutability: None,
+        elem,
+        ..
+    }) = ty
+    {
+        if let Type::Path(path) = elem.as_ref() {
+            if path.qself.is_none() && !path.path.is_ident("str") {
+                return Ok(parse_quote!(&[&#path]));
+            }
+        }
+    }
+    Err(Error::new(
+        ty.span(),
+        format_args!(
+            "batched argument '{name}' must be a &[u8] or a reference to a bridged handle, not '{}'",
+            ty.to_token_stream()
+        ),
+    ))
+}
+
+/// The return type of the batched function: `T` becomes `Box<[T]>` and `Result<T, E>` becomes
+/// `Result<Box<[T]>, E>`, while functions returning nothing still return nothing.
+fn batched_return_type(output: &ReturnType) -> ReturnType {
+    let ReturnType::Type(arrow, ty) = output else {
+        return ReturnType::Default;
+    };
+    let is_unit = |ty: &Type| matches!(ty, Type::Tuple(t) if t.elems.is_empty());
+    if is_unit(ty) {
+        return output.clone();
+    }
+
+    let mut batched = ty.as_ref().clone();
+    if let Type::Path(path) = &mut batched {
+        if let Some(segment) = path.path.segments.last_mut() {
+            if segment.ident == "Result" {
+                if let PathArguments::AngleBracketed(args) = &mut segment.arguments {
+                    if let Some(GenericArgument::Type(success)) = args.args.first_mut() {
+                        if !is_unit(success) {
+                            *success = parse_quote!(Box<[#success]>);
+                        }
+                        return ReturnType::Type(*arrow, Box::new(batched));
+                    }
+                }
+            }
+        }
+    }
+    ReturnType::Type(*arrow, parse_quote!(Box<[#ty]>))
+}
+
+/// Generates `{name}_Batch`, which calls `function` once per item of the batched arguments and
+/// collects the results, stopping at the first error.
+///
+/// Every batched argument must have the same number of items; the arguments that aren't batched
+/// are cloned (usually just copying a reference) for every call.
+pub(crate) fn batched_fn(function: &ItemFn, batched: &[Ident]) -> Result<ItemFn> {
+    let sig = &function.sig;
+    if sig.asyncness.is_some() {
+        return Err(Error::new(
+            sig.ident.span(),
+            "batch is not supported for async functions",
+        ));
+    }
+
+    let input_names_and_types = extract_arg_names_and_types(sig)?;
+    for name in batched {
+        if !input_names_and_types.iter().any(|(arg, _ty)| *arg == name) {
+            return Err(Error::new(
+                name.span(),
+                format_args!("'{}' has no argument named '{name}'", sig.ident),
+            ));
+        }
+    }
+    let is_batched = |name: &Ident| batched.contains(name);
+
+    let inputs = input_names_and_types
+        .iter()
+        .map(|(name, ty)| {
+            let ty = if is_batched(name) {
+                batched_arg_type(name, ty)?
+            } else {
+                (*ty).clone()
+            };
+            Ok(quote!(#name: #ty))
+        })
+        .collect::<Result<Vec<_>>>()?;
+    let call_args = input_names_and_types.iter().map(|(name, _ty)| {
+        if is_batched(name) {
+            quote!(#name[__index])
+        } else {
+            quote!(::core::clone::Clone::clone(&#name))
+        }
+    });
+
+    let orig_name = &sig.ident;
+    let batch_name = format_ident!("{}_Batch", orig_name);
+    let generics = &sig.generics;
+    let where_clause = &sig.generics.where_clause;
+    let output = batched_return_type(&sig.output);
+    let (first, rest) = batched
+        .split_first()
+        .expect("checked non-empty when parsing");
+
+    parse2(quote! {
+        fn #batch_name #generics(#(#inputs),*) #output #where_clause {
+            let __count = #first.len();
+            #(
+                assert_eq!(
+                    #rest.len(),
+                    __count,
+                    concat!(
+                        "batched argument '", stringify!(#rest),
+                        "' must have as many items as '", stringify!(#first), "'",
+                    ),
+                );
+            )*
+            (0..__count).map(|__index| #orig_name(#(#call_args),*)).collect()
+        }
+    })
+}
+
+#[cfg(test)]
+mod test {
+    use syn::punctuated::Punctuated;
+
+    use super::*;
+
+    fn batched_sig(function: ItemFn, batched: Punctuated<Ident, Token![,]>) -> String {
+        let batched: Vec<Ident> = batched.into_iter().collect();
+        batched_fn(&function, &batched)
+            .expect("valid")
+            .sig
+            .to_token_stream()
+            .to_string()
+    }
+
+    #[test]
+    fn batches_byte_slices_and_handles() {
+        let sig = batched_sig(
+            parse_quote! {
+                fn PublicKey_Verify(key: &PublicKey, message: &[u8], signature: &[u8]) -> bool {
+                    key.verify_signature(message, signature)
+                }
+            },
+            parse_quote!(message, signature),
+        );
+        assert_eq!(
+            sig,
+            quote! {
+                fn PublicKey_Verify_Batch(
+                    key: &PublicKey,
+                    message: Vec<&[u8]>,
+                    signature: Vec<&[u8]>
+                ) -> Box<[bool]>
+            }
+            .to_string()
+        );
+
+        let sig = batched_sig(
+            parse_quote! {
+                fn Handle_Serialize(handle: &Handle) -> Vec<u8> { handle.serialize() }
+            },
+            parse_quote!(handle),
+        );
+        assert_eq!(
+            sig,
+            quote!(fn Handle_Serialize_Batch(handle: &[&Handle]) -> Box<[Vec<u8>]>).to_string()
+        );
+    }
+
+    #[test]
+    fn batches_inside_results() {
+        for (output, expected) in [
+            (quote!(), quote!()),
+            (quote!(-> ()), quote!(-> ())),
+            (quote!(-> Result<()>), quote!(-> Result<()>)),
+            (
+                quote!(-> Result<Vec<u8>>),
+                quote!(-> Result<Box<[Vec<u8>]>>),
+            ),
+            (
+                quote!(-> Result<Vec<u8>, ZkGroupVerificationFailure>),
+                quote!(-> Result<Box<[Vec<u8>]>, ZkGroupVerificationFailure>),
+            ),
+        ] {
+            let function: ItemFn = parse_quote!(fn F(x: &[u8]) #output {});
+            let batched = batched_fn(&function, &[parse_quote!(x)]).expect("valid");
+            assert_eq!(
+                batched.sig.output.to_token_stream().to_string(),
+                expected.to_string()
+            );
+        }
+    }
+
+    #[test]
+    fn rejects_unsupported_arguments() {
+        let function: ItemFn = parse_quote!(
+            fn F(x: u32, y: &str, z: &mut Handle) {}
+        );
+        for name in ["x", "y", "z", "missing"] {
+            assert!(batched_fn(&function, &[format_ident!("{name}")]).is_err());
+        }
+
+        let function: ItemFn = parse_quote!(
+            async fn F(x: &[u8]) {}
+        );
+        assert!(batched_fn(&function, &[parse_quote!(x)]).is_err());
+    }
+
+    #[test]
+    fn parses_argument_lists() {
+        let names = batched_arg_names(&parse_quote!([message, signature])).expect("valid");
+        assert_eq!(
+            names,
+            [format_ident!("message"), format_ident!("signature")]
+        );
+
+        assert!(batched_arg_names(&parse_quote!([])).is_err());
+        assert!(batched_arg_names(&parse_quote!(true)).is_err());
+        assert!(batched_arg_names(&parse_quote!(["message"])).is_err());
+    }
+}
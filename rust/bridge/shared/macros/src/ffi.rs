@@ -9,7 +9,10 @@ use quote::*;
 use syn::*;
 use syn_mid::Signature;
 
-use crate::util::{extract_arg_names_and_types, result_type};
+use crate::util::{
+    extract_arg_names_and_types, handle_creation_site, metrics_timer, metrics_timer_capture,
+    result_type,
+};
 use crate::{BridgingKind, ResultKind};
 
 pub(crate) fn bridge_fn(
@@ -55,6 +58,8 @@ pub(crate) fn bridge_fn(
         BridgingKind::Regular => bridge_fn_body(sig, &input_names_and_types, result_kind),
         BridgingKind::Io { runtime } => bridge_io_body(&sig.ident, &input_names_and_types, runtime),
     };
+    let start_metrics = metrics_timer("ffi", name);
+    let creation_site = sig.asyncness.is_none().then(|| handle_creation_site(name));
 
     Ok(quote! {
         #[cfg(feature = "ffi")]
@@ -63,6 +68,8 @@ pub(crate) fn bridge_fn(
             #implicit_args
             #(#input_args),*
         ) -> *mut ffi::SignalFfiError {
+            #start_metrics
+            #creation_site
             #body
         }
     })
@@ -156,6 +163,7 @@ fn bridge_io_body(
     });
 
     let input_names = input_args.iter().map(|(name, _ty)| name);
+    let capture_metrics = metrics_timer_capture();
 
     quote! {
         ffi::run_ffi_safe(|| {
@@ -166,6 +174,7 @@ fn bridge_io_body(
                 async_runtime,
                 promise,
                 |__cancel| async move {
+                    #capture_metrics
                     let __future = ffi::catch_unwind(std::panic::AssertUnwindSafe(async move {
                         #(#input_loading)*
                         ::tokio::select! {
@@ -8,7 +8,10 @@ use quote::*;
 use syn::*;
 use syn_mid::Signature;
 
-use crate::util::{extract_arg_names_and_types, result_type};
+use crate::util::{
+    extract_arg_names_and_types, handle_creation_site, is_borrowed_byte_slice, metrics_timer,
+    metrics_timer_capture, result_type,
+};
 use crate::BridgingKind;
 
 pub(crate) fn bridge_fn(
@@ -51,11 +54,16 @@ pub(crate) fn bridge_fn(
     };
 
     let body = match bridging_kind {
-        BridgingKind::Regular => {
-            bridge_fn_body(orig_name, &input_names_and_types, sig.asyncness.is_some())
-        }
+        BridgingKind::Regular => bridge_fn_body(
+            orig_name,
+            &input_names_and_types,
+            sig.asyncness.is_some(),
+            |name, ty| generate_code_to_load_input(name, ty),
+        ),
         BridgingKind::Io { runtime } => bridge_io_body(orig_name, &input_names_and_types, runtime),
     };
+    let start_metrics = metrics_timer("jni", name);
+    let creation_site = sig.asyncness.is_none().then(|| handle_creation_site(name));
 
     Ok(quote! {
         #[cfg(feature = "jni")]
@@ -68,6 +76,8 @@ pub(crate) fn bridge_fn(
             #async_runtime_if_needed
             #(#input_args),*
         ) -> #result_ty {
+            #start_metrics
+            #creation_site
             #body
         }
     })
@@ -86,11 +96,10 @@ fn bridge_fn_body(
     orig_name: &Ident,
     input_args: &[(&Ident, &Type)],
     await_needed: bool,
+    load_input: impl Fn(&Ident, &Type) -> TokenStream2,
 ) -> TokenStream2 {
     let input_names = input_args.iter().map(|(name, _ty)| name);
-    let input_processing = input_args
-        .iter()
-        .map(|(name, ty)| generate_code_to_load_input(name, ty));
+    let input_processing = input_args.iter().map(|(name, ty)| load_input(name, ty));
 
     let await_if_needed = await_needed.then(|| {
         quote! {
@@ -149,12 +158,14 @@ fn bridge_io_body(
 
     let input_names = input_args.iter().map(|(name, _ty)| name);
     let input_stored_names = input_args.iter().map(|(name, _ty)| storage_ident_for(name));
+    let capture_metrics = metrics_timer_capture();
 
     quote! {
         jni::run_ffi_safe(&mut env, |env| {
             #load_async_runtime
             #(#input_saving)*
             jni::run_future_on_runtime(env, async_runtime, |__cancel| async move {
+                #capture_metrics
                 // Wrap the actual work to catch any panics.
                 let __future = jni::catch_unwind(std::panic::AssertUnwindSafe(async {
                     #(#input_loading)*
@@ -177,6 +188,105 @@ fn bridge_io_body(
     }
 }
 
+/// Generates a second JNI entry point, `{name}_Direct`, that takes each `&[u8]` argument as a
+/// direct `java.nio.ByteBuffer` instead of a `byte[]`.
+///
+/// The buffer's storage is borrowed in place rather than copied across JNI, which matters for
+/// large payloads. gen_java_decl.py also emits a Java overload of the original name that forwards
+/// to the `_Direct` entry point.
+pub(crate) fn bridge_fn_direct_buffers(
+    name: &str,
+    sig: &Signature,
+    bridging_kind: &BridgingKind,
+) -> Result<TokenStream2> {
+    if !matches!(bridging_kind, BridgingKind::Regular) {
+        return Err(Error::new(
+            sig.ident.span(),
+            "jni_direct_buffers is not supported for #[bridge_io]",
+        ));
+    }
+
+    let wrapper_name = format_ident!("__bridge_fn_jni_direct_{}", name);
+    let export_name = format!("{name}_1Direct");
+    let orig_name = &sig.ident;
+
+    let input_names_and_types = extract_arg_names_and_types(sig)?;
+    if !input_names_and_types
+        .iter()
+        .any(|(_name, ty)| is_borrowed_byte_slice(ty))
+    {
+        return Err(Error::new(
+            sig.ident.span(),
+            format_args!(
+                "jni_direct_buffers requires '{}' to take at least one &[u8]",
+                sig.ident
+            ),
+        ));
+    }
+
+    let input_args = input_names_and_types.iter().map(|(name, ty)| {
+        if is_borrowed_byte_slice(ty) {
+            quote!(#name: jni::JavaByteBuffer<'local>)
+        } else {
+            quote!(#name: jni_arg_type!(#ty))
+        }
+    });
+
+    let output = result_type(&sig.output);
+
+    let body = bridge_fn_body(
+        orig_name,
+        &input_names_and_types,
+        sig.asyncness.is_some(),
+        |name, ty| {
+            if is_borrowed_byte_slice(ty) {
+                let load = generate_code_to_load_input(name, quote!(jni::DirectByteBufferSlice));
+                quote! {
+                    #load
+                    let #name = #name.into_slice();
+                }
+            } else {
+                generate_code_to_load_input(name, ty)
+            }
+        },
+    );
+    let start_metrics = metrics_timer("jni", &export_name);
+    let creation_site = handle_creation_site(&export_name);
+
+    Ok(quote! {
+        #[cfg(feature = "jni")]
+        #[export_name = concat!(env!("LIBSIGNAL_BRIDGE_FN_PREFIX_JNI"), #export_name)]
+        #[allow(non_snake_case)]
+        pub unsafe extern "C" fn #wrapper_name<'local>(
+            mut env: ::jni::JNIEnv<'local>,
+            // We only generate static methods.
+            _class: ::jni::objects::JClass,
+            #(#input_args),*
+        ) -> jni_result_type!(#output) {
+            #start_metrics
+            #creation_site
+            #body
+        }
+    })
+}
+
 pub(crate) fn name_from_ident(ident: &Ident) -> String {
     ident.to_string().replace('_', "_1")
 }
+
+#[cfg(test)]
+mod direct_buffer_tests {
+    use super::*;
+
+    #[test]
+    fn only_shared_byte_slices_have_a_direct_form() {
+        assert!(is_borrowed_byte_slice(&parse_quote!(&[u8])));
+        assert!(is_borrowed_byte_slice(&parse_quote!(&'a [u8])));
+
+        assert!(!is_borrowed_byte_slice(&parse_quote!(&mut [u8])));
+        assert!(!is_borrowed_byte_slice(&parse_quote!(&[u8; 32])));
+        assert!(!is_borrowed_byte_slice(&parse_quote!(Option<&[u8]>)));
+        assert!(!is_borrowed_byte_slice(&parse_quote!(Vec<u8>)));
+        assert!(!is_borrowed_byte_slice(&parse_quote!(&[i8])));
+    }
+}
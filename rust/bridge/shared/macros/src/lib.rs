@@ -97,8 +97,45 @@
 //! A replaced name does not undergo any transformation, but is still prefixed with the required
 //! "namespace" for FFI and JNI.
 //!
+//! # Zero-copy byte buffers for Java
+//!
+//! Every `&[u8]` argument is a `byte[]` on the Java side, which the JVM may copy on every call.
+//! For functions that see large payloads, `bridge_fn(jni_direct_buffers = true)` additionally
+//! generates a JNI entry point with a `_Direct` suffix that takes each `&[u8]` as a direct
+//! `java.nio.ByteBuffer` and borrows its storage without copying. gen_java_decl.py adds an
+//! overload of the original Java method that forwards to it.
+//!
 //! [JNI spec]: https://docs.oracle.com/javase/8/docs/technotes/guides/jni/spec/design.html#resolving_native_method_names
 //!
+//! # Batched entry points
+//!
+//! Functions that clients call once per item in a loop can add `bridge_fn(batch = [arg, ...])`
+//! to also generate entry points with a `Batch` suffix (`_batch` for FFI), which take the listed
+//! arguments as arrays and call the original function once per item in Rust, paying the
+//! bridge's per-call overhead only once. A batched `&[u8]` becomes a `Vec<&[u8]>` (`ByteBuffer[]`
+//! in Java), and a batched `&T` becomes a `&[&T]`. The other arguments are shared across every
+//! item and so must be `Clone`, which references always are.
+//!
+//! Every batched argument must have the same length; a mismatch panics, which each bridge reports
+//! as an error. A result type `T` becomes `Box<[T]>` (and `Result<T, E>` becomes
+//! `Result<Box<[T]>, E>`, failing on the first error), so `T` needs an existing boxed-slice
+//! result mapping such as `Vec<u8>`, `String`, or `bool`.
+//!
+//! # Call metrics
+//!
+//! When the client crate enables its `bridge-metrics` feature, every generated entry point counts
+//! its calls and records their latency in a log-bucketed histogram, using lock-free counters from
+//! `libsignal_bridge_types::metrics`. Async entry points are timed until their future completes.
+//! `BridgeMetrics_Snapshot` dumps the counters, and `stats_scripts/bridge_metrics.py` merges and
+//! reports on the dumps. Without the feature, no metrics code is generated at all.
+//!
+//! # Handle tracking
+//!
+//! Similarly, the client crate's `bridge-handle-tracking` feature makes every synchronous entry
+//! point mark itself as the creation site of any handles it returns, for the live-handle counts in
+//! `libsignal_bridge_types::handles`. `BridgeHandles_Snapshot` dumps the counts, and
+//! `stats_scripts/handle_leaks.py` diffs the dumps to find growing types.
+//!
 //! # Limiting to certain bridges
 //!
 //! Do not use `cfg(feature = "abc")` to restrict a `bridge_fn` to certain bridges (e.g. "just
@@ -144,6 +181,7 @@ use syn::spanned::Spanned;
 use syn::*;
 use syn_mid::ItemFn;
 
+mod batch;
 mod ffi;
 mod jni;
 mod node;
@@ -303,10 +341,77 @@ fn bridge_fn_impl(
         Err(error) => return error.to_compile_error().into(),
     };
 
+    let jni_direct_buffers = match value_for_meta_key(&item_names, "jni_direct_buffers") {
+        None
+        | Some(Expr::Lit(ExprLit {
+            lit: Lit::Bool(LitBool { value: false, .. }),
+            ..
+        })) => false,
+        Some(Expr::Lit(ExprLit {
+            lit: Lit::Bool(LitBool { value: true, .. }),
+            ..
+        })) => true,
+        Some(value) => {
+            return Error::new(value.span(), "jni_direct_buffers must be true or false")
+                .to_compile_error()
+                .into()
+        }
+    };
+
+    let batched = match value_for_meta_key(&item_names, "batch") {
+        None => None,
+        Some(value) => {
+            if let BridgingKind::Io { .. } = bridging_kind {
+                return Error::new(value.span(), "batch is not supported for bridge_io")
+                    .to_compile_error()
+                    .into();
+            }
+            match batch::batched_arg_names(value)
+                .and_then(|names| batch::batched_fn(&function, &names))
+            {
+                Ok(batched) => Some(batched),
+                Err(error) => return error.to_compile_error().into(),
+            }
+        }
+    };
+
     let ffi_feature = ffi_name.as_ref().map(|_| quote!(feature = "ffi"));
     let jni_feature = jni_name.as_ref().map(|_| quote!(feature = "jni"));
     let node_feature = node_name.as_ref().map(|_| quote!(feature = "node"));
     let maybe_features = [ffi_feature, jni_feature, node_feature];
+
+    let batched_fns = batched.as_ref().map(|batched| {
+        let result_kind = ResultKind::from(&batched.sig);
+        let feature_list = maybe_features.iter().flatten();
+        let ffi_fn = ffi_name.as_ref().map(|name| {
+            ffi::bridge_fn(
+                &format!("{name}_batch"),
+                &batched.sig,
+                result_kind,
+                &bridging_kind,
+            )
+            .unwrap_or_else(Error::into_compile_error)
+        });
+        let jni_fn = jni_name.as_ref().map(|name| {
+            jni::bridge_fn(&format!("{name}_1Batch"), &batched.sig, &bridging_kind)
+                .unwrap_or_else(Error::into_compile_error)
+        });
+        let node_fn = node_name.as_ref().map(|name| {
+            node::bridge_fn(&format!("{name}_Batch"), &batched.sig, &bridging_kind)
+                .unwrap_or_else(Error::into_compile_error)
+        });
+        quote! {
+            #[allow(non_snake_case, clippy::needless_pass_by_ref_mut)]
+            #[cfg(any(#(#feature_list,)*))]
+            #batched
+
+            #ffi_fn
+
+            #jni_fn
+
+            #node_fn
+        }
+    });
     let feature_list = maybe_features.iter().flatten();
 
     // We could early-exit on the Errors returned from generating each wrapper,
@@ -315,6 +420,13 @@ fn bridge_fn_impl(
         ffi::bridge_fn(&name, &function.sig, result_kind, &bridging_kind)
             .unwrap_or_else(Error::into_compile_error)
     });
+    let jni_direct_fn = jni_name
+        .as_ref()
+        .filter(|_| jni_direct_buffers)
+        .map(|name| {
+            jni::bridge_fn_direct_buffers(name, &function.sig, &bridging_kind)
+                .unwrap_or_else(Error::into_compile_error)
+        });
     let jni_fn = jni_name.map(|name| {
         jni::bridge_fn(&name, &function.sig, &bridging_kind)
             .unwrap_or_else(Error::into_compile_error)
@@ -334,7 +446,11 @@ fn bridge_fn_impl(
 
         #jni_fn
 
+        #jni_direct_fn
+
         #node_fn
+
+        #batched_fns
     )
     .into()
 }
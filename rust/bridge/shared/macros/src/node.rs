@@ -8,7 +8,10 @@ use quote::*;
 use syn::*;
 use syn_mid::Signature;
 
-use crate::util::{extract_arg_names_and_types, result_type};
+use crate::util::{
+    extract_arg_names_and_types, handle_creation_site, metrics_timer, metrics_timer_capture,
+    result_type,
+};
 use crate::BridgingKind;
 
 fn bridge_fn_body(orig_name: &Ident, input_args: &[(&Ident, &Type)]) -> TokenStream2 {
@@ -130,6 +133,7 @@ fn bridge_fn_async_body(
         let names_stored = chunk.iter().map(|(name, _ty)| storage_ident_for(name));
         quote!((#(#names_stored),*))
     });
+    let capture_metrics = metrics_timer_capture();
 
     quote! {
         #set_up_async_runtime
@@ -145,6 +149,7 @@ fn bridge_fn_async_body(
             async_runtime,
             #custom_name,
             |__cancel| async move {
+                #capture_metrics
                 // Wrap the actual work to catch any panics.
                 let __future = node::catch_unwind(std::panic::AssertUnwindSafe(async {
                     #(#input_loading)*
@@ -194,6 +199,8 @@ pub(crate) fn bridge_fn(
             ));
         }
     };
+    let start_metrics = metrics_timer("node", name);
+    let creation_site = sig.asyncness.is_none().then(|| handle_creation_site(name));
 
     Ok(quote! {
         #[cfg(feature = "node")]
@@ -202,6 +209,8 @@ pub(crate) fn bridge_fn(
         pub fn #name_with_prefix(
             mut cx: node::FunctionContext,
         ) -> node::JsResult<node::JsValue> {
+            #start_metrics
+            #creation_site
             #body
         }
 
@@ -45,3 +45,59 @@ pub(crate) fn extract_arg_names_and_types(sig: &Signature) -> Result<Vec<(&Ident
         })
         .collect()
 }
+
+/// Returns whether `ty` is exactly `&[u8]`.
+///
+/// These arguments have a direct-buffer form for JNI, and a batched form (`Vec<&[u8]>`) in every
+/// bridge.
+pub(crate) fn is_borrowed_byte_slice(ty: &Type) -> bool {
+    let Type::Reference(TypeReference {
+        mutability: None,
+        elem,
+        ..
+    }) = ty
+    else {
+        return false;
+    };
+    let Type::Slice(TypeSlice { elem, .. }) = elem.as_ref() else {
+        return false;
+    };
+    matches!(elem.as_ref(), Type::Path(path) if path.qself.is_none() && path.path.is_ident("u8"))
+}
+
+/// Generates a statement that starts timing the enclosing entry point when the client crate's
+/// `bridge-metrics` feature is enabled, and nothing at all otherwise.
+///
+/// The timer records the call when it goes out of scope. Use [`metrics_timer_capture`] to move it
+/// into an async block so that the whole future is timed.
+pub(crate) fn metrics_timer(bridge: &str, name: &str) -> TokenStream2 {
+    quote! {
+        #[cfg(feature = "bridge-metrics")]
+        let __bridge_metrics_timer = {
+            static METRICS: ::libsignal_bridge_types::metrics::EntryPointMetrics =
+                ::libsignal_bridge_types::metrics::EntryPointMetrics::new(#bridge, #name);
+            METRICS.start_call()
+        };
+    }
+}
+
+/// Generates a statement that marks the enclosing entry point as the creation site of any handles
+/// it returns when the client crate's `bridge-handle-tracking` feature is enabled, and nothing at
+/// all otherwise.
+///
+/// Only synchronous entry points use this; the results of async ones are converted after the entry
+/// point has returned.
+pub(crate) fn handle_creation_site(name: &str) -> TokenStream2 {
+    quote! {
+        #[cfg(feature = "bridge-handle-tracking")]
+        let __bridge_handle_site = ::libsignal_bridge_types::handles::EntryPointScope::enter(#name);
+    }
+}
+
+/// Moves the timer started by [`metrics_timer`] into the enclosing (`move`) block.
+pub(crate) fn metrics_timer_capture() -> TokenStream2 {
+    quote! {
+        #[cfg(feature = "bridge-metrics")]
+        let __bridge_metrics_timer = __bridge_metrics_timer;
+    }
+}
@@ -0,0 +1,27 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+use libsignal_bridge_macros::*;
+
+use crate::support::*;
+use crate::*;
+
+/// Returns the live handle counts, high-water marks, and sampled creation sites of every bridged
+/// type created so far, in the format described in `libsignal_bridge_types::handles`, optionally
+/// resetting the high-water marks.
+///
+/// Returns an empty string if libsignal was built without the `bridge-handle-tracking` feature.
+#[bridge_fn]
+fn BridgeHandles_Snapshot(reset_high_water: bool) -> String {
+    #[cfg(feature = "bridge-handle-tracking")]
+    {
+        libsignal_bridge_types::handles::snapshot(reset_high_water)
+    }
+    #[cfg(not(feature = "bridge-handle-tracking"))]
+    {
+        _ = reset_high_water;
+        String::new()
+    }
+}
@@ -30,7 +30,7 @@ pub fn IncrementalMac_Initialize(key: &[u8], chunk_size: u32) -> IncrementalMac
     IncrementalMac(Some(Incremental::new(hmac, chunk_size as usize)))
 }
 
-#[bridge_fn]
+#[bridge_fn(jni_direct_buffers = true)]
 pub fn IncrementalMac_Update(
     mac: &mut IncrementalMac,
     bytes: &[u8],
@@ -68,7 +68,7 @@ pub fn ValidatingMac_Initialize(key: &[u8], chunk_size: u32, digests: &[u8]) ->
     ValidatingMac(Some(incremental.validating(macs)))
 }
 
-#[bridge_fn]
+#[bridge_fn(jni_direct_buffers = true)]
 pub fn ValidatingMac_Update(
     mac: &mut ValidatingMac,
     bytes: &[u8],
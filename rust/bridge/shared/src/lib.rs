@@ -45,8 +45,10 @@ mod account_keys;
 #[cfg(any(feature = "jni", feature = "ffi"))]
 mod svr2;
 
+mod handles;
 pub mod incremental_mac;
 pub mod message_backup;
+mod metrics;
 pub mod usernames;
 
 #[cfg(feature = "signal-media")]
@@ -125,7 +125,7 @@ fn OnlineBackupValidator_New(
         .map_err(ReadError::with_error_only)
 }
 
-#[bridge_fn]
+#[bridge_fn(jni_direct_buffers = true)]
 fn OnlineBackupValidator_AddFrame(
     backup: &mut OnlineBackupValidator,
     frame: &[u8],
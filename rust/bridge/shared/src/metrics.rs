@@ -0,0 +1,26 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+use libsignal_bridge_macros::*;
+
+use crate::support::*;
+use crate::*;
+
+/// Returns the call counts and latency histograms of every bridged function called so far, in the
+/// format described in `libsignal_bridge_types::metrics`, optionally resetting them.
+///
+/// Returns an empty string if libsignal was built without the `bridge-metrics` feature.
+#[bridge_fn]
+fn BridgeMetrics_Snapshot(reset: bool) -> String {
+    #[cfg(feature = "bridge-metrics")]
+    {
+        libsignal_bridge_types::metrics::snapshot(reset)
+    }
+    #[cfg(not(feature = "bridge-metrics"))]
+    {
+        _ = reset;
+        String::new()
+    }
+}
@@ -171,7 +171,11 @@ fn ECPublicKey_Compare(key1: &PublicKey, key2: &PublicKey) -> i32 {
     }
 }
 
-#[bridge_fn(ffi = "publickey_verify", node = "PublicKey_Verify")]
+#[bridge_fn(
+    ffi = "publickey_verify",
+    node = "PublicKey_Verify",
+    batch = [message, signature]
+)]
 fn ECPublicKey_Verify(key: &PublicKey, message: &[u8], signature: &[u8]) -> bool {
     key.verify_signature(message, signature)
 }
@@ -646,6 +646,14 @@ impl ResultTypeInfo for Box<[Vec<u8>]> {
     }
 }
 
+/// Returns a Rust-owned buffer of booleans, to be freed with `signal_free_list_of_bools`.
+impl ResultTypeInfo for Box<[bool]> {
+    type ResultType = OwnedBufferOf<bool>;
+    fn convert_into(self) -> SignalFfiResult<Self::ResultType> {
+        Ok(OwnedBufferOf::from(self))
+    }
+}
+
 impl ResultTypeInfo for Vec<u8> {
     type ResultType = OwnedBufferOf<std::ffi::c_uchar>;
     fn convert_into(self) -> SignalFfiResult<Self::ResultType> {
@@ -852,6 +860,8 @@ impl<'a> ArgTypeInfo<'a> for &'a SignalFfiError {
 impl<T: BridgeHandle> ResultTypeInfo for T {
     type ResultType = MutPointer<T>;
     fn convert_into(self) -> SignalFfiResult<Self::ResultType> {
+        #[cfg(feature = "bridge-handle-tracking")]
+        crate::handles::created::<T>("ffi");
         Ok(Box::into_raw(Box::new(self)).into())
     }
 }
@@ -1019,6 +1029,10 @@ macro_rules! ffi_bridge_handle_clone {
                 new_obj: *mut ffi::MutPointer<$typ>,
                 obj: ffi::ConstPointer<$typ>,
             ) -> *mut $crate::ffi::SignalFfiError {
+                #[cfg(feature = "bridge-handle-tracking")]
+                let _site = $crate::handles::EntryPointScope::enter(
+                    concat!(stringify!($ffi_name), "_clone"),
+                );
                 $crate::ffi::run_ffi_safe(|| {
                     let obj = $crate::ffi::native_handle_cast::<$typ>(obj.into_inner())?;
                     $crate::ffi::write_result_to::<$typ>(new_obj, obj.clone())
@@ -1189,6 +1203,7 @@ macro_rules! ffi_result_type {
     (Vec<u8>) => (ffi::OwnedBufferOf<std::ffi::c_uchar>);
     (Box<[String]>) => (ffi::StringArray);
     (Box<[Vec<u8>]>) => (ffi::BytestringArray);
+    (Box<[bool]>) => (ffi::OwnedBufferOf<bool>);
     (Box<[ChallengeOption]>) => (ffi_result_type!(Vec<u8>));
     (Option<$typ:ty>) => ($crate::ffi::MutPointer<$typ>);
 
@@ -356,6 +356,16 @@ pub unsafe fn native_handle_cast_mut<T>(handle: *mut T) -> Result<&'static mut T
     Ok(&mut *handle)
 }
 
+/// Takes back ownership of a handle that the app returned from a store callback.
+///
+/// `handle` must be non-null, must have come from converting a `T` result, and must not be used by
+/// the app afterwards.
+pub unsafe fn take_returned_handle<T: BridgeHandle>(handle: *mut T) -> Box<T> {
+    #[cfg(feature = "bridge-handle-tracking")]
+    crate::handles::destroyed::<T>("ffi");
+    Box::from_raw(handle)
+}
+
 pub unsafe fn write_result_to<T: ResultTypeInfo>(
     ptr: *mut T::ResultType,
     value: T,
@@ -392,6 +402,8 @@ macro_rules! ffi_bridge_handle_destroy {
                 let p = std::panic::AssertUnwindSafe(p.into_inner());
                 ffi::run_ffi_safe(|| {
                     if !p.is_null() {
+                        #[cfg(feature = "bridge-handle-tracking")]
+                        $crate::handles::destroyed::<$typ>("ffi");
                         drop(Box::from_raw(*p));
                     }
                     Ok(())
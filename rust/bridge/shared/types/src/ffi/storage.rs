@@ -66,7 +66,7 @@ impl IdentityKeyStore for &FfiIdentityKeyStoreStruct {
             ));
         }
 
-        let priv_key = unsafe { Box::from_raw(key) };
+        let priv_key = unsafe { take_returned_handle(key) };
         let pub_key = priv_key.public_key()?;
 
         Ok(IdentityKeyPair::new(IdentityKey::new(pub_key), *priv_key))
@@ -145,7 +145,7 @@ impl IdentityKeyStore for &FfiIdentityKeyStoreStruct {
             return Ok(None);
         }
 
-        let pk = unsafe { Box::from_raw(key) };
+        let pk = unsafe { take_returned_handle(key) };
 
         Ok(Some(IdentityKey::new(*pk)))
     }
@@ -181,7 +181,7 @@ impl PreKeyStore for &FfiPreKeyStoreStruct {
             return Err(SignalProtocolError::InvalidPreKeyId);
         }
 
-        let record = unsafe { Box::from_raw(record) };
+        let record = unsafe { take_returned_handle(record) };
         Ok(*record)
     }
 
@@ -243,7 +243,7 @@ impl SignedPreKeyStore for &FfiSignedPreKeyStoreStruct {
             return Err(SignalProtocolError::InvalidSignedPreKeyId);
         }
 
-        let record = unsafe { Box::from_raw(record) };
+        let record = unsafe { take_returned_handle(record) };
 
         Ok(*record)
     }
@@ -302,7 +302,7 @@ impl KyberPreKeyStore for &FfiKyberPreKeyStoreStruct {
             return Err(SignalProtocolError::InvalidKyberPreKeyId);
         }
 
-        let record = unsafe { Box::from_raw(record) };
+        let record = unsafe { take_returned_handle(record) };
 
         Ok(*record)
     }
@@ -368,7 +368,7 @@ impl SessionStore for &FfiSessionStoreStruct {
             return Ok(None);
         }
 
-        let record = unsafe { Box::from_raw(record) };
+        let record = unsafe { take_returned_handle(record) };
 
         Ok(Some(*record))
     }
@@ -449,7 +449,7 @@ impl SenderKeyStore for &FfiSenderKeyStoreStruct {
             return Ok(None);
         }
 
-        let record = unsafe { Box::from_raw(record) };
+        let record = unsafe { take_returned_handle(record) };
 
         Ok(Some(*record))
     }
@@ -0,0 +1,271 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+//! Live-handle counts for types exposed through [`bridge_as_handle`](crate::support::bridge_as_handle).
+//!
+//! Only compiled with the `bridge-handle-tracking` feature. When it's enabled, each bridge records
+//! every handle it gives to the app (a boxed result for FFI and JNI, a `JsBox` for Node) and every
+//! handle the app gives back (a `_destroy` call for FFI and JNI, a garbage collection for Node),
+//! keeping a live count and a high-water mark per bridge and type.
+//!
+//! Every [`SAMPLE_INTERVAL`]th creation of each type also records its *creation site*: the
+//! synchronous `bridge_fn` entry point that was running at the time, or `?` if there wasn't one
+//! (e.g. when an async function's result is delivered, or a handle is cloned through FFI).
+//!
+//! [`snapshot`] dumps the counts in a line-oriented text format that
+//! `stats_scripts/handle_leaks.py` knows how to diff:
+//!
+//! ```text
+//! # libsignal-bridge-handles v1
+//! # sample-interval 16
+//! ffi libsignal_protocol::curve::PublicKey 40 1200 1160 75 publickey_deserialize:60,?:15
+//! ```
+//!
+//! Each line is `bridge type live created destroyed high_water sites`, where `sites` lists the
+//! sampled creation sites as `entry_point:count` (or `-` if there are none yet). Counts are
+//! cumulative since the process started, except that [`snapshot`] can reset the high-water marks.
+
+use std::any::TypeId;
+use std::cell::Cell;
+use std::collections::HashMap;
+use std::fmt::Write as _;
+use std::sync::atomic::{AtomicI64, AtomicU64, Ordering};
+use std::sync::{LazyLock, Mutex, RwLock};
+
+/// The first line of every snapshot, so that readers can reject formats they don't understand.
+pub const SNAPSHOT_HEADER: &str = "# libsignal-bridge-handles v1";
+
+/// How often creations record their site: the first creation of each type, and every
+/// `SAMPLE_INTERVAL`th one after that.
+pub const SAMPLE_INTERVAL: u64 = 16;
+
+/// Counts for a single bridged type, on a single bridge.
+struct HandleCounts {
+    bridge: &'static str,
+    type_name: &'static str,
+    live: AtomicI64,
+    created: AtomicU64,
+    destroyed: AtomicU64,
+    high_water: AtomicI64,
+    sites: Mutex<HashMap<&'static str, u64>>,
+}
+
+/// Every type that has been created at least once, keyed by bridge and by the type that is
+/// actually boxed (which for Node may be a wrapper around the bridged type).
+///
+/// Entries are leaked so that recording only needs the read lock.
+static REGISTRY: LazyLock<RwLock<HashMap<(&'static str, TypeId), &'static HandleCounts>>> =
+    LazyLock::new(Default::default);
+
+thread_local! {
+    static CURRENT_ENTRY_POINT: Cell<Option<&'static str>> = const { Cell::new(None) };
+}
+
+/// Marks the entry point running on this thread as the creation site for any handles created
+/// until it's dropped.
+#[must_use]
+pub struct EntryPointScope {
+    previous: Option<&'static str>,
+}
+
+impl EntryPointScope {
+    #[inline]
+    pub fn enter(name: &'static str) -> Self {
+        Self {
+            previous: CURRENT_ENTRY_POINT.replace(Some(name)),
+        }
+    }
+}
+
+impl Drop for EntryPointScope {
+    fn drop(&mut self) {
+        CURRENT_ENTRY_POINT.set(self.previous);
+    }
+}
+
+fn counts_for<K: 'static>(bridge: &'static str) -> Option<&'static HandleCounts> {
+    REGISTRY
+        .read()
+        .expect("not poisoned")
+        .get(&(bridge, TypeId::of::<K>()))
+        .copied()
+}
+
+#[cold]
+fn register<K: 'static>(bridge: &'static str, type_name: &'static str) -> &'static HandleCounts {
+    REGISTRY
+        .write()
+        .expect("not poisoned")
+        .entry((bridge, TypeId::of::<K>()))
+        .or_insert_with(|| {
+            Box::leak(Box::new(HandleCounts {
+                bridge,
+                type_name,
+                live: AtomicI64::new(0),
+                created: AtomicU64::new(0),
+                destroyed: AtomicU64::new(0),
+                high_water: AtomicI64::new(0),
+                sites: Mutex::default(),
+            }))
+        })
+}
+
+/// Records that `bridge` handed the app a new handle to a `T`.
+pub fn created<T: 'static>(bridge: &'static str) {
+    created_as::<T>(bridge, std::any::type_name::<T>())
+}
+
+/// Records that `bridge` handed the app a new handle to a `type_name`, stored as a `K`.
+///
+/// [`destroyed`] must later be called with the same `K`.
+pub fn created_as<K: 'static>(bridge: &'static str, type_name: &'static str) {
+    let counts = counts_for::<K>(bridge).unwrap_or_else(|| register::<K>(bridge, type_name));
+    let live = counts.live.fetch_add(1, Ordering::Relaxed) + 1;
+    counts.high_water.fetch_max(live, Ordering::Relaxed);
+    if counts.created.fetch_add(1, Ordering::Relaxed) % SAMPLE_INTERVAL == 0 {
+        let site = CURRENT_ENTRY_POINT.get().unwrap_or("?");
+        *counts
+            .sites
+            .lock()
+            .expect("not poisoned")
+            .entry(site)
+            .or_default() += 1;
+    }
+}
+
+/// Records that the app gave up a handle to a `K`, which `bridge` has now dropped.
+///
+/// Does nothing if no `K` was ever created, so that it's safe to call for boxes that weren't
+/// bridged handles.
+pub fn destroyed<K: 'static>(bridge: &'static str) {
+    if let Some(counts) = counts_for::<K>(bridge) {
+        counts.live.fetch_sub(1, Ordering::Relaxed);
+        counts.destroyed.fetch_add(1, Ordering::Relaxed);
+    }
+}
+
+/// Renders the counts for every type created so far in the format described in the module
+/// documentation.
+///
+/// If `reset_high_water` is set, each high-water mark starts over from the current live count.
+pub fn snapshot(reset_high_water: bool) -> String {
+    let registry = REGISTRY.read().expect("not poisoned");
+    let mut all_counts: Vec<&HandleCounts> = registry.values().copied().collect();
+    drop(registry);
+    all_counts.sort_by_key(|counts| (counts.bridge, counts.type_name));
+
+    let mut result = format!("{SNAPSHOT_HEADER}\n# sample-interval {SAMPLE_INTERVAL}\n");
+    for counts in all_counts {
+        let live = counts.live.load(Ordering::Relaxed);
+        let high_water = if reset_high_water {
+            counts.high_water.swap(live, Ordering::Relaxed)
+        } else {
+            counts.high_water.load(Ordering::Relaxed)
+        };
+        write!(
+            result,
+            "{} {} {} {} {} {} ",
+            counts.bridge,
+            counts.type_name.replace(' ', ""),
+            live,
+            counts.created.load(Ordering::Relaxed),
+            counts.destroyed.load(Ordering::Relaxed),
+            high_water,
+        )
+        .expect("writing to a String cannot fail");
+
+        let mut sites: Vec<(&str, u64)> = counts
+            .sites
+            .lock()
+            .expect("not poisoned")
+            .iter()
+            .map(|(site, count)| (*site, *count))
+            .collect();
+        if sites.is_empty() {
+            result.push('-');
+        }
+        sites.sort_by(|a, b| b.1.cmp(&a.1).then(a.0.cmp(b.0)));
+        for (i, (site, count)) in sites.into_iter().enumerate() {
+            if i != 0 {
+                result.push(',');
+            }
+            write!(result, "{site}:{count}").expect("writing to a String cannot fail");
+        }
+        result.push('\n');
+    }
+    result
+}
+
+#[cfg(test)]
+mod test {
+    use super::*;
+
+    fn line_for(snapshot: &str, bridge: &str, type_name: &str) -> Option<Vec<String>> {
+        snapshot
+            .lines()
+            .map(|line| line.split(' ').map(str::to_owned).collect::<Vec<_>>())
+            .find(|fields| fields[0] == bridge && fields[1] == type_name)
+    }
+
+    #[test]
+    fn counts_live_handles_and_high_water() {
+        struct Tracked;
+        let name = std::any::type_name::<Tracked>();
+
+        for _ in 0..3 {
+            created::<Tracked>("ffi");
+        }
+        destroyed::<Tracked>("ffi");
+        destroyed::<Tracked>("ffi");
+        created::<Tracked>("ffi");
+
+        let fields = line_for(&snapshot(true), "ffi", name).expect("registered");
+        assert_eq!(fields[2..6], ["2", "4", "2", "3"]);
+        assert_eq!(fields[6], "?:1");
+
+        let fields = line_for(&snapshot(false), "ffi", name).expect("registered");
+        assert_eq!(
+            fields[5], "2",
+            "high-water mark was reset to the live count"
+        );
+        assert!(line_for(&snapshot(false), "jni", name).is_none());
+    }
+
+    #[test]
+    fn samples_creation_sites() {
+        struct Sampled;
+        {
+            let _scope = EntryPointScope::enter("signal_sampled_new");
+            for _ in 0..SAMPLE_INTERVAL {
+                created::<Sampled>("jni");
+            }
+            {
+                let _inner = EntryPointScope::enter("signal_sampled_clone");
+                created::<Sampled>("jni");
+            }
+            for _ in 0..SAMPLE_INTERVAL {
+                created::<Sampled>("jni");
+            }
+        }
+        created::<Sampled>("jni");
+
+        let fields = line_for(&snapshot(false), "jni", std::any::type_name::<Sampled>())
+            .expect("registered");
+        assert_eq!(fields[3], (2 * SAMPLE_INTERVAL + 2).to_string());
+        assert_eq!(fields[6], "signal_sampled_new:2,signal_sampled_clone:1");
+    }
+
+    #[test]
+    fn node_boxes_are_keyed_by_contents() {
+        struct Inner;
+        created_as::<std::cell::RefCell<Inner>>("node", std::any::type_name::<Inner>());
+        destroyed::<Inner>("node");
+        destroyed::<u8>("node");
+
+        let fields =
+            line_for(&snapshot(false), "node", std::any::type_name::<Inner>()).expect("registered");
+        assert_eq!(fields[2..5], ["1", "1", "0"]);
+    }
+}
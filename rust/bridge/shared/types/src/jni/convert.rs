@@ -8,7 +8,7 @@ use std::ops::Deref;
 use std::sync::Arc;
 
 use itertools::Itertools as _;
-use jni::objects::{AutoLocal, JByteBuffer, JMap, JObjectArray};
+use jni::objects::{AutoLocal, JBooleanArray, JByteBuffer, JMap, JObjectArray};
 use jni::sys::{jbyte, JNI_FALSE, JNI_TRUE};
 use jni::JNIEnv;
 use libsignal_account_keys::{AccountEntropyPool, InvalidAccountEntropyPool};
@@ -504,6 +504,72 @@ impl<'a> SimpleArgTypeInfo<'a> for Vec<&'a [u8]> {
     }
 }
 
+/// A byte slice borrowed from the storage of a direct `java.nio.ByteBuffer`.
+///
+/// `bridge_fn(jni_direct_buffers = true)` uses this in place of `&[u8]` for the `_Direct` variant
+/// of a function. Unlike a `byte[]`, whose elements the JVM may copy out (and which must be
+/// released afterwards), a direct buffer's storage is never copied and stays valid for as long as
+/// the buffer object is live, which covers the whole call.
+///
+/// Only the buffer's remaining bytes, from `position()` up to `limit()`, are borrowed, so a large
+/// buffer can be reused for smaller payloads by flipping it. The position isn't advanced.
+pub struct DirectByteBufferSlice<'a>(&'a [u8]);
+
+impl<'a> DirectByteBufferSlice<'a> {
+    pub fn into_slice(self) -> &'a [u8] {
+        self.0
+    }
+}
+
+impl<'a> SimpleArgTypeInfo<'a> for DirectByteBufferSlice<'a> {
+    type ArgType = JByteBuffer<'a>;
+
+    fn convert_from(
+        env: &mut JNIEnv<'a>,
+        foreign: &Self::ArgType,
+    ) -> Result<Self, BridgeLayerError> {
+        if foreign.is_null() {
+            return Err(BridgeLayerError::NullPointer(Some("java.nio.ByteBuffer")));
+        }
+        let capacity = env
+            .get_direct_buffer_capacity(foreign)
+            .check_exceptions(env, "DirectByteBufferSlice::convert_from")?;
+        let addr = env
+            .get_direct_buffer_address(foreign)
+            .check_exceptions(env, "DirectByteBufferSlice::convert_from")?;
+
+        let args = jni_args!(() -> int);
+        let position: jint = call_method_checked(env, foreign, "position", args)?;
+        let limit: jint = call_method_checked(env, foreign, "limit", args)?;
+        let (Ok(position), Ok(limit)) = (usize::try_from(position), usize::try_from(limit)) else {
+            return Err(BridgeLayerError::IntegerOverflow(format!(
+                "ByteBuffer position {position} or limit {limit}"
+            )));
+        };
+        // java.nio.Buffer guarantees this, but the slice below relies on it.
+        if position > limit || limit > capacity {
+            return Err(BridgeLayerError::BadArgument(format!(
+                "ByteBuffer position {position} and limit {limit} don't fit its capacity {capacity}"
+            )));
+        }
+
+        if addr.is_null() {
+            if capacity != 0 {
+                return Err(BridgeLayerError::NullPointer(Some(
+                    "ByteBuffer direct address",
+                )));
+            }
+            return Ok(Self(&[]));
+        }
+        // SAFETY: the JVM keeps a direct buffer's storage in place for as long as the buffer is
+        // reachable, and `foreign` is a live reference for the duration of the call. The range
+        // was checked against the buffer's capacity above.
+        Ok(Self(unsafe {
+            std::slice::from_raw_parts(addr.add(position), limit - position)
+        }))
+    }
+}
+
 macro_rules! bridge_trait {
     ($name:ident) => {
         paste! {
@@ -1117,6 +1183,8 @@ where
 impl<T: BridgeHandle> ResultTypeInfo<'_> for T {
     type ResultType = ObjectHandle;
     fn convert_into(self, _env: &mut JNIEnv) -> Result<Self::ResultType, BridgeLayerError> {
+        #[cfg(feature = "bridge-handle-tracking")]
+        crate::handles::created::<T>("jni");
         Ok(T::encode_as_handle(Arc::new(self)))
     }
 }
@@ -1770,6 +1838,27 @@ impl<'a> ResultTypeInfo<'a> for Box<[Vec<u8>]> {
     }
 }
 
+impl<'a> ResultTypeInfo<'a> for Box<[bool]> {
+    type ResultType = JBooleanArray<'a>;
+    fn convert_into(self, env: &mut JNIEnv<'a>) -> Result<Self::ResultType, BridgeLayerError> {
+        let len = self.len();
+        let array = env
+            .new_boolean_array(
+                len.try_into().map_err(|_| {
+                    BridgeLayerError::IntegerOverflow(format!("{len}_usize to i32"))
+                })?,
+            )
+            .check_exceptions(env, "Box<[bool]>::convert_into")?;
+        let values: Vec<jboolean> = self
+            .iter()
+            .map(|&value| if value { JNI_TRUE } else { JNI_FALSE })
+            .collect();
+        env.set_boolean_array_region(&array, 0, &values)
+            .check_exceptions(env, "Box<[bool]>::convert_into")?;
+        Ok(array)
+    }
+}
+
 impl<'a> ResultTypeInfo<'a> for MessageBackupValidationOutcome {
     type ResultType = JObject<'a>;
 
@@ -2161,6 +2250,9 @@ macro_rules! jni_result_type {
     (Box<[Vec<u8>]>) => {
         $crate::jni::JavaArrayOfByteArray<'local>
     };
+    (Box<[bool]>) => {
+        ::jni::objects::JBooleanArray<'local>
+    };
     (Cds2Metrics) => {
         $crate::jni::JavaMap<'local>
     };
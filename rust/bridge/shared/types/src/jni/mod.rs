@@ -16,7 +16,7 @@ pub use jni::objects::{
     AutoElements, JByteArray, JClass, JLongArray, JObject, JObjectArray, JString, JValue,
     ReleaseMode,
 };
-use jni::objects::{GlobalRef, JThrowable, JValueOwned};
+use jni::objects::{GlobalRef, JByteBuffer, JThrowable, JValueOwned};
 pub use jni::sys::{jboolean, jint, jlong};
 pub use jni::JNIEnv;
 use jni::JavaVM;
@@ -68,6 +68,7 @@ pub type ObjectHandle = jlong;
 // Aliases with a certain spelling that gen_java_decl.py will pick out when generating Native.java.
 pub type JavaArrayOfByteArray<'a> = JObjectArray<'a>;
 pub type JavaByteBufferArray<'a> = JObjectArray<'a>;
+pub type JavaByteBuffer<'a> = JByteBuffer<'a>;
 pub type JavaObject<'a> = JObject<'a>;
 pub type JavaUUID<'a> = JObject<'a>;
 pub type JavaCiphertextMessage<'a> = JObject<'a>;
@@ -1179,6 +1180,8 @@ macro_rules! jni_bridge_handle_destroy {
                 handle: $crate::jni::ObjectHandle,
             ) {
                 if handle != 0 {
+                    #[cfg(feature = "bridge-handle-tracking")]
+                    $crate::handles::destroyed::<$typ>("jni");
                     drop(::std::sync::Arc::from_raw(
                         <$typ as $crate::jni::BridgeHandle>::native_handle_cast(handle)
                             .expect("valid")
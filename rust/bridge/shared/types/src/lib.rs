@@ -23,6 +23,12 @@ pub mod support;
 
 pub use support::{describe_panic, AsyncRuntime, ResultReporter};
 
+#[cfg(feature = "bridge-handle-tracking")]
+pub mod handles;
+
+#[cfg(feature = "bridge-metrics")]
+pub mod metrics;
+
 pub mod cds2;
 pub mod crypto;
 pub mod hsm_enclave;
@@ -0,0 +1,253 @@
+//
+// Copyright 2026 Signal Messenger, LLC.
+// SPDX-License-Identifier: AGPL-3.0-only
+//
+
+//! Per-entry-point call counters and latency histograms for bridged functions.
+//!
+//! Only compiled with the `bridge-metrics` feature. When it's enabled, every function generated by
+//! `bridge_fn` and `bridge_io` owns a static [`EntryPointMetrics`] and holds a [`CallTimer`] for
+//! the duration of the call (including the whole future for async functions). Recording never
+//! takes a lock: each entry point registers itself on first use by pushing onto a global
+//! intrusive list, and after that only does relaxed atomic adds.
+//!
+//! [`snapshot`] dumps everything recorded so far in a compact line-oriented text format that
+//! `stats_scripts/bridge_metrics.py` knows how to merge:
+//!
+//! ```text
+//! # libsignal-bridge-metrics v1
+//! ffi signal_foo 12 345678 3:1,10:11
+//! ```
+//!
+//! Each line is `bridge name calls total_nanos histogram`, where the histogram lists the non-empty
+//! buckets as `index:count`. Bucket `i` counts calls that took between 2<sup>i</sup> and
+//! 2<sup>i+1</sup> nanoseconds (bucket 0 also holds calls that took 0ns, and the last bucket holds
+//! everything longer).
+
+use std::fmt::Write as _;
+use std::ptr;
+use std::sync::atomic::{AtomicBool, AtomicPtr, AtomicU64, Ordering};
+use std::time::{Duration, Instant};
+
+/// The number of log<sub>2</sub>-nanosecond latency buckets; the last one covers everything over
+/// 2<sup>39</sup>ns (about nine minutes).
+pub const BUCKET_COUNT: usize = 40;
+
+/// The first line of every snapshot, so that readers can reject formats they don't understand.
+pub const SNAPSHOT_HEADER: &str = "# libsignal-bridge-metrics v1";
+
+/// The head of the list of every entry point that has been called at least once.
+static REGISTRY: AtomicPtr<EntryPointMetrics> = AtomicPtr::new(ptr::null_mut());
+
+/// Counters for a single generated entry point.
+///
+/// Meant to be used as a `static`; see the module documentation.
+pub struct EntryPointMetrics {
+    bridge: &'static str,
+    name: &'static str,
+    calls: AtomicU64,
+    total_nanos: AtomicU64,
+    buckets: [AtomicU64; BUCKET_COUNT],
+    registered: AtomicBool,
+    next: AtomicPtr<EntryPointMetrics>,
+}
+
+impl EntryPointMetrics {
+    pub const fn new(bridge: &'static str, name: &'static str) -> Self {
+        Self {
+            bridge,
+            name,
+            calls: AtomicU64::new(0),
+            total_nanos: AtomicU64::new(0),
+            buckets: [const { AtomicU64::new(0) }; BUCKET_COUNT],
+            registered: AtomicBool::new(false),
+            next: AtomicPtr::new(ptr::null_mut()),
+        }
+    }
+
+    /// Starts timing a call; the call is recorded when the returned timer is dropped.
+    #[inline]
+    pub fn start_call(&'static self) -> CallTimer {
+        if !self.registered.load(Ordering::Relaxed) {
+            self.register();
+        }
+        CallTimer {
+            metrics: self,
+            start: Instant::now(),
+        }
+    }
+
+    #[cold]
+    fn register(&'static self) {
+        if self.registered.swap(true, Ordering::AcqRel) {
+            // Another thread got here first.
+            return;
+        }
+        let this = ptr::from_ref(self).cast_mut();
+        let mut head = REGISTRY.load(Ordering::Acquire);
+        loop {
+            self.next.store(head, Ordering::Relaxed);
+            match REGISTRY.compare_exchange_weak(head, this, Ordering::AcqRel, Ordering::Acquire) {
+                Ok(_) => break,
+                Err(current) => head = current,
+            }
+        }
+    }
+
+    fn record(&self, elapsed: Duration) {
+        let nanos = u64::try_from(elapsed.as_nanos()).unwrap_or(u64::MAX);
+        self.calls.fetch_add(1, Ordering::Relaxed);
+        self.total_nanos.fetch_add(nanos, Ordering::Relaxed);
+        self.buckets[bucket_index(nanos)].fetch_add(1, Ordering::Relaxed);
+    }
+}
+
+/// Records a call to its [`EntryPointMetrics`] when dropped.
+#[must_use]
+pub struct CallTimer {
+    metrics: &'static EntryPointMetrics,
+    start: Instant,
+}
+
+impl Drop for CallTimer {
+    fn drop(&mut self) {
+        self.metrics.record(self.start.elapsed());
+    }
+}
+
+fn bucket_index(nanos: u64) -> usize {
+    let log2 = (u64::BITS - nanos.leading_zeros()).saturating_sub(1);
+    usize::try_from(log2)
+        .expect("at most 63")
+        .min(BUCKET_COUNT - 1)
+}
+
+fn registered_entry_points() -> impl Iterator<Item = &'static EntryPointMetrics> {
+    let mut next = REGISTRY.load(Ordering::Acquire);
+    std::iter::from_fn(move || {
+        // SAFETY: Only references to `'static` EntryPointMetrics are ever pushed onto the
+        // registry, and nothing is ever removed, so every non-null pointer is valid forever.
+        let current = unsafe { next.as_ref() }?;
+        next = current.next.load(Ordering::Acquire);
+        Some(current)
+    })
+}
+
+/// Renders every entry point called so far in the format described in the module documentation.
+///
+/// If `reset` is set, the counters are zeroed as they're read. Each counter is read (and reset)
+/// individually, so calls that complete concurrently may be split across two snapshots, but are
+/// never lost or counted twice.
+pub fn snapshot(reset: bool) -> String {
+    let read = |counter: &AtomicU64| {
+        if reset {
+            counter.swap(0, Ordering::Relaxed)
+        } else {
+            counter.load(Ordering::Relaxed)
+        }
+    };
+
+    let mut result = String::from(SNAPSHOT_HEADER);
+    result.push('\n');
+    for metrics in registered_entry_points() {
+        let calls = read(&metrics.calls);
+        let total_nanos = read(&metrics.total_nanos);
+        let buckets = metrics.buckets.each_ref().map(read);
+        if calls == 0 && total_nanos == 0 && buckets.iter().all(|&count| count == 0) {
+            continue;
+        }
+        write!(
+            result,
+            "{} {} {} {} ",
+            metrics.bridge, metrics.name, calls, total_nanos
+        )
+        .expect("writing to a String cannot fail");
+        let mut first = true;
+        for (i, count) in buckets.into_iter().enumerate() {
+            if count != 0 {
+                if !first {
+                    result.push(',');
+                }
+                write!(result, "{i}:{count}").expect("writing to a String cannot fail");
+                first = false;
+            }
+        }
+        result.push('\n');
+    }
+    result
+}
+
+#[cfg(test)]
+mod test {
+    use test_case::test_case;
+
+    use super::*;
+
+    /// Snapshots with `reset` affect every registered entry point, so tests that record calls
+    /// take turns.
+    static SNAPSHOT_LOCK: std::sync::Mutex<()> = std::sync::Mutex::new(());
+
+    #[test_case(0 => 0)]
+    #[test_case(1 => 0)]
+    #[test_case(2 => 1)]
+    #[test_case(3 => 1)]
+    #[test_case(1024 => 10)]
+    #[test_case(2047 => 10)]
+    #[test_case(u64::MAX => BUCKET_COUNT - 1)]
+    fn bucket_index_is_floor_log2(nanos: u64) -> usize {
+        bucket_index(nanos)
+    }
+
+    fn line_for<'a>(snapshot: &'a str, name: &str) -> Option<&'a str> {
+        snapshot
+            .lines()
+            .find(|line| line.split(' ').nth(1) == Some(name))
+    }
+
+    #[test]
+    fn calls_are_recorded_and_reset() {
+        static METRICS: EntryPointMetrics =
+            EntryPointMetrics::new("ffi", "test_calls_are_recorded_and_reset");
+        let _guard = SNAPSHOT_LOCK.lock().expect("not poisoned");
+        assert!(line_for(&snapshot(false), METRICS.name).is_none());
+
+        drop(METRICS.start_call());
+        drop(METRICS.start_call());
+
+        let first = snapshot(true);
+        assert!(first.starts_with(SNAPSHOT_HEADER));
+        let line = line_for(&first, METRICS.name).expect("registered");
+        let fields: Vec<&str> = line.split(' ').collect();
+        assert_eq!(fields[0], "ffi");
+        assert_eq!(fields[2], "2");
+        let bucketed: u64 = fields[4]
+            .split(',')
+            .map(|entry| {
+                let (_index, count) = entry.split_once(':').expect("index:count");
+                count.parse::<u64>().expect("valid count")
+            })
+            .sum();
+        assert_eq!(bucketed, 2);
+
+        assert!(line_for(&snapshot(false), METRICS.name).is_none());
+    }
+
+    #[test]
+    fn concurrent_first_calls_register_once() {
+        static METRICS: EntryPointMetrics =
+            EntryPointMetrics::new("jni", "test_concurrent_first_calls_register_once");
+        let _guard = SNAPSHOT_LOCK.lock().expect("not poisoned");
+        std::thread::scope(|s| {
+            for _ in 0..8 {
+                s.spawn(|| drop(METRICS.start_call()));
+            }
+        });
+        assert_eq!(
+            registered_entry_points()
+                .filter(|m| ptr::eq(*m, &METRICS))
+                .count(),
+            1
+        );
+        assert_eq!(METRICS.calls.load(Ordering::Relaxed), 8);
+    }
+}
@@ -921,6 +921,13 @@ impl<'a> ResultTypeInfo<'a> for Box<[Vec<u8>]> {
     }
 }
 
+impl<'a> ResultTypeInfo<'a> for Box<[bool]> {
+    type ResultType = JsArray;
+    fn convert_into(self, cx: &mut impl Context<'a>) -> JsResult<'a, Self::ResultType> {
+        make_array(cx, self.into_vec())
+    }
+}
+
 fn make_array<'a, It>(cx: &mut impl Context<'a>, it: It) -> JsResult<'a, JsArray>
 where
     It: IntoIterator<IntoIter: ExactSizeIterator, Item: ResultTypeInfo<'a>>,
@@ -1338,6 +1345,9 @@ type JsBoxContentsFor<T> =
 impl<'a, T: BridgeHandle> ResultTypeInfo<'a> for T {
     type ResultType = JsValue;
     fn convert_into(self, cx: &mut impl Context<'a>) -> NeonResult<Handle<'a, Self::ResultType>> {
+        // Tracked under the boxed type, which is all DefaultFinalize sees when it's collected.
+        #[cfg(feature = "bridge-handle-tracking")]
+        crate::handles::created_as::<JsBoxContentsFor<T>>("node", std::any::type_name::<T>());
         Ok(cx
             .boxed(DefaultFinalize(JsBoxContentsFor::<T>::from(self)))
             .upcast())
@@ -64,6 +64,14 @@ pub fn register(cx: &mut ModuleContext) -> NeonResult<()> {
 #[derive(derive_more::Deref, derive_more::From)]
 pub struct DefaultFinalize<T>(pub T);
 
+#[cfg(not(feature = "bridge-handle-tracking"))]
 impl<T> Finalize for DefaultFinalize<T> {}
 
+#[cfg(feature = "bridge-handle-tracking")]
+impl<T: 'static> Finalize for DefaultFinalize<T> {
+    fn finalize<'a, C: Context<'a>>(self, _cx: &mut C) {
+        crate::handles::destroyed::<T>("node");
+    }
+}
+
 pub type DefaultJsBox<T> = JsBox<DefaultFinalize<T>>;
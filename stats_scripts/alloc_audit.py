@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Rank allocation and copy sites by how likely they are to sit on a hot path.
+
+Every `to_vec()`, `clone()`, `collect()`, `Vec::with_capacity`, `Box::new`, `format!`, ... in
+the corpus is located together with its loop nesting (counting closures passed to iterator
+adapters as loops). Each site is weighted by how many bench functions (`rust/*/benches`) and
+bridge exports (`rust/bridge/shared/src`) can reach its function through the call graph, and by
+LOOP_FACTOR per enclosing loop.
+"""
+
+import argparse
+import sys
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import (load_data, strongly_connected_components, propagate_reach, TOKEN, ALLOC_PATHS,
+                          ALLOC_METHODS, ALLOC_MACROS, LOOP_FACTOR, BRIDGE_EXPORT_PREFIX)
+from select_impacted import locate_spans, first_line
+
+DEFAULT_WITHIN = ['rust/protocol/', 'rust/zkgroup/', 'rust/message-backup/']
+
+# Closures passed to these run once per element.
+ITERATOR_ADAPTERS = {'map', 'for_each', 'filter', 'filter_map', 'flat_map', 'fold', 'try_for_each',
+                     'try_fold', 'any', 'all', 'find', 'find_map', 'take_while', 'skip_while', 'scan',
+                     'inspect', 'map_while', 'zip_with', 'retain'}
+
+def is_bench_path(relative_path):
+    parts = relative_path.split('/')
+    return len(parts) > 3 and parts[0] == 'rust' and 'benches' in parts[2:-1]
+
+def allocation_sites(body):
+    """Yield (kind, loop depth, offset) for every allocation or copy in a body."""
+    tokens = [(m.lastgroup, m.group(m.lastgroup), m.start()) for m in TOKEN.finditer(body) if m.lastgroup]
+    brace_stack = []  # True for braces that open a loop body
+    paren_stack = []  # True for parentheses holding an iterator adapter's closure
+    pending_loop = False
+    depth = 0
+    for i, (kind, text, offset) in enumerate(tokens):
+        nxt = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        previous = tokens[i - 1][1] if i else None
+        if kind == 'ident':
+            if text in ('for', 'while', 'loop'):
+                pending_loop = True
+            elif previous == '.' and text in ALLOC_METHODS and nxt in ('(', '::'):
+                yield f'.{text}()', depth, offset
+            elif nxt == '!' and text in ALLOC_MACROS:
+                yield f'{text}!', depth, offset
+            elif previous == '::' and i >= 2 and (tokens[i - 2][1], text) in ALLOC_PATHS:
+                yield f'{tokens[i - 2][1]}::{text}', depth, offset
+            if previous == '.' and text in ITERATOR_ADAPTERS and nxt == '(':
+                # Mark the adapter's opening parenthesis, which is the next token.
+                tokens[i + 1] = ('adapter', '(', tokens[i + 1][2])
+        elif kind == 'adapter':
+            paren_stack.append(True)
+            depth += 1
+        elif text == '(':
+            paren_stack.append(False)
+        elif text == ')':
+            if paren_stack and paren_stack.pop():
+                depth -= 1
+        elif text == '{':
+            brace_stack.append(pending_loop)
+            depth += pending_loop
+            pending_loop = False
+        elif text == '}':
+            if brace_stack and brace_stack.pop():
+                depth -= 1
+
+def observer_reach(data):
+    """How many bench functions and bridge exports can reach each function."""
+    identifiers = [item.get('identifier', '') for item in data]
+    position = {identifier: i for i, identifier in enumerate(identifiers)}
+    edges = [[(position[dep],) for dep in set(item.get('deps', [])) if dep in position] for item in data]
+
+    bench_bits = [0] * len(data)
+    export_bits = [0] * len(data)
+    benches = exports = 0
+    for i, item in enumerate(data):
+        relative_path = item.get('relative_path', '')
+        if is_bench_path(relative_path):
+            bench_bits[i] = 1 << benches
+            benches += 1
+        elif relative_path.startswith(BRIDGE_EXPORT_PREFIX):
+            export_bits[i] = 1 << exports
+            exports += 1
+
+    components = strongly_connected_components(len(data), edges)
+    component, component_bench = propagate_reach(edges, bench_bits, toward='callees', components=components)
+    _, component_export = propagate_reach(edges, export_bits, toward='callees', components=components)
+    reach = [(bin(component_bench[component[i]]).count('1'), bin(component_export[component[i]]).count('1'))
+             for i in range(len(data))]
+    return reach, benches, exports
+
+def audit(data, within, bench_weight):
+    """Every allocation site under the given path prefixes, with its score."""
+    reach, bench_total, export_total = observer_reach(data)
+    prefixes = tuple(within)
+    sites = []
+    for i, item in enumerate(data):
+        if not item.get('relative_path', '').startswith(prefixes):
+            continue
+        benches, exports = reach[i]
+        for kind, depth, offset in allocation_sites(item.get('body', '')):
+            sites.append({
+                'function': i,
+                'kind': kind,
+                'loop_depth': depth,
+                'offset': offset,
+                'benches': benches,
+                'exports': exports,
+                'score': (bench_weight * benches + exports) * LOOP_FACTOR ** depth,
+            })
+    sites.sort(key=lambda s: s['score'], reverse=True)
+    return sites, bench_total, export_total
+
+def site_locations(data, sites, repo_root):
+    """File line number and source line for each site, reading each source file once."""
+    by_file = defaultdict(set)
+    for site in sites:
+        by_file[data[site['function']].get('relative_path', '')].add(site['function'])
+
+    spans = {}
+    for relative_path, functions in by_file.items():
+        source = repo_root / relative_path
+        if source.exists():
+            spans.update(locate_spans(source.read_text(errors='replace'), [
+                (i, data[i].get('body', ''), first_line(data[i].get('body', '')),
+                 data[i].get('body', '').count('\n') + 1) for i in functions]))
+
+    locations = []
+    for site in sites:
+        body = data[site['function']].get('body', '')
+        line_in_body = body.count('\n', 0, site['offset'])
+        start = body.rfind('\n', 0, site['offset']) + 1
+        end = body.find('\n', site['offset'])
+        text = body[start:end if end != -1 else len(body)].strip()
+        span = spans.get(site['function'])
+        locations.append((span[0] + line_in_body if span else None, text))
+    return locations
+
+def generate_markdown_report(data, sites, locations, bench_total, export_total, within, top):
+    """Generate a markdown report of ranked allocation sites."""
+    md_content = []
+    md_content.append("# LibSignal Allocation Hotspot Audit")
+    md_content.append("")
+    md_content.append(f"Allocation and copy sites under {', '.join(f'`{w}`' for w in within)}, weighted by the "
+                      f"{bench_total} bench functions and {export_total} bridge exports that reach them "
+                      f"and by ×{LOOP_FACTOR:g} per enclosing loop.")
+    md_content.append("")
+
+    reachable = [s for s in sites if s['score']]
+    md_content.append("## 📊 Summary")
+    md_content.append("")
+    md_content.append(f"- **Allocation sites:** {len(sites)}")
+    md_content.append(f"- **Reachable from a bench or export:** {len(reachable)}")
+    md_content.append(f"- **Inside loops:** {sum(1 for s in sites if s['loop_depth'])}")
+    md_content.append("")
+
+    md_content.append("| Kind | Sites | Reachable | In Loops | Total Score |")
+    md_content.append("|------|-------|-----------|----------|-------------|")
+    by_kind = defaultdict(list)
+    for site in sites:
+        by_kind[site['kind']].append(site)
+    for kind, kind_sites in sorted(by_kind.items(), key=lambda kv: -sum(s['score'] for s in kv[1])):
+        md_content.append(f"| `{kind}` | {len(kind_sites)} | {sum(1 for s in kind_sites if s['score'])} "
+                          f"| {sum(1 for s in kind_sites if s['loop_depth'])} | {sum(s['score'] for s in kind_sites):,.0f} |")
+    md_content.append("")
+
+    md_content.append("## 📁 By Crate")
+    md_content.append("")
+    md_content.append("| Crate | Sites | Total Score | Hottest Function |")
+    md_content.append("|-------|-------|-------------|------------------|")
+    by_crate = defaultdict(list)
+    for site in sites:
+        by_crate['/'.join(data[site['function']].get('relative_path', '').split('/')[:2])].append(site)
+    for crate, crate_sites in sorted(by_crate.items(), key=lambda kv: -sum(s['score'] for s in kv[1])):
+        per_function = Counter()
+        for site in crate_sites:
+            per_function[site['function']] += site['score']
+        hottest = per_function.most_common(1)[0][0]
+        md_content.append(f"| `{crate}` | {len(crate_sites)} | {sum(s['score'] for s in crate_sites):,.0f} "
+                          f"| `{data[hottest].get('display_name', '')}` |")
+    md_content.append("")
+
+    md_content.append("## 🔥 Hottest Allocation Sites")
+    md_content.append("")
+    md_content.append("| Score | Kind | Loops | Benches | Exports | Function | Location | Code |")
+    md_content.append("|-------|------|-------|---------|---------|----------|----------|------|")
+    for site, (line, text) in zip(sites[:top], locations):
+        item = data[site['function']]
+        location = f"{item.get('relative_path', '')}:{line}" if line else item.get('relative_path', '')
+        code = text.replace('|', '\\|')[:80]
+        md_content.append(f"| {site['score']:,.0f} | `{site['kind']}` | {site['loop_depth']} | {site['benches']} "
+                          f"| {site['exports']} | `{item.get('display_name', '')}` | {location} | `{code}` |")
+    md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Closures passed to iterator adapters (`map`, `for_each`, `filter_map`, ...) count as loops")
+    md_content.append("- Reach counts every bench function or export with a call path to the site's function, regardless of how often that path runs")
+    md_content.append("- `clone()` of `Copy` or reference-counted values is counted too; check the type before rewriting")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--within', nargs='+', default=DEFAULT_WITHIN,
+                        help='path prefixes to audit (default: %(default)s)')
+    parser.add_argument('--bench-weight', type=float, default=2.0,
+                        help='weight of a reaching bench relative to a reaching export (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=50, help='sites to list (default: %(default)s)')
+    parser.add_argument('--output', default='ALLOCATION_AUDIT_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    sites, bench_total, export_total = audit(data, args.within, args.bench_weight)
+    locations = site_locations(data, sites[:args.top], Path(__file__).resolve().parent.parent)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(data, sites, locations, bench_total, export_total, args.within, args.top))
+
+    print(f"🔎 {len(sites)} allocation sites, {sum(1 for s in sites if s['score'])} reachable from benches or exports")
+    for site, (line, _) in list(zip(sites, locations))[:10]:
+        item = data[site['function']]
+        print(f"  {site['score']:>10,.0f}  {site['kind']:<18} {item.get('relative_path', '')}:{line or '?'}")
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
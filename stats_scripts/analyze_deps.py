@@ -4,12 +4,46 @@ Analyze dependencies in libsignal using the libsignal_with_deps.json file.
 This script analyzes function calls from rust/ code to deps/ code.
 """
 
+import argparse
+import heapq
 import json
+import operator
 import sys
+import tempfile
 from collections import defaultdict, Counter
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 import re
 
+from external_sort import iter_json_array, ExternalSorter, last_per_key
+
+# Common deps crate names looked for in rust/ function bodies.
+BODY_CRATE_NAMES = ['curve25519_dalek', 'sha2', 'hmac', 'aes', 'ctr', 'cbc', 'subtle']
+
+# Records held in memory per sorted run by the out-of-core analysis.
+DEFAULT_RUN_SIZE = 200_000
+
+# A call made inside a loop is assumed to run this many times per enclosing loop.
+LOOP_FACTOR = 4.0
+
+BRIDGE_EXPORT_PREFIX = 'rust/bridge/shared/src/'
+
+TOKEN = re.compile(r'''
+    //[^\n]*|/\*.*?\*/                      # comments (skipped)
+  | b?"(?:\\.|[^"\\])*"                     # string literals
+  | '(?:\\.|[^'\\])'                        # char literals
+  | (?P<ident>[A-Za-z_]\w*)
+  | (?P<number>\d[\w.]*)
+  | (?P<punct>::|->|=>|[+\-*/%]=|&&|\|\||[^\s\w])
+''', re.VERBOSE | re.DOTALL)
+
+# Allocation and copy sites, as recognized by static_cost.py and alloc_audit.py.
+ALLOC_PATHS = {('Vec', 'new'), ('Vec', 'with_capacity'), ('Box', 'new'), ('String', 'new'),
+               ('String', 'from'), ('Rc', 'new'), ('Arc', 'new')}
+ALLOC_METHODS = {'to_vec', 'clone', 'to_owned', 'to_string', 'collect', 'into_boxed_slice'}
+ALLOC_MACROS = {'vec', 'format'}
+
 def load_data(json_file):
     """Load the JSON data from the file."""
     with open(json_file, 'r') as f:
@@ -35,6 +69,119 @@ def get_dep_crate_name(relative_path):
             return parts[1]  # deps/crate_name/...
     return None
 
+def brace_block(text, opening):
+    """The text of the brace-delimited block starting at `opening`."""
+    depth = 0
+    for i in range(opening, len(text)):
+        if text[i] == '{':
+            depth += 1
+        elif text[i] == '}':
+            depth -= 1
+            if depth == 0:
+                return text[opening:i + 1]
+    return text[opening:]
+
+def closure_text(text, start):
+    """The text from `start` up to the parenthesis closing the call opened just before it."""
+    depth = 1
+    for i in range(start, len(text)):
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return text[start:i]
+    return text[start:]
+
+def call_counts(text, callee_names):
+    """How many times each callee name is called in a piece of source text."""
+    counts = Counter()
+    for name in callee_names:
+        short = name.split('::')[-1].split('/')[-1]
+        if short:
+            counts[name] = len(re.findall(r'\b' + re.escape(short) + r'\s*(?:::<[^>]*>)?\(', text))
+    return counts
+
+def strongly_connected_components(count, edges):
+    """Tarjan's algorithm (iterative); returns a component number per node, in reverse topological order."""
+    index = [-1] * count
+    lowlink = [0] * count
+    on_stack = [False] * count
+    component = [-1] * count
+    stack = []
+    next_index = 0
+    next_component = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = next_index
+                next_index += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            for j in range(child, len(edges[node])):
+                target = edges[node][j][0]
+                if index[target] == -1:
+                    work.append((node, j + 1))
+                    work.append((target, 0))
+                    recurse = True
+                    break
+                if on_stack[target]:
+                    lowlink[node] = min(lowlink[node], index[target])
+            if recurse:
+                continue
+            if lowlink[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = next_component
+                    if member == node:
+                        break
+                next_component += 1
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+    return component, next_component
+
+def propagate_reach(edges, seeds, toward='callers', merge=operator.or_, carry=None, components=None):
+    """
+    Push per-function values through the call graph, condensed into strongly connected components.
+
+    `edges[i]` lists the calls function i makes as tuples starting with the callee, and `seeds[i]`
+    is its own value (an int bitset or a frozenset, say). With toward='callers' every component
+    ends up with the seeds of everything it calls, transitively; with toward='callees', of
+    everything that calls it. Values are combined with `merge`, and `carry(calls, value)`, if
+    given, adjusts a value crossing between two components over `calls` (the edge tuples joining
+    them). `components` can pass in the (component, count) already computed for `edges`.
+
+    Returns (component per function, value per component).
+    """
+    component, count = components or strongly_connected_components(len(edges), edges)
+    values = [None] * count
+    for i, seed in enumerate(seeds):
+        c = component[i]
+        values[c] = seed if values[c] is None else merge(values[c], seed)
+    callees = defaultdict(lambda: defaultdict(list))
+    for i, out in enumerate(edges):
+        for call in out:
+            if component[call[0]] != component[i]:
+                callees[component[i]][component[call[0]]].append(call)
+
+    # Tarjan numbers components callees first.
+    if toward == 'callers':
+        for c in range(count):
+            for d, calls in callees[c].items():
+                values[c] = merge(values[c], carry(calls, values[d]) if carry else values[d])
+    else:
+        for c in range(count - 1, -1, -1):
+            for d, calls in callees[c].items():
+                values[d] = merge(values[d], carry(calls, values[c]) if carry else values[c])
+    return component, values
+
 def analyze_dependencies(data):
     """Analyze dependencies and return statistics."""
     
@@ -56,6 +203,8 @@ def analyze_dependencies(data):
     deps_function_usage = Counter()  # deps function -> count of how many times it's called
     deps_crate_usage = Counter()  # deps crate -> count of calls
     rust_files_using_deps = set()  # rust files that use deps
+    rust_file_calls = Counter()  # rust file -> count of calls it makes to deps
+    deps_rust_callers = defaultdict(set)  # deps function -> rust files calling it
     
     # Analyze each function
     for item in data:
@@ -77,6 +226,9 @@ def analyze_dependencies(data):
                 rust_to_deps_calls[identifier].append(dep_identifier)
                 deps_function_usage[dep_identifier] += 1
                 rust_files_using_deps.add(relative_path)
+                # Attribute the call to this item's own file, even if its identifier is reused.
+                rust_file_calls[relative_path] += 1
+                deps_rust_callers[dep_identifier].add(relative_path)
                 
                 # Count by crate
                 crate_name = get_dep_crate_name(dep_relative_path)
@@ -88,8 +240,7 @@ def analyze_dependencies(data):
             body = item.get('body', '')
             if body:
                 # Look for common deps crate names in the body
-                deps_crates = ['curve25519_dalek', 'sha2', 'hmac', 'aes', 'ctr', 'cbc', 'subtle']
-                for crate in deps_crates:
+                for crate in BODY_CRATE_NAMES:
                     if crate in body:
                         deps_crate_usage[f"{crate}_in_body"] += 1
     
@@ -98,10 +249,164 @@ def analyze_dependencies(data):
         'deps_function_usage': deps_function_usage,
         'deps_crate_usage': deps_crate_usage,
         'rust_files_using_deps': rust_files_using_deps,
+        'rust_file_calls': rust_file_calls,
+        'deps_rust_callers': dict(deps_rust_callers),
         'function_info': function_info
     }
 
-def generate_markdown_report(stats):
+def analyze_dependencies_out_of_core(json_file, work_dir, run_size=None):
+    """
+    Compute the statistics of analyze_dependencies with bounded memory, streaming the corpus.
+
+    The identifier→path mapping and the call edges of rust/ functions are spilled to sorted run
+    files and merge-joined on the callee, then everything derived from the resolved edges is
+    sorted back into the order the in-memory analysis produces it. Only per-crate counters and
+    one callee's edges at a time are held in memory, besides `run_size` records per sorter.
+    Calls are attributed to the file of the item making them, even when callers share an
+    identifier; for duplicated callees the last entry wins, as it does in the in-memory
+    function_info.
+    """
+    run_size = run_size or DEFAULT_RUN_SIZE
+    paths = ExternalSorter(work_dir, 'paths', run_size)    # [identifier, seq, path, display_name]
+    edges = ExternalSorter(work_dir, 'edges', run_size)    # [callee, seq, k, caller, caller path]
+    crate_usage = Counter()
+    crate_first_seen = {}
+
+    def count_crate(name, position, amount=1):
+        crate_usage[name] += amount
+        if name not in crate_first_seen or position < crate_first_seen[name]:
+            crate_first_seen[name] = position
+
+    for seq, item in enumerate(iter_json_array(json_file)):
+        identifier = item.get('identifier', '')
+        relative_path = item.get('relative_path', '')
+        paths.add([identifier, seq, relative_path, item.get('display_name', '')])
+        if not is_rust_function(identifier, relative_path):
+            continue
+        body = item.get('body', '')
+        in_body = [crate for crate in BODY_CRATE_NAMES if crate in body] if body else []
+        for k, dep_identifier in enumerate(item.get('deps', [])):
+            edges.add([dep_identifier, seq, k, identifier, relative_path])
+            for j, crate in enumerate(in_body):
+                count_crate(f"{crate}_in_body", (seq, k, 1, j))
+
+    resolved = ExternalSorter(work_dir, 'resolved', run_size)    # [caller, seq, k, callee]
+    functions = ExternalSorter(work_dir, 'functions', run_size)  # [seq, k, callee, count, path, display_name, crate, caller files]
+    file_calls = ExternalSorter(work_dir, 'file_calls', run_size)  # [caller path, seq]
+    callees = last_per_key(iter(paths))
+    callee = next(callees, None)
+    for dep_identifier, group in groupby(edges, key=itemgetter(0)):
+        while callee is not None and callee[0] < dep_identifier:
+            callee = next(callees, None)
+        if callee is None or callee[0] != dep_identifier:
+            continue
+        _, _, dep_relative_path, display_name = callee[1]
+        if not is_deps_function(dep_identifier, dep_relative_path):
+            continue
+        crate_name = get_dep_crate_name(dep_relative_path)
+        count = 0
+        callers = set()
+        for _, seq, k, caller, caller_path in group:
+            if not count:
+                first = (seq, k)
+            count += 1
+            callers.add(caller_path)
+            resolved.add([caller, seq, k, dep_identifier])
+            file_calls.add([caller_path, seq])
+            if crate_name:
+                count_crate(crate_name, (seq, k, 0, 0))
+        functions.add([*first, dep_identifier, count, dep_relative_path, display_name, crate_name, sorted(callers)])
+
+    calls = ExternalSorter(work_dir, 'calls', run_size)  # [seq, k, caller, [callees]]
+    for caller, group in groupby(resolved, key=itemgetter(0)):
+        group = list(group)
+        calls.add([group[0][1], group[0][2], caller, [record[3] for record in group]])
+
+    files = ExternalSorter(work_dir, 'files', run_size)  # [seq, caller path, calls]
+    for caller_path, group in groupby(file_calls, key=itemgetter(0)):
+        group = list(group)
+        files.add([group[0][1], caller_path, len(group)])
+
+    ordered_crate_usage = Counter()
+    for name in sorted(crate_first_seen, key=crate_first_seen.get):
+        ordered_crate_usage[name] = crate_usage[name]
+    return {
+        'calls': calls,
+        'functions': functions,
+        'deps_crate_usage': ordered_crate_usage,
+        'files': files,
+    }
+
+def report_summary(stats):
+    """The figures the markdown report and console summary show, from in-memory statistics."""
+    function_info = stats['function_info']
+
+    def describe(func):
+        func_info = function_info.get(func, {})
+        return (func_info.get('display_name', func.split('/')[-1] if '/' in func else func),
+                func_info.get('relative_path', 'unknown'))
+
+    crate_details = defaultdict(lambda: {'functions': Counter(), 'total_calls': 0})
+    for func, count in stats['deps_function_usage'].items():
+        crate_name = get_dep_crate_name(function_info.get(func, {}).get('relative_path', ''))
+        if crate_name:
+            crate_details[crate_name]['functions'][func] += count
+            crate_details[crate_name]['total_calls'] += count
+
+    return {
+        'caller_count': len(stats['rust_to_deps_calls']),
+        'function_count': len(stats['deps_function_usage']),
+        'file_count': len(stats['rust_files_using_deps']),
+        'total_calls': sum(stats['deps_function_usage'].values()),
+        'top_functions': [(*describe(func), count) for func, count in stats['deps_function_usage'].most_common(20)],
+        'crate_usage': stats['deps_crate_usage'],
+        'top_files': sorted(stats['rust_file_calls'].items(), key=lambda x: x[1], reverse=True)[:15],
+        'crate_details': {
+            crate_name: {
+                'total_calls': details['total_calls'],
+                'function_count': len(details['functions']),
+                'top': [(*describe(func), count) for func, count in details['functions'].most_common(10)],
+            }
+            for crate_name, details in crate_details.items()
+        },
+    }
+
+def out_of_core_summary(result):
+    """report_summary for the output of analyze_dependencies_out_of_core, streaming its sorters."""
+    # Ties keep first-call order, like Counter.most_common and the stable sort in report_summary.
+    top_functions = []
+    crate_details = {}
+    total_calls = 0
+    for order, (_, _, func, count, relative_path, display_name, crate_name, _) in enumerate(result['functions']):
+        total_calls += count
+        entry = (count, -order, (display_name, relative_path, count))
+        heapq.heappush(top_functions, entry)
+        if len(top_functions) > 20:
+            heapq.heappop(top_functions)
+        if crate_name:
+            details = crate_details.setdefault(crate_name, {'total_calls': 0, 'function_count': 0, 'top': []})
+            details['total_calls'] += count
+            details['function_count'] += 1
+            heapq.heappush(details['top'], entry)
+            if len(details['top']) > 10:
+                heapq.heappop(details['top'])
+    for details in crate_details.values():
+        details['top'] = [row for _, _, row in sorted(details['top'], reverse=True)]
+
+    top_files = heapq.nlargest(15, ((relative_path, count) for _, relative_path, count in result['files']),
+                               key=itemgetter(1))
+    return {
+        'caller_count': len(result['calls']),
+        'function_count': len(result['functions']),
+        'file_count': len(result['files']),
+        'total_calls': total_calls,
+        'top_functions': [row for _, _, row in sorted(top_functions, reverse=True)],
+        'crate_usage': result['deps_crate_usage'],
+        'top_files': top_files,
+        'crate_details': crate_details,
+    }
+
+def generate_markdown_report(summary):
     """Generate a comprehensive markdown report about dependency usage."""
     
     md_content = []
@@ -111,14 +416,17 @@ def generate_markdown_report(stats):
     md_content.append("")
     md_content.append("This report analyzes function calls from `rust/` code to `deps/` code in the LibSignal project.")
     md_content.append("")
+    if summary.get('notes'):
+        md_content.extend(summary['notes'])
+        md_content.append("")
     
     # Overall statistics
     md_content.append("## 📊 Overall Statistics")
     md_content.append("")
-    md_content.append(f"- **Total rust functions calling deps:** {len(stats['rust_to_deps_calls'])}")
-    md_content.append(f"- **Total deps functions called:** {len(stats['deps_function_usage'])}")
-    md_content.append(f"- **Total rust files using deps:** {len(stats['rust_files_using_deps'])}")
-    md_content.append(f"- **Total dependency calls:** {sum(stats['deps_function_usage'].values())}")
+    md_content.append(f"- **Total rust functions calling deps:** {summary['caller_count']}")
+    md_content.append(f"- **Total deps functions called:** {summary['function_count']}")
+    md_content.append(f"- **Total rust files using deps:** {summary['file_count']}")
+    md_content.append(f"- **Total dependency calls:** {summary['total_calls']}")
     md_content.append("")
     
     # Most used deps functions
@@ -126,10 +434,7 @@ def generate_markdown_report(stats):
     md_content.append("")
     md_content.append("| Rank | Calls | Function | Crate | Path |")
     md_content.append("|------|-------|----------|-------|------|")
-    for i, (func, count) in enumerate(stats['deps_function_usage'].most_common(20), 1):
-        func_info = stats['function_info'].get(func, {})
-        relative_path = func_info.get('relative_path', 'unknown')
-        display_name = func_info.get('display_name', func.split('/')[-1] if '/' in func else func)
+    for i, (display_name, relative_path, count) in enumerate(summary['top_functions'], 1):
         crate = get_dep_crate_name(relative_path) or 'unknown'
         md_content.append(f"| {i} | {count} | `{display_name}` | {crate} | `{relative_path}` |")
     md_content.append("")
@@ -139,13 +444,13 @@ def generate_markdown_report(stats):
     md_content.append("")
     md_content.append("| Crate | Calls | Path Pattern |")
     md_content.append("|-------|-------|--------------|")
-    for crate, count in stats['deps_crate_usage'].most_common():
+    for crate, count in summary['crate_usage'].most_common():
         if not crate.endswith('_in_body'):
             md_content.append(f"| `{crate}` | {count} | `deps/{crate}/` |")
     md_content.append("")
     
     # Crate usage in function bodies (text analysis)
-    body_usage = {k: v for k, v in stats['deps_crate_usage'].items() if k.endswith('_in_body')}
+    body_usage = {k: v for k, v in summary['crate_usage'].items() if k.endswith('_in_body')}
     if body_usage:
         md_content.append("## 📝 Crate References in Code Bodies")
         md_content.append("")
@@ -157,119 +462,169 @@ def generate_markdown_report(stats):
         md_content.append("")
     
     # Rust files most dependent on deps
-    file_deps_count = defaultdict(int)
-    for rust_func, deps_list in stats['rust_to_deps_calls'].items():
-        func_info = stats['function_info'].get(rust_func, {})
-        rust_file = func_info.get('relative_path', 'unknown')
-        file_deps_count[rust_file] += len(deps_list)
-    
     md_content.append("## 📁 Top 15 Rust Files by Deps Usage")
     md_content.append("")
     md_content.append("| Deps Calls | File |")
     md_content.append("|------------|------|")
-    for file_path, call_count in sorted(file_deps_count.items(), key=lambda x: x[1], reverse=True)[:15]:
+    for file_path, call_count in summary['top_files']:
         md_content.append(f"| {call_count} | `{file_path}` |")
     md_content.append("")
     
     # Detailed breakdown by specific deps
     md_content.append("## 🔍 Detailed Breakdown by Deps Crate")
     md_content.append("")
-    crate_details = defaultdict(lambda: {'functions': Counter(), 'total_calls': 0})
-    
-    for func, count in stats['deps_function_usage'].items():
-        func_info = stats['function_info'].get(func, {})
-        relative_path = func_info.get('relative_path', '')
-        crate_name = get_dep_crate_name(relative_path)
-        if crate_name:
-            crate_details[crate_name]['functions'][func] += count
-            crate_details[crate_name]['total_calls'] += count
-    
-    for crate_name in sorted(crate_details.keys()):
-        details = crate_details[crate_name]
+    for crate_name in sorted(summary['crate_details'].keys()):
+        details = summary['crate_details'][crate_name]
         md_content.append(f"### {crate_name.upper()}")
         md_content.append("")
         md_content.append(f"**Total calls:** {details['total_calls']}")
         md_content.append("")
         md_content.append("| Function | Calls | Path |")
         md_content.append("|----------|-------|------|")
-        for func, count in details['functions'].most_common(10):  # Top 10 per crate
-            func_info = stats['function_info'].get(func, {})
-            display_name = func_info.get('display_name', func.split('/')[-1] if '/' in func else func)
-            relative_path = func_info.get('relative_path', 'unknown')
+        for display_name, relative_path, count in details['top']:  # Top 10 per crate
             md_content.append(f"| `{display_name}` | {count} | `{relative_path}` |")
-        if len(details['functions']) > 10:
+        if details['function_count'] > 10:
             md_content.append(f"| ... | ... | ... |")
-            md_content.append(f"| *{len(details['functions']) - 10} more functions* | | |")
+            md_content.append(f"| *{details.get('marker', '')}{details['function_count'] - 10} more functions* | | |")
         md_content.append("")
     
     return "\n".join(md_content)
 
-def print_summary(stats):
+def print_summary(summary):
     """Print a brief summary to the console."""
     print("=" * 80)
     print("LIBSIGNAL DEPENDENCY ANALYSIS")
     print("=" * 80)
     
     print(f"\n📊 SUMMARY")
-    print(f"├── Total rust functions calling deps: {len(stats['rust_to_deps_calls'])}")
-    print(f"├── Total deps functions called: {len(stats['deps_function_usage'])}")
-    print(f"├── Total rust files using deps: {len(stats['rust_files_using_deps'])}")
-    print(f"└── Total dependency calls: {sum(stats['deps_function_usage'].values())}")
+    print(f"├── Total rust functions calling deps: {summary['caller_count']}")
+    print(f"├── Total deps functions called: {summary['function_count']}")
+    print(f"├── Total rust files using deps: {summary['file_count']}")
+    print(f"└── Total dependency calls: {summary['total_calls']}")
+
+def exportable_stats(stats):
+    """The contents of dependency_analysis.json."""
+    # Convert Counter objects to regular dicts for JSON serialization
+    # Also include path information for each dependency and which rust files call them
+    deps_with_paths = {}
+    
+    for func, count in stats['deps_function_usage'].items():
+        func_info = stats['function_info'].get(func, {})
+        deps_with_paths[func] = {
+            'call_count': count,
+            'path': func_info.get('relative_path', 'unknown'),
+            'display_name': func_info.get('display_name', func.split('/')[-1] if '/' in func else func),
+            'crate': get_dep_crate_name(func_info.get('relative_path', '')),
+            'called_from_rust_files': sorted(stats['deps_rust_callers'].get(func, set()))
+        }
+    
+    return {
+        'rust_to_deps_calls': stats['rust_to_deps_calls'],
+        'deps_function_usage': dict(stats['deps_function_usage']),
+        'deps_function_details': deps_with_paths,
+        'deps_crate_usage': dict(stats['deps_crate_usage']),
+        'rust_files_using_deps': sorted(stats['rust_files_using_deps'])
+    }
+
+def write_streamed_json(f, sections):
+    """
+    Write a JSON object exactly as `json.dump(..., indent=2)` would, without materializing it.
+
+    `sections` is a list of (key, kind, value): 'value' sections are dumped as-is, while for
+    'dict' and 'list' sections the value is an iterable of (key, value) pairs or of elements.
+    """
+    def dumps(value, level):
+        return json.dumps(value, indent=2).replace('\n', '\n' + '  ' * level)
+
+    f.write('{')
+    for i, (key, kind, value) in enumerate(sections):
+        f.write(f"{',' if i else ''}\n  {json.dumps(key)}: ")
+        if kind == 'value':
+            f.write(dumps(value, 1))
+            continue
+        opening, closing = ('{', '}') if kind == 'dict' else ('[', ']')
+        f.write(opening)
+        empty = True
+        for entry in value:
+            f.write('\n    ' if empty else ',\n    ')
+            if kind == 'dict':
+                f.write(f"{json.dumps(entry[0])}: {dumps(entry[1], 2)}")
+            else:
+                f.write(dumps(entry, 2))
+            empty = False
+        f.write(closing if empty else f"\n  {closing}")
+    f.write('\n}')
+
+def write_out_of_core_json(f, result):
+    """Write dependency_analysis.json from the output of analyze_dependencies_out_of_core."""
+    write_streamed_json(f, [
+        ('rust_to_deps_calls', 'dict', ((caller, deps_list) for _, _, caller, deps_list in result['calls'])),
+        ('deps_function_usage', 'dict', ((func, count) for _, _, func, count, *_ in result['functions'])),
+        ('deps_function_details', 'dict', (
+            (func, {
+                'call_count': count,
+                'path': relative_path,
+                'display_name': display_name,
+                'crate': crate_name,
+                'called_from_rust_files': callers,
+            })
+            for _, _, func, count, relative_path, display_name, crate_name, callers in result['functions'])),
+        ('deps_crate_usage', 'value', dict(result['deps_crate_usage'])),
+        ('rust_files_using_deps', 'list', sorted_file_paths(result['files'])),
+    ])
+
+def sorted_file_paths(files):
+    """The rust/ files using deps, sorted, without loading them all."""
+    by_path = ExternalSorter(files.directory, 'file_paths', files.run_size)
+    for _, relative_path, _ in files:
+        by_path.add([relative_path])
+    return (relative_path for relative_path, in by_path)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--out-of-core', action='store_true',
+                        help='stream the corpus and aggregate through sorted run files on disk')
+    parser.add_argument('--run-size', type=int, default=DEFAULT_RUN_SIZE,
+                        help='records held in memory per sorted run with --out-of-core (default: %(default)s)')
+    parser.add_argument('--work-dir', help='directory for run files with --out-of-core (default: a temporary directory)')
+    return parser.parse_args()
 
 def main():
-    json_file = 'libsignal_with_deps.json'
+    args = parse_args()
+    json_file = args.corpus
     
     if not Path(json_file).exists():
         print(f"Error: {json_file} not found in current directory")
         sys.exit(1)
     
-    print("Loading and analyzing libsignal dependencies...")
-    data = load_data(json_file)
-    stats = analyze_dependencies(data)
+    output_file = 'dependency_analysis.json'
+    if args.out_of_core:
+        print("Streaming and analyzing libsignal dependencies out of core...")
+        with tempfile.TemporaryDirectory(dir=args.work_dir, prefix='analyze_deps.') as work_dir:
+            result = analyze_dependencies_out_of_core(json_file, work_dir, args.run_size)
+            summary = out_of_core_summary(result)
+            with open(output_file, 'w') as f:
+                write_out_of_core_json(f, result)
+    else:
+        print("Loading and analyzing libsignal dependencies...")
+        data = load_data(json_file)
+        stats = analyze_dependencies(data)
+        summary = report_summary(stats)
+        
+        # Save detailed results to JSON file
+        with open(output_file, 'w') as f:
+            json.dump(exportable_stats(stats), f, indent=2)
     
     # Print brief summary to console
-    print_summary(stats)
+    print_summary(summary)
     
     # Generate markdown report
-    markdown_content = generate_markdown_report(stats)
+    markdown_content = generate_markdown_report(summary)
     markdown_file = 'DEPENDENCY_ANALYSIS_REPORT.md'
     with open(markdown_file, 'w') as f:
         f.write(markdown_content)
     
-    # Save detailed results to JSON file
-    output_file = 'dependency_analysis.json'
-    with open(output_file, 'w') as f:
-        # Convert Counter objects to regular dicts for JSON serialization
-        # Also include path information for each dependency and which rust files call them
-        deps_with_paths = {}
-        
-        # First, build a mapping of deps function -> list of rust files that call it
-        deps_to_rust_callers = defaultdict(set)
-        for rust_func, deps_list in stats['rust_to_deps_calls'].items():
-            rust_func_info = stats['function_info'].get(rust_func, {})
-            rust_file_path = rust_func_info.get('relative_path', 'unknown')
-            for dep_func in deps_list:
-                deps_to_rust_callers[dep_func].add(rust_file_path)
-        
-        for func, count in stats['deps_function_usage'].items():
-            func_info = stats['function_info'].get(func, {})
-            deps_with_paths[func] = {
-                'call_count': count,
-                'path': func_info.get('relative_path', 'unknown'),
-                'display_name': func_info.get('display_name', func.split('/')[-1] if '/' in func else func),
-                'crate': get_dep_crate_name(func_info.get('relative_path', '')),
-                'called_from_rust_files': sorted(list(deps_to_rust_callers.get(func, set())))
-            }
-        
-        exportable_stats = {
-            'rust_to_deps_calls': stats['rust_to_deps_calls'],
-            'deps_function_usage': dict(stats['deps_function_usage']),
-            'deps_function_details': deps_with_paths,
-            'deps_crate_usage': dict(stats['deps_crate_usage']),
-            'rust_files_using_deps': list(stats['rust_files_using_deps'])
-        }
-        json.dump(exportable_stats, f, indent=2)
-    
     print(f"\n💾 Files generated:")
     print(f"├── Markdown report: {markdown_file}")
     print(f"└── JSON data: {output_file}")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Approximate analyze_deps statistics from streaming passes, with mergeable sketches.
+
+`build` streams a corpus (or one shard of it) into a few megabytes of sketches:
+- count-min sketches with heavy-hitter candidates for the most called deps functions, overall
+  and per crate, and for the rust/ files making the most deps calls;
+- HyperLogLogs for distinct callers, deps functions and files, overall and per crate;
+- a reservoir sample of example calls per crate.
+
+Exact totals (calls per crate, body references) are kept alongside, since they're small. `merge`
+combines sketch files from shards or snapshots, and `report` renders analyze_deps's markdown report
+from any number of sketch files, followed by the error bound of every approximate figure.
+
+Identifiers don't encode paths, so `build` streams the corpus twice: once to map the identifiers
+of deps/ functions (the only callees that count) to their path and name, and once to sketch the
+calls. The path and name of each heavy-hitter candidate are stored in the sketch for the report.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from pathlib import Path
+
+from analyze_deps import (is_rust_function, is_deps_function, get_dep_crate_name, generate_markdown_report,
+                          print_summary, BODY_CRATE_NAMES)
+from external_sort import iter_json_array
+from sketches import CountMinSketch, HeavyHitters, HyperLogLog, ReservoirSample
+
+SKETCH_VERSION = 2
+
+# Heavy-hitter candidates kept per list, as a multiple of the rows shown, so that keys near the
+# cutoff survive estimation noise.
+CANDIDATE_FACTOR = 4
+TOP_FUNCTIONS = 20
+TOP_FUNCTIONS_PER_CRATE = 10
+TOP_FILES = 15
+
+def load_callee_index(corpus):
+    """Map the identifier of every deps/ function in a corpus to its (relative path, display name)."""
+    callees = {}
+    for item in iter_json_array(corpus):
+        relative_path = item.get('relative_path', '')
+        if is_deps_function(item.get('identifier', ''), relative_path):
+            callees[item.get('identifier', '')] = (sys.intern(relative_path), item.get('display_name', ''))
+    return callees
+
+class DependencySketch:
+    """Sketched analyze_deps statistics for any number of corpus items."""
+
+    def __init__(self, width=8192, depth=4, precision=12, examples=5, seed=0):
+        self.items = 0
+        self.precision = precision
+        self.examples = examples
+        self.seed = seed
+        self.function_calls = CountMinSketch(width, depth)
+        self.file_calls = CountMinSketch(width, depth)
+        self.top_functions = HeavyHitters(TOP_FUNCTIONS * CANDIDATE_FACTOR)
+        self.top_files = HeavyHitters(TOP_FILES * CANDIDATE_FACTOR)
+        self.callers = HyperLogLog(precision)
+        self.functions = HyperLogLog(precision)
+        self.files = HyperLogLog(precision)
+        self.crate_usage = Counter()
+        self.crates = {}
+        # (relative path, display name) of heavy-hitter candidates, pruned when saved.
+        self.callees = {}
+
+    def _crate(self, crate_name):
+        if crate_name not in self.crates:
+            self.crates[crate_name] = {
+                'top': HeavyHitters(TOP_FUNCTIONS_PER_CRATE * CANDIDATE_FACTOR),
+                'functions': HyperLogLog(self.precision),
+                'callers': HyperLogLog(self.precision),
+                'examples': ReservoirSample(self.examples, f"{self.seed}:{crate_name}"),
+            }
+        return self.crates[crate_name]
+
+    def add_item(self, item, callee_index):
+        """Account for one corpus item, as analyze_dependencies does.
+
+        `callee_index` is load_callee_index of the whole corpus, even when sketching one shard.
+        """
+        self.items += 1
+        identifier = item.get('identifier', '')
+        relative_path = item.get('relative_path', '')
+        if not is_rust_function(identifier, relative_path):
+            return
+        body = item.get('body', '')
+        in_body = [crate for crate in BODY_CRATE_NAMES if crate in body] if body else []
+        for dep_identifier in item.get('deps', []):
+            dep_relative_path, dep_name = callee_index.get(dep_identifier, ('', dep_identifier))
+            if is_deps_function(dep_identifier, dep_relative_path):
+                self.callees[dep_identifier] = (dep_relative_path, dep_name)
+                estimate = self.function_calls.add(dep_identifier)
+                self.top_functions.offer(dep_identifier, estimate)
+                self.top_files.offer(relative_path, self.file_calls.add(relative_path))
+                self.callers.add(identifier)
+                self.functions.add(dep_identifier)
+                self.files.add(relative_path)
+                crate_name = get_dep_crate_name(dep_relative_path)
+                if crate_name:
+                    self.crate_usage[crate_name] += 1
+                    crate = self._crate(crate_name)
+                    crate['top'].offer(dep_identifier, estimate)
+                    crate['functions'].add(dep_identifier)
+                    crate['callers'].add(identifier)
+                    crate['examples'].add([item.get('display_name', ''), relative_path, dep_name])
+            for crate in in_body:
+                self.crate_usage[f"{crate}_in_body"] += 1
+
+    def merge(self, other):
+        self.items += other.items
+        self.function_calls.merge(other.function_calls)
+        self.file_calls.merge(other.file_calls)
+        self.top_functions.merge(other.top_functions, self.function_calls)
+        self.top_files.merge(other.top_files, self.file_calls)
+        self.callers.merge(other.callers)
+        self.functions.merge(other.functions)
+        self.files.merge(other.files)
+        self.crate_usage.update(other.crate_usage)
+        self.callees.update(other.callees)
+        for crate_name, theirs in other.crates.items():
+            ours = self._crate(crate_name)
+            ours['top'].merge(theirs['top'], self.function_calls)
+            ours['functions'].merge(theirs['functions'])
+            ours['callers'].merge(theirs['callers'])
+            ours['examples'].merge(theirs['examples'])
+        return self
+
+    def candidate_callees(self):
+        """The recorded callees that are still heavy-hitter candidates somewhere."""
+        keys = set(self.top_functions.candidates)
+        for crate in self.crates.values():
+            keys.update(crate['top'].candidates)
+        return {key: self.callees[key] for key in keys if key in self.callees}
+
+    def to_dict(self):
+        return {
+            'version': SKETCH_VERSION,
+            'items': self.items,
+            'precision': self.precision,
+            'examples': self.examples,
+            'seed': self.seed,
+            'function_calls': self.function_calls.to_dict(),
+            'file_calls': self.file_calls.to_dict(),
+            'top_functions': self.top_functions.to_dict(),
+            'top_files': self.top_files.to_dict(),
+            'callers': self.callers.to_dict(),
+            'functions': self.functions.to_dict(),
+            'files': self.files.to_dict(),
+            'crate_usage': dict(self.crate_usage),
+            'crates': {crate_name: {key: sketch.to_dict() for key, sketch in crate.items()}
+                       for crate_name, crate in self.crates.items()},
+            'callees': {key: list(value) for key, value in self.candidate_callees().items()},
+        }
+
+    @classmethod
+    def from_dict(cls, value):
+        if value.get('version') != SKETCH_VERSION:
+            raise ValueError(f"unsupported sketch version {value.get('version')!r}")
+        sketch = cls(precision=value['precision'], examples=value['examples'], seed=value['seed'])
+        sketch.items = value['items']
+        sketch.function_calls = CountMinSketch.from_dict(value['function_calls'])
+        sketch.file_calls = CountMinSketch.from_dict(value['file_calls'])
+        sketch.top_functions = HeavyHitters.from_dict(value['top_functions'])
+        sketch.top_files = HeavyHitters.from_dict(value['top_files'])
+        sketch.callers = HyperLogLog.from_dict(value['callers'])
+        sketch.functions = HyperLogLog.from_dict(value['functions'])
+        sketch.files = HyperLogLog.from_dict(value['files'])
+        sketch.crate_usage = Counter(value['crate_usage'])
+        sketch.callees = {key: tuple(callee) for key, callee in value['callees'].items()}
+        for crate_name, crate in value['crates'].items():
+            sketch.crates[crate_name] = {
+                'top': HeavyHitters.from_dict(crate['top']),
+                'functions': HyperLogLog.from_dict(crate['functions']),
+                'callers': HyperLogLog.from_dict(crate['callers']),
+                'examples': ReservoirSample.from_dict(crate['examples'], f"{sketch.seed}:{crate_name}"),
+            }
+        return sketch
+
+    def summary(self):
+        """The figures generate_markdown_report and print_summary show; estimates are marked ≈."""
+        def describe(identifier, estimate):
+            relative_path, name = self.callees.get(identifier, ('unknown', identifier))
+            return name, relative_path, f"≈{estimate}"
+
+        crate_usage = Counter()
+        # Ties are broken by name so that merge order doesn't matter.
+        for crate_name in sorted(self.crate_usage):
+            crate_usage[crate_name] = self.crate_usage[crate_name]
+        return {
+            'caller_count': f"≈{self.callers.estimate()}",
+            'function_count': f"≈{self.functions.estimate()}",
+            'file_count': f"≈{self.files.estimate()}",
+            'total_calls': self.function_calls.total,
+            'top_functions': [describe(identifier, estimate)
+                              for identifier, estimate in self.top_functions.top(self.function_calls, TOP_FUNCTIONS)],
+            'crate_usage': crate_usage,
+            'top_files': [(relative_path, f"≈{estimate}")
+                          for relative_path, estimate in self.top_files.top(self.file_calls, TOP_FILES)],
+            'crate_details': {
+                crate_name: {
+                    'total_calls': self.crate_usage[crate_name],
+                    'function_count': crate['functions'].estimate(),
+                    'marker': '≈',
+                    'top': [describe(identifier, estimate)
+                            for identifier, estimate in crate['top'].top(self.function_calls, TOP_FUNCTIONS_PER_CRATE)],
+                }
+                for crate_name, crate in self.crates.items()
+            },
+            'notes': [
+                f"**Approximate:** built from sketches of {self.items:,} corpus items. Figures marked ≈ are "
+                "estimates; see Error Bounds at the end.",
+            ],
+        }
+
+def generate_approximate_sections(sketch):
+    """Sections only the approximate report has: per-crate callers, examples and error bounds."""
+    md_content = []
+    md_content.append("## 👥 Distinct Callers per Crate")
+    md_content.append("")
+    md_content.append("| Crate | Calls | Distinct Functions | Distinct Callers |")
+    md_content.append("|-------|-------|--------------------|------------------|")
+    for crate_name in sorted(sketch.crates, key=lambda name: -sketch.crate_usage[name]):
+        crate = sketch.crates[crate_name]
+        md_content.append(f"| `{crate_name}` | {sketch.crate_usage[crate_name]} | ≈{crate['functions'].estimate()} "
+                          f"| ≈{crate['callers'].estimate()} |")
+    md_content.append("")
+
+    md_content.append("## 🎲 Example Calls")
+    md_content.append("")
+    md_content.append("A uniform random sample of calls into each crate.")
+    md_content.append("")
+    md_content.append("| Crate | Caller | File | Callee |")
+    md_content.append("|-------|--------|------|--------|")
+    for crate_name in sorted(sketch.crates):
+        for caller, relative_path, dep_name in sketch.crates[crate_name]['examples'].items:
+            md_content.append(f"| `{crate_name}` | `{caller}` | `{relative_path}` | `{dep_name}` |")
+    md_content.append("")
+
+    cms = sketch.function_calls
+    md_content.append("## 📏 Error Bounds")
+    md_content.append("")
+    md_content.append(f"- **Call counts per function and per file** (count-min, {cms.width}×{cms.depth}): never below the "
+                      f"true count, and at most {cms.error_bound():,} above it (ε = {cms.epsilon:.2e} of "
+                      f"{cms.total:,} calls) with probability {1 - cms.delta:.1%}")
+    md_content.append(f"- **Top lists**: re-estimated from {CANDIDATE_FACTOR}× as many heavy-hitter candidates as rows shown, "
+                      "so entries whose counts differ by less than the bound above may be out of order")
+    md_content.append(f"- **Distinct counts** (HyperLogLog, {len(sketch.callers.registers)} registers): "
+                      f"±{sketch.callers.relative_error():.1%} standard error (±{2 * sketch.callers.relative_error():.1%} at 95%)")
+    md_content.append("- **Total calls, calls per crate and body references**: exact")
+    md_content.append("- **Example calls**: a uniform sample, merged in proportion to each shard's calls")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def load_sketches(paths):
+    """Load and merge sketch files."""
+    merged = None
+    for path in paths:
+        with open(path, 'r') as f:
+            sketch = DependencySketch.from_dict(json.load(f))
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
+
+def parse_shard(text):
+    index, count = (int(part) for part in text.split('/'))
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard {text} is not of the form i/n with 0 <= i < n")
+    return index, count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='sketch a corpus in two streaming passes (callee index, then calls)')
+    build.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    build.add_argument('--shard', type=parse_shard, help='only sketch items i, i+n, i+2n, ... (as i/n)')
+    build.add_argument('--width', type=int, default=8192, help='count-min counters per row (default: %(default)s)')
+    build.add_argument('--depth', type=int, default=4, help='count-min rows (default: %(default)s)')
+    build.add_argument('--precision', type=int, default=12, help='HyperLogLog precision bits (default: %(default)s)')
+    build.add_argument('--examples', type=int, default=5, help='example calls kept per crate (default: %(default)s)')
+    build.add_argument('--seed', type=int, default=0, help='reservoir sampling seed (default: %(default)s)')
+    build.add_argument('--output', default='dependency_sketch.json', help='sketch file (default: %(default)s)')
+
+    merge = subparsers.add_parser('merge', help='merge sketch files from shards or snapshots')
+    merge.add_argument('sketches', nargs='+', help='sketch files')
+    merge.add_argument('--output', default='dependency_sketch.json', help='merged sketch file (default: %(default)s)')
+
+    report = subparsers.add_parser('report', help='render the dependency report from sketch files')
+    report.add_argument('sketches', nargs='+', help='sketch files, merged before reporting')
+    report.add_argument('--output', default='APPROXIMATE_DEPENDENCY_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == 'build':
+        if not Path(args.corpus).exists():
+            print(f"Error: {args.corpus} not found in current directory")
+            sys.exit(1)
+        callee_index = load_callee_index(args.corpus)
+        sketch = DependencySketch(args.width, args.depth, args.precision, args.examples, args.seed)
+        for i, item in enumerate(iter_json_array(args.corpus)):
+            if args.shard is None or i % args.shard[1] == args.shard[0]:
+                sketch.add_item(item, callee_index)
+        with open(args.output, 'w') as f:
+            json.dump(sketch.to_dict(), f)
+        print(f"🧮 Sketched {sketch.items:,} items ({sketch.function_calls.total:,} deps calls)")
+        print(f"💾 Sketch saved to: {args.output}")
+        return
+
+    for path in args.sketches:
+        if not Path(path).exists():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+    try:
+        sketch = load_sketches(args.sketches)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.command == 'merge':
+        with open(args.output, 'w') as f:
+            json.dump(sketch.to_dict(), f)
+        print(f"💾 Merged {len(args.sketches)} sketches ({sketch.items:,} items) into: {args.output}")
+        return
+
+    summary = sketch.summary()
+    print_summary(summary)
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(summary))
+        f.write("\n")
+        f.write(generate_approximate_sections(sketch))
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Find CPU-heavy crypto that async code runs directly on the tokio runtime threads.
+
+Async code is every `async fn` body and every `async { ... }` block in the corpus. From there,
+synchronous call edges are followed into the heavy deps/ crates (boring-signal,
+curve25519-dalek, sha2, aes-gcm-siv by default), skipping calls made inside a `spawn_blocking`
+(or `block_in_place`, `thread::spawn`, `rayon::spawn`) closure and stopping at other async fns,
+which are checked on their own. Paths are ranked by the static cost of the heavy code they reach,
+taken from static_cost.py's `static_costs.json` when available.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict, deque
+from pathlib import Path
+
+from analyze_deps import load_data, get_dep_crate_name, propagate_reach, brace_block, closure_text, call_counts
+
+DEFAULT_HEAVY_CRATES = ['boring-signal', 'curve25519-dalek', 'sha2', 'aes-gcm-siv']
+
+# Calls whose closure argument runs off the async worker threads.
+OFFLOAD_CALL = re.compile(r'\b(?:spawn_blocking|block_in_place|thread::spawn|rayon::spawn)\s*\(')
+ASYNC_FN = re.compile(r'^[^{]*\basync\s+(?:unsafe\s+)?fn\b')
+ASYNC_BLOCK = re.compile(r'\basync\s+(?:move\s+)?\{')
+
+def offloaded_text(body):
+    """The closure arguments of every offloading call in a body."""
+    return '\n'.join(closure_text(body, m.end()) for m in OFFLOAD_CALL.finditer(body))
+
+def runtime_callees(item, names, position):
+    """
+    Callees of a function that run on the calling thread: those called at least once outside an
+    offloading closure. A callee whose name can't be found in the body at all is kept, since the
+    call may come from a macro or trait dispatch.
+    """
+    deps = [position[dep] for dep in set(item.get('deps', [])) if dep in position]
+    body = item.get('body', '')
+    if not OFFLOAD_CALL.search(body):
+        return deps
+    offloaded = offloaded_text(body)
+    callee_names = {names[j] for j in deps}
+    everywhere = call_counts(body, callee_names)
+    inside = call_counts(offloaded, callee_names)
+    return [j for j in deps if not everywhere[names[j]] or everywhere[names[j]] > inside[names[j]]]
+
+def async_regions(item):
+    """The text of a function that runs as async code: its whole body, or its async blocks."""
+    body = item.get('body', '')
+    if ASYNC_FN.match(body):
+        return body, True
+    blocks = [brace_block(body, m.end() - 1) for m in ASYNC_BLOCK.finditer(body)]
+    return '\n'.join(blocks), False
+
+class RuntimeGraph:
+    """Synchronous, non-offloaded call edges and the heavy crate functions they reach."""
+
+    def __init__(self, data, heavy_crates):
+        self.data = data
+        identifiers = [item.get('identifier', '') for item in data]
+        position = {identifier: i for i, identifier in enumerate(identifiers)}
+        self.names = [item.get('display_name', '') for item in data]
+        self.heavy_crate = [get_dep_crate_name(item.get('relative_path', '')) for item in data]
+        self.heavy_crate = [crate if crate in heavy_crates else None for crate in self.heavy_crate]
+        self.is_async_fn = [bool(ASYNC_FN.match(item.get('body', ''))) for item in data]
+        self.edges = [runtime_callees(item, self.names, position) for item in data]
+
+        # Async roots: async fns, and sync functions whose async blocks call something.
+        self.roots = {}
+        for i, item in enumerate(data):
+            text, whole = async_regions(item)
+            if whole:
+                self.roots[i] = self.edges[i]
+            elif text:
+                callee_names = {self.names[j] for j in self.edges[i]}
+                counts = call_counts(text, callee_names)
+                self.roots[i] = [j for j in self.edges[i] if counts[self.names[j]]]
+
+        self.reachable = self._heavy_reachability()
+
+    def _follows(self, j):
+        """Whether a walk continues into callee `j` (it is neither heavy nor a separate async fn)."""
+        return self.heavy_crate[j] is None and not self.is_async_fn[j]
+
+    def _heavy_reachability(self):
+        """For each function, the heavy entry points reached by its synchronous calls."""
+        # A heavy callee is an entry point itself; the walk only continues through followed callees.
+        seeds = [frozenset({i}) if crate is not None else frozenset() for i, crate in enumerate(self.heavy_crate)]
+        edges = [[(j,) for j in out if self.heavy_crate[j] is not None or self._follows(j)]
+                 if self.heavy_crate[i] is None else [] for i, out in enumerate(self.edges)]
+        component, reached = propagate_reach(edges, seeds)
+        return [reached[component[i]] for i in range(len(self.data))]
+
+    def heavy_entries(self, root):
+        """Heavy entry points reached from an async root without leaving its thread."""
+        found = set()
+        for j in self.roots[root]:
+            if self.heavy_crate[j] is not None:
+                found.add(j)
+            elif self._follows(j):
+                found |= self.reachable[j]
+        return found
+
+    def path(self, root, target):
+        """A shortest synchronous call path from an async root to a heavy entry point."""
+        parent = {j: root for j in self.roots[root]}
+        queue = deque(self.roots[root])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                break
+            if not self._follows(node):
+                continue
+            for j in self.edges[node]:
+                if j not in parent:
+                    parent[j] = node
+                    queue.append(j)
+        if target not in parent:
+            return [root, target]
+        chain = [target]
+        while chain[-1] != root:
+            chain.append(parent[chain[-1]])
+        return chain[::-1]
+
+def load_costs(costs_file, data):
+    """Inclusive static cost per function, or body length if static_costs.json is unavailable."""
+    if costs_file and Path(costs_file).exists():
+        with open(costs_file, 'r') as f:
+            costs = json.load(f)
+        return [costs.get(item.get('identifier', ''), {}).get('inclusive', {}).get('cost', 0.0) for item in data], True
+    return [float(len(item.get('body', ''))) for item in data], False
+
+def find_blocking_paths(data, heavy_crates, costs):
+    """Rank async roots by the cost of the heavy crypto they run on the runtime."""
+    graph = RuntimeGraph(data, set(heavy_crates))
+    findings = []
+    for root in graph.roots:
+        entries = graph.heavy_entries(root)
+        if not entries:
+            continue
+        ranked = sorted(entries, key=lambda j: costs[j], reverse=True)
+        findings.append({
+            'root': root,
+            'entries': ranked,
+            'cost': sum(costs[j] for j in entries),
+            'crates': sorted({graph.heavy_crate[j] for j in entries}),
+            'path': graph.path(root, ranked[0]),
+        })
+    findings.sort(key=lambda f: f['cost'], reverse=True)
+    return graph, findings
+
+def describe(data, i):
+    item = data[i]
+    return f"{item.get('display_name', '')} ({item.get('relative_path', '')})"
+
+def generate_markdown_report(data, graph, findings, costs, cost_source, top):
+    """Generate a markdown report of heavy crypto running on async threads."""
+    md_content = []
+    md_content.append("# LibSignal Blocking Crypto on Async Threads")
+    md_content.append("")
+    md_content.append(f"Costs are {cost_source}.")
+    md_content.append("")
+
+    md_content.append("## 📊 Summary")
+    md_content.append("")
+    async_fns = sum(1 for root in graph.roots if graph.is_async_fn[root])
+    md_content.append(f"- **Async fns:** {async_fns}")
+    md_content.append(f"- **Functions with async blocks:** {len(graph.roots) - async_fns}")
+    md_content.append(f"- **Async code reaching heavy crates on the runtime:** {len(findings)}")
+    md_content.append("")
+
+    md_content.append("## 🚨 Async Code Running Heavy Crypto")
+    md_content.append("")
+    md_content.append("| Async Function | File | Heavy Crates | Heavy Entry Points | Cost |")
+    md_content.append("|----------------|------|--------------|--------------------|------|")
+    for finding in findings[:top]:
+        item = data[finding['root']]
+        md_content.append(f"| `{item.get('display_name', '')}` | {item.get('relative_path', '')} "
+                          f"| {', '.join(finding['crates'])} | {len(finding['entries'])} | {finding['cost']:,.0f} |")
+    md_content.append("")
+
+    exposure = defaultdict(set)
+    for finding in findings:
+        for j in finding['entries']:
+            exposure[j].add(finding['root'])
+    md_content.append("## 🔥 Heavy Entry Points Reached from Async Code")
+    md_content.append("")
+    md_content.append("| Function | Crate | Cost | Async Callers |")
+    md_content.append("|----------|-------|------|---------------|")
+    for j in sorted(exposure, key=lambda j: costs[j] * len(exposure[j]), reverse=True)[:top]:
+        md_content.append(f"| `{graph.names[j]}` | {graph.heavy_crate[j]} | {costs[j]:,.0f} | {len(exposure[j])} |")
+    md_content.append("")
+
+    md_content.append("## 🧭 Paths")
+    md_content.append("")
+    md_content.append("Heaviest reached entry point for each of the top async functions:")
+    md_content.append("")
+    for finding in findings[:top]:
+        md_content.append(f"- `{describe(data, finding['root'])}`")
+        for i in finding['path'][1:]:
+            md_content.append(f"  - → `{describe(data, i)}`")
+    md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Calls made only inside `spawn_blocking`, `block_in_place`, `thread::spawn` or `rayon::spawn` closures are treated as off the runtime")
+    md_content.append("- Walks stop at other async fns; their own bodies are reported separately")
+    md_content.append("- Calls that can't be located in a body (macros, trait dispatch) are assumed to run on the runtime")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--heavy', nargs='+', default=DEFAULT_HEAVY_CRATES,
+                        help='deps/ crates considered CPU-heavy (default: %(default)s)')
+    parser.add_argument('--costs', default='static_costs.json',
+                        help='static_cost.py output to rank by (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=25, help='rows per table (default: %(default)s)')
+    parser.add_argument('--output', default='ASYNC_BLOCKING_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    costs, have_static_costs = load_costs(args.costs, data)
+    cost_source = (f"inclusive static costs from `{args.costs}`" if have_static_costs else
+                   "body lengths (run static_cost.py first for static costs)")
+    if not have_static_costs:
+        print(f"Warning: {args.costs} not found; ranking by body length")
+
+    graph, findings = find_blocking_paths(data, args.heavy, costs)
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(data, graph, findings, costs, cost_source, args.top))
+
+    print(f"🚨 {len(findings)} async functions reach {', '.join(args.heavy)} on the runtime")
+    for finding in findings[:10]:
+        print(f"  {describe(data, finding['root']):<80} cost {finding['cost']:,.0f}")
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
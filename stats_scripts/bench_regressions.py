@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Collect benchmark results for libsignal and flag statistically significant regressions.
+
+Results are read from criterion output directories (`target/criterion/**/new/estimates.json`,
+plus `sample.json` when present) and from saved libtest `cargo bench` output (used by several of
+the vendored crates in deps/), and stored per commit in a local SQLite time series.
+"""
+
+import argparse
+import json
+import random
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_STORE = 'bench_history.sqlite'
+DEFAULT_REPORT = 'BENCH_REGRESSION_REPORT.md'
+
+# `test sha256_10 ... bench:          12 ns/iter (+/- 1) = 833 MB/s`
+LIBTEST_BENCH_LINE = re.compile(r'^test (\S+)\s+\.\.\. bench:\s+([\d,.]+) ns/iter \(\+/- ([\d,.]+)\)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    commit_sha TEXT PRIMARY KEY,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    commit_sha TEXT NOT NULL REFERENCES runs(commit_sha),
+    bench_id TEXT NOT NULL,
+    suite TEXT NOT NULL,
+    median_ns REAL NOT NULL,
+    median_lower_ns REAL,
+    median_upper_ns REAL,
+    samples TEXT,
+    PRIMARY KEY (commit_sha, bench_id)
+);
+"""
+
+def open_store(store_path):
+    """Open (and create if needed) the time-series store."""
+    conn = sqlite3.connect(store_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+def current_commit():
+    """Return the commit sha of HEAD in the current checkout."""
+    return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+def load_criterion_results(criterion_dir):
+    """Yield one result per benchmark found under a criterion output directory."""
+    criterion_dir = Path(criterion_dir)
+    for estimates_file in sorted(criterion_dir.glob('**/new/estimates.json')):
+        new_dir = estimates_file.parent
+        with open(estimates_file, 'r') as f:
+            estimates = json.load(f)
+
+        # benchmark.json has the id as criterion prints it; fall back to the directory layout.
+        bench_id = str(new_dir.parent.relative_to(criterion_dir))
+        benchmark_file = new_dir / 'benchmark.json'
+        if benchmark_file.exists():
+            with open(benchmark_file, 'r') as f:
+                bench_id = json.load(f).get('full_id', bench_id)
+
+        # Per-iteration times, so that commits can be compared with our own bootstrap.
+        samples = None
+        sample_file = new_dir / 'sample.json'
+        if sample_file.exists():
+            with open(sample_file, 'r') as f:
+                sample = json.load(f)
+            samples = [t / n for t, n in zip(sample['times'], sample['iters']) if n]
+
+        median = estimates['median']
+        yield {
+            'bench_id': bench_id,
+            'median_ns': median['point_estimate'],
+            'median_lower_ns': median['confidence_interval']['lower_bound'],
+            'median_upper_ns': median['confidence_interval']['upper_bound'],
+            'samples': samples,
+        }
+
+def load_libtest_results(output_file):
+    """Yield one result per `test ... bench:` line of saved libtest bench output."""
+    with open(output_file, 'r') as f:
+        for line in f:
+            match = LIBTEST_BENCH_LINE.match(line.strip())
+            if not match:
+                continue
+            name, ns, spread = match.groups()
+            ns = float(ns.replace(',', ''))
+            spread = float(spread.replace(',', ''))
+            # libtest only reports the median and the max-min spread of its samples.
+            yield {
+                'bench_id': name,
+                'median_ns': ns,
+                'median_lower_ns': ns - spread / 2,
+                'median_upper_ns': ns + spread / 2,
+                'samples': None,
+            }
+
+def record_results(conn, commit_sha, suite, results):
+    """Store results for one commit, replacing any earlier results for the same benchmarks."""
+    conn.execute("INSERT OR IGNORE INTO runs (commit_sha, recorded_at) VALUES (?, ?)",
+                 (commit_sha, time.time()))
+    count = 0
+    for result in results:
+        conn.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (commit_sha, f"{suite}/{result['bench_id']}" if suite else result['bench_id'], suite,
+             result['median_ns'], result['median_lower_ns'], result['median_upper_ns'],
+             json.dumps(result['samples']) if result['samples'] is not None else None))
+        count += 1
+    conn.commit()
+    return count
+
+def load_run(conn, commit_sha):
+    """Return bench_id -> result for one stored commit."""
+    rows = conn.execute(
+        "SELECT bench_id, suite, median_ns, median_lower_ns, median_upper_ns, samples "
+        "FROM results WHERE commit_sha = ?", (commit_sha,))
+    return {
+        bench_id: {
+            'suite': suite,
+            'median_ns': median,
+            'median_lower_ns': lower,
+            'median_upper_ns': upper,
+            'samples': json.loads(samples) if samples else None,
+        }
+        for bench_id, suite, median, lower, upper, samples in rows
+    }
+
+def resolve_commit(conn, prefix):
+    """Expand a (possibly abbreviated) commit sha to one stored in the database."""
+    matches = [row[0] for row in conn.execute(
+        "SELECT commit_sha FROM runs WHERE commit_sha LIKE ? ORDER BY recorded_at", (prefix + '%',))]
+    if len(matches) != 1:
+        print(f"Error: {prefix!r} matches {len(matches)} stored commits")
+        sys.exit(1)
+    return matches[0]
+
+def latest_commits(conn, count, until=None):
+    """Return the most recently recorded commits (up to and including `until`, if given), oldest first."""
+    if until is None:
+        rows = conn.execute("SELECT commit_sha FROM runs ORDER BY recorded_at DESC, rowid DESC LIMIT ?", (count,))
+    else:
+        rows = conn.execute(
+            "SELECT commit_sha FROM runs "
+            "WHERE (recorded_at, rowid) <= (SELECT recorded_at, rowid FROM runs WHERE commit_sha = ?) "
+            "ORDER BY recorded_at DESC, rowid DESC LIMIT ?", (until, count))
+    return [row[0] for row in rows][::-1]
+
+def select_runs(conn, commit=None, baseline=None, history=8):
+    """
+    Return (candidate, baseline, history runs) for a report.
+
+    The candidate defaults to the most recent run, and the baseline to the run recorded just before
+    the candidate; the history ends at the candidate, so checking an older commit never compares it
+    against later runs.
+    """
+    latest = latest_commits(conn, 1)
+    candidate_sha = resolve_commit(conn, commit) if commit else (latest[0] if latest else None)
+    if candidate_sha is None:
+        return None, None, []
+    recent = latest_commits(conn, max(history, 2), until=candidate_sha)
+    if baseline:
+        baseline_sha = resolve_commit(conn, baseline)
+    else:
+        baseline_sha = recent[-2] if len(recent) >= 2 else None
+    return candidate_sha, baseline_sha, recent
+
+def bootstrap_median_ratio(baseline, candidate, resamples, rng, confidence=0.95):
+    """Bootstrap a confidence interval for median(candidate) / median(baseline)."""
+    ratios = []
+    for _ in range(resamples):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        cand = statistics.median(rng.choices(candidate, k=len(candidate)))
+        if base > 0:
+            ratios.append(cand / base)
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    lower = ratios[int(tail * (len(ratios) - 1))]
+    upper = ratios[int((1 - tail) * (len(ratios) - 1))]
+    return lower, upper
+
+def compare_runs(baseline, candidate, threshold, resamples, seed=0):
+    """Compare two runs benchmark by benchmark and classify each change."""
+    rng = random.Random(seed)
+    comparisons = []
+    for bench_id in sorted(baseline.keys() & candidate.keys()):
+        base = baseline[bench_id]
+        cand = candidate[bench_id]
+        ratio = cand['median_ns'] / base['median_ns'] if base['median_ns'] else float('inf')
+
+        if base['samples'] and cand['samples']:
+            lower, upper = bootstrap_median_ratio(base['samples'], cand['samples'], resamples, rng)
+            method = 'bootstrap'
+        else:
+            # Without raw samples, fall back to the intervals the harness reported.
+            lower = (cand['median_lower_ns'] / base['median_upper_ns']) if base['median_upper_ns'] else ratio
+            upper = (cand['median_upper_ns'] / base['median_lower_ns']) if base['median_lower_ns'] else ratio
+            method = 'reported CI'
+
+        # Significant only if the whole interval is beyond the noise threshold.
+        if lower > 1 + threshold:
+            status = 'regression'
+        elif upper < 1 - threshold:
+            status = 'improvement'
+        else:
+            status = 'unchanged'
+
+        comparisons.append({
+            'bench_id': bench_id,
+            'suite': cand['suite'],
+            'baseline_ns': base['median_ns'],
+            'candidate_ns': cand['median_ns'],
+            'ratio': ratio,
+            'ci_lower': lower,
+            'ci_upper': upper,
+            'method': method,
+            'status': status,
+        })
+    return comparisons
+
+def format_ns(ns):
+    """Format a duration in nanoseconds with a readable unit."""
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('µs', 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.1f} ns"
+
+def format_change(comparison):
+    """Format a median ratio and its interval as percentages."""
+    return (f"{(comparison['ratio'] - 1) * 100:+.1f}% "
+            f"[{(comparison['ci_lower'] - 1) * 100:+.1f}%, {(comparison['ci_upper'] - 1) * 100:+.1f}%]")
+
+def generate_markdown_report(baseline_sha, candidate_sha, comparisons, history, threshold):
+    """Generate a markdown report of the comparison between two commits."""
+    report = []
+    report.append("# LibSignal Benchmark Regression Report")
+    report.append("")
+    report.append(f"This report compares benchmark medians at `{candidate_sha[:12]}` against `{baseline_sha[:12]}`.")
+    report.append("")
+
+    regressions = [c for c in comparisons if c['status'] == 'regression']
+    improvements = [c for c in comparisons if c['status'] == 'improvement']
+
+    report.append("## Executive Summary")
+    report.append("")
+    report.append(f"- **{len(comparisons)} benchmarks** present in both runs")
+    report.append(f"- **{len(regressions)} significant regressions** (95% CI of the median ratio above +{threshold * 100:.0f}%)")
+    report.append(f"- **{len(improvements)} significant improvements** (95% CI below -{threshold * 100:.0f}%)")
+    report.append(f"- **{len(comparisons) - len(regressions) - len(improvements)} benchmarks** unchanged within noise")
+    report.append("")
+
+    for title, rows in (("Regressions", sorted(regressions, key=lambda c: c['ratio'], reverse=True)),
+                        ("Improvements", sorted(improvements, key=lambda c: c['ratio']))):
+        report.append(f"## {title}")
+        report.append("")
+        if not rows:
+            report.append("None.")
+            report.append("")
+            continue
+        report.append("| Benchmark | Baseline | Current | Change [95% CI] | Method |")
+        report.append("|-----------|----------|---------|-----------------|--------|")
+        for c in rows:
+            report.append(f"| `{c['bench_id']}` | {format_ns(c['baseline_ns'])} | {format_ns(c['candidate_ns'])} "
+                          f"| {format_change(c)} | {c['method']} |")
+        report.append("")
+
+    # Per-suite overview
+    suites = {}
+    for c in comparisons:
+        suites.setdefault(c['suite'] or '(none)', []).append(c)
+    report.append("## Suite Overview")
+    report.append("")
+    report.append("| Suite | Benchmarks | Regressions | Improvements | Geometric Mean Change |")
+    report.append("|-------|------------|-------------|--------------|-----------------------|")
+    for suite, rows in sorted(suites.items()):
+        geomean = statistics.geometric_mean([c['ratio'] for c in rows if c['ratio'] > 0])
+        report.append(f"| `{suite}` | {len(rows)} "
+                      f"| {sum(c['status'] == 'regression' for c in rows)} "
+                      f"| {sum(c['status'] == 'improvement' for c in rows)} "
+                      f"| {(geomean - 1) * 100:+.1f}% |")
+    report.append("")
+
+    # Recent history for the benchmarks that regressed
+    if regressions and len(history) > 2:
+        report.append("## Recent History of Regressed Benchmarks")
+        report.append("")
+        report.append("| Benchmark | " + " | ".join(f"`{sha[:8]}`" for sha, _ in history) + " |")
+        report.append("|-----------|" + "|".join("-" * 10 for _ in history) + "|")
+        for c in regressions:
+            cells = [format_ns(run[c['bench_id']]['median_ns']) if c['bench_id'] in run else "–"
+                     for _, run in history]
+            report.append(f"| `{c['bench_id']}` | " + " | ".join(cells) + " |")
+        report.append("")
+
+    report.append("## Technical Details")
+    report.append("")
+    report.append("### Analysis Method")
+    report.append("- Criterion results are read from `new/estimates.json`; per-iteration times come from `new/sample.json`")
+    report.append("- When both runs have samples, the median ratio is bootstrapped by resampling each run's iterations")
+    report.append("- Otherwise the reported confidence intervals of the two medians are combined conservatively")
+    report.append("- libtest results (`cargo bench` on nightly) only carry a median and spread, so they use the latter")
+    report.append("")
+    return "\n".join(report)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--store', default=DEFAULT_STORE, help='SQLite time-series store (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help='record results for a commit')
+    ingest.add_argument('--commit', help='commit the results belong to (default: HEAD)')
+    ingest.add_argument('--suite', default='', help='prefix for benchmark ids, e.g. "protocol" or "deps/sha2"')
+    ingest.add_argument('--criterion-dir', action='append', default=[],
+                        help='criterion output directory, e.g. ../target/criterion (repeatable)')
+    ingest.add_argument('--libtest-output', action='append', default=[],
+                        help='saved output of a libtest `cargo bench` run (repeatable)')
+
+    report = subparsers.add_parser('report', help='compare two commits and write a markdown report')
+    report.add_argument('--baseline', help='baseline commit (default: the run recorded just before --commit)')
+    report.add_argument('--commit', help='commit to check (default: most recent run)')
+    report.add_argument('--threshold', type=float, default=0.02,
+                        help='relative change treated as noise (default: %(default)s)')
+    report.add_argument('--resamples', type=int, default=2000,
+                        help='bootstrap resamples per benchmark (default: %(default)s)')
+    report.add_argument('--history', type=int, default=8,
+                        help='runs up to --commit to show in the history table')
+    report.add_argument('--output', default=DEFAULT_REPORT, help='report file (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    conn = open_store(args.store)
+
+    if args.command == 'ingest':
+        if not args.criterion_dir and not args.libtest_output:
+            print("Error: nothing to ingest; pass --criterion-dir and/or --libtest-output")
+            sys.exit(1)
+        commit_sha = args.commit or current_commit()
+        count = 0
+        for criterion_dir in args.criterion_dir:
+            if not Path(criterion_dir).is_dir():
+                print(f"Error: {criterion_dir} not found")
+                sys.exit(1)
+            count += record_results(conn, commit_sha, args.suite, load_criterion_results(criterion_dir))
+        for output_file in args.libtest_output:
+            count += record_results(conn, commit_sha, args.suite, load_libtest_results(output_file))
+        print(f"💾 Recorded {count} benchmark results for {commit_sha[:12]} in {args.store}")
+        return
+
+    candidate_sha, baseline_sha, recent = select_runs(conn, args.commit, args.baseline, args.history)
+    if candidate_sha is None or baseline_sha is None:
+        print(f"Error: need at least two recorded runs in {args.store}, the baseline recorded before the candidate")
+        sys.exit(1)
+
+    print(f"Comparing {candidate_sha[:12]} against {baseline_sha[:12]}...")
+    comparisons = compare_runs(load_run(conn, baseline_sha), load_run(conn, candidate_sha),
+                               args.threshold, args.resamples)
+    history = [(sha, load_run(conn, sha)) for sha in recent]
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(baseline_sha, candidate_sha, comparisons, history, args.threshold))
+
+    regressions = [c for c in comparisons if c['status'] == 'regression']
+    print(f"📉 {len(regressions)} significant regressions out of {len(comparisons)} benchmarks")
+    for c in sorted(regressions, key=lambda c: c['ratio'], reverse=True)[:10]:
+        print(f"  {c['bench_id']:<60} {format_change(c)}")
+    print(f"📄 Report saved to: {args.output}")
+    if regressions:
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
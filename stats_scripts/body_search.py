@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Trigram-indexed search over the bodies and names of libsignal functions.
+
+Builds (and caches next to the corpus) an inverted index from case-folded trigrams to functions,
+so that substring and regex queries only verify the functions that contain every trigram of the
+query's required literals. Results can be restricted with call-graph filters, e.g.
+
+    python3 body_search.py --regex 'to_vec\\(\\)' --reachable-from rust/protocol
+
+The same functionality is available as a library:
+
+    index = TrigramIndex.load_or_build('libsignal_with_deps.json')
+    scope = index.reachable_from(['rust/protocol'])
+    hits = index.search(r'to_vec\\(\\)', regex=True, within=scope)
+"""
+
+import argparse
+import os
+import pickle
+import re
+import sys
+from array import array
+from collections import defaultdict, deque
+from pathlib import Path
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from analyze_deps import load_data
+
+INDEX_VERSION = 1
+FIELDS = ('body', 'display_name')
+
+def trigrams(text):
+    """The set of case-folded trigrams of a string."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def required_literals(parsed):
+    """
+    Return literal strings that every match of a parsed regex must contain.
+
+    This is deliberately conservative: alternations, optional parts and character classes end
+    the current literal run instead of being expanded.
+    """
+    runs = []
+    current = []
+
+    def flush():
+        if current:
+            runs.append(''.join(current))
+            current.clear()
+
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            current.append(chr(av))
+        elif op is sre_parse.AT:
+            continue
+        elif op is sre_parse.SUBPATTERN:
+            flush()
+            runs.extend(required_literals(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            flush()
+            runs.extend(required_literals(av[2]))
+        else:
+            flush()
+    flush()
+    return runs
+
+class TrigramIndex:
+    """An inverted trigram index over corpus functions, plus their call graph."""
+
+    def __init__(self, identifiers, paths, names, bodies, callees, postings, signature=None):
+        self.identifiers = identifiers
+        self.paths = paths
+        self.names = names
+        self.bodies = bodies
+        self.callees = callees
+        self.postings = postings
+        self.signature = signature
+        self._callers = None
+
+    @classmethod
+    def build(cls, data, signature=None):
+        """Index a loaded corpus."""
+        identifiers = [item.get('identifier', '') for item in data]
+        position = {identifier: i for i, identifier in enumerate(identifiers)}
+        paths = [item.get('relative_path', '') for item in data]
+        names = [item.get('display_name', '') for item in data]
+        bodies = [item.get('body', '') for item in data]
+        callees = [array('I', sorted({position[dep] for dep in item.get('deps', []) if dep in position}))
+                   for item in data]
+
+        postings = {}
+        for field, texts in (('body', bodies), ('display_name', names)):
+            field_postings = defaultdict(lambda: array('I'))
+            for doc, text in enumerate(texts):
+                for trigram in trigrams(text):
+                    field_postings[trigram].append(doc)
+            postings[field] = dict(field_postings)
+        return cls(identifiers, paths, names, bodies, callees, postings, signature)
+
+    @staticmethod
+    def corpus_signature(corpus_file):
+        stat = os.stat(corpus_file)
+        return (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load_or_build(cls, corpus_file, index_file=None, rebuild=False):
+        """Load the cached index for a corpus file, (re)building it if it is missing or stale."""
+        index_file = index_file or str(Path(corpus_file).with_suffix('.trigrams.pickle'))
+        signature = cls.corpus_signature(corpus_file)
+        if not rebuild and Path(index_file).exists():
+            with open(index_file, 'rb') as f:
+                state = pickle.load(f)
+            if state.get('signature') == signature:
+                return cls(**state)
+
+        print(f"Indexing {corpus_file}...", file=sys.stderr)
+        index = cls.build(load_data(corpus_file), signature)
+        index.save(index_file)
+        return index
+
+    def save(self, index_file):
+        # Plain containers only, so the file loads the same whether this runs as a script or not.
+        state = {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
+        with open(index_file, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def candidates(self, literals, field='body'):
+        """Documents containing every trigram of every literal, or None if nothing narrows it."""
+        wanted = set()
+        for literal in literals:
+            wanted |= trigrams(literal)
+        if not wanted:
+            return None
+        field_postings = self.postings[field]
+        lists = sorted((field_postings.get(trigram, ()) for trigram in wanted), key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            if not result:
+                break
+            result.intersection_update(posting)
+        return result
+
+    def search(self, pattern, regex=False, field='body', ignore_case=False, within=None):
+        """
+        Return the document numbers whose `field` matches `pattern`, in corpus order.
+
+        `within`, if given, is a set of document numbers (e.g. from reachable_from) to restrict
+        the search to; it is intersected with the trigram candidates before any text is checked.
+        """
+        texts = self.bodies if field == 'body' else self.names
+        flags = re.IGNORECASE if ignore_case else 0
+        if regex:
+            compiled = re.compile(pattern, flags)
+            literals = required_literals(sre_parse.parse(pattern, flags))
+            matches = compiled.search
+        elif ignore_case:
+            literals = [pattern]
+            needle = pattern.lower()
+            matches = lambda text: needle in text.lower()
+        else:
+            literals = [pattern]
+            matches = lambda text: pattern in text
+
+        docs = self.candidates(literals, field)
+        if within is not None:
+            docs = set(within) if docs is None else docs & set(within)
+        if docs is None:
+            docs = range(len(texts))
+        return [doc for doc in sorted(docs) if matches(texts[doc])]
+
+    def docs_under(self, prefixes):
+        prefixes = tuple(prefixes)
+        return {doc for doc, path in enumerate(self.paths) if path.startswith(prefixes)}
+
+    def callers(self):
+        if self._callers is None:
+            callers = [array('I') for _ in self.identifiers]
+            for doc, callees in enumerate(self.callees):
+                for callee in callees:
+                    callers[callee].append(doc)
+            self._callers = callers
+        return self._callers
+
+    def _closure(self, start, edges):
+        seen = set(start)
+        queue = deque(start)
+        while queue:
+            for nxt in edges[queue.popleft()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    queue.append(nxt)
+        return seen
+
+    def reachable_from(self, prefixes):
+        """Documents reachable through calls from any function under the path prefixes."""
+        return self._closure(self.docs_under(prefixes), self.callees)
+
+    def reaching(self, prefixes):
+        """Documents that can (transitively) call any function under the path prefixes."""
+        return self._closure(self.docs_under(prefixes), self.callers())
+
+def first_matching_line(text, pattern, regex, ignore_case):
+    """The first line of a body that matches, for display."""
+    flags = re.IGNORECASE if ignore_case else 0
+    for line in text.splitlines():
+        if (re.search(pattern, line, flags) if regex else
+                (pattern.lower() in line.lower() if ignore_case else pattern in line)):
+            return line.strip()
+    return ''
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('pattern', help='substring (or regex with --regex) to look for')
+    parser.add_argument('--regex', action='store_true', help='treat the pattern as a Python regex')
+    parser.add_argument('-i', '--ignore-case', action='store_true', help='case-insensitive matching')
+    parser.add_argument('--field', choices=FIELDS, default='body', help='field to search (default: %(default)s)')
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--index', help='index file (default: next to the corpus)')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the index even if it looks current')
+    parser.add_argument('--path', action='append', default=[], help='only report functions under this path prefix')
+    parser.add_argument('--reachable-from', action='append', default=[], metavar='PREFIX',
+                        help='only functions reachable by calls from functions under PREFIX')
+    parser.add_argument('--reaching', action='append', default=[], metavar='PREFIX',
+                        help='only functions that transitively call into functions under PREFIX')
+    parser.add_argument('--count', action='store_true', help='only print the number of matches')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    index = TrigramIndex.load_or_build(args.corpus, args.index, args.rebuild)
+
+    within = None
+    for docs in ([index.docs_under(args.path)] if args.path else []) + \
+                ([index.reachable_from(args.reachable_from)] if args.reachable_from else []) + \
+                ([index.reaching(args.reaching)] if args.reaching else []):
+        within = docs if within is None else within & docs
+
+    try:
+        hits = index.search(args.pattern, args.regex, args.field, args.ignore_case, within)
+    except re.error as e:
+        print(f"Error: invalid regex: {e}")
+        sys.exit(1)
+
+    if args.count:
+        print(len(hits))
+        return
+    for doc in hits:
+        line = ''
+        if args.field == 'body':
+            line = first_matching_line(index.bodies[doc], args.pattern, args.regex, args.ignore_case)
+        print(f"{index.paths[doc]}\t{index.names[doc]}\t{line}")
+    print(f"\n🔎 {len(hits)} matching functions", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Merge bridge call-metrics snapshots and report per-function call counts and latencies.
+
+Snapshots come from `BridgeMetrics_Snapshot` in a libsignal built with the `bridge-metrics`
+feature (see rust/bridge/shared/types/src/metrics.rs for the format). Any number of snapshots, from
+any of the three bridges and any number of processes, are summed per entry point. Entry points are
+then joined across bridges (`signal_foo_bar` over FFI, `Foo_1Bar` over JNI and `Foo_Bar` over Node
+are the same Rust function) and with the generated `Native.d.ts` / `Native.java` declarations, so
+the report can show each function's signature and list the declared functions that were never
+called.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from bench_regressions import format_ns
+
+SNAPSHOT_HEADER = '# libsignal-bridge-metrics v1'
+BUCKET_COUNT = 40
+
+TS_DECLARATION = re.compile(r'^export function (\w+)\((.*)\): (.*);$')
+JAVA_DECLARATION = re.compile(r'^\s*public static native (.+?) (\w+)\((.*)\)(?: throws \w+)?;$')
+
+def parse_snapshot(text, source):
+    """(bridge, name) -> [calls, total nanos, buckets] for one snapshot."""
+    lines = text.splitlines()
+    if not lines or not lines[0].strip():
+        print(f"Warning: {source} is empty (was libsignal built without bridge-metrics?)")
+        return {}
+    if lines[0].strip() != SNAPSHOT_HEADER:
+        raise ValueError(f"{source}: unsupported snapshot header {lines[0]!r}")
+    entries = {}
+    for number, line in enumerate(lines[1:], start=2):
+        if not line.strip():
+            continue
+        fields = line.split(' ')
+        if len(fields) != 5:
+            raise ValueError(f"{source}:{number}: expected 5 fields, got {len(fields)}")
+        bridge, name, calls, total_nanos, histogram = fields
+        buckets = [0] * BUCKET_COUNT
+        for entry in filter(None, histogram.split(',')):
+            index, count = entry.split(':')
+            buckets[int(index)] += int(count)
+        entries[(bridge, name)] = [int(calls), int(total_nanos), buckets]
+    return entries
+
+def merge_snapshots(snapshots):
+    """Sum any number of parsed snapshots."""
+    merged = defaultdict(lambda: [0, 0, [0] * BUCKET_COUNT])
+    for snapshot in snapshots:
+        for key, (calls, total_nanos, buckets) in snapshot.items():
+            entry = merged[key]
+            entry[0] += calls
+            entry[1] += total_nanos
+            entry[2] = [a + b for a, b in zip(entry[2], buckets)]
+    return dict(merged)
+
+def function_key(bridge, name):
+    """
+    The Rust function an entry point belongs to, normalized so the three bridges agree, plus
+    whether it's a JNI direct-buffer variant.
+    """
+    direct = False
+    if bridge == 'jni':
+        name = name.replace('_1', '_')
+        if name.endswith('_Direct'):
+            name, direct = name[:-len('_Direct')], True
+    return name.replace('_', '').lower(), direct
+
+def percentile(buckets, fraction):
+    """Upper bound in nanoseconds of the bucket holding the given fraction of calls."""
+    total = sum(buckets)
+    if not total:
+        return 0
+    seen = 0
+    for index, count in enumerate(buckets):
+        seen += count
+        if seen >= fraction * total:
+            return 2 ** (index + 1)
+    return 2 ** BUCKET_COUNT
+
+def load_declarations(ts_file, java_file):
+    """Normalized function name -> (display name, {bridge: signature}) from the generated decls."""
+    declarations = {}
+    if ts_file:
+        for line in Path(ts_file).read_text().splitlines():
+            if (match := TS_DECLARATION.match(line.strip())):
+                name, args, result = match.groups()
+                key, _ = function_key('node', name)
+                declarations.setdefault(key, (name, {}))[1]['node'] = f"({args}): {result}"
+    if java_file:
+        for line in Path(java_file).read_text().splitlines():
+            if (match := JAVA_DECLARATION.match(line)):
+                result, name, args = match.groups()
+                if not name.endswith('_Direct'):
+                    key, _ = function_key('node', name)
+                    declarations.setdefault(key, (name, {}))[1]['jni'] = f"{result} ({args})"
+    return declarations
+
+def summarize(merged, declarations):
+    """One row per Rust function with its per-bridge and combined statistics."""
+    functions = {}
+    for (bridge, name), (calls, total_nanos, buckets) in merged.items():
+        key, direct = function_key(bridge, name)
+        if key in declarations:
+            name = declarations[key][0]
+        elif bridge == 'jni':
+            name = name.replace('_1', '_')
+        row = functions.setdefault(key, {
+            'function': name,
+            'calls': 0,
+            'total_ns': 0,
+            'buckets': [0] * BUCKET_COUNT,
+            'bridges': {},
+            'declared': key in declarations,
+        })
+        if direct:
+            bridge = 'jni-direct'
+        row['calls'] += calls
+        row['total_ns'] += total_nanos
+        row['buckets'] = [a + b for a, b in zip(row['buckets'], buckets)]
+        row['bridges'][bridge] = {'calls': calls, 'total_ns': total_nanos,
+                                  'p50_ns': percentile(buckets, 0.5), 'p99_ns': percentile(buckets, 0.99)}
+    for row in functions.values():
+        row['mean_ns'] = row['total_ns'] / row['calls'] if row['calls'] else 0
+        row['p50_ns'] = percentile(row['buckets'], 0.5)
+        row['p99_ns'] = percentile(row['buckets'], 0.99)
+    never_called = sorted(name for key, (name, _) in declarations.items() if key not in functions)
+    return sorted(functions.values(), key=lambda row: row['total_ns'], reverse=True), never_called
+
+def generate_markdown_report(rows, never_called, declarations, snapshot_files, top):
+    """Generate a markdown report of bridge call counts and latencies."""
+    md_content = []
+    md_content.append("# LibSignal Bridge Call Metrics")
+    md_content.append("")
+    md_content.append(f"Merged from {len(snapshot_files)} snapshot(s): {', '.join(f'`{f}`' for f in snapshot_files)}.")
+    md_content.append("")
+
+    total_calls = sum(row['calls'] for row in rows)
+    total_ns = sum(row['total_ns'] for row in rows)
+    md_content.append("## 📊 Summary")
+    md_content.append("")
+    md_content.append(f"- **Functions called:** {len(rows)}")
+    md_content.append(f"- **Total calls:** {total_calls:,}")
+    md_content.append(f"- **Total time in bridged functions:** {format_ns(total_ns)}")
+    if declarations:
+        md_content.append(f"- **Declared functions never called:** {len(never_called)} of {len(declarations)}")
+    md_content.append("")
+
+    per_bridge = defaultdict(lambda: [0, 0])
+    for row in rows:
+        for bridge, stats in row['bridges'].items():
+            per_bridge[bridge][0] += stats['calls']
+            per_bridge[bridge][1] += stats['total_ns']
+    md_content.append("| Bridge | Calls | Total Time |")
+    md_content.append("|--------|-------|------------|")
+    for bridge, (calls, nanos) in sorted(per_bridge.items()):
+        md_content.append(f"| {bridge} | {calls:,} | {format_ns(nanos)} |")
+    md_content.append("")
+
+    md_content.append("## ⏱️ Functions by Total Time")
+    md_content.append("")
+    md_content.append("| Function | Calls | Total | Mean | p50 ≤ | p99 ≤ | Share | Bridges |")
+    md_content.append("|----------|-------|-------|------|-------|-------|-------|---------|")
+    for row in rows[:top]:
+        share = row['total_ns'] / total_ns * 100 if total_ns else 0
+        bridges = ', '.join(f"{bridge} {stats['calls']:,}" for bridge, stats in sorted(row['bridges'].items()))
+        md_content.append(f"| `{row['function']}` | {row['calls']:,} | {format_ns(row['total_ns'])} "
+                          f"| {format_ns(row['mean_ns'])} | {format_ns(row['p50_ns'])} | {format_ns(row['p99_ns'])} "
+                          f"| {share:.1f}% | {bridges} |")
+    md_content.append("")
+
+    md_content.append("## 🔁 Most Frequently Called")
+    md_content.append("")
+    md_content.append("Cheap functions called this often are candidates for batching on the app side.")
+    md_content.append("")
+    md_content.append("| Function | Calls | Mean | Signature |")
+    md_content.append("|----------|-------|------|-----------|")
+    for row in sorted(rows, key=lambda row: row['calls'], reverse=True)[:top]:
+        key = function_key('node', row['function'])[0]
+        signatures = declarations.get(key, (None, {}))[1]
+        signature = signatures.get('node') or signatures.get('jni') or ''
+        md_content.append(f"| `{row['function']}` | {row['calls']:,} | {format_ns(row['mean_ns'])} "
+                          f"| `{signature.replace('|', chr(92) + '|')}` |")
+    md_content.append("")
+
+    undeclared = [row['function'] for row in rows if not row['declared']]
+    if declarations and undeclared:
+        md_content.append("## ❓ Called but Not Declared")
+        md_content.append("")
+        md_content.append("These may be FFI-only functions, or the declarations may be out of date.")
+        md_content.append("")
+        for name in undeclared[:top]:
+            md_content.append(f"- `{name}`")
+        md_content.append("")
+
+    if never_called:
+        md_content.append("## 💤 Declared but Never Called")
+        md_content.append("")
+        md_content.append(", ".join(f"`{name}`" for name in never_called))
+        md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Latencies are measured inside the native entry point, so marshalling done by the generated Java/TypeScript wrappers is not included")
+    md_content.append("- Async functions are timed until their future completes, including time spent waiting")
+    md_content.append("- Percentiles are the upper bounds of power-of-two nanosecond buckets")
+    md_content.append("- JNI `_Direct` entry points are counted under their function as `jni-direct`")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('snapshots', nargs='+', help='files written from BridgeMetrics_Snapshot output')
+    parser.add_argument('--node-decls', help='generated Native.d.ts to join against')
+    parser.add_argument('--java-decls', help='generated Native.java to join against')
+    parser.add_argument('--top', type=int, default=50, help='rows per table (default: %(default)s)')
+    parser.add_argument('--json', help='also write the merged per-function statistics as JSON')
+    parser.add_argument('--output', default='BRIDGE_METRICS_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    for path in [*args.snapshots, args.node_decls, args.java_decls]:
+        if path and not Path(path).exists():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    try:
+        merged = merge_snapshots(parse_snapshot(Path(path).read_text(), path) for path in args.snapshots)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    declarations = load_declarations(args.node_decls, args.java_decls)
+    rows, never_called = summarize(merged, declarations)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(rows, never_called, declarations, args.snapshots, args.top))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'functions': rows, 'never_called': never_called}, f, indent=2)
+
+    print(f"⏱️ {sum(row['calls'] for row in rows):,} calls to {len(rows)} functions")
+    for row in rows[:10]:
+        print(f"  {row['function']:<50} {row['calls']:>10,} calls  {format_ns(row['total_ns']):>12}")
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Suggest crate splits that shrink incremental rebuilds of libsignal's workspace crates.
+
+Rust rebuilds a whole crate (and every crate depending on it) when one of its files changes.
+This script combines the corpus call graph with the crates' Cargo.toml dependencies and the
+size of each file's function bodies, partitions the files of a crate with a multilevel min-cut
+bisection, and estimates how much code a typical edit would invalidate before and after the
+split. Edits are weighted by how often each file changed in recent git history (or by size, if
+no history is available).
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import tomllib
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import load_data
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CRATES = ['rust/protocol', 'rust/net', 'rust/bridge/shared']
+
+def load_workspace_crates(repo_root):
+    """Map each crate under rust/ to its directory, workspace membership and crate dependencies."""
+    with open(repo_root / 'Cargo.toml', 'rb') as f:
+        members = set(tomllib.load(f).get('workspace', {}).get('members', []))
+
+    crates = {}
+    for cargo_toml in sorted((repo_root / 'rust').glob('**/Cargo.toml')):
+        if 'target' in cargo_toml.parts:
+            continue
+        with open(cargo_toml, 'rb') as f:
+            manifest = tomllib.load(f)
+        name = manifest.get('package', {}).get('name')
+        if not name:
+            continue
+        tables = [manifest.get('dependencies', {}), manifest.get('build-dependencies', {})]
+        tables += [target.get('dependencies', {}) for target in manifest.get('target', {}).values()]
+        dependencies = set()
+        for table in tables:
+            for key, spec in table.items():
+                dependencies.add(spec.get('package', key) if isinstance(spec, dict) else key)
+        crate_dir = str(cargo_toml.parent.relative_to(repo_root))
+        crates[name] = {'dir': crate_dir, 'member': crate_dir in members, 'dependencies': dependencies}
+
+    for info in crates.values():
+        info['dependencies'] &= crates.keys()
+    return crates
+
+def crate_for_path(relative_path, crate_dirs):
+    """The crate owning a path: the one with the longest directory prefix."""
+    for crate_dir, name in crate_dirs:
+        if relative_path.startswith(crate_dir + '/'):
+            return name
+    return None
+
+def workspace_build(crates):
+    """The crates a workspace build compiles: the members and everything they depend on."""
+    built = {name for name, info in crates.items() if info['member']}
+    stack = list(built)
+    while stack:
+        for dependency in crates[stack.pop()]['dependencies']:
+            if dependency not in built:
+                built.add(dependency)
+                stack.append(dependency)
+    return built
+
+def transitive_dependents(crates):
+    """
+    Map each crate to every crate that (transitively) depends on it.
+
+    Only crates compiled by a workspace build count as dependents: an edit doesn't rebuild a
+    fuzz target or tool outside the workspace until someone builds it explicitly.
+    """
+    built = workspace_build(crates)
+    direct = defaultdict(set)
+    for name, info in crates.items():
+        if name not in built:
+            continue
+        for dependency in info['dependencies']:
+            direct[dependency].add(name)
+    closure = {}
+    for name in crates:
+        seen = set()
+        stack = [name]
+        while stack:
+            for dependent in direct[stack.pop()]:
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        closure[name] = seen
+    return direct, closure
+
+def edit_frequencies(repo_root, commits):
+    """How many of the last `commits` commits touched each file."""
+    if not commits:
+        return Counter()
+    try:
+        log = subprocess.run(['git', 'log', f'-n{commits}', '--name-only', '--format='],
+                             cwd=repo_root, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return Counter()
+    return Counter(line for line in log.splitlines() if line.endswith('.rs'))
+
+# --- Multilevel bisection -------------------------------------------------------------------
+
+def cut_weight(graph, side):
+    return sum(w for u, nbrs in graph.items() for v, w in nbrs.items() if side[u] != side[v]) / 2
+
+def coarsen(graph, weights, rng):
+    """Collapse a heavy-edge matching; returns the coarse graph, weights and fine→coarse map."""
+    matched = {}
+    nodes = list(graph)
+    rng.shuffle(nodes)
+    for u in nodes:
+        if u in matched:
+            continue
+        candidates = [(w, v) for v, w in graph[u].items() if v not in matched and v != u]
+        if candidates:
+            _, v = max(candidates)
+            matched[u] = matched[v] = u
+        else:
+            matched[u] = u
+
+    coarse_graph = defaultdict(lambda: defaultdict(float))
+    coarse_weights = defaultdict(float)
+    for u, weight in weights.items():
+        coarse_weights[matched[u]] += weight
+        coarse_graph[matched[u]]
+    for u, nbrs in graph.items():
+        for v, w in nbrs.items():
+            if matched[u] != matched[v]:
+                coarse_graph[matched[u]][matched[v]] += w
+    return {u: dict(n) for u, n in coarse_graph.items()}, dict(coarse_weights), matched
+
+def grow_bisection(graph, weights, rng, tries=8):
+    """Initial bisection by greedy graph growing from several seeds; keeps the smallest cut."""
+    total = sum(weights.values())
+    best = None
+    nodes = list(graph)
+    for _ in range(tries):
+        side = dict.fromkeys(nodes, 1)
+        seed = rng.choice(nodes)
+        side[seed] = 0
+        grown = weights[seed]
+        while grown < total / 2:
+            frontier = {v for u in nodes if side[u] == 0 for v in graph[u] if side[v] == 1}
+            pool = frontier or {u for u in nodes if side[u] == 1}
+            if not pool:
+                break
+            # Prefer the node most strongly connected to the growing side.
+            nxt = max(pool, key=lambda v: sum(w for u, w in graph[v].items() if side[u] == 0))
+            side[nxt] = 0
+            grown += weights[nxt]
+        cut = cut_weight(graph, side)
+        if best is None or cut < best[0]:
+            best = (cut, side)
+    return best[1]
+
+def refine(graph, weights, side, imbalance):
+    """Greedy boundary refinement: move nodes that reduce the cut while staying balanced."""
+    total = sum(weights.values())
+    limit = total / 2 * (1 + imbalance)
+    part_weight = [sum(w for u, w in weights.items() if side[u] == p) for p in (0, 1)]
+    improved = True
+    while improved:
+        improved = False
+        for u in graph:
+            here = side[u]
+            external = sum(w for v, w in graph[u].items() if side[v] != here)
+            internal = sum(w for v, w in graph[u].items() if side[v] == here and v != u)
+            if external > internal and part_weight[1 - here] + weights[u] <= limit:
+                side[u] = 1 - here
+                part_weight[here] -= weights[u]
+                part_weight[1 - here] += weights[u]
+                improved = True
+    return side
+
+def bisect(graph, weights, rng, imbalance=0.2):
+    """Multilevel bisection: coarsen, split the coarsest graph, then project back and refine."""
+    levels = []
+    while len(graph) > 16:
+        coarse_graph, coarse_weights, matched = coarsen(graph, weights, rng)
+        if len(coarse_graph) > 0.9 * len(graph):
+            break
+        levels.append((graph, weights, matched))
+        graph, weights = coarse_graph, coarse_weights
+
+    side = refine(graph, weights, grow_bisection(graph, weights, rng), imbalance)
+    for fine_graph, fine_weights, matched in reversed(levels):
+        side = {u: side[matched[u]] for u in fine_graph}
+        side = refine(fine_graph, fine_weights, side, imbalance)
+    return side
+
+def orient_halves(halves, callers, weights):
+    """
+    Turn an undirected bisection into an acyclic one: crates can't depend on each other cyclically.
+
+    Whichever half is chosen as the upper (calling) one also takes every file that transitively
+    calls into it, so the lower half never calls back up. Both orientations are tried and the
+    more balanced result is kept; returns None if neither leaves two non-empty halves.
+    """
+    best = None
+    group = halves[0] | halves[1]
+    for upper in halves:
+        closed = set(upper)
+        stack = list(upper)
+        while stack:
+            for caller in callers[stack.pop()]:
+                if caller in group and caller not in closed:
+                    closed.add(caller)
+                    stack.append(caller)
+        lower = group - closed
+        if not closed or not lower:
+            continue
+        balance = min(sum(weights[u] for u in closed), sum(weights[u] for u in lower))
+        if best is None or balance > best[0]:
+            best = (balance, [closed, lower])
+    return best and best[1]
+
+def partition(graph, weights, directed_edges, parts, seed):
+    """Split into up to `parts` acyclic groups by repeatedly bisecting the heaviest group."""
+    rng = random.Random(seed)
+    callers = defaultdict(set)
+    for (u, v) in directed_edges:
+        callers[v].add(u)
+
+    groups = [set(graph)]
+    unsplittable = []
+    while groups and len(groups) + len(unsplittable) < parts:
+        groups.sort(key=lambda g: sum(weights[u] for u in g), reverse=True)
+        heaviest = groups.pop(0)
+        halves = None
+        if len(heaviest) >= 2:
+            subgraph = {u: {v: w for v, w in graph[u].items() if v in heaviest} for u in heaviest}
+            side = bisect(subgraph, {u: weights[u] for u in heaviest}, rng)
+            halves = orient_halves([{u for u in heaviest if side[u] == p} for p in (0, 1)], callers, weights)
+        if halves:
+            groups.extend(halves)
+        else:
+            unsplittable.append(heaviest)
+    return groups + unsplittable
+
+# --- Rebuild footprint model ----------------------------------------------------------------
+
+def evaluate_split(groups, file_sizes, file_edits, file_edges, external_users, external_cost):
+    """
+    Expected bytes rebuilt per edit of a crate split into `groups`.
+
+    `external_users` maps each crate depending directly on this one to the set of files it calls
+    (None when it uses the crate without any recorded calls, e.g. for types only, which is
+    treated as depending on every group). `external_cost` gives the bytes rebuilt when a given
+    dependent crate is invalidated (the crate plus its own dependents).
+    """
+    group_of = {u: i for i, g in enumerate(groups) for u in g}
+    calls = defaultdict(set)
+    for (u, v) in file_edges:
+        if group_of[u] != group_of[v]:
+            calls[group_of[u]].add(group_of[v])
+
+    def used_groups(start_groups):
+        seen = set(start_groups)
+        stack = list(start_groups)
+        while stack:
+            for nxt in calls[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    group_size = [sum(file_sizes[u] for u in g) for g in groups]
+    uses = {i: used_groups({i}) for i in range(len(groups))}
+    external_uses = {
+        crate: (set(range(len(groups))) if files is None else used_groups({group_of[f] for f in files if f in group_of}))
+        for crate, files in external_users.items()
+    }
+
+    total_edits = sum(file_edits.get(u, 0) for u in group_of) or 1
+    expected = 0.0
+    for i, group in enumerate(groups):
+        internal = sum(group_size[j] for j in range(len(groups)) if i in uses[j])
+        rebuilt_crates = {crate for crate, used in external_uses.items() if i in used}
+        footprint = internal + external_cost(rebuilt_crates)
+        expected += sum(file_edits.get(u, 0) for u in group) / total_edits * footprint
+    return expected
+
+def analyze_crate(crate_name, crates, data, crate_dirs, dependents, file_edit_counts, max_parts, seed):
+    """Build the file graph of one crate and try splitting it into 2..max_parts groups."""
+    crate_dir = crates[crate_name]['dir']
+    function_file = {}
+    function_crate = {}
+    file_sizes = Counter()
+    for item in data:
+        relative_path = item.get('relative_path', '')
+        owner = crate_for_path(relative_path, crate_dirs)
+        function_file[item.get('identifier', '')] = relative_path
+        function_crate[item.get('identifier', '')] = owner
+        if owner == crate_name:
+            file_sizes[relative_path] += len(item.get('body', ''))
+
+    crate_sizes = Counter()
+    for item in data:
+        owner = function_crate.get(item.get('identifier', ''))
+        if owner:
+            crate_sizes[owner] += len(item.get('body', ''))
+
+    graph = {f: defaultdict(float) for f in file_sizes}
+    file_edges = Counter()
+    external_calls = defaultdict(set)
+    for item in data:
+        src_file = item.get('relative_path', '')
+        src_crate = function_crate.get(item.get('identifier', ''))
+        for dep in item.get('deps', []):
+            dst_file = function_file.get(dep)
+            if function_crate.get(dep) != crate_name or dst_file is None:
+                continue
+            if src_crate == crate_name and src_file != dst_file:
+                graph[src_file][dst_file] += 1
+                graph[dst_file][src_file] += 1
+                file_edges[(src_file, dst_file)] += 1
+            elif src_crate and src_crate != crate_name:
+                external_calls[src_crate].add(dst_file)
+    graph = {u: dict(nbrs) for u, nbrs in graph.items()}
+
+    direct, closure = dependents
+    external_users = {crate: (external_calls.get(crate) or None) for crate in direct[crate_name]}
+
+    def external_cost(rebuilt):
+        everything = set(rebuilt)
+        for crate in rebuilt:
+            everything |= closure[crate]
+        return sum(crate_sizes[crate] for crate in everything)
+
+    # Files that never changed still get a small weight, so they aren't free to move around.
+    file_edits = {f: file_edit_counts.get(f, 0) + 0.1 * file_sizes[f] / max(file_sizes.values(), default=1)
+                  for f in file_sizes} if file_edit_counts else dict(file_sizes)
+
+    baseline = evaluate_split([set(file_sizes)], file_sizes, file_edits, file_edges, external_users, external_cost)
+    options = []
+    for parts in range(2, max_parts + 1):
+        if len(file_sizes) < parts:
+            break
+        groups = partition(graph, file_sizes, file_edges, parts, seed)
+        if len(groups) < 2:
+            options.append({'requested': parts, 'groups': groups, 'expected': baseline, 'cut': []})
+            continue
+        group_of = {u: i for i, g in enumerate(groups) for u in g}
+        cut = sorted(((count, u, v) for (u, v), count in file_edges.items() if group_of[u] != group_of[v]),
+                     reverse=True)
+        options.append({
+            'requested': parts,
+            'groups': groups,
+            'expected': evaluate_split(groups, file_sizes, file_edits, file_edges, external_users, external_cost),
+            'cut': cut,
+        })
+
+    return {
+        'crate': crate_name,
+        'dir': crate_dir,
+        'files': len(file_sizes),
+        'size': sum(file_sizes.values()),
+        'file_sizes': file_sizes,
+        'dependents': sorted(closure[crate_name]),
+        'untyped_dependents': sorted(c for c, files in external_users.items() if files is None),
+        'baseline': baseline,
+        'options': options,
+    }
+
+def describe_group(group, file_sizes, crate_dir):
+    """Name a group of files by the directories holding most of its code."""
+    dirs = Counter()
+    for f in group:
+        dirs[str(Path(f).parent.relative_to(crate_dir))] += file_sizes[f]
+    return ', '.join(f"`{d}/`" for d, _ in dirs.most_common(3))
+
+def generate_markdown_report(results, edit_source):
+    """Generate a markdown report of suggested splits."""
+    md_content = []
+    md_content.append("# LibSignal Compile-Time Advisor")
+    md_content.append("")
+    md_content.append("Estimated code invalidated by a typical edit (body bytes of the edited crate, or split part, "
+                      f"plus everything depending on it), with edits weighted by {edit_source}.")
+    md_content.append("")
+
+    md_content.append("## 📊 Current Rebuild Footprint")
+    md_content.append("")
+    md_content.append("| Crate | Directory | Files | Body Size | Dependents | Expected Rebuild per Edit |")
+    md_content.append("|-------|-----------|-------|-----------|------------|---------------------------|")
+    for r in results:
+        md_content.append(f"| `{r['crate']}` | `{r['dir']}/` | {r['files']} | {r['size'] / 1024:,.0f} KiB "
+                          f"| {len(r['dependents'])} | {r['baseline'] / 1024:,.0f} KiB |")
+    md_content.append("")
+
+    for r in results:
+        md_content.append(f"## ✂️ `{r['crate']}` ({r['dir']})")
+        md_content.append("")
+        if r['untyped_dependents']:
+            md_content.append("Dependents with no recorded calls into this crate (assumed to use all of it): "
+                              + ', '.join(f"`{c}`" for c in r['untyped_dependents']))
+            md_content.append("")
+        if not r['options']:
+            md_content.append("Too few files to split.")
+            md_content.append("")
+            continue
+        md_content.append("| Requested Parts | Acyclic Parts | Cut Calls | Expected Rebuild | Reduction |")
+        md_content.append("|-----------------|---------------|-----------|------------------|-----------|")
+        for option in r['options']:
+            reduction = (1 - option['expected'] / r['baseline']) * 100 if r['baseline'] else 0
+            md_content.append(f"| {option['requested']} | {len(option['groups'])} "
+                              f"| {sum(c for c, _, _ in option['cut'])} | {option['expected'] / 1024:,.0f} KiB "
+                              f"| {reduction:.1f}% |")
+        md_content.append("")
+
+        best = min(r['options'], key=lambda o: o['expected'])
+        if len(best['groups']) < 2 or best['expected'] >= r['baseline']:
+            md_content.append("No split reduces the expected rebuild footprint.")
+            md_content.append("")
+            continue
+        md_content.append(f"**Suggested split ({len(best['groups'])} parts):**")
+        md_content.append("")
+        md_content.append("| Part | Files | Body Size | Mostly From |")
+        md_content.append("|------|-------|-----------|-------------|")
+        for i, group in enumerate(sorted(best['groups'], key=lambda g: -sum(r['file_sizes'][f] for f in g)), 1):
+            size = sum(r['file_sizes'][f] for f in group)
+            md_content.append(f"| {i} | {len(group)} | {size / 1024:,.0f} KiB "
+                              f"| {describe_group(group, r['file_sizes'], r['dir'])} |")
+        md_content.append("")
+        if best['cut']:
+            md_content.append("Heaviest calls crossing the split (candidates for moving or inverting):")
+            md_content.append("")
+            md_content.append("| Calls | From | To |")
+            md_content.append("|-------|------|----|")
+            for count, u, v in best['cut'][:10]:
+                md_content.append(f"| {count} | `{u}` | `{v}` |")
+            md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Files are partitioned by multilevel bisection (heavy-edge matching, greedy growing, boundary refinement) on the undirected call graph, weighted by body size")
+    md_content.append("- Each bisection is made acyclic by moving every file that calls into the upper half into it, since crates can't depend on each other cyclically")
+    md_content.append("- Body size is a proxy for compile cost; type-only dependencies are invisible to the call graph")
+    md_content.append("- Dependents outside the workspace build (crates that are neither members nor dependencies of one, such as fuzz targets) are not counted")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--crates', nargs='+', default=DEFAULT_CRATES,
+                        help='crate directories to analyze (default: %(default)s)')
+    parser.add_argument('--max-parts', type=int, default=4, help='largest split to try (default: %(default)s)')
+    parser.add_argument('--edit-history', type=int, default=500,
+                        help='weight edits by the last N commits; 0 to weight by size (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the partitioner')
+    parser.add_argument('--output', default='COMPILE_ADVISOR_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    crates = load_workspace_crates(REPO_ROOT)
+    by_dir = {info['dir']: name for name, info in crates.items()}
+    crate_dirs = sorted(by_dir.items(), key=lambda kv: len(kv[0]), reverse=True)
+    dependents = transitive_dependents(crates)
+    for crate_dir in args.crates:
+        if crate_dir.rstrip('/') not in by_dir:
+            print(f"Error: no crate at {crate_dir}")
+            sys.exit(1)
+
+    file_edit_counts = edit_frequencies(REPO_ROOT, args.edit_history)
+    edit_source = (f"how often each file changed in the last {args.edit_history} commits"
+                   if file_edit_counts else "file size")
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    results = []
+    for crate_dir in args.crates:
+        name = by_dir[crate_dir.rstrip('/')]
+        print(f"Partitioning {name}...")
+        results.append(analyze_crate(name, crates, data, crate_dirs, dependents, file_edit_counts,
+                                     args.max_parts, args.seed))
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(results, edit_source))
+
+    for r in results:
+        best = min(r['options'], key=lambda o: o['expected'], default=None)
+        if best and r['baseline']:
+            print(f"  {r['crate']:<28} best split: {len(best['groups'])} parts, "
+                  f"{(1 - best['expected'] / r['baseline']) * 100:.1f}% less rebuilt per edit")
+    print(f"\n📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
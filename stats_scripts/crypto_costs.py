@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Predict how much of each libsignal benchmark is spent in each crypto primitive.
+
+For every criterion benchmark in `rust/protocol/benches` and `rust/zkgroup/benches`, the calls
+made inside its `b.iter(...)` closure are followed through the corpus call graph (condensed into
+strongly connected components so recursion is counted once) until they enter a primitive crate
+in deps/. The resulting calls-per-iteration are multiplied by per-call costs measured by the
+deps/ benches (as recorded by bench_regressions.py, or read straight from criterion/libtest
+output) and compared against the benchmark's own measured time.
+"""
+
+import argparse
+import operator
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from analyze_deps import (load_data, strongly_connected_components, propagate_reach, brace_block,
+                          closure_text, call_counts)
+from bench_regressions import (open_store, load_run, latest_commits, resolve_commit, format_ns,
+                               load_criterion_results, load_libtest_results)
+
+DEFAULT_BENCH_DIRS = ['rust/protocol/benches', 'rust/zkgroup/benches']
+
+# (primitive, crate directory, pattern on "relative_path display_name" of the called function,
+#  pattern for the deps/ benchmark measuring one call). The first matching row wins; every
+# primitive crate ends with a catch-all row.
+PRIMITIVES = [
+    ('x25519', 'deps/curve25519-dalek/', r'montgomery', r'Montgomery pseudomultiplication'),
+    ('edwards fixed-base mul', 'deps/curve25519-dalek/', r'mul_base|basepoint_table',
+     r'edwards benches/Constant-time fixed-base scalar mul'),
+    ('multiscalar mul', 'deps/curve25519-dalek/', r'multiscalar',
+     r'multiscalar benches/Variable-time variable-base multiscalar multiplication/16$'),
+    ('edwards scalar mul', 'deps/curve25519-dalek/', r'edwards\.rs .*\bmul',
+     r'edwards benches/Constant-time variable-base scalar mul'),
+    ('ristretto compress', 'deps/curve25519-dalek/', r'ristretto\.rs compress', r'RistrettoPoint compression'),
+    ('ristretto decompress', 'deps/curve25519-dalek/', r'ristretto\.rs decompress', r'RistrettoPoint decompression'),
+    ('scalar inversion', 'deps/curve25519-dalek/', r'scalar\.rs .*invert', r'Scalar inversion'),
+    ('scalar mul', 'deps/curve25519-dalek/', r'scalar\.rs .*mul', r'Scalar multiplication'),
+    ('curve25519 (other)', 'deps/curve25519-dalek/', r'', None),
+    ('ed25519 sign', 'deps/ed25519-dalek/', r'\bsign', r'Ed25519 signing$'),
+    ('ed25519 verify', 'deps/ed25519-dalek/', r'verify', r'Ed25519 signature verification$'),
+    ('ed25519 (other)', 'deps/ed25519-dalek/', r'', None),
+    ('sha512', 'deps/sha2/', r'512', r'\bsha512_100$'),
+    ('sha256', 'deps/sha2/', r'', r'\bsha256_100$'),
+    ('hmac', 'deps/hmac/', r'', None),
+    ('aes-gcm-siv', 'deps/aes-gcm-siv/', r'', None),
+    ('chacha20poly1305', 'deps/chacha20poly1305/', r'', None),
+    ('aes-ctr', 'deps/ctr/', r'', r'\bctr_128be_aes128_stream_bench2_256b$'),
+    ('aes-cbc', 'deps/cbc/', r'', r'\bcbc_aes128_encrypt_block$'),
+    ('aes', 'deps/aes/', r'', r'\baes256_encrypt_block$'),
+]
+
+BENCH_FUNCTION = re.compile(r'(\w+)\.bench_function\(\s*"([^"]+)"')
+BENCHMARK_GROUP = re.compile(r'let\s+(?:mut\s+)?(\w+)\s*=\s*\w+\.benchmark_group\(\s*"([^"]+)"')
+ITER_CALL = re.compile(r'\.iter(?:_batched|_with_setup|_custom)?\(')
+CLOSURE_REFERENCE = re.compile(r'^\s*(?:&\s*mut\s+|&\s*)?(\w+)\s*$')
+
+def classify(item):
+    """The primitive a function belongs to, or None if it isn't in a primitive crate."""
+    relative_path = item.get('relative_path', '')
+    key = f"{relative_path} {item.get('display_name', '')}"
+    for name, crate_dir, pattern, _ in PRIMITIVES:
+        if relative_path.startswith(crate_dir) and re.search(pattern, key):
+            return name
+    return None
+
+def closure_definition(body, name):
+    """The block of a closure bound with `let [mut] name = || { ... }`, or '' if there is none."""
+    match = re.search(r'let\s+(?:mut\s+)?' + re.escape(name) + r'\s*=', body)
+    if not match:
+        return ''
+    opening = body.find('{', match.end())
+    return brace_block(body, opening) if opening != -1 else ''
+
+def measured_regions(item):
+    """
+    Split a bench function into its criterion benchmarks: (bench id, text run per iteration).
+
+    Bench ids are `group/name` for benchmarks registered on a benchmark group. A function
+    without literal bench names is treated as a single benchmark named after the function.
+    """
+    body = item.get('body', '')
+    groups = {m.group(1): m.group(2) for m in BENCHMARK_GROUP.finditer(body)}
+    starts = list(BENCH_FUNCTION.finditer(body))
+    regions = []
+    for n, match in enumerate(starts):
+        end = starts[n + 1].start() if n + 1 < len(starts) else len(body)
+        section = body[match.end():end]
+        iterated = []
+        for m in ITER_CALL.finditer(section):
+            text = closure_text(section, m.end())
+            # `b.iter(&mut encrypt_it)` runs a closure defined earlier in the function.
+            reference = CLOSURE_REFERENCE.match(text)
+            iterated.append(closure_definition(body, reference.group(1)) if reference else text)
+        receiver, name = match.groups()
+        bench_id = f"{groups[receiver]}/{name}" if receiver in groups else name
+        regions.append((bench_id, '\n'.join(iterated) or section))
+    return regions or [(item.get('display_name', ''), body)]
+
+class CallModel:
+    """The corpus call graph condensed into components, with primitive boundaries."""
+
+    def __init__(self, data):
+        self.data = data
+        identifiers = [item.get('identifier', '') for item in data]
+        self.position = {identifier: i for i, identifier in enumerate(identifiers)}
+        self.primitive = [classify(item) for item in data]
+        self.calls = [Counter(self.position[dep] for dep in item.get('deps', []) if dep in self.position)
+                      for item in data]
+        # Calls are followed up to the first function of a primitive crate.
+        self.edges = [[(j, multiplicity) for j, multiplicity in calls.items() if self.primitive[j] is None]
+                      if self.primitive[i] is None else [] for i, calls in enumerate(self.calls)]
+        self.components = strongly_connected_components(len(data), self.edges)
+
+    def primitive_calls(self, roots):
+        """
+        Expected primitive calls when each root function is called the given number of times.
+
+        Calls are pushed from callers to callees in topological order of components; a
+        component runs as often as it is called from outside, and propagation stops at the
+        first function of a primitive crate (its own callees are part of its measured cost).
+        """
+        totals = Counter()
+        seeds = [0.0] * len(self.data)
+        for i, count in roots.items():
+            if self.primitive[i] is None:
+                seeds[i] += count
+            else:
+                totals[self.primitive[i]] += count
+        component, runs = propagate_reach(
+            self.edges, seeds, toward='callees', merge=operator.add,
+            carry=lambda calls, value: value * sum(multiplicity for _, multiplicity in calls),
+            components=self.components)
+        for i, calls in enumerate(self.calls):
+            if self.primitive[i] is None and runs[component[i]]:
+                for j, multiplicity in calls.items():
+                    if self.primitive[j] is not None:
+                        totals[self.primitive[j]] += runs[component[i]] * multiplicity
+        return totals
+
+def find_measurement(results, pattern):
+    """The median of the first (by id) measured benchmark matching a pattern."""
+    for bench_id in sorted(results):
+        if re.search(pattern, bench_id):
+            return bench_id, results[bench_id]['median_ns']
+    return None, None
+
+def measured_bench(results, bench_id):
+    """The stored result for a workspace benchmark, allowing for a suite prefix."""
+    for stored_id, result in results.items():
+        if stored_id == bench_id or stored_id.endswith('/' + bench_id):
+            return result['median_ns']
+    return None
+
+def load_measurements(args):
+    """bench_id -> {'median_ns': ...} from the bench store and/or raw benchmark output."""
+    results = {}
+    if Path(args.store).exists():
+        conn = open_store(args.store)
+        commits = [resolve_commit(conn, args.commit)] if args.commit else latest_commits(conn, 1)
+        if commits:
+            results.update(load_run(conn, commits[0]))
+    for criterion_dir in args.criterion_dir:
+        results.update({r['bench_id']: r for r in load_criterion_results(criterion_dir)})
+    for output_file in args.libtest_output:
+        results.update({r['bench_id']: r for r in load_libtest_results(output_file)})
+    return results
+
+def primitive_costs(results, overrides):
+    """primitive -> (source bench id, ns per call or None)."""
+    costs = {}
+    for name, _, _, pattern in PRIMITIVES:
+        if name in costs:
+            continue
+        if name in overrides:
+            costs[name] = ('--cost', overrides[name])
+        elif pattern:
+            costs[name] = find_measurement(results, pattern)
+        else:
+            costs[name] = (None, None)
+    return costs
+
+def analyze_benches(data, bench_dirs, results, costs):
+    """Predicted per-primitive cost of every benchmark found in the bench directories."""
+    model = CallModel(data)
+    prefixes = tuple(d.rstrip('/') + '/' for d in bench_dirs)
+    benches = []
+    for item in data:
+        if not item.get('relative_path', '').startswith(prefixes):
+            continue
+        body = item.get('body', '')
+        if 'bench_function' not in body and not ITER_CALL.search(body):
+            continue
+        deps = [dep for dep in set(item.get('deps', [])) if dep in model.position]
+        names = {dep: data[model.position[dep]].get('display_name', '') for dep in deps}
+        for bench_id, text in measured_regions(item):
+            counts = call_counts(text, set(names.values()))
+            roots = Counter()
+            for dep, name in names.items():
+                if counts[name]:
+                    roots[model.position[dep]] += counts[name]
+            calls = model.primitive_calls(roots)
+            breakdown = {name: (count, count * costs[name][1] if costs[name][1] is not None else None)
+                         for name, count in calls.items()}
+            benches.append({
+                'bench_id': bench_id,
+                'path': item.get('relative_path', ''),
+                'measured_ns': measured_bench(results, bench_id),
+                'predicted_ns': sum(ns for _, ns in breakdown.values() if ns is not None),
+                'breakdown': breakdown,
+            })
+    return benches
+
+def generate_markdown_report(benches, costs):
+    """Generate a markdown report of predicted versus measured primitive costs."""
+    md_content = []
+    md_content.append("# LibSignal Crypto Primitive Cost Breakdown")
+    md_content.append("")
+    md_content.append("Calls per benchmark iteration are counted statically from the corpus call graph; "
+                      "costs per call come from the deps/ benchmarks.")
+    md_content.append("")
+
+    md_content.append("## 🧮 Per-Call Primitive Costs")
+    md_content.append("")
+    md_content.append("| Primitive | Cost per Call | Measured By |")
+    md_content.append("|-----------|---------------|-------------|")
+    for name, (source, ns) in costs.items():
+        md_content.append(f"| {name} | {format_ns(ns) if ns is not None else '—'} | {f'`{source}`' if source else 'not measured'} |")
+    md_content.append("")
+
+    totals = Counter()
+    top_counts = Counter()
+    for bench in benches:
+        for name, (_, ns) in bench['breakdown'].items():
+            if ns:
+                totals[name] += ns
+        priced = [(ns, name) for name, (_, ns) in bench['breakdown'].items() if ns]
+        if priced:
+            top_counts[max(priced)[1]] += 1
+
+    md_content.append("## 🎯 Where to Optimize")
+    md_content.append("")
+    if totals:
+        grand_total = sum(totals.values())
+        md_content.append("| Primitive | Predicted Time (all benches) | Share | Top Primitive in # Benches |")
+        md_content.append("|-----------|------------------------------|-------|----------------------------|")
+        for name, ns in totals.most_common():
+            md_content.append(f"| {name} | {format_ns(ns)} | {ns / grand_total * 100:.1f}% | {top_counts[name]} |")
+        md_content.append("")
+        md_content.append(f"**{totals.most_common(1)[0][0]}** accounts for the most predicted time across the benchmarks.")
+    else:
+        md_content.append("No priced primitive calls; record the deps/ benches with bench_regressions.py or pass --cost.")
+    md_content.append("")
+
+    md_content.append("## 📊 Predicted vs Measured")
+    md_content.append("")
+    md_content.append("| Benchmark | Measured | Predicted | Explained | Top Primitive |")
+    md_content.append("|-----------|----------|-----------|-----------|---------------|")
+    for bench in sorted(benches, key=lambda b: -(b['measured_ns'] or b['predicted_ns'])):
+        measured = bench['measured_ns']
+        explained = f"{bench['predicted_ns'] / measured * 100:.0f}%" if measured else '—'
+        priced = [(ns, name) for name, (_, ns) in bench['breakdown'].items() if ns]
+        top = max(priced)[1] if priced else '—'
+        md_content.append(f"| `{bench['bench_id']}` | {format_ns(measured) if measured else '—'} "
+                          f"| {format_ns(bench['predicted_ns'])} | {explained} | {top} |")
+    md_content.append("")
+
+    md_content.append("## 🔍 Breakdown per Benchmark")
+    md_content.append("")
+    for bench in benches:
+        if not bench['breakdown']:
+            continue
+        md_content.append(f"### `{bench['bench_id']}` ({bench['path']})")
+        md_content.append("")
+        md_content.append("| Primitive | Calls / Iteration | Predicted | Share of Predicted |")
+        md_content.append("|-----------|-------------------|-----------|--------------------|")
+        for name, (count, ns) in sorted(bench['breakdown'].items(), key=lambda kv: -(kv[1][1] or 0)):
+            share = f"{ns / bench['predicted_ns'] * 100:.1f}%" if ns and bench['predicted_ns'] else '—'
+            md_content.append(f"| {name} | {count:g} | {format_ns(ns) if ns is not None else '—'} | {share} |")
+        md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Only calls inside `b.iter(...)` closures count toward a benchmark; setup code is excluded")
+    md_content.append("- A function in a strongly connected component runs as often as the component is called from outside it")
+    md_content.append("- Counts ignore loops and branches, so data-dependent repetition (e.g. chain key steps) is undercounted")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--bench-dir', action='append', dest='bench_dirs', default=[],
+                        help=f'benchmark directories to analyze (default: {" ".join(DEFAULT_BENCH_DIRS)})')
+    parser.add_argument('--store', default='bench_history.sqlite',
+                        help='bench_regressions.py store to read measurements from (default: %(default)s)')
+    parser.add_argument('--commit', help='stored commit to use (default: most recent run)')
+    parser.add_argument('--criterion-dir', action='append', default=[], help='also read criterion output from here')
+    parser.add_argument('--libtest-output', action='append', default=[], help='also read saved libtest bench output')
+    parser.add_argument('--cost', action='append', default=[], metavar='PRIMITIVE=NS',
+                        help='set the cost of a primitive by hand, e.g. "hmac=450"')
+    parser.add_argument('--output', default='CRYPTO_COST_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    overrides = {}
+    known = {row[0] for row in PRIMITIVES}
+    for spec in args.cost:
+        name, _, ns = spec.partition('=')
+        if name not in known:
+            print(f"Error: unknown primitive {name!r}; expected one of: {', '.join(sorted(known))}")
+            sys.exit(1)
+        overrides[name] = float(ns)
+
+    results = load_measurements(args)
+    costs = primitive_costs(results, overrides)
+    print(f"Priced {sum(1 for _, ns in costs.values() if ns is not None)} of {len(costs)} primitives "
+          f"from {len(results)} measured benchmarks")
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    benches = analyze_benches(data, args.bench_dirs or DEFAULT_BENCH_DIRS, results, costs)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(benches, costs))
+
+    for bench in benches:
+        priced = sorted(((ns, name) for name, (_, ns) in bench['breakdown'].items() if ns), reverse=True)
+        if priced:
+            print(f"  {bench['bench_id']:<48} predicted {format_ns(bench['predicted_ns']):>10}, "
+                  f"mostly {priced[0][1]}")
+    print(f"\n📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
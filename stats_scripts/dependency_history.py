@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Track rust→deps dependency metrics across many libsignal releases.
+
+Snapshots of the corpus are stored as one full copy plus per-snapshot deltas of functions and
+call edges (with a full checkpoint every so often to bound reconstruction time). The
+`analyze_deps` counters are computed once when a snapshot is added and stored as deltas too, so
+a trend over N snapshots only replays the counter changes instead of re-analyzing N corpora.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from analyze_deps import load_data, analyze_dependencies, get_dep_crate_name
+
+DEFAULT_STORE = 'dependency_history'
+DEFAULT_CHECKPOINT_EVERY = 32
+
+def read_json_gz(path):
+    with gzip.open(path, 'rt') as f:
+        return json.load(f)
+
+def write_json_gz(path, value):
+    with gzip.open(path, 'wt') as f:
+        json.dump(value, f, separators=(',', ':'))
+
+def corpus_by_identifier(data):
+    """Key a corpus list by function identifier."""
+    return {item.get('identifier', ''): item for item in data}
+
+def snapshot_counters(data):
+    """Flatten the analyze_deps statistics of one corpus into named counters."""
+    stats = analyze_dependencies(data)
+    counters = Counter()
+    counters['total:rust_functions_calling_deps'] = len(stats['rust_to_deps_calls'])
+    counters['total:deps_functions_called'] = len(stats['deps_function_usage'])
+    counters['total:rust_files_using_deps'] = len(stats['rust_files_using_deps'])
+    counters['total:dependency_calls'] = sum(stats['deps_function_usage'].values())
+    for crate, count in stats['deps_crate_usage'].items():
+        counters[f'crate:{crate}'] = count
+    for func, count in stats['deps_function_usage'].items():
+        counters[f'function:{func}'] = count
+    # rust module -> deps crate coupling, e.g. module_crate:attest/boring-signal
+    for rust_func, deps_list in stats['rust_to_deps_calls'].items():
+        path_parts = stats['function_info'].get(rust_func, {}).get('relative_path', '').split('/')
+        if len(path_parts) < 2:
+            continue
+        for dep in deps_list:
+            crate = get_dep_crate_name(stats['function_info'].get(dep, {}).get('relative_path', ''))
+            if crate:
+                counters[f'module_crate:{path_parts[1]}/{crate}'] += 1
+    return counters
+
+def diff_counters(old, new):
+    """The changes that turn counters `old` into `new`."""
+    return {key: new.get(key, 0) - old.get(key, 0)
+            for key in old.keys() | new.keys() if new.get(key, 0) != old.get(key, 0)}
+
+def apply_counter_delta(counters, delta):
+    for key, change in delta.items():
+        value = counters.get(key, 0) + change
+        if value:
+            counters[key] = value
+        else:
+            counters.pop(key, None)
+
+def compute_delta(old, new):
+    """
+    Describe how to turn snapshot `old` into `new` (both keyed by identifier).
+
+    Changed fields are stored with their new values, and a changed `deps` list is stored whole
+    under `edges`, so that call order is kept. Removed fields are listed separately, since `None`
+    is a legitimate value. Functions and fields that end up out of order are given explicit orders.
+    """
+    delta = {'added': {}, 'removed': [], 'changed': {}, 'removed_fields': {}, 'edges': {}, 'key_order': {}}
+    for identifier, item in new.items():
+        previous = old.get(identifier)
+        if previous is None:
+            delta['added'][identifier] = item
+            continue
+        fields = {key: value for key, value in item.items()
+                  if key != 'deps' and (key not in previous or previous[key] != value)}
+        if fields:
+            delta['changed'][identifier] = fields
+        removed_fields = [key for key in previous if key not in item]
+        if removed_fields:
+            delta['removed_fields'][identifier] = removed_fields
+        if previous.get('deps') != item.get('deps') and 'deps' in item:
+            delta['edges'][identifier] = item['deps']
+        kept = [key for key in previous if key in item]
+        if kept + [key for key in item if key not in previous] != list(item):
+            delta['key_order'][identifier] = list(item)
+    delta['removed'] = sorted(old.keys() - new.keys())
+    if [i for i in old if i in new] + [i for i in new if i not in old] != list(new):
+        delta['order'] = list(new)
+    return delta
+
+def apply_delta(snapshot, delta):
+    """Apply a delta to a snapshot (keyed by identifier) in place."""
+    for identifier in delta['removed']:
+        snapshot.pop(identifier, None)
+    for identifier, fields in delta['changed'].items():
+        snapshot[identifier] = {**snapshot[identifier], **fields}
+    for identifier, keys in delta['removed_fields'].items():
+        item = snapshot[identifier] = dict(snapshot[identifier])
+        for key in keys:
+            item.pop(key, None)
+    for identifier, deps in delta['edges'].items():
+        snapshot[identifier] = {**snapshot[identifier], 'deps': list(deps)}
+    for identifier, keys in delta['key_order'].items():
+        snapshot[identifier] = {key: snapshot[identifier][key] for key in keys}
+    snapshot.update(delta['added'])
+    if 'order' in delta:
+        reordered = {identifier: snapshot[identifier] for identifier in delta['order']}
+        snapshot.clear()
+        snapshot.update(reordered)
+    return snapshot
+
+class HistoryStore:
+    """A directory holding snapshot checkpoints, deltas and per-snapshot counter deltas."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.manifest_file = self.path / 'manifest.json'
+        if self.manifest_file.exists():
+            with open(self.manifest_file, 'r') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'snapshots': []}
+
+    @property
+    def snapshots(self):
+        return self.manifest['snapshots']
+
+    def names(self):
+        return [entry['name'] for entry in self.snapshots]
+
+    def position(self, name):
+        names = self.names()
+        if name not in names:
+            print(f"Error: no snapshot named {name!r} in {self.path}")
+            sys.exit(1)
+        return names.index(name)
+
+    def reconstruct(self, position):
+        """Rebuild a snapshot from the nearest checkpoint at or before it."""
+        start = max(i for i in range(position + 1) if self.snapshots[i]['kind'] == 'checkpoint')
+        snapshot = read_json_gz(self.path / self.snapshots[start]['file'])
+        for entry in self.snapshots[start + 1:position + 1]:
+            apply_delta(snapshot, read_json_gz(self.path / entry['file']))
+        return snapshot
+
+    def add(self, name, data, checkpoint_every):
+        """Store a new snapshot after the latest one."""
+        if name in self.names():
+            print(f"Error: snapshot {name!r} already exists in {self.path}")
+            sys.exit(1)
+        self.path.mkdir(parents=True, exist_ok=True)
+        snapshot = corpus_by_identifier(data)
+        counters = snapshot_counters(data)
+        position = len(self.snapshots)
+
+        since_checkpoint = 0
+        for entry in reversed(self.snapshots):
+            if entry['kind'] == 'checkpoint':
+                break
+            since_checkpoint += 1
+
+        entry = {'name': name, 'recorded_at': time.time()}
+        if position == 0 or since_checkpoint + 1 >= checkpoint_every:
+            entry.update(kind='checkpoint', file=f'{position:05d}.full.json.gz')
+            write_json_gz(self.path / entry['file'], snapshot)
+            summary = f"checkpoint of {len(snapshot)} functions"
+        else:
+            delta = compute_delta(self.reconstruct(position - 1), snapshot)
+            entry.update(kind='delta', file=f'{position:05d}.delta.json.gz')
+            write_json_gz(self.path / entry['file'], delta)
+            summary = (f"+{len(delta['added'])} -{len(delta['removed'])} ~{len(delta['changed'])} functions, "
+                       f"{len(delta['edges'])} functions with changed calls")
+
+        previous = self.counters_at(position - 1) if position else {}
+        entry['counters'] = diff_counters(previous, counters)
+        self.snapshots.append(entry)
+        with open(self.manifest_file, 'w') as f:
+            json.dump(self.manifest, f, indent=1)
+        return summary
+
+    def counters_at(self, position):
+        counters = {}
+        for entry in self.snapshots[:position + 1]:
+            apply_counter_delta(counters, entry['counters'])
+        return counters
+
+    def trend(self, metrics):
+        """Yield (snapshot name, {metric: value}) for every snapshot, replaying counter deltas."""
+        counters = {}
+        for entry in self.snapshots:
+            apply_counter_delta(counters, entry['counters'])
+            yield entry['name'], {metric: counters.get(metric, 0) for metric in metrics}
+
+def generate_trend_report(rows, metrics):
+    """Generate a markdown table (and text sparkline bars) of metric values per snapshot."""
+    report = []
+    report.append("# LibSignal Dependency Trends")
+    report.append("")
+    report.append("Values of `analyze_deps` counters for each recorded snapshot, oldest first.")
+    report.append("")
+    report.append("| Snapshot | " + " | ".join(f"`{metric}`" for metric in metrics) + " |")
+    report.append("|----------|" + "|".join("-" * (len(metric) + 2) for metric in metrics) + "|")
+    for name, values in rows:
+        report.append(f"| {name} | " + " | ".join(str(values[metric]) for metric in metrics) + " |")
+    report.append("")
+
+    for metric in metrics:
+        peak = max((values[metric] for _, values in rows), default=0) or 1
+        report.append(f"## `{metric}`")
+        report.append("")
+        report.append("```")
+        for name, values in rows:
+            bar_length = int(values[metric] / peak * 30)
+            report.append(f"{name:<20} │{'█' * bar_length}{'░' * (30 - bar_length)}│ {values[metric]}")
+        report.append("```")
+        report.append("")
+    return "\n".join(report)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--store', default=DEFAULT_STORE, help='history directory (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('add', help='record a corpus snapshot (e.g. one per release)')
+    add.add_argument('name', help='snapshot name, e.g. v0.52.0')
+    add.add_argument('corpus', help='libsignal_with_deps.json for that snapshot')
+    add.add_argument('--checkpoint-every', type=int, default=DEFAULT_CHECKPOINT_EVERY,
+                     help='store a full copy every N snapshots (default: %(default)s)')
+
+    show = subparsers.add_parser('show', help='reconstruct a snapshot as a corpus JSON file')
+    show.add_argument('name')
+    show.add_argument('output')
+
+    subparsers.add_parser('list', help='list recorded snapshots')
+
+    trend = subparsers.add_parser('trend', help='report metrics across all snapshots')
+    trend.add_argument('metrics', nargs='+',
+                       help='counter names, e.g. total:dependency_calls crate:boring-signal '
+                            'module_crate:attest/boring-signal "function:impl//T//ConstantTimeEq/ct_eq"')
+    trend.add_argument('--output', default='DEPENDENCY_TRENDS.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = HistoryStore(args.store)
+
+    if args.command == 'add':
+        if not Path(args.corpus).exists():
+            print(f"Error: {args.corpus} not found")
+            sys.exit(1)
+        summary = store.add(args.name, load_data(args.corpus), args.checkpoint_every)
+        print(f"💾 Recorded {args.name}: {summary}")
+
+    elif args.command == 'show':
+        snapshot = store.reconstruct(store.position(args.name))
+        with open(args.output, 'w') as f:
+            json.dump(list(snapshot.values()), f)
+        print(f"📄 {args.name}: {len(snapshot)} functions written to {args.output}")
+
+    elif args.command == 'list':
+        for entry in store.snapshots:
+            print(f"{entry['name']:<24} {entry['kind']:<10} {len(entry['counters']):>6} counter changes")
+
+    elif args.command == 'trend':
+        if not store.snapshots:
+            print(f"Error: no snapshots recorded in {args.store}")
+            sys.exit(1)
+        rows = list(store.trend(args.metrics))
+        with open(args.output, 'w') as f:
+            f.write(generate_trend_report(rows, args.metrics))
+        for name, values in rows[-10:]:
+            print(f"{name:<24} " + "  ".join(f"{metric}={value}" for metric, value in values.items()))
+        print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Export the libsignal call graph at crate, module, file or function level of detail.
+
+All four levels are aggregated in a single pass over the corpus edges and cached next to the
+corpus, so switching levels (or extracting an ego-subgraph) never re-walks the function graph.
+Views are written as DOT, GraphML or JSON, streamed straight to disk, and can be pruned by edge
+weight and to the heaviest k edges per node.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+from collections import defaultdict, Counter, deque
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from analyze_deps import load_data
+
+LEVELS = ('crate', 'module', 'file', 'function')
+INDEX_VERSION = 2
+
+def level_keys(item):
+    """The node each function belongs to at every level of detail."""
+    relative_path = item.get('relative_path', '') or '[unknown]'
+    parts = relative_path.split('/')
+    return {
+        'crate': '/'.join(parts[:2]),                 # rust/<module> or deps/<crate>
+        'module': '/'.join(parts[:-1]) or relative_path,  # the directory holding the file
+        'file': relative_path,
+        'function': item.get('identifier', ''),
+    }
+
+def build_graph_index(data, signature=None):
+    """Aggregate nodes and weighted edges for every level in one pass."""
+    # Callees are named by identifier only; a reused identifier resolves to its last item, as in
+    # analyze_deps. Everything else uses each item's own keys.
+    keys_of_item = [level_keys(item) for item in data]
+    keys_by_function = {keys['function']: keys for keys in keys_of_item}
+    nodes = {level: defaultdict(lambda: {'functions': 0, 'body_bytes': 0}) for level in LEVELS}
+    labels = {}
+    function_paths = {}
+    for item, keys in zip(data, keys_of_item):
+        for level in LEVELS:
+            node = nodes[level][keys[level]]
+            node['functions'] += 1
+            node['body_bytes'] += len(item.get('body', ''))
+        labels[keys['function']] = item.get('display_name', '') or keys['function']
+        function_paths[keys['function']] = keys['file']
+
+    edges = {level: Counter() for level in LEVELS}
+    for item, source in zip(data, keys_of_item):
+        for dep in item.get('deps', []):
+            target = keys_by_function.get(dep)
+            if target is None:
+                continue
+            for level in LEVELS:
+                edges[level][(source[level], target[level])] += 1
+
+    return {
+        'signature': signature,
+        'nodes': {level: dict(nodes[level]) for level in LEVELS},
+        'edges': {level: dict(edges[level]) for level in LEVELS},
+        'labels': labels,
+        'function_paths': function_paths,
+    }
+
+def load_or_build_index(corpus_file, index_file=None, rebuild=False):
+    """Load the cached graph index for a corpus, rebuilding it if missing or stale."""
+    index_file = index_file or str(Path(corpus_file).with_suffix('.graph.pickle'))
+    stat = os.stat(corpus_file)
+    signature = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+    if not rebuild and Path(index_file).exists():
+        with open(index_file, 'rb') as f:
+            index = pickle.load(f)
+        if index.get('signature') == signature:
+            return index
+
+    print(f"Aggregating call graph of {corpus_file}...", file=sys.stderr)
+    index = build_graph_index(load_data(corpus_file), signature)
+    with open(index_file, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return index
+
+def select_view(index, level, min_weight=1, top_k=None, within=None, keep_self_loops=False):
+    """
+    Pick the nodes and edges of one level, pruned by weight and top-k outgoing edges per node.
+
+    Every node under the `within` prefixes (or every node of the level) is kept, including nodes
+    left without edges by the pruning.
+    """
+    edges = [(src, dst, weight) for (src, dst), weight in index['edges'][level].items()
+             if weight >= min_weight and (keep_self_loops or src != dst)]
+    in_scope = set(index['nodes'][level])
+    if within:
+        prefixes = tuple(within)
+        in_scope = {node for node in in_scope if node_path(index, level, node).startswith(prefixes)}
+        edges = [e for e in edges if e[0] in in_scope and e[1] in in_scope]
+    if top_k:
+        by_source = defaultdict(list)
+        for edge in edges:
+            by_source[edge[0]].append(edge)
+        edges = [edge for out in by_source.values()
+                 for edge in sorted(out, key=lambda e: e[2], reverse=True)[:top_k]]
+    return in_scope, edges
+
+def node_path(index, level, node):
+    """The path-like name of a node, used for --within filtering."""
+    return index['function_paths'].get(node, '') if level == 'function' else node
+
+def ego_view(index, level, center, radius, min_weight=1, top_k=None, within=None, keep_self_loops=False):
+    """
+    The subgraph within `radius` calls (in either direction) of `center`.
+
+    The neighbourhood is walked over the view select_view picks with the same pruning, so
+    `within` and `top_k` limit which calls it follows; the center itself is always included.
+    """
+    _, view_edges = select_view(index, level, min_weight, top_k, within, keep_self_loops)
+    adjacency = defaultdict(set)
+    for src, dst, _ in view_edges:
+        adjacency[src].add(dst)
+        adjacency[dst].add(src)
+
+    seen = {center}
+    frontier = deque([(center, 0)])
+    while frontier:
+        node, depth = frontier.popleft()
+        if depth == radius:
+            continue
+        for nxt in adjacency[node]:
+            if nxt not in seen:
+                seen.add(nxt)
+                frontier.append((nxt, depth + 1))
+
+    edges = [edge for edge in view_edges if edge[0] in seen and edge[1] in seen]
+    return seen, edges
+
+def resolve_center(index, level, name):
+    """Find the node to center an ego view on, by exact key or (for functions) display name."""
+    nodes = index['nodes'][level]
+    if name in nodes:
+        return name
+    if level == 'function':
+        matches = sorted(ident for ident, label in index['labels'].items() if label == name)
+    else:
+        matches = sorted(node for node in nodes if node.endswith(name))
+    if len(matches) != 1:
+        print(f"Error: {name!r} matches {len(matches)} {level} nodes" +
+              (": " + ", ".join(matches[:10]) if matches else ""))
+        sys.exit(1)
+    return matches[0]
+
+def node_label(index, level, node):
+    return index['labels'].get(node, node) if level == 'function' else node
+
+def write_dot(f, index, level, nodes, edges):
+    max_weight = max((weight for _, _, weight in edges), default=1)
+    f.write("digraph libsignal {\n")
+    f.write("  rankdir=LR;\n  node [shape=box, fontsize=10];\n")
+    for node in sorted(nodes):
+        attrs = index['nodes'][level].get(node, {})
+        f.write(f"  {json.dumps(node)} [label={json.dumps(node_label(index, level, node))}, "
+                f"tooltip=\"{attrs.get('functions', 0)} functions\"];\n")
+    for src, dst, weight in edges:
+        penwidth = 1 + 4 * weight / max_weight
+        f.write(f"  {json.dumps(src)} -> {json.dumps(dst)} [weight={weight}, penwidth={penwidth:.2f}];\n")
+    f.write("}\n")
+
+def write_graphml(f, index, level, nodes, edges):
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+    f.write('  <key id="label" for="node" attr.name="label" attr.type="string"/>\n')
+    f.write('  <key id="functions" for="node" attr.name="functions" attr.type="int"/>\n')
+    f.write('  <key id="body_bytes" for="node" attr.name="body_bytes" attr.type="long"/>\n')
+    f.write('  <key id="weight" for="edge" attr.name="weight" attr.type="int"/>\n')
+    f.write(f'  <graph id="{level}" edgedefault="directed">\n')
+    for node in sorted(nodes):
+        attrs = index['nodes'][level].get(node, {})
+        label = escape(node_label(index, level, node))
+        f.write(f'    <node id={quoteattr(node)}><data key="label">{label}</data>'
+                f'<data key="functions">{attrs.get("functions", 0)}</data>'
+                f'<data key="body_bytes">{attrs.get("body_bytes", 0)}</data></node>\n')
+    for src, dst, weight in edges:
+        f.write(f'    <edge source={quoteattr(src)} target={quoteattr(dst)}>'
+                f'<data key="weight">{weight}</data></edge>\n')
+    f.write('  </graph>\n</graphml>\n')
+
+def write_json(f, index, level, nodes, edges):
+    # One record per line inside the arrays, written as we go rather than built in memory.
+    f.write(f'{{"level": {json.dumps(level)},\n "nodes": [\n')
+    for i, node in enumerate(sorted(nodes)):
+        attrs = index['nodes'][level].get(node, {})
+        record = {'id': node, 'label': node_label(index, level, node), **attrs}
+        f.write(("," if i else " ") + json.dumps(record) + "\n")
+    f.write(' ],\n "edges": [\n')
+    for i, (src, dst, weight) in enumerate(edges):
+        f.write(("," if i else " ") + json.dumps({'source': src, 'target': dst, 'weight': weight}) + "\n")
+    f.write(' ]}\n')
+
+WRITERS = {'dot': write_dot, 'graphml': write_graphml, 'json': write_json}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('output', help='file to write; the format defaults to its extension (.dot, .graphml, .json)')
+    parser.add_argument('--level', choices=LEVELS, default='crate', help='level of detail (default: %(default)s)')
+    parser.add_argument('--format', choices=sorted(WRITERS), help='output format (default: from the extension)')
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--rebuild', action='store_true', help='re-aggregate even if the cached index looks current')
+    parser.add_argument('--min-weight', type=int, default=1, help='drop edges with fewer calls (default: %(default)s)')
+    parser.add_argument('--top-k', type=int, help='keep only the k heaviest outgoing edges of each node')
+    parser.add_argument('--within', action='append', default=[], metavar='PREFIX',
+                        help='only nodes whose path starts with PREFIX')
+    parser.add_argument('--keep-self-loops', action='store_true', help='keep calls within the same node')
+    parser.add_argument('--ego', metavar='NODE',
+                        help='only the neighbourhood of this node (function: identifier or name), walked over '
+                             'the edges left by the other filters')
+    parser.add_argument('--radius', type=int, default=2, help='hops around --ego (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    output_format = args.format or Path(args.output).suffix.lstrip('.').lower()
+    if output_format not in WRITERS:
+        print(f"Error: can't tell the format of {args.output}; pass --format")
+        sys.exit(1)
+
+    index = load_or_build_index(args.corpus, rebuild=args.rebuild)
+    if args.ego:
+        center = resolve_center(index, args.level, args.ego)
+        nodes, edges = ego_view(index, args.level, center, args.radius, args.min_weight, args.top_k, args.within,
+                                args.keep_self_loops)
+    else:
+        nodes, edges = select_view(index, args.level, args.min_weight, args.top_k, args.within,
+                                   args.keep_self_loops)
+
+    with open(args.output, 'w') as f:
+        WRITERS[output_format](f, index, args.level, nodes, edges)
+
+    print(f"🗺️  {args.level} view: {len(nodes)} nodes, {len(edges)} edges → {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -79,6 +79,15 @@ def analyze_dependency_patterns(data):
     
     return patterns, function_info
 
+def module_for_path(relative_path):
+    """Return the rust module (rust/<module>/...) a path belongs to, or None outside rust/."""
+    if not relative_path.startswith('rust/'):
+        return None
+    path_parts = relative_path.split('/')
+    if len(path_parts) >= 2:
+        return path_parts[1]  # rust/module/...
+    return None
+
 def analyze_file_dependencies(data):
     """Analyze which rust modules depend on which deps crates."""
     
@@ -88,14 +97,9 @@ def analyze_file_dependencies(data):
         relative_path = item.get('relative_path', '')
         deps = item.get('deps', [])
         
-        if not relative_path.startswith('rust/'):
-            continue
-            
         # Extract module name from path
-        path_parts = relative_path.split('/')
-        if len(path_parts) >= 2:
-            module = path_parts[1]  # rust/module/...
-        else:
+        module = module_for_path(relative_path)
+        if module is None:
             continue
             
         # Check dependencies
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Helpers for processing corpora that don't fit in memory.
+
+`iter_json_array` streams the items of a top-level JSON array without loading the whole file, and
+`ExternalSorter` sorts any number of records by spilling sorted runs to disk and merging them
+lazily, so the only things held in memory are one run being filled and one record per run while
+merging.
+"""
+
+import heapq
+import json
+import os
+from itertools import groupby
+from operator import itemgetter
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+def iter_json_array(json_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the elements of the top-level JSON array in a file, one at a time."""
+    decoder = json.JSONDecoder()
+    with open(json_file, 'r') as f:
+        buffer = ''
+        position = 0
+        started = False
+        exhausted = False
+
+        def skip_whitespace():
+            nonlocal buffer, position, exhausted
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or exhausted:
+                    return
+                buffer, position = f.read(chunk_size), 0
+                exhausted = not buffer
+
+        skip_whitespace()
+        if buffer[position:position + 1] != '[':
+            raise ValueError(f"{json_file}: expected a top-level JSON array")
+        position += 1
+        while True:
+            skip_whitespace()
+            if exhausted:
+                raise ValueError(f"{json_file}: unterminated JSON array")
+            if buffer[position] == ']':
+                return
+            if started:
+                if buffer[position] != ',':
+                    raise ValueError(f"{json_file}: expected ',' between array elements")
+                position += 1
+                skip_whitespace()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                    # A number could be cut off at the end of the buffer; everything else fails
+                    # to decode until it's complete.
+                    if end < len(buffer) or exhausted:
+                        break
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                chunk = f.read(chunk_size)
+                exhausted = not chunk
+                buffer, position = buffer[position:] + chunk, 0
+            position = end
+            started = True
+            yield item
+
+class ExternalSorter:
+    """
+    Sort records (lists of JSON values, compared element by element) that may not fit in memory.
+
+    Records are buffered until `run_size` have been added, then sorted and written to a run file
+    in `directory`. Iterating merges the runs; it can be repeated.
+    """
+
+    def __init__(self, directory, name, run_size):
+        self.directory = directory
+        self.name = name
+        self.run_size = run_size
+        self.buffer = []
+        self.runs = []
+        self.count = 0
+
+    def add(self, record):
+        self.buffer.append(record)
+        self.count += 1
+        if len(self.buffer) >= self.run_size:
+            self._spill()
+
+    def _spill(self):
+        self.buffer.sort()
+        path = os.path.join(self.directory, f"{self.name}.{len(self.runs)}.run")
+        with open(path, 'w') as f:
+            for record in self.buffer:
+                f.write(json.dumps(record, separators=(',', ':')))
+                f.write('\n')
+        self.runs.append(path)
+        self.buffer = []
+
+    def _read_run(self, path):
+        with open(path, 'r') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def __iter__(self):
+        if self.buffer and self.runs:
+            self._spill()
+        if not self.runs:
+            # Everything fit in one run; don't bother touching the disk.
+            self.buffer.sort()
+            return iter(self.buffer)
+        return heapq.merge(*(self._read_run(path) for path in self.runs))
+
+    def __len__(self):
+        return self.count
+
+def last_per_key(records):
+    """(key, last record) for each run of records sharing their first element."""
+    for key, group in groupby(records, key=itemgetter(0)):
+        for record in group:
+            pass
+        yield key, record
@@ -0,0 +1,853 @@
+#!/usr/bin/env python3
+"""
+Suggest minimal cargo feature sets for the vendored deps crates, and list their dead API.
+
+Most of each vendored crate is never called from rust/. This script reads the `[features]`
+tables of `deps/*/Cargo.toml` and the features the workspace requests of them, maps every
+`#[cfg(feature = ...)]` gate in the crates' sources (including gated `mod` declarations) onto the
+corpus functions, and marks the functions reachable from rust/ code through the call graph. It
+then drops requested features one at a time, keeping each removal that leaves every reachable
+function compiled exactly as before, and estimates the source (and, given cargo timings, the build time) no longer
+compiled. Drops of features that also enable crates outside deps/ are reported as unverifiable.
+
+Only calls are visible in the corpus: features used solely through trait impls, derives or
+macros (serde, zeroize, ...) can look unused, so check suggestions with `cargo check`.
+"""
+
+import argparse
+import bisect
+import json
+import re
+import sys
+import tomllib
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import load_data
+from select_impacted import locate_spans, first_line
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# cfg names that are never set in a normal build of the workspace.
+DISABLED_CFGS = {'test', 'doc', 'docsrs', 'miri', 'fuzzing', 'kani'}
+
+CFG_ATTRIBUTE = re.compile(r'#(!?)\[\s*cfg\s*\(')
+CFG_TOKEN = re.compile(r'\s*(?:("(?:[^"\\]|\\.)*")|([A-Za-z_]\w*)|([(),=]))')
+MOD_DECLARATION = re.compile(r'^[ \t]*(?:pub(?:\s*\([^)]*\))?\s+)?mod\s+(\w+)\s*;', re.M)
+PATH_ATTRIBUTE = re.compile(r'#\[\s*path\s*=\s*"([^"]+)"\s*\]\s*$')
+CHAR_LITERAL = re.compile(r"'(?:[^'\\\n]|\\(?:[nrt0\\'\"]|x[0-9a-fA-F]{2}|u\{[0-9a-fA-F]+\}))'")
+TRAIT_IMPL = re.compile(r'^\s*(?:#\[[^\]]*\]\s*)*(?:unsafe\s+)?impl\b[^{;]*\bfor\b')
+# Items a gate can hide: types, traits, constants, modules, functions and macros.
+GATED_ITEM = re.compile(r'\b(?:type|struct|enum|union|trait|const|static|mod)\s+([A-Za-z_]\w*)'
+                        r'|\bfn\s+([A-Za-z_]\w*)|\bmacro_rules!\s*([A-Za-z_]\w*)')
+USE_DECLARATION = re.compile(r'\buse\s+([^;]+);')
+USE_NAME = re.compile(r'([A-Za-z_]\w*)\s*(?=[,}]|$)|\bas\s+([A-Za-z_]\w*)')
+IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+COMMENT = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+
+# Features that pick a faster implementation rather than adding API. The workspace enables these
+# deliberately (sha2's `asm`, for instance), so they are never suggested for removal.
+PERFORMANCE_FEATURES = {'asm', 'asm-aarch64', 'fast', 'precomputed-tables'}
+
+# --- Manifests and feature resolution -------------------------------------------------------
+
+def dependency_spec(key, spec):
+    if isinstance(spec, str):
+        return {'package': key, 'optional': False, 'default': True, 'features': []}
+    return {
+        'package': spec.get('package', key),
+        'optional': spec.get('optional', False),
+        'default': spec.get('default-features', True),
+        'features': list(spec.get('features', [])),
+    }
+
+def load_deps_crates(repo_root):
+    """Map each vendored crate's package name to its directory, features and dependencies."""
+    crates = {}
+    for cargo_toml in sorted((repo_root / 'deps').glob('*/Cargo.toml')):
+        with open(cargo_toml, 'rb') as f:
+            manifest = tomllib.load(f)
+        name = manifest.get('package', {}).get('name')
+        if not name:
+            continue
+        tables = [manifest.get('dependencies', {})]
+        tables += [target.get('dependencies', {}) for target in manifest.get('target', {}).values()]
+        dependencies = {}
+        for table in tables:
+            for key, spec in table.items():
+                dependencies[key] = dependency_spec(key, spec)
+        crates[name] = {
+            'dir': str(cargo_toml.parent.relative_to(repo_root)),
+            'features': manifest.get('features', {}),
+            'dependencies': dependencies,
+        }
+    return crates
+
+def dependency_requests(spec):
+    """The (package, entry) requests a dependency declaration makes; None just activates it."""
+    requests = [(spec['package'], None)]
+    if spec['default']:
+        requests.append((spec['package'], 'default'))
+    requests += [(spec['package'], feature) for feature in spec['features']]
+    return requests
+
+def workspace_requests(repo_root, crates):
+    """
+    Map each (vendored package, feature) the workspace's own crates request to the requesting
+    crates, and find the requests that are pinned.
+
+    A request is pinned if it names a performance feature explicitly, or if a member adds it only
+    for some targets: both are deliberate choices the call graph can't see the reason for.
+    """
+    with open(repo_root / 'Cargo.toml', 'rb') as f:
+        workspace = tomllib.load(f).get('workspace', {})
+    shared = {key: dependency_spec(key, spec) for key, spec in workspace.get('dependencies', {}).items()}
+
+    requests = defaultdict(set)
+    pinned = set()
+    for cargo_toml in sorted((repo_root / 'rust').glob('**/Cargo.toml')):
+        if 'target' in cargo_toml.parts:
+            continue
+        with open(cargo_toml, 'rb') as f:
+            manifest = tomllib.load(f)
+        member = str(cargo_toml.parent.relative_to(repo_root))
+        # Dev-dependencies only affect tests and benches, not what ships.
+        tables = [(manifest.get('dependencies', {}), False), (manifest.get('build-dependencies', {}), False)]
+        tables += [(target.get('dependencies', {}), True) for target in manifest.get('target', {}).values()]
+        for table, target_specific in tables:
+            for key, spec in table.items():
+                if isinstance(spec, dict) and spec.get('workspace') and key in shared:
+                    # Members can add features to a workspace dependency, but not remove defaults.
+                    merged = dict(shared[key])
+                    merged['features'] = merged['features'] + list(spec.get('features', []))
+                    merged['optional'] = spec.get('optional', False)
+                else:
+                    merged = dependency_spec(key, spec)
+                if merged['package'] in crates:
+                    for request in dependency_requests(merged):
+                        requests[request].add(member)
+                    pinned.update((merged['package'], feature) for feature in merged['features']
+                                  if target_specific or feature in PERFORMANCE_FEATURES)
+    return requests, pinned
+
+def resolve_features(crates, requests):
+    """
+    Close (package, entry) requests over the crates' feature tables, like cargo's feature
+    unification.
+
+    Entries are feature names, `dep:name`, `name/feature` or `name?/feature`; `default` stands
+    for a crate's default features. Returns the enabled names per activated crate: its features,
+    its optional dependencies as `dep:name`, and (for `#[cfg(feature = ...)]` on implicit
+    features) the optional dependencies' bare names.
+    """
+    enabled = defaultdict(set)
+    weak = defaultdict(list)
+    queue = list(requests)
+
+    def enable_dependency(crate, key):
+        if f'dep:{key}' in enabled[crate]:
+            return
+        enabled[crate].add(f'dep:{key}')
+        spec = crates[crate]['dependencies'].get(key)
+        if spec and spec['optional']:
+            enabled[crate].add(key)
+        queue.extend(weak.pop((crate, key), []))
+        if spec and spec['package'] in crates:
+            queue.extend(dependency_requests(spec))
+
+    while queue:
+        crate, entry = queue.pop()
+        if crate not in enabled:
+            enabled[crate] = set()
+            for key, spec in crates[crate]['dependencies'].items():
+                if not spec['optional']:
+                    enable_dependency(crate, key)
+        if entry is None:
+            continue
+        if entry.startswith('dep:'):
+            enable_dependency(crate, entry[4:])
+        elif '/' in entry:
+            key, feature = entry.split('/', 1)
+            spec = crates[crate]['dependencies'].get(key.rstrip('?'))
+            if spec is None:
+                continue
+            request = (spec['package'], feature)
+            if key.endswith('?'):
+                if spec['package'] not in crates:
+                    continue
+                if f"dep:{key[:-1]}" in enabled[crate]:
+                    queue.append(request)
+                else:
+                    weak[(crate, key[:-1])].append(request)
+            else:
+                enable_dependency(crate, key)
+                if spec['package'] in crates:
+                    queue.append(request)
+        elif entry not in enabled[crate]:
+            enabled[crate].add(entry)
+            if entry in crates[crate]['features']:
+                queue.extend((crate, sub) for sub in crates[crate]['features'][entry])
+            elif entry in crates[crate]['dependencies']:
+                enable_dependency(crate, entry)
+    return dict(enabled)
+
+# --- cfg predicates -------------------------------------------------------------------------
+
+def parse_cfg(text):
+    """Parse the predicate inside `cfg(...)` into nested tuples."""
+    tokens = [next(group for group in match.groups() if group) for match in CFG_TOKEN.finditer(text)]
+
+    def predicate(i):
+        name = tokens[i]
+        if name in ('all', 'any', 'not') and i + 1 < len(tokens) and tokens[i + 1] == '(':
+            i += 2
+            items = []
+            while i < len(tokens) and tokens[i] != ')':
+                item, i = predicate(i)
+                items.append(item)
+                if i < len(tokens) and tokens[i] == ',':
+                    i += 1
+            return (name, items[0] if name == 'not' and items else tuple(items)), i + 1
+        if i + 2 < len(tokens) and tokens[i + 1] == '=':
+            value = tokens[i + 2][1:-1]
+            return (('feature', value) if name == 'feature' else ('other', f'{name} = "{value}"')), i + 3
+        return (('off', name) if name in DISABLED_CFGS else ('other', name)), i + 1
+
+    try:
+        return predicate(0)[0] if tokens else ('other', '')
+    except (IndexError, StopIteration):
+        return ('other', text)
+
+def evaluate(predicate, enabled):
+    """True, False, or None when it depends on something other than features (target, backend, ...)."""
+    kind = predicate[0]
+    if kind == 'feature':
+        return predicate[1] in enabled
+    if kind == 'off':
+        return False
+    if kind == 'other':
+        return None
+    if kind == 'not':
+        value = evaluate(predicate[1], enabled)
+        return None if value is None else not value
+    values = [evaluate(item, enabled) for item in predicate[1]]
+    if kind == 'all':
+        return False if False in values else (None if None in values else True)
+    return True if True in values else (None if None in values else False)
+
+def mentioned_features(predicate):
+    kind = predicate[0]
+    if kind == 'feature':
+        return {predicate[1]}
+    if kind == 'not':
+        return mentioned_features(predicate[1])
+    if kind in ('all', 'any'):
+        return set().union(*(mentioned_features(item) for item in predicate[1]))
+    return set()
+
+def conjunction(predicates):
+    predicates = [p for p in predicates if p is not None]
+    if not predicates:
+        return None
+    return predicates[0] if len(predicates) == 1 else ('all', tuple(predicates))
+
+# --- Source scanning ------------------------------------------------------------------------
+
+def skip_literal(text, i):
+    """If a string, char literal or comment starts at `i`, the index just past it; else None."""
+    if text.startswith('//', i):
+        end = text.find('\n', i)
+        return len(text) if end == -1 else end
+    if text.startswith('/*', i):
+        end = text.find('*/', i + 2)
+        return len(text) if end == -1 else end + 2
+    raw = re.match(r'b?r(#*)"', text[i:i + 64])
+    if raw and (i == 0 or not (text[i - 1].isalnum() or text[i - 1] == '_')):
+        end = text.find('"' + raw.group(1), i + raw.end())
+        return len(text) if end == -1 else end + 1 + len(raw.group(1))
+    if text[i] == '"':
+        i += 1
+        while i < len(text) and text[i] != '"':
+            i += 2 if text[i] == '\\' else 1
+        return i + 1
+    if text[i] == "'":
+        match = CHAR_LITERAL.match(text, i)
+        if match:
+            return match.end()
+    return None
+
+def matching_paren(text, i):
+    """The index of the parenthesis closing the one at `i`."""
+    depth = 0
+    while i < len(text):
+        skipped = skip_literal(text, i)
+        if skipped is not None:
+            i = skipped
+            continue
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text)
+
+def item_end(text, i):
+    """
+    The end of the item (or statement, field, match arm) starting at or after `i`.
+
+    Skips further attributes, then scans to the first `;` or `,` outside brackets, to the brace
+    closing the item's block, or to a bracket closing the enclosing one.
+    """
+    depth = 0
+    angle = 0
+    while i < len(text):
+        skipped = skip_literal(text, i)
+        if skipped is not None:
+            i = skipped
+            continue
+        c = text[i]
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+            if depth < 0:
+                return i
+            if depth == 0 and c == '}':
+                return i + 1
+        elif depth == 0:
+            if text.startswith('->', i) or text.startswith('=>', i):
+                i += 2
+                continue
+            if c == '<':
+                angle += 1
+            elif c == '>':
+                angle = max(0, angle - 1)
+            elif c == ';' or (c == ',' and angle == 0):
+                return i + 1
+        i += 1
+    return len(text)
+
+def cfg_regions(text):
+    """(start, end, predicate) for every feature-dependent `#[cfg]`, and the file's `#![cfg]`s."""
+    regions = []
+    inner = []
+    for match in CFG_ATTRIBUTE.finditer(text):
+        # Skip matches inside comments and strings by checking the line so far.
+        line_start = text.rfind('\n', 0, match.start()) + 1
+        if '//' in text[line_start:match.start()] or '"' in text[line_start:match.start()]:
+            continue
+        close = matching_paren(text, match.end() - 1)
+        predicate = parse_cfg(text[match.end():close])
+        if not mentioned_features(predicate) and predicate[0] != 'off':
+            continue
+        if match.group(1):
+            inner.append(predicate)
+            continue
+        end_of_attribute = text.find(']', close) + 1
+        regions.append((match.start(), item_end(text, end_of_attribute), predicate))
+    return regions, inner
+
+def module_files(crate_dir):
+    """
+    Walk a crate's module tree from src/lib.rs, returning each file's text, gated regions (as
+    1-based line ranges) and the condition under which the whole file is compiled.
+    """
+    root = crate_dir / 'src' / 'lib.rs'
+    if not root.exists():
+        return {}
+    files = {}
+    pending = [(root, None)]
+    while pending:
+        path, condition = pending.pop()
+        if path in files or not path.exists():
+            continue
+        text = path.read_text(errors='replace')
+        regions, inner = cfg_regions(text)
+        condition = conjunction([condition, *inner])
+        line_starts = [0] + [m.end() for m in re.finditer('\n', text)]
+        line_of = lambda offset: bisect.bisect_right(line_starts, offset)
+        files[path] = {
+            'text': text,
+            'condition': condition,
+            'regions': [(line_of(start), line_of(max(start, end - 1)), predicate)
+                        for start, end, predicate in regions],
+        }
+
+        if path.name in ('lib.rs', 'main.rs', 'mod.rs'):
+            base = path.parent
+        else:
+            base = path.parent / path.stem
+        for match in MOD_DECLARATION.finditer(text):
+            name = match.group(1)
+            previous = text[:match.start()].rstrip().rsplit('\n', 1)[-1]
+            explicit = PATH_ATTRIBUTE.search(previous)
+            candidates = ([path.parent / explicit.group(1)] if explicit
+                          else [base / f'{name}.rs', base / name / 'mod.rs'])
+            enclosing = [predicate for start, end, predicate in regions if start <= match.start() < end]
+            for candidate in candidates:
+                if candidate.exists():
+                    pending.append((candidate.resolve(), conjunction([condition, *enclosing])))
+                    break
+    return files
+
+def line_segments(info):
+    """Bytes of the file grouped by the condition each line is compiled under."""
+    segments = Counter()
+    lines = info['text'].splitlines(keepends=True)
+    covering = defaultdict(list)
+    for index, (start, end, _) in enumerate(info['regions']):
+        for line in range(start, end + 1):
+            covering[line].append(index)
+    for number, line in enumerate(lines, 1):
+        segments[tuple(covering[number])] += len(line.encode())
+    return [(size, conjunction([info['condition'], *(info['regions'][i][2] for i in key)]))
+            for key, size in segments.items()]
+
+def declared_names(text):
+    """Names of the items declared in a piece of source, including `use` imports."""
+    text = COMMENT.sub('', text)
+    names = {a or b or c for a, b, c in GATED_ITEM.findall(text)}
+    for use in USE_DECLARATION.findall(text):
+        # Imports from the standard library don't depend on the crate's features.
+        if use.lstrip(':').split('::', 1)[0].strip() in ('std', 'core', 'alloc'):
+            continue
+        names.update(a or b for a, b in USE_NAME.findall(use))
+    return names - {'self', 'super', 'crate', '_'}
+
+def workspace_identifiers(repo_root):
+    """Every identifier in the sources of the workspace's own crates."""
+    identifiers = set()
+    for path in (repo_root / 'rust').glob('**/*.rs'):
+        if 'target' not in path.parts:
+            identifiers.update(IDENTIFIER.findall(path.read_text(errors='replace')))
+    return identifiers
+
+def gated_items_in_use(sources, used_names, repo_root):
+    """
+    Gated code that the call graph can't see used: type aliases, re-exports, `cfg_if!` branches,
+    whole gated modules, and functions missing from the corpus.
+
+    Returns (crate, file, line, names, predicate) for each gated region or file that declares a
+    name used in rust/ sources or reachable functions. Names the crate also declares outside any
+    feature gate (`new`, `from`, ...) prove nothing and are ignored.
+    """
+    units = defaultdict(list)
+    ungated = defaultdict(set)
+    for crate, files in sources.items():
+        for path, info in files.items():
+            lines = info['text'].splitlines()
+            relative = str(path.relative_to(repo_root.resolve()))
+            gated_lines = set()
+            for start, end, predicate in info['regions']:
+                if not mentioned_features(predicate):
+                    continue
+                gated_lines.update(range(start, end + 1))
+                enclosing = [p for s, e, p in info['regions'] if s <= start <= e]
+                units[crate].append((relative, start, '\n'.join(lines[start - 1:end]),
+                                     conjunction([info['condition'], *enclosing])))
+            if info['condition'] is not None and mentioned_features(info['condition']):
+                units[crate].append((relative, 1, info['text'], info['condition']))
+            else:
+                ungated[crate].update(declared_names('\n'.join(line for number, line in enumerate(lines, 1)
+                                                               if number not in gated_lines)))
+    required = []
+    for crate, crate_units in units.items():
+        for relative, line, text, predicate in crate_units:
+            names = (declared_names(text) & used_names) - ungated[crate]
+            if names:
+                required.append((crate, relative, line, sorted(names), predicate))
+    return required
+
+def forwards_outside(crates, crate, feature, seen=None):
+    """Whether enabling `feature` of `crate` enables anything in a crate that isn't vendored."""
+    seen = set() if seen is None else seen
+    if (crate, feature) in seen:
+        return False
+    seen.add((crate, feature))
+    dependencies = crates[crate]['dependencies']
+    if feature not in crates[crate]['features'] and feature in dependencies:
+        # The implicit feature of an optional dependency.
+        return dependencies[feature]['package'] not in crates
+    for entry in crates[crate]['features'].get(feature, []):
+        key = entry[4:] if entry.startswith('dep:') else entry.split('/', 1)[0].rstrip('?')
+        if key in dependencies:
+            package = dependencies[key]['package']
+            if package not in crates:
+                return True
+            if '/' in entry and forwards_outside(crates, package, entry.split('/', 1)[1], seen):
+                return True
+        elif key in crates[crate]['features'] and forwards_outside(crates, crate, key, seen):
+            return True
+    return False
+
+# --- Analysis -------------------------------------------------------------------------------
+
+def analyze(data, crates, requests, repo_root, pinned=frozenset()):
+    """Map corpus functions onto gates, then search for the smallest sufficient feature set."""
+    by_dir = {info['dir']: name for name, info in crates.items()}
+    sources = {name: module_files(repo_root / info['dir']) for name, info in crates.items()}
+
+    functions = {}
+    body_of = {}
+    by_file = defaultdict(list)
+    for item in data:
+        path = item.get('relative_path', '')
+        parts = path.split('/')
+        if len(parts) < 2 or parts[0] != 'deps' or f'deps/{parts[1]}' not in by_dir:
+            continue
+        crate = by_dir[f'deps/{parts[1]}']
+        body = item.get('body', '')
+        body_of[item['identifier']] = body
+        functions[item['identifier']] = {
+            'crate': crate, 'path': path, 'name': item.get('display_name', ''), 'size': len(body),
+            'predicate': None, 'gates': [], 'located': False, 'trait_impl': False,
+        }
+        by_file[(crate, (repo_root / path).resolve())].append(
+            (item['identifier'], body, first_line(body), body.count('\n') + 1))
+
+    for (crate, path), entries in by_file.items():
+        info = sources[crate].get(path)
+        if info is None:
+            continue
+        spans = locate_spans(info['text'], entries)
+        lines = info['text'].splitlines()
+        for key, (first, last) in spans.items():
+            enclosing = [(start, end, predicate) for start, end, predicate in info['regions']
+                         if start <= first <= end]
+            function = functions[key]
+            function['located'] = True
+            function['predicate'] = conjunction([info['condition'], *(p for _, _, p in enclosing)])
+            # Gated statements inside the body matter too: they pick between implementations.
+            function['gates'] = [function['predicate'], *(predicate for start, _, predicate in info['regions']
+                                                          if first < start <= last)]
+            function['trait_impl'] = any(TRAIT_IMPL.match(lines[start - 1]) for start, _, _ in enclosing
+                                         if start - 1 < len(lines))
+
+    # Deps functions reachable from rust/ code.
+    deps_of = {item['identifier']: item.get('deps', []) for item in data}
+    stack = [dep for item in data if item.get('relative_path', '').startswith('rust/')
+             for dep in item.get('deps', []) if dep in functions]
+    reachable = set()
+    while stack:
+        current = stack.pop()
+        if current in reachable:
+            continue
+        reachable.add(current)
+        stack.extend(dep for dep in deps_of.get(current, []) if dep in functions)
+
+    segments = {crate: [segment for info in files.values() for segment in line_segments(info)]
+                for crate, files in sources.items()}
+
+    def compiled_bytes(enabled):
+        return {crate: sum(size for size, predicate in segments[crate]
+                           if predicate is None or evaluate(predicate, enabled[crate]) is not False)
+                for crate in enabled}
+
+    # A `default` request is expanded so that each default feature can be dropped on its own.
+    top_level = set()
+    for (crate, entry) in requests:
+        if entry == 'default':
+            top_level.update((crate, sub) for sub in crates[crate]['features'].get('default', []))
+        else:
+            top_level.add((crate, entry))
+
+    current = resolve_features(crates, top_level)
+    covered = {function['crate'] for function in functions.values()}
+    gated_off = {key for key in reachable
+                 if functions[key]['predicate'] is not None
+                 and evaluate(functions[key]['predicate'], current.get(functions[key]['crate'], set())) is False}
+    constrained = [(function['crate'], [gate for gate in function['gates'] if gate is not None])
+                   for function in (functions[key] for key in reachable - gated_off)]
+    constrained = [(crate, gates) for crate, gates in constrained if gates]
+
+    used_names = workspace_identifiers(repo_root)
+    for key in reachable:
+        used_names.update(IDENTIFIER.findall(body_of[key]))
+    required_items = gated_items_in_use(sources, used_names, repo_root)
+    constrained += [(crate, [predicate]) for crate, _, _, _, predicate in required_items]
+    # Features that forward to crates outside deps/ also change code the corpus doesn't cover, so
+    # dropping them can only be checked within deps/.
+    opaque = {(crate, entry) for crate, entry in top_level
+              if entry and forwards_outside(crates, crate, entry)}
+
+    def unchanged(enabled):
+        """Whether every reachable function compiles exactly as it does now."""
+        return all(evaluate(gate, enabled.get(crate, set())) == evaluate(gate, current.get(crate, set()))
+                   for crate, gates in constrained for gate in gates)
+
+    current_bytes = compiled_bytes(current)
+
+    def saving(candidate):
+        enabled = resolve_features(crates, candidate)
+        after = compiled_bytes(enabled)
+        return sum(current_bytes[crate] - after.get(crate, 0) for crate in current_bytes)
+
+    # Only features of crates the corpus covers can be judged; drop the most expensive first.
+    droppable = sorted((request for request in top_level
+                        if request[0] in covered and request[1] and request not in pinned),
+                       key=lambda request: (-saving(top_level - {request}), request))
+    minimal = set(top_level)
+    for request in droppable:
+        candidate = minimal - {request}
+        if unchanged(resolve_features(crates, candidate)):
+            minimal = candidate
+    # Only suggest drops that change something: other requests may still enable the feature.
+    minimized = resolve_features(crates, minimal)
+    for request in sorted(top_level - minimal):
+        if resolve_features(crates, minimal | {request}) == minimized:
+            minimal.add(request)
+    minimal_bytes = compiled_bytes(minimized)
+
+    def restored(request):
+        """Source bytes that putting one dropped request back would compile again."""
+        after = compiled_bytes(resolve_features(crates, minimal | {request}))
+        return sum(after[crate] - minimal_bytes.get(crate, 0) for crate in after)
+
+    unverifiable = {request: restored(request) for request in (top_level - minimal) & opaque}
+
+    return {
+        'functions': functions,
+        'reachable': reachable,
+        'gated_off': gated_off,
+        'required_items': required_items,
+        'pinned': pinned & top_level,
+        'unverifiable': unverifiable,
+        'covered': covered,
+        'top_level': top_level,
+        'minimal': minimal,
+        'current': current,
+        'minimized': minimized,
+        'current_bytes': current_bytes,
+        'minimal_bytes': minimal_bytes,
+    }
+
+def load_timings(timings_file):
+    """Build seconds per crate from `cargo build --timings=json` (`timing-info` messages)."""
+    durations = Counter()
+    with open(timings_file, 'r') as f:
+        for line in f:
+            if not line.startswith('{'):
+                continue
+            message = json.loads(line)
+            if message.get('reason') != 'timing-info' or message.get('mode') != 'build':
+                continue
+            durations[message.get('target', {}).get('name', '').replace('_', '-')] += message.get('duration', 0)
+    return durations
+
+def crate_time(durations, crate):
+    return durations.get(crate, durations.get(crate.replace('_', '-'), 0))
+
+def optional_dependencies(enabled_names, crate_info):
+    return {name[4:] for name in enabled_names if name.startswith('dep:')
+            and crate_info['dependencies'].get(name[4:], {}).get('optional')}
+
+def generate_markdown_report(result, crates, requests, durations):
+    """Generate a markdown report of feature suggestions and dead API."""
+    functions = result['functions']
+    reachable = result['reachable']
+    current, minimized = result['current'], result['minimized']
+
+    md_content = []
+    md_content.append("# LibSignal Deps Feature Advisor")
+    md_content.append("")
+    md_content.append("Features of the vendored `deps/` crates that no function reachable from `rust/` needs, "
+                      "and the source they compile. Features used only through trait impls, derives or macros "
+                      "can look unused: check each suggestion with `cargo check --workspace`.")
+    md_content.append("")
+
+    md_content.append("## 📊 Vendored Crates")
+    md_content.append("")
+    md_content.append("| Crate | Corpus Functions | Reachable | Usage % | Enabled Features | Compiled Source |")
+    md_content.append("|-------|------------------|-----------|---------|------------------|-----------------|")
+    totals = Counter(function['crate'] for function in functions.values())
+    used = Counter(functions[key]['crate'] for key in reachable)
+    for crate in sorted(crates, key=lambda c: -result['current_bytes'].get(c, 0)):
+        if crate not in current:
+            continue
+        features = sorted(name for name in current[crate] if not name.startswith('dep:')
+                          and name in crates[crate]['features'])
+        usage = used[crate] / totals[crate] * 100 if totals[crate] else 0
+        md_content.append(f"| `{crate}` | {totals[crate]} | {used[crate]} | {usage:.1f}% "
+                          f"| {', '.join(features) or '—'} | {result['current_bytes'][crate] / 1024:,.0f} KiB |")
+    md_content.append("")
+
+    md_content.append("## ✂️ Suggested Feature Sets")
+    md_content.append("")
+    dropped = sorted(result['top_level'] - result['minimal'])
+    if not dropped:
+        md_content.append("Every requested feature is needed by some reachable function.")
+        md_content.append("")
+    else:
+        md_content.append("| Crate | Drop | Features Left | Source Saved | Optional Deps No Longer Built | Est. Build Time Saved |")
+        md_content.append("|-------|------|---------------|--------------|-------------------------------|-----------------------|")
+        total_seconds = 0.0
+        for crate in sorted({crate for crate, _ in dropped} | (set(current) - set(minimized))):
+            before = result['current_bytes'].get(crate, 0)
+            after = result['minimal_bytes'].get(crate, 0)
+            lost_deps = sorted(optional_dependencies(current.get(crate, set()), crates[crate])
+                               - optional_dependencies(minimized.get(crate, set()), crates[crate]))
+            seconds = None
+            if durations:
+                seconds = crate_time(durations, crate) * (1 - after / before if before else 0)
+                seconds += sum(crate_time(durations, dep) for dep in lost_deps)
+                total_seconds += seconds
+            remaining = sorted(name for name in minimized.get(crate, set()) if name in crates[crate]['features'])
+            drops = [f"`{e}`" + (' (unverifiable)' if (c, e) in result['unverifiable'] else '')
+                     for c, e in dropped if c == crate]
+            md_content.append(f"| `{crate}` | {', '.join(drops) or '—'} "
+                              f"| {', '.join(remaining) or '—'} "
+                              f"| {(before - after) / 1024:,.1f} KiB ({(1 - after / before) * 100 if before else 0:.0f}%) "
+                              f"| {', '.join(lost_deps) or '—'} "
+                              f"| {'—' if seconds is None else f'{seconds:.1f}s'} |")
+        md_content.append("")
+        if durations:
+            md_content.append(f"**Estimated build time saved:** {total_seconds:.1f}s (each crate's build time "
+                              "scaled by the share of its source no longer compiled, plus dropped dependencies)")
+        else:
+            md_content.append("Pass `--timings` with the output of `cargo build --timings=json -Zunstable-options "
+                              "--message-format=json` to turn source size into build time.")
+        md_content.append("")
+        md_content.append("**Where the dropped features are requested** (set `default-features = false` in the "
+                          "workspace `Cargo.toml` for dropped defaults):")
+        md_content.append("")
+        for crate, entry in dropped:
+            members = sorted(requests.get((crate, entry)) or requests.get((crate, 'default'), set()))
+            md_content.append(f"- `{crate}/{entry}`: {', '.join(f'`{m}`' for m in members)}")
+        md_content.append("")
+
+    if result['unverifiable']:
+        md_content.append("## ❓ Unverifiable Drops")
+        md_content.append("")
+        md_content.append("These features also enable features of crates outside `deps/`, which the corpus doesn't "
+                          "cover. Nothing reachable in `deps/` needs them, but their effect on the other crates "
+                          "can't be checked here: confirm each one with `cargo check --workspace` before dropping it.")
+        md_content.append("")
+        md_content.append("| Crate | Feature | Est. Source Saved in deps/ |")
+        md_content.append("|-------|---------|----------------------------|")
+        for (crate, entry), saved in sorted(result['unverifiable'].items(), key=lambda kv: (-kv[1], kv[0])):
+            md_content.append(f"| `{crate}` | `{entry}` | {saved / 1024:,.1f} KiB |")
+        md_content.append("")
+
+    if result['pinned'] or result['required_items']:
+        md_content.append("## 📌 Features Kept Without a Reachable Function")
+        md_content.append("")
+        for crate, entry in sorted(result['pinned']):
+            members = sorted(requests.get((crate, entry), set()))
+            md_content.append(f"- `{crate}/{entry}`: pinned, requested explicitly (for performance or for specific "
+                              f"targets) by {', '.join(f'`{m}`' for m in members)}")
+        if result['pinned']:
+            md_content.append("")
+        if result['required_items']:
+            md_content.append("Gated items the call graph doesn't reach, but whose names `rust/` or reachable functions use:")
+            md_content.append("")
+            md_content.append("| Crate | Items | Gated By | Location |")
+            md_content.append("|-------|-------|----------|----------|")
+            for crate, path, line, names, predicate in sorted(result['required_items'])[:30]:
+                md_content.append(f"| `{crate}` | {', '.join(f'`{n}`' for n in names[:5])} "
+                                  f"| {', '.join(sorted(mentioned_features(predicate))) or '—'} | `{path}:{line}` |")
+            md_content.append("")
+
+    md_content.append("## 🔎 Feature Gates")
+    md_content.append("")
+    md_content.append("Corpus functions behind each feature, and how many rust/ code reaches.")
+    md_content.append("")
+    md_content.append("| Crate | Feature | Enabled | Gated Functions | Reachable | Gated Body Size | Trait Impls |")
+    md_content.append("|-------|---------|---------|-----------------|-----------|-----------------|-------------|")
+    gates = defaultdict(list)
+    for key, function in functions.items():
+        if function['predicate'] is not None:
+            for feature in mentioned_features(function['predicate']):
+                gates[(function['crate'], feature)].append(key)
+    for (crate, feature), keys in sorted(gates.items(), key=lambda kv: (kv[0][0], -len(kv[1]))):
+        md_content.append(f"| `{crate}` | `{feature}` | {'yes' if feature in current.get(crate, ()) else 'no'} "
+                          f"| {len(keys)} | {sum(1 for k in keys if k in reachable)} "
+                          f"| {sum(functions[k]['size'] for k in keys) / 1024:,.1f} KiB "
+                          f"| {sum(1 for k in keys if functions[k]['trait_impl'])} |")
+    md_content.append("")
+
+    md_content.append("## 🪦 Dead API by File")
+    md_content.append("")
+    md_content.append("Files of covered crates where no corpus function is reachable from rust/.")
+    md_content.append("")
+    md_content.append("| Crate | File | Functions | Body Size | Gated By |")
+    md_content.append("|-------|------|-----------|-----------|----------|")
+    file_functions = defaultdict(list)
+    for key, function in functions.items():
+        file_functions[(function['crate'], function['path'])].append(key)
+    dead_files = [(crate, path, keys) for (crate, path), keys in file_functions.items()
+                  if not any(k in reachable for k in keys)]
+    dead_files.sort(key=lambda entry: -sum(functions[k]['size'] for k in entry[2]))
+    for crate, path, keys in dead_files[:30]:
+        gated_by = set().union(*(mentioned_features(functions[k]['predicate']) for k in keys
+                                 if functions[k]['predicate'] is not None))
+        md_content.append(f"| `{crate}` | `{path}` | {len(keys)} "
+                          f"| {sum(functions[k]['size'] for k in keys) / 1024:,.1f} KiB "
+                          f"| {', '.join(sorted(gated_by)) or '—'} |")
+    md_content.append("")
+
+    unlocated = [key for key, function in functions.items() if not function['located']]
+    if result['gated_off'] or unlocated:
+        md_content.append("## ⚠️ Unmatched Functions")
+        md_content.append("")
+        if result['gated_off']:
+            md_content.append(f"{len(result['gated_off'])} reachable functions are gated off in the current build "
+                              "(probably reached only from tests) and were not used as constraints:")
+            md_content.append("")
+            for key in sorted(result['gated_off'])[:20]:
+                md_content.append(f"- `{key}`")
+            md_content.append("")
+        if unlocated:
+            md_content.append(f"{len(unlocated)} corpus functions could not be found in their source files "
+                              "(treated as ungated).")
+            md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Features are resolved like cargo's feature unification over `deps/*/Cargo.toml`, starting from the non-dev dependencies of the crates under `rust/`")
+    md_content.append("- Gates come from `#[cfg]` attributes on items, statements and `mod` declarations; cfgs that depend on the target or backend are treated as possibly enabled")
+    md_content.append("- Gated regions and modules (type aliases, `use` re-exports, `cfg_if!` branches) constrain the search when `rust/` sources or reachable functions mention a name only they declare")
+    md_content.append("- Features that forward to crates outside `deps/` (e.g. `aead/alloc`) are judged on `deps/` alone and reported as unverifiable, with the source they save in `deps/`")
+    md_content.append(f"- Performance features ({', '.join(sorted(PERFORMANCE_FEATURES))}) and features added in target-specific dependency tables are never dropped")
+    md_content.append("- Requested features are dropped greedily, largest saving first; a drop is kept if every reachable function, including gated statements in its body, compiles as before")
+    md_content.append("- Source size is a proxy for build time unless cargo timings are given")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--timings', help='JSON messages from `cargo build --timings=json` to estimate build time')
+    parser.add_argument('--output', default='FEATURE_ADVISOR_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    crates = load_deps_crates(REPO_ROOT)
+    requests, pinned = workspace_requests(REPO_ROOT, crates)
+    durations = load_timings(args.timings) if args.timings else Counter()
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    print("Mapping feature gates...")
+    result = analyze(data, crates, requests, REPO_ROOT, pinned)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(result, crates, requests, durations))
+
+    for crate in sorted(result['covered']):
+        before = result['current_bytes'].get(crate, 0)
+        after = result['minimal_bytes'].get(crate, 0)
+        dropped = sorted(entry + (' (unverifiable)' if (c, entry) in result['unverifiable'] else '')
+                         for c, entry in result['top_level'] - result['minimal'] if c == crate)
+        print(f"  {crate:<20} drop {', '.join(dropped) or 'nothing'}; "
+              f"{(before - after) / 1024:,.0f} KiB less source")
+    print(f"\n📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
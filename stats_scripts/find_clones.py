@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate functions across rust/ and deps/ in libsignal.
+
+Function bodies are normalized into token streams, shingled, and summarized with MinHash
+signatures; LSH banding then yields candidate clone pairs without comparing every pair of
+functions. Candidates are confirmed with the exact Jaccard similarity of their shingles and
+grouped into clusters, which are ranked and reported together with their callers.
+"""
+
+import argparse
+import re
+import sys
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+from analyze_deps import load_data
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: find_clones.py needs numpy (pip install numpy)")
+    sys.exit(1)
+
+RUST_KEYWORDS = {
+    'as', 'async', 'await', 'break', 'const', 'continue', 'crate', 'dyn', 'else', 'enum', 'extern',
+    'false', 'fn', 'for', 'if', 'impl', 'in', 'let', 'loop', 'match', 'mod', 'move', 'mut', 'pub',
+    'ref', 'return', 'self', 'Self', 'static', 'struct', 'super', 'trait', 'true', 'type', 'unsafe',
+    'use', 'where', 'while', 'Some', 'None', 'Ok', 'Err',
+}
+
+TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>b?"(?:\\.|[^"\\])*"|b?'(?:\\.|[^'\\])')
+  | (?P<number>\b\d[\w.]*)
+  | (?P<ident>[A-Za-z_]\w*!?)
+  | (?P<punct>::|->|=>|==|!=|<=|>=|&&|\|\||[^\s\w])
+''', re.VERBOSE | re.DOTALL)
+
+# MinHash parameters: 128 hash functions split into 16 bands of 8 rows, which makes pairs with
+# a Jaccard similarity above ~0.7 very likely to share a bucket.
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+MERSENNE_PRIME = (1 << 31) - 1
+
+def normalize_tokens(body):
+    """Tokenize a function body, abstracting away names and literals."""
+    tokens = []
+    for match in TOKEN.finditer(body):
+        kind = match.lastgroup
+        text = match.group(kind)
+        if kind == 'comment':
+            continue
+        elif kind == 'string':
+            tokens.append('STR')
+        elif kind == 'number':
+            tokens.append('NUM')
+        elif kind == 'ident':
+            # Keep keywords, macros and calls' shape; rename everything else.
+            tokens.append(text if text in RUST_KEYWORDS or text.endswith('!') else 'ID')
+        else:
+            tokens.append(text)
+    return tokens
+
+def shingle_hashes(tokens, k):
+    """Return the distinct 32-bit hashes of the k-token shingles."""
+    return np.unique(np.fromiter(
+        (zlib.crc32(' '.join(tokens[i:i + k]).encode()) for i in range(len(tokens) - k + 1)),
+        dtype=np.uint64))
+
+def minhash_signatures(shingle_sets, seed):
+    """Compute MinHash signatures for all functions, one vectorized pass per function."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, size=NUM_PERMUTATIONS, dtype=np.uint64)
+    signatures = np.empty((len(shingle_sets), NUM_PERMUTATIONS), dtype=np.uint64)
+    for i, shingles in enumerate(shingle_sets):
+        # (a * h + b) mod p stays below 2^63 since a, b < 2^31 and h < 2^32.
+        hashed = (np.outer(shingles, a) + b) % MERSENNE_PRIME
+        signatures[i] = hashed.min(axis=0)
+    return signatures
+
+def candidate_pairs(signatures):
+    """Yield index pairs that share at least one LSH band bucket."""
+    seen = set()
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        rows = signatures[:, band * ROWS:(band + 1) * ROWS]
+        for i, key in enumerate(map(bytes, rows)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pair = (members[x], members[y])
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+def jaccard(left, right):
+    """Exact Jaccard similarity of two sorted arrays of distinct shingle hashes."""
+    intersection = len(np.intersect1d(left, right, assume_unique=True))
+    return intersection / (len(left) + len(right) - intersection)
+
+def find_clusters(pairs, count):
+    """Union-find the confirmed pairs into clusters of function indices."""
+    parent = list(range(count))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for x, y in pairs:
+        parent[find(x)] = find(y)
+
+    clusters = defaultdict(list)
+    for i in sorted({i for pair in pairs for i in pair}):
+        clusters[find(i)].append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+def build_callers(data):
+    """Map each function identifier to the identifiers of the functions that call it."""
+    callers = defaultdict(set)
+    for item in data:
+        for dep in item.get('deps', []):
+            callers[dep].add(item.get('identifier', ''))
+    return callers
+
+def owner_of(relative_path):
+    """rust/<module> or deps/<crate> for a corpus path."""
+    return '/'.join(relative_path.split('/')[:2])
+
+def analyze_clones(data, prefixes, min_tokens, shingle_size, threshold, seed):
+    """Find and rank clone clusters among the functions under `prefixes`."""
+    functions = []
+    shingle_sets = []
+    for item in data:
+        relative_path = item.get('relative_path', '')
+        if not relative_path.startswith(tuple(prefixes)):
+            continue
+        tokens = normalize_tokens(item.get('body', ''))
+        if len(tokens) < min_tokens:
+            continue
+        functions.append((item, len(tokens)))
+        shingle_sets.append(shingle_hashes(tokens, shingle_size))
+
+    signatures = minhash_signatures(shingle_sets, seed)
+    confirmed = []
+    candidates = 0
+    for x, y in candidate_pairs(signatures):
+        candidates += 1
+        # Cheap estimate first, exact similarity only for plausible pairs.
+        if np.mean(signatures[x] == signatures[y]) < threshold - 0.1:
+            continue
+        if jaccard(shingle_sets[x], shingle_sets[y]) >= threshold:
+            confirmed.append((x, y))
+
+    callers = build_callers(data)
+    clusters = []
+    for members in find_clusters(confirmed, len(functions)):
+        member_set = set(members)
+        items = [functions[i][0] for i in members]
+        identifiers = {item.get('identifier', '') for item in items}
+        cluster_callers = set().union(*(callers.get(ident, set()) for ident in identifiers)) - identifiers
+        similarities = [jaccard(shingle_sets[x], shingle_sets[y]) for x, y in confirmed
+                        if x in member_set]
+        clusters.append({
+            'members': sorted(((item, functions[i][1]) for item, i in zip(items, members)),
+                              key=lambda m: m[0].get('relative_path', '')),
+            'owners': sorted({owner_of(item.get('relative_path', '')) for item in items}),
+            'duplicated_tokens': sum(functions[i][1] for i in members) - max(functions[i][1] for i in members),
+            'similarity': sum(similarities) / len(similarities),
+            'callers': sorted(cluster_callers),
+        })
+
+    # Clusters spanning several crates/modules first, then by how much code is duplicated.
+    clusters.sort(key=lambda c: (len(c['owners']) > 1, c['duplicated_tokens'], len(c['callers'])), reverse=True)
+    return {
+        'functions_considered': len(functions),
+        'candidate_pairs': candidates,
+        'confirmed_pairs': len(confirmed),
+        'clusters': clusters,
+    }
+
+def generate_markdown_report(results, function_info, top, threshold):
+    """Generate a markdown report of clone clusters."""
+    clusters = results['clusters']
+    md_content = []
+    md_content.append("# LibSignal Near-Duplicate Function Report")
+    md_content.append("")
+    md_content.append("This report lists groups of functions in `rust/` and `deps/` whose normalized bodies are near-identical.")
+    md_content.append("")
+
+    md_content.append("## 📊 Overall Statistics")
+    md_content.append("")
+    md_content.append(f"- **Functions considered:** {results['functions_considered']}")
+    md_content.append(f"- **LSH candidate pairs:** {results['candidate_pairs']}")
+    md_content.append(f"- **Confirmed pairs (Jaccard ≥ {threshold}):** {results['confirmed_pairs']}")
+    md_content.append(f"- **Clone clusters:** {len(clusters)}")
+    md_content.append(f"- **Clusters spanning several crates/modules:** {sum(len(c['owners']) > 1 for c in clusters)}")
+    md_content.append("")
+
+    md_content.append(f"## 🧬 Top {top} Clone Clusters")
+    md_content.append("")
+    md_content.append("| Rank | Functions | Similarity | Duplicated Tokens | Callers | Crates / Modules |")
+    md_content.append("|------|-----------|------------|-------------------|---------|------------------|")
+    for i, cluster in enumerate(clusters[:top], 1):
+        owners = ', '.join(f"`{owner}`" for owner in cluster['owners'])
+        md_content.append(f"| {i} | {len(cluster['members'])} | {cluster['similarity']:.2f} "
+                          f"| {cluster['duplicated_tokens']} | {len(cluster['callers'])} | {owners} |")
+    md_content.append("")
+
+    md_content.append("## 🔍 Cluster Details")
+    md_content.append("")
+    for i, cluster in enumerate(clusters[:top], 1):
+        md_content.append(f"### Cluster {i}")
+        md_content.append("")
+        md_content.append("| Function | Tokens | Path |")
+        md_content.append("|----------|--------|------|")
+        for item, token_count in cluster['members']:
+            md_content.append(f"| `{item.get('display_name', '')}` | {token_count} | `{item.get('relative_path', '')}` |")
+        md_content.append("")
+        if cluster['callers']:
+            md_content.append("**Callers:** " + ', '.join(
+                f"`{function_info.get(caller, {}).get('display_name', caller)}` "
+                f"({function_info.get(caller, {}).get('relative_path', 'unknown')})"
+                for caller in cluster['callers'][:10])
+                + (f", … {len(cluster['callers']) - 10} more" if len(cluster['callers']) > 10 else ""))
+            md_content.append("")
+
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--paths', nargs='+', default=['rust/', 'deps/'],
+                        help='only consider functions under these path prefixes (default: %(default)s)')
+    parser.add_argument('--threshold', type=float, default=0.8,
+                        help='minimum Jaccard similarity of shingles (default: %(default)s)')
+    parser.add_argument('--min-tokens', type=int, default=40,
+                        help='ignore functions with fewer normalized tokens (default: %(default)s)')
+    parser.add_argument('--shingle-size', type=int, default=5, help='tokens per shingle (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the MinHash permutations')
+    parser.add_argument('--top', type=int, default=25, help='clusters to report (default: %(default)s)')
+    parser.add_argument('--output', default='CLONE_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    function_info = {item.get('identifier', ''): item for item in data}
+
+    print("Computing MinHash signatures and LSH buckets...")
+    results = analyze_clones(data, args.paths, args.min_tokens, args.shingle_size, args.threshold, args.seed)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(results, function_info, args.top, args.threshold))
+
+    print(f"\n🧬 {len(results['clusters'])} clone clusters from {results['confirmed_pairs']} confirmed pairs "
+          f"({results['candidate_pairs']} LSH candidates, {results['functions_considered']} functions)")
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
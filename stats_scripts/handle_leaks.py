@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Diff bridge handle-tracking snapshots over time and report the bridged types whose live counts grow.
+
+Snapshots come from `BridgeHandles_Snapshot` in a libsignal built with the `bridge-handle-tracking`
+feature (see rust/bridge/shared/types/src/handles.rs for the format). Pass them in the order they
+were taken, all from the same process. Each bridged type's live count is followed across the
+snapshots; types that keep growing are reported with the entry points that created them, and with
+the names the app sees them under in the generated `Native.d.ts` / `Native.java` / `signal_ffi.h`
+declarations.
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+
+SNAPSHOT_HEADER = '# libsignal-bridge-handles v1'
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+TS_INTERFACE = re.compile(r'^interface (\w+) \{ readonly __type: unique symbol; \}$')
+JAVA_DESTROY = re.compile(r'^public static native void (\w+)_Destroy\(long \w+\);$')
+FFI_STRUCT = re.compile(r'^typedef struct (Signal\w+) \1;$')
+HANDLE_FNS = re.compile(r'bridge_handle_fns!\(\s*(\w+)([^;]*?)\);', re.DOTALL)
+
+def parse_snapshot(text, source):
+    """(sample interval, {(bridge, rust type): counts}) for one snapshot."""
+    lines = text.splitlines()
+    if not lines or not lines[0].strip():
+        print(f"Warning: {source} is empty (was libsignal built without bridge-handle-tracking?)")
+        return None, {}
+    if lines[0].strip() != SNAPSHOT_HEADER:
+        raise ValueError(f"{source}: unsupported snapshot header {lines[0]!r}")
+    interval = None
+    entries = {}
+    for number, line in enumerate(lines[1:], start=2):
+        if line.startswith('# sample-interval '):
+            interval = int(line.split()[-1])
+            continue
+        if not line.strip() or line.startswith('#'):
+            continue
+        fields = line.split(' ')
+        if len(fields) != 7:
+            raise ValueError(f"{source}:{number}: expected 7 fields, got {len(fields)}")
+        bridge, rust_type, live, created, destroyed, high_water, site_list = fields
+        sites = {}
+        if site_list != '-':
+            for entry in site_list.split(','):
+                site, count = entry.rsplit(':', 1)
+                sites[site] = int(count)
+        entries[(bridge, rust_type)] = {
+            'live': int(live), 'created': int(created), 'destroyed': int(destroyed),
+            'high_water': int(high_water), 'sites': sites,
+        }
+    return interval, entries
+
+def short_type_name(rust_type):
+    """`libsignal_protocol::curve::PublicKey` -> `PublicKey`, ignoring any generic arguments."""
+    return rust_type.split('<', 1)[0].rsplit('::', 1)[-1]
+
+def load_jni_names(bridge_dir):
+    """Rust type -> JNI name, for the `bridge_handle_fns!` invocations that override it."""
+    names = {}
+    for path in sorted(bridge_dir.rglob('*.rs')):
+        for match in HANDLE_FNS.finditer(path.read_text(errors='replace')):
+            rust_type, options = match.groups()
+            if (jni := re.search(r'\bjni\s*=\s*(\w+)', options)):
+                names[rust_type] = jni.group(1)
+    return names
+
+def load_declarations(ts_file, java_file, ffi_file):
+    """bridge -> set of handle type names declared by the generated files that were given."""
+    declarations = {}
+    for bridge, path, pattern in (('node', ts_file, TS_INTERFACE), ('jni', java_file, JAVA_DESTROY),
+                                  ('ffi', ffi_file, FFI_STRUCT)):
+        if path:
+            declarations[bridge] = {match.group(1) for line in Path(path).read_text().splitlines()
+                                    if (match := pattern.match(line.strip()))}
+    return declarations
+
+def declared_name(bridge, rust_type, jni_names, declarations):
+    """(name the app sees for this type on `bridge`, whether the declarations confirm it)."""
+    short = short_type_name(rust_type)
+    if bridge == 'ffi':
+        name = f"Signal{short}"
+    elif bridge == 'jni':
+        name = jni_names.get(short, short)
+    else:
+        name = short
+    return name, bridge in declarations and name in declarations[bridge]
+
+def site_name(bridge, site):
+    """The entry point name the app calls, from the name recorded in the snapshot."""
+    if site == '?':
+        return '(no synchronous entry point)'
+    if bridge == 'ffi':
+        return f"signal_{site}"
+    if bridge == 'jni':
+        return site.replace('_1', '_')
+    return site
+
+def rising_fraction(series):
+    """Share of consecutive snapshot pairs in which the live count went up."""
+    steps = list(zip(series, series[1:]))
+    return sum(b > a for a, b in steps) / len(steps) if steps else 0
+
+def slope(series):
+    """Least-squares growth in live handles per snapshot."""
+    n = len(series)
+    if n < 2:
+        return 0
+    mean_x = (n - 1) / 2
+    mean_y = sum(series) / n
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(series))
+    return numerator / sum((x - mean_x) ** 2 for x in range(n))
+
+def analyze(snapshots, interval, jni_names, declarations, min_growth, min_rising):
+    """One row per (bridge, type) seen in any snapshot, with its live-count series and verdict."""
+    keys = sorted({key for snapshot in snapshots for key in snapshot})
+    rows = []
+    for bridge, rust_type in keys:
+        empty = {'live': 0, 'created': 0, 'destroyed': 0, 'high_water': 0, 'sites': {}}
+        counts = [snapshot.get((bridge, rust_type), empty) for snapshot in snapshots]
+        series = [c['live'] for c in counts]
+        first, last = counts[0], counts[-1]
+        name, confirmed = declared_name(bridge, rust_type, jni_names, declarations)
+        site_deltas = {site: count - first['sites'].get(site, 0) for site, count in last['sites'].items()}
+        sites = sorted(((site_name(bridge, site), delta * (interval or 1))
+                        for site, delta in site_deltas.items() if delta > 0),
+                       key=lambda pair: pair[1], reverse=True)
+        growth = series[-1] - series[0]
+        rising = rising_fraction(series)
+        rows.append({
+            'bridge': bridge,
+            'name': name,
+            'declared': confirmed,
+            'rust_type': rust_type,
+            'live': series,
+            'growth': growth,
+            'slope': slope(series),
+            'rising': rising,
+            'created': last['created'] - first['created'],
+            'destroyed': last['destroyed'] - first['destroyed'],
+            'high_water': max(c['high_water'] for c in counts),
+            'estimated_sites': sites,
+            'growing': growth >= min_growth and rising >= min_rising,
+        })
+    rows.sort(key=lambda row: (row['growing'], row['growth']), reverse=True)
+    return rows
+
+def generate_markdown_report(rows, snapshot_files, interval, declarations, top):
+    """Generate a markdown report of growing handle types."""
+    md_content = []
+    md_content.append("# LibSignal Bridge Handle Leaks")
+    md_content.append("")
+    md_content.append(f"Diffed {len(snapshot_files)} snapshot(s), in order: "
+                      f"{', '.join(f'`{f}`' for f in snapshot_files)}.")
+    md_content.append("")
+
+    growing = [row for row in rows if row['growing']]
+    md_content.append("## 📊 Summary")
+    md_content.append("")
+    md_content.append(f"- **Tracked types:** {len(rows)}")
+    md_content.append(f"- **Growing types:** {len(growing)}")
+    md_content.append(f"- **Live handles in the last snapshot:** {sum(row['live'][-1] for row in rows):,}")
+    md_content.append(f"- **Net growth across the snapshots:** {sum(row['growth'] for row in rows):+,}")
+    md_content.append("")
+
+    md_content.append("## 📈 Growing Types")
+    md_content.append("")
+    if growing:
+        md_content.append("| Type | Bridge | Live (first → last) | Growth | Per Snapshot | Rising | Created | Destroyed | High Water |")
+        md_content.append("|------|--------|---------------------|--------|--------------|--------|---------|-----------|------------|")
+        for row in growing[:top]:
+            name = f"`{row['name']}`" if row['declared'] or not declarations else f"`{row['name']}` (undeclared)"
+            md_content.append(f"| {name} | {row['bridge']} | {row['live'][0]:,} → {row['live'][-1]:,} "
+                              f"| {row['growth']:+,} | {row['slope']:+.1f} | {row['rising'] * 100:.0f}% "
+                              f"| {row['created']:,} | {row['destroyed']:,} | {row['high_water']:,} |")
+    else:
+        md_content.append("No type's live count grew enough to report.")
+    md_content.append("")
+
+    if growing:
+        md_content.append("## 📍 Where Growing Types Were Created")
+        md_content.append("")
+        md_content.append(f"Estimated creations per entry point between the first and last snapshot "
+                          f"(sampled counts × {interval or 1}).")
+        md_content.append("")
+        for row in growing[:top]:
+            md_content.append(f"### `{row['name']}` ({row['bridge']})")
+            md_content.append("")
+            md_content.append(f"Rust type: `{row['rust_type']}`")
+            md_content.append("")
+            if row['estimated_sites']:
+                md_content.append("| Entry Point | Estimated Creations |")
+                md_content.append("|-------------|---------------------|")
+                for site, estimate in row['estimated_sites'][:10]:
+                    md_content.append(f"| `{site}` | ~{estimate:,} |")
+            else:
+                md_content.append("No creations were sampled in this window.")
+            md_content.append("")
+
+    md_content.append("## 📋 All Tracked Types")
+    md_content.append("")
+    md_content.append("| Type | Bridge | Live | Growth | Created | Destroyed | High Water |")
+    md_content.append("|------|--------|------|--------|---------|-----------|------------|")
+    for row in sorted(rows, key=lambda row: row['live'][-1], reverse=True)[:top]:
+        md_content.append(f"| `{row['name']}` | {row['bridge']} | {row['live'][-1]:,} | {row['growth']:+,} "
+                          f"| {row['created']:,} | {row['destroyed']:,} | {row['high_water']:,} |")
+    md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- A type is growing when its live count rose by at least `--min-growth` overall and in at least `--min-rising` of the snapshot-to-snapshot steps")
+    md_content.append("- Node handles are only destroyed when the JavaScript wrapper is garbage-collected, so Node counts lag behind the app's own references")
+    md_content.append("- High-water marks are the largest seen in any snapshot; they are per-process and reset only when a snapshot asks for it")
+    md_content.append("- Creation sites are sampled; async results and FFI clones have no synchronous entry point and are grouped together")
+    md_content.append("- FFI names are the `Signal*` structs in signal_ffi.h, JNI names are the `*_Destroy` prefixes in Native.java, and Node names are the interfaces in Native.d.ts")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('snapshots', nargs='+', help='files written from BridgeHandles_Snapshot output, oldest first')
+    parser.add_argument('--node-decls', help='generated Native.d.ts to take type names from')
+    parser.add_argument('--java-decls', help='generated Native.java to take type names from')
+    parser.add_argument('--ffi-decls', help='generated signal_ffi.h to take type names from')
+    parser.add_argument('--min-growth', type=int, default=10,
+                        help='live handles a type must gain to be reported (default: %(default)s)')
+    parser.add_argument('--min-rising', type=float, default=0.6,
+                        help='fraction of snapshot steps in which it must grow (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=50, help='rows per table (default: %(default)s)')
+    parser.add_argument('--json', help='also write the per-type series as JSON')
+    parser.add_argument('--output', default='HANDLE_LEAKS_REPORT.md', help='markdown report (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    for path in [*args.snapshots, args.node_decls, args.java_decls, args.ffi_decls]:
+        if path and not Path(path).exists():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+    if len(args.snapshots) < 2:
+        print("Error: need at least two snapshots to diff")
+        sys.exit(1)
+
+    try:
+        parsed = [parse_snapshot(Path(path).read_text(), path) for path in args.snapshots]
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    interval = next((interval for interval, _ in parsed if interval), None)
+    snapshots = [entries for _, entries in parsed]
+
+    declarations = load_declarations(args.node_decls, args.java_decls, args.ffi_decls)
+    jni_names = load_jni_names(REPO_ROOT / 'rust' / 'bridge')
+    rows = analyze(snapshots, interval, jni_names, declarations, args.min_growth, args.min_rising)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(rows, args.snapshots, interval, declarations, args.top))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'sample_interval': interval, 'types': rows}, f, indent=2)
+
+    growing = [row for row in rows if row['growing']]
+    print(f"🔍 {len(rows)} tracked types across {len(snapshots)} snapshots, {len(growing)} growing")
+    for row in growing[:10]:
+        print(f"  {row['bridge']:<5} {row['name']:<40} {row['live'][0]:>8,} → {row['live'][-1]:<8,} ({row['growth']:+,})")
+    print(f"📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
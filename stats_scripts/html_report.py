@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Write the complete dependency analysis as a static, lazily loaded HTML report.
+
+Every rust→deps call edge (aggregated per caller/callee pair) is written out, pre-sorted by call
+count, into shards per deps crate, per rust module and per rust file, each split into chunks of
+--chunk-size rows. A small index lists every shard with its totals. The page loads the index, and
+then only the chunks a table actually shows: paging forward fetches the next chunk, and searching a
+shard fetches the rest of it.
+
+Shards are JavaScript files that hand their data to the page (`dependencyReport.load(id, data)`)
+rather than JSON, because browsers refuse to `fetch()` from file:// URLs. The report therefore opens
+straight from local disk, with no server.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import load_data, analyze_dependencies, get_dep_crate_name
+from extended_analysis import module_for_path
+
+COLUMNS = ['Caller', 'Caller File', 'Callee', 'Callee File', 'Crate', 'Calls']
+VIEWS = ('crate', 'module', 'file')
+
+def build_rows(stats):
+    """One row per (rust caller, deps callee) pair, most calls first."""
+    function_info = stats['function_info']
+    edge_calls = Counter()
+    for caller, deps_list in stats['rust_to_deps_calls'].items():
+        for dep in deps_list:
+            edge_calls[(caller, dep)] += 1
+
+    rows = []
+    for (caller, dep), calls in edge_calls.items():
+        caller_info = function_info.get(caller, {})
+        dep_info = function_info.get(dep, {})
+        rows.append([
+            caller_info.get('display_name', caller),
+            caller_info.get('relative_path', 'unknown'),
+            dep_info.get('display_name', dep),
+            dep_info.get('relative_path', 'unknown'),
+            get_dep_crate_name(dep_info.get('relative_path', '')) or 'unknown',
+            calls,
+        ])
+    rows.sort(key=lambda row: (-row[5], row[0], row[2], row[1], row[3]))
+    return rows
+
+def group_rows(rows):
+    """Rows per shard of each view; rows keep their global order."""
+    groups = {view: defaultdict(list) for view in VIEWS}
+    for row in rows:
+        caller_path = row[1]
+        groups['crate'][row[4]].append(row)
+        groups['module'][module_for_path(caller_path) or caller_path].append(row)
+        groups['file'][caller_path].append(row)
+    return groups
+
+def write_script(path, shard_id, payload):
+    """Write a shard as a script that hands its data to the page."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(f"dependencyReport.load({json.dumps(shard_id)}, ")
+        json.dump(payload, f, separators=(',', ':'))
+        f.write(");\n")
+
+def write_report(stats, output_dir, chunk_size):
+    """Write index.html, the shard index and every shard chunk; returns the index."""
+    rows = build_rows(stats)
+    groups = group_rows(rows)
+
+    data_dir = output_dir / 'data'
+    if data_dir.exists():
+        shutil.rmtree(data_dir)
+
+    views = {}
+    shard_files = 0
+    for view in VIEWS:
+        entries = []
+        ranked = sorted(groups[view].items(), key=lambda kv: (-sum(row[5] for row in kv[1]), kv[0]))
+        for number, (name, group) in enumerate(ranked):
+            chunks = [group[start:start + chunk_size] for start in range(0, len(group), chunk_size)]
+            for chunk_number, chunk in enumerate(chunks):
+                write_script(data_dir / view / f"{number}.{chunk_number}.js",
+                             f"{view}/{number}/{chunk_number}", {'rows': chunk})
+            shard_files += len(chunks)
+            entries.append({
+                'name': name,
+                'id': number,
+                'edges': len(group),
+                'calls': sum(row[5] for row in group),
+                'chunks': len(chunks),
+            })
+        views[view] = entries
+
+    index = {
+        'columns': COLUMNS,
+        'chunk_size': chunk_size,
+        'summary': {
+            'rust_functions_calling_deps': len(stats['rust_to_deps_calls']),
+            'deps_functions_called': len(stats['deps_function_usage']),
+            'rust_files_using_deps': len(stats['rust_files_using_deps']),
+            'dependency_calls': sum(stats['deps_function_usage'].values()),
+            'edges': len(rows),
+        },
+        'views': views,
+    }
+    write_script(data_dir / 'index.js', 'index', index)
+    (output_dir / 'index.html').write_text(HTML_PAGE)
+    return index, shard_files
+
+HTML_PAGE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>LibSignal Dependency Analysis</title>
+<style>
+  body { font-family: -apple-system, system-ui, sans-serif; margin: 0; display: flex; height: 100vh; color: #222; }
+  nav { width: 26rem; border-right: 1px solid #ddd; display: flex; flex-direction: column; }
+  main { flex: 1; display: flex; flex-direction: column; overflow: hidden; padding: 0 1rem; }
+  h1 { font-size: 1.1rem; margin: 0.8rem 1rem 0.4rem; }
+  #summary { font-size: 0.85rem; margin: 0 1rem 0.6rem; color: #555; }
+  .tabs { display: flex; margin: 0 1rem; }
+  .tabs button { flex: 1; border: 1px solid #ccc; background: #f6f6f6; padding: 0.3rem; cursor: pointer; }
+  .tabs button.active { background: #fff; border-bottom-color: #fff; font-weight: bold; }
+  input[type=search] { margin: 0.5rem 1rem; padding: 0.3rem; }
+  main input[type=search] { margin: 0.5rem 0; }
+  #groups { list-style: none; margin: 0; padding: 0; overflow-y: auto; flex: 1; }
+  #groups li { padding: 0.25rem 1rem; cursor: pointer; display: flex; justify-content: space-between; font-size: 0.85rem; }
+  #groups li:hover { background: #f0f4ff; }
+  #groups li.selected { background: #dde6ff; }
+  #groups li span.count { color: #777; margin-left: 1rem; white-space: nowrap; }
+  .table-wrap { flex: 1; overflow: auto; }
+  table { border-collapse: collapse; width: 100%; font-size: 0.8rem; }
+  th, td { text-align: left; padding: 0.2rem 0.5rem; border-bottom: 1px solid #eee; }
+  th { position: sticky; top: 0; background: #fafafa; }
+  td.num { text-align: right; }
+  .pager { padding: 0.5rem 0; display: flex; gap: 0.5rem; align-items: center; font-size: 0.85rem; }
+  #title { font-size: 1rem; margin: 0.8rem 0 0; }
+  #status { color: #a00; }
+</style>
+</head>
+<body>
+<nav>
+  <h1>LibSignal Dependency Analysis</h1>
+  <div id="summary">Loading…</div>
+  <div class="tabs">
+    <button data-view="crate">Deps crates</button>
+    <button data-view="module">Rust modules</button>
+    <button data-view="file">Rust files</button>
+  </div>
+  <input type="search" id="group-filter" placeholder="Filter…">
+  <ul id="groups"></ul>
+</nav>
+<main>
+  <h2 id="title">Select a crate, module or file</h2>
+  <input type="search" id="row-filter" placeholder="Search callers, callees and paths…" disabled>
+  <div class="table-wrap"><table><thead id="head"></thead><tbody id="rows"></tbody></table></div>
+  <div class="pager">
+    <button id="prev">‹ Prev</button>
+    <span id="page"></span>
+    <button id="next">Next ›</button>
+    <span id="status"></span>
+  </div>
+</main>
+<script>
+const PAGE_SIZE = 50;
+
+// Shards are scripts calling dependencyReport.load(), so the report works from file:// URLs.
+const dependencyReport = {
+  pending: {},
+  cache: {},
+  load(id, data) {
+    this.cache[id] = data;
+    const waiting = this.pending[id] || [];
+    delete this.pending[id];
+    for (const { resolve } of waiting) resolve(data);
+  },
+  fetch(id) {
+    if (this.cache[id]) return Promise.resolve(this.cache[id]);
+    return new Promise((resolve, reject) => {
+      // Every caller waiting on a shard is settled when it loads; the script is added once.
+      if (this.pending[id]) {
+        this.pending[id].push({ resolve, reject });
+        return;
+      }
+      this.pending[id] = [{ resolve, reject }];
+      const script = document.createElement('script');
+      script.src = 'data/' + (id === 'index' ? 'index' : id.replace(/\/(\d+)$/, '.$1')) + '.js';
+      script.onerror = () => {
+        const waiting = this.pending[id] || [];
+        delete this.pending[id];
+        for (const waiter of waiting) waiter.reject(new Error('could not load ' + script.src));
+      };
+      document.head.appendChild(script);
+    });
+  },
+};
+
+// `selection` counts group selections, so loads started for an earlier one can tell they're stale.
+const state = { index: null, view: 'crate', group: null, groupView: null, selection: 0, rows: [], loadedChunks: 0,
+                filter: '', page: 0, searchKeys: [] };
+const $ = (id) => document.getElementById(id);
+
+function cell(tag, text, className) {
+  const element = document.createElement(tag);
+  element.textContent = text;
+  if (className) element.className = className;
+  return element;
+}
+
+function renderGroups() {
+  const filter = $('group-filter').value.toLowerCase();
+  const list = $('groups');
+  list.replaceChildren();
+  for (const button of document.querySelectorAll('.tabs button')) {
+    button.classList.toggle('active', button.dataset.view === state.view);
+  }
+  for (const group of state.index.views[state.view]) {
+    if (filter && !group.name.toLowerCase().includes(filter)) continue;
+    const item = document.createElement('li');
+    item.append(cell('span', group.name), cell('span', group.calls.toLocaleString() + ' calls', 'count'));
+    item.classList.toggle('selected', state.group === group);
+    item.onclick = () => selectGroup(group);
+    list.append(item);
+  }
+}
+
+function chunkId(group, chunk) {
+  return state.groupView + '/' + group.id + '/' + chunk;
+}
+
+async function loadChunks(group, upTo) {
+  const selection = state.selection;
+  while (state.selection === selection && state.loadedChunks < Math.min(upTo, group.chunks)) {
+    const chunk = state.loadedChunks;
+    const data = await dependencyReport.fetch(chunkId(group, chunk));
+    if (state.selection !== selection) return;
+    // Another load of this selection may have appended the chunk while this one waited.
+    if (state.loadedChunks !== chunk) continue;
+    state.rows.push(...data.rows);
+    for (const row of data.rows) state.searchKeys.push(row.slice(0, 5).join('\n').toLowerCase());
+    state.loadedChunks++;
+  }
+}
+
+async function selectGroup(group) {
+  Object.assign(state, { group, groupView: state.view, selection: state.selection + 1, rows: [], searchKeys: [],
+                         loadedChunks: 0, page: 0 });
+  $('row-filter').value = state.filter = '';
+  $('row-filter').disabled = false;
+  $('title').textContent = group.name + ' — ' + group.edges.toLocaleString() + ' caller/callee pairs, '
+    + group.calls.toLocaleString() + ' calls';
+  renderGroups();
+  await showPage();
+}
+
+function matchingRows() {
+  if (!state.filter) return state.rows;
+  return state.rows.filter((row, i) => state.searchKeys[i].includes(state.filter));
+}
+
+async function showPage() {
+  const group = state.group;
+  const selection = state.selection;
+  $('status').textContent = '';
+  try {
+    if (state.filter) {
+      // Searching needs the whole shard.
+      await loadChunks(group, group.chunks);
+    } else {
+      await loadChunks(group, Math.floor(((state.page + 1) * PAGE_SIZE - 1) / state.index.chunk_size) + 1);
+    }
+  } catch (error) {
+    $('status').textContent = error.message;
+  }
+  if (state.selection !== selection) return;
+
+  const rows = matchingRows();
+  const total = state.filter ? rows.length : group.edges;
+  const pages = Math.max(1, Math.ceil(total / PAGE_SIZE));
+  state.page = Math.min(state.page, pages - 1);
+  const body = $('rows');
+  body.replaceChildren();
+  for (const row of rows.slice(state.page * PAGE_SIZE, (state.page + 1) * PAGE_SIZE)) {
+    const tr = document.createElement('tr');
+    row.forEach((value, i) => tr.append(cell('td', typeof value === 'number' ? value.toLocaleString() : value,
+                                             typeof value === 'number' ? 'num' : '')));
+    body.append(tr);
+  }
+  $('page').textContent = 'Page ' + (state.page + 1) + ' of ' + pages + ' (' + total.toLocaleString() + ' rows)';
+  $('prev').disabled = state.page === 0;
+  $('next').disabled = state.page >= pages - 1;
+}
+
+let searchTimer = null;
+$('row-filter').oninput = () => {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(() => {
+    state.filter = $('row-filter').value.toLowerCase();
+    state.page = 0;
+    showPage();
+  }, 150);
+};
+$('group-filter').oninput = renderGroups;
+$('prev').onclick = () => { state.page--; showPage(); };
+$('next').onclick = () => { state.page++; showPage(); };
+for (const button of document.querySelectorAll('.tabs button')) {
+  button.onclick = () => { state.view = button.dataset.view; $('group-filter').value = ''; renderGroups(); };
+}
+
+dependencyReport.fetch('index').then((index) => {
+  state.index = index;
+  const s = index.summary;
+  $('summary').textContent = s.rust_functions_calling_deps.toLocaleString() + ' rust functions call '
+    + s.deps_functions_called.toLocaleString() + ' deps functions ' + s.dependency_calls.toLocaleString()
+    + ' times from ' + s.rust_files_using_deps.toLocaleString() + ' files (' + s.edges.toLocaleString() + ' pairs).';
+  $('head').append(...[document.createElement('tr')].map((tr) => {
+    index.columns.forEach((column) => tr.append(cell('th', column)));
+    return tr;
+  }));
+  renderGroups();
+}, (error) => { $('summary').textContent = error.message; });
+</script>
+</body>
+</html>
+"""
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--output-dir', default='dependency_report', help='report directory (default: %(default)s)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='rows per shard file (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading and analyzing libsignal dependencies...")
+    data = load_data(args.corpus)
+    stats = analyze_dependencies(data)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index, shard_files = write_report(stats, output_dir, args.chunk_size)
+
+    groups = ', '.join(f"{len(index['views'][view])} {view}s" for view in VIEWS)
+    print(f"🧩 {index['summary']['edges']:,} caller/callee pairs in {shard_files} shard files ({groups})")
+    print(f"📄 Report saved to: {output_dir / 'index.html'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Rank generic functions and the rust/ call sites behind them by the LLVM IR their instantiations add.
+
+Reads saved `cargo llvm-lines` output, one file per crate built (for example
+`cargo llvm-lines -p libsignal-protocol --lib > llvm-lines/libsignal-protocol.txt`), so that the
+analysis runs offline. Each function name is mapped onto libsignal_with_deps.json with the same
+resolver as profile_attribution.py and joined with the rust/ → deps/ call sites from
+analyze_deps.py, to show which callers pull in the most instantiated code and where a non-generic
+inner function or wrapper would remove the most copies.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import load_data, analyze_dependencies
+from profile_attribution import REPO_ROOT, FrameResolver, build_function_index, load_crate_dirs, owner_of_path
+
+# `  Lines  (%)  Copies  (%)  Function name`; older cargo-llvm-lines omits the percentages.
+LLVM_LINES_ROW = re.compile(r'^\s*(\d+)(?:\s+\(\s*[\d.]+%\))?\s+(\d+)(?:\s+\(\s*[\d.]+%\))?\s+(\S.*?)\s*$')
+GENERIC_PARAM = re.compile(r'^[&*\[\s]*(?:mut\s+|const\s+|dyn\s+)?[A-Z]\w{0,2}\]?$')
+TYPE_ARGS = re.compile(r'<[^<>]*>')
+
+# Patterns in a generic signature, checked in order, and what to do about each.
+GENERIC_KINDS = [
+    ('iterator', re.compile(r'\bIntoIterator\b|\bIterator\b|\bBorrow<'),
+     "collect the items into a slice at the boundary and keep the body non-generic over `&[T]`"),
+    ('conversion', re.compile(r'\bAsRef<|\bAsMut<|\bInto<|\bTryInto<|impl\s+AsRef'),
+     "convert at the boundary and call a non-generic inner function"),
+    ('closure', re.compile(r'\bFn(?:Mut|Once)?\s*\('),
+     "take `&dyn Fn`/`&mut dyn FnMut` where the closure isn't on a hot path"),
+    ('rng', re.compile(r'\b(?:Crypto)?Rng(?:Core)?\b|\bCryptoRngCore\b'),
+     "take `&mut dyn CryptoRngCore` like the rest of rust/"),
+    ('io', re.compile(r'\b(?:Read|Write|BufRead)\b'),
+     "take `&mut dyn Read`/`&mut dyn Write`"),
+    ('block-cipher', re.compile(r'\bBlock(?:Cipher|Encrypt|Decrypt|SizeUser)\b|\bKeyInit\b|\bStreamCipher\b'),
+     "settle on one cipher type per mode, or wrap the mode in a non-generic helper per key size"),
+    ('const', re.compile(r'\bconst\s+[A-Z_]+\s*:'),
+     "pass the length at runtime to a shared inner function and keep the const-generic shim thin"),
+]
+TRAIT_KIND = ('trait', None, "move the type-independent part of the body into a non-generic helper")
+
+def parse_llvm_lines(path):
+    """Yield (lines, copies, function name) for each row of one `cargo llvm-lines` report."""
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            m = LLVM_LINES_ROW.match(line)
+            if m is None or m.group(3) == '(TOTAL)':
+                continue
+            yield int(m.group(1)), int(m.group(2)), m.group(3)
+
+def split_qualified(name):
+    """Split `<Self as Trait>::rest` into its parts, respecting nested angle brackets."""
+    if not name.startswith('<'):
+        return None
+    depth = 0
+    as_at = None
+    for i, c in enumerate(name):
+        if c == '<':
+            depth += 1
+        elif c == '>':
+            depth -= 1
+            if depth == 0:
+                if as_at is None or not name.startswith('>::', i):
+                    return None
+                return name[1:as_at], name[as_at + 4:i], name[i + 3:]
+        elif depth == 1 and as_at is None and name.startswith(' as ', i):
+            as_at = i
+    return None
+
+def strip_type_args(path):
+    """Drop generic arguments from a path: `a::B<T, C<U>>::f` -> `a::B::f`."""
+    previous = None
+    while previous != path:
+        previous = path
+        path = TYPE_ARGS.sub('', path)
+    return path
+
+def normalize_symbol(name, crate_dirs):
+    """Turn an llvm-lines function name into a path the frame resolver understands.
+
+    `<T as subtle::ConditionallySelectable>::conditional_assign` is attributed to the trait,
+    `<curve25519_dalek::scalar::Scalar as core::ops::Mul>::mul` to the type, and an impl for a
+    primitive or a type outside the workspace (`<u8 as subtle::ConstantTimeEq>::ct_eq`) to the trait.
+    """
+    qualified = split_qualified(name)
+    if qualified is None:
+        return strip_type_args(name)
+    self_type, trait, rest = qualified
+    self_path = strip_type_args(self_type).lstrip('&*[ ').replace('mut ', '').replace('dyn ', '')
+    trait_path = strip_type_args(trait)
+    # Type parameters and primitives have no crate of their own.
+    if GENERIC_PARAM.match(self_type) or '::' not in self_path:
+        return f"{trait_path}::{strip_type_args(rest)}"
+    if self_path.split('::', 1)[0] not in crate_dirs and trait_path.split('::', 1)[0] in crate_dirs:
+        return f"{trait_path}::{strip_type_args(rest)}"
+    return f"{self_path}::{strip_type_args(rest)}"
+
+def signature_of(item):
+    """The declaration part of a corpus function body, up to its opening brace."""
+    body = item.get('body', '')
+    brace = body.find('{')
+    return ' '.join((body[:brace] if brace >= 0 else body).split())
+
+def classify_generic(signature):
+    """Pick the first matching kind of genericity for a function, defaulting to a trait bound."""
+    for kind in GENERIC_KINDS:
+        if kind[1].search(signature):
+            return kind
+    return TRAIT_KIND
+
+def rust_callers_of(data, function_info, rust_to_deps_calls, depth):
+    """Map each corpus function to the rust/ functions that reach it, and the deps/ function they call.
+
+    deps/ functions called from rust/ map to their callers in rust_to_deps_calls. Functions only
+    called from other deps/ functions inherit the callers of the deps/ functions up to `depth`
+    calls above them, and rust/ functions map to their rust/ callers.
+    """
+    direct = defaultdict(set)
+    for caller, callees in rust_to_deps_calls.items():
+        for callee in callees:
+            direct[callee].add(caller)
+
+    reverse = defaultdict(set)
+    for item in data:
+        caller = item.get('identifier', '')
+        caller_path = item.get('relative_path', '')
+        for callee in item.get('deps', []):
+            callee_path = function_info.get(callee, {}).get('relative_path', '')
+            if caller_path.startswith('deps/') and callee_path.startswith('deps/'):
+                reverse[callee].add(caller)
+            elif caller_path.startswith('rust/') and callee_path.startswith('rust/'):
+                direct[callee].add(caller)
+
+    cache = {}
+
+    def callers(identifier):
+        """Return {rust caller: deps/ function it calls to get here (or None if direct)}."""
+        if identifier in cache:
+            return cache[identifier]
+        found = {caller: None for caller in direct.get(identifier, ())}
+        if not found and function_info.get(identifier, {}).get('relative_path', '').startswith('deps/'):
+            seen = {identifier}
+            frontier = [identifier]
+            for _ in range(depth):
+                next_frontier = []
+                for callee in frontier:
+                    for caller in reverse.get(callee, ()):
+                        if caller in seen:
+                            continue
+                        seen.add(caller)
+                        next_frontier.append(caller)
+                        for rust_caller in direct.get(caller, ()):
+                            found.setdefault(rust_caller, caller)
+                if found:
+                    break
+                frontier = next_frontier
+        cache[identifier] = found
+        return found
+
+    return callers
+
+def analyze(reports, data, depth):
+    """Aggregate llvm-lines reports by function and attribute them to owners and rust/ callers."""
+    stats = analyze_dependencies(data)
+    function_info = stats['function_info']
+    items = {item.get('identifier', ''): item for item in data}
+    crate_dirs = load_crate_dirs(REPO_ROOT)
+    resolver = FrameResolver(build_function_index(data), crate_dirs)
+    callers_of = rust_callers_of(data, function_info, stats['rust_to_deps_calls'], depth)
+
+    functions = {}
+    total_lines = 0
+    for label, path in reports:
+        for lines, copies, name in parse_llvm_lines(path):
+            total_lines += lines
+            symbol = normalize_symbol(name, crate_dirs)
+            entry = functions.get(name)
+            if entry is None:
+                identifier, owner, _ = resolver.resolve(symbol)
+                entry = functions[name] = {
+                    'name': name,
+                    'identifier': identifier,
+                    'owner': owner,
+                    'lines': 0,
+                    'copies': 0,
+                    'reports': Counter(),
+                }
+            entry['lines'] += lines
+            entry['copies'] += copies
+            entry['reports'][label] += lines
+
+    owner_lines = Counter()
+    owner_copies = Counter()
+    caller_lines = Counter()
+    caller_functions = defaultdict(Counter)
+    unmatched = Counter()
+    for entry in functions.values():
+        owner_lines[entry['owner']] += entry['lines']
+        owner_copies[entry['owner']] += entry['copies']
+        identifier = entry['identifier']
+        entry['callers'] = {}
+        if identifier is None:
+            if entry['owner'].startswith(('rust/', 'deps/')):
+                unmatched[entry['name']] += entry['lines']
+            continue
+
+        item = items.get(identifier, {})
+        entry['signature'] = signature_of(item)
+        entry['kind'] = classify_generic(entry['signature'])
+        callers = callers_of(identifier)
+        entry['callers'] = callers
+        if callers:
+            share = entry['lines'] / len(callers)
+            for caller in callers:
+                caller_lines[caller] += share
+                caller_functions[caller][identifier] += share
+        elif entry['owner'].startswith('rust/'):
+            # A rust/ function nobody in the corpus calls (an entry point); it pays for itself.
+            caller_lines[identifier] += entry['lines']
+            caller_functions[identifier][identifier] += entry['lines']
+
+    return {
+        'functions': functions,
+        'total_lines': total_lines,
+        'owner_lines': owner_lines,
+        'owner_copies': owner_copies,
+        'caller_lines': caller_lines,
+        'caller_functions': caller_functions,
+        'unmatched': unmatched,
+        'function_info': function_info,
+        'reports': [label for label, _ in reports],
+    }
+
+def suggestions(result, min_copies, min_lines):
+    """Pick de-generification points: matched functions with enough copies and code to matter."""
+    function_info = result['function_info']
+    suggested = []
+    for entry in result['functions'].values():
+        if entry['identifier'] is None or entry['copies'] < min_copies or entry['lines'] < min_lines:
+            continue
+        per_copy = entry['lines'] / entry['copies']
+        kind, _, advice = entry['kind']
+        callers = entry['callers']
+        if entry['owner'].startswith('rust/'):
+            where = f"`{function_info[entry['identifier']]['relative_path']}`"
+        else:
+            # Vendored code isn't edited in place; the fix goes at the rust/ call sites.
+            caller_owners = sorted({owner_of_path(function_info.get(c, {}).get('relative_path', ''))
+                                    for c in callers})
+            if len(callers) >= 2:
+                advice = (f"route the {len(callers)} rust/ callers through one non-generic wrapper "
+                          f"in {', '.join(caller_owners)}; upstream: {advice}")
+            elif callers:
+                advice = f"check which types the caller instantiates it with; upstream: {advice}"
+            else:
+                advice = f"not called from rust/ directly; upstream: {advice}"
+            where = f"`{entry['owner']}`"
+        suggested.append({
+            'name': entry['name'],
+            'identifier': entry['identifier'],
+            'kind': kind,
+            'where': where,
+            'advice': advice,
+            'copies': entry['copies'],
+            'lines': entry['lines'],
+            'per_copy': per_copy,
+            # Keeping a single copy is the most any change can save.
+            'saving': entry['lines'] - per_copy,
+        })
+    suggested.sort(key=lambda s: -s['saving'])
+    return suggested
+
+def percent(lines, total):
+    return f"{lines / total * 100:.1f}%" if total else "0.0%"
+
+def describe_callers(callers, function_info, limit=3):
+    if not callers:
+        return "-"
+    names = []
+    for caller, via in sorted(callers.items(), key=lambda c: (c[1] is not None, c[0]))[:limit]:
+        name = function_info.get(caller, {}).get('display_name', caller)
+        if via:
+            name += f" (via {function_info.get(via, {}).get('display_name', via)})"
+        names.append(f"`{name}`")
+    if len(callers) > limit:
+        names.append(f"+{len(callers) - limit} more")
+    return ', '.join(names)
+
+def generate_markdown_report(result, suggested, top, min_copies):
+    """Generate a markdown report of instantiated code by generic function and caller."""
+    total = result['total_lines']
+    function_info = result['function_info']
+    functions = sorted(result['functions'].values(), key=lambda e: -e['lines'])
+    generic = [e for e in functions if e['copies'] >= min_copies]
+    matched = [e for e in functions if e['identifier']]
+
+    md_content = []
+    md_content.append("# LibSignal Monomorphization Bloat Report")
+    md_content.append("")
+    md_content.append("This report ranks generic functions by the LLVM IR lines their instantiations add, and attributes "
+                      "them to the `rust/` functions whose calls bring them in.")
+    md_content.append("")
+
+    md_content.append("## 📊 Summary")
+    md_content.append("")
+    md_content.append(f"- **Reports read:** {', '.join(f'`{label}`' for label in result['reports'])}")
+    md_content.append(f"- **Total LLVM lines:** {total:,}")
+    md_content.append(f"- **Distinct functions:** {len(functions):,} ({len(generic):,} with {min_copies}+ copies)")
+    md_content.append(f"- **Matched to the corpus:** {len(matched):,} functions, "
+                      f"{percent(sum(e['lines'] for e in matched), total)} of lines")
+    md_content.append(f"- **Callers with attributed code:** {len(result['caller_lines']):,}")
+    md_content.append("")
+
+    md_content.append("## 📦 Lines by Crate / Module")
+    md_content.append("")
+    md_content.append("| Owner | Lines | % | Copies |")
+    md_content.append("|-------|-------|---|--------|")
+    for owner, lines in result['owner_lines'].most_common(top):
+        md_content.append(f"| `{owner}` | {lines:,} | {percent(lines, total)} | {result['owner_copies'][owner]:,} |")
+    md_content.append("")
+
+    md_content.append(f"## 🧬 Top {top} Generic Functions by Instantiated Code")
+    md_content.append("")
+    md_content.append("| Rank | Lines | % | Copies | Lines/Copy | Owner | Function | rust/ Callers |")
+    md_content.append("|------|-------|---|--------|------------|-------|----------|---------------|")
+    for i, entry in enumerate(generic[:top], 1):
+        md_content.append(f"| {i} | {entry['lines']:,} | {percent(entry['lines'], total)} | {entry['copies']} "
+                          f"| {entry['lines'] / entry['copies']:,.0f} | `{entry['owner']}` | `{entry['name']}` "
+                          f"| {describe_callers(entry['callers'], function_info)} |")
+    md_content.append("")
+
+    if result['caller_lines']:
+        md_content.append(f"## 📞 Top {top} Callers by Attributed Code")
+        md_content.append("")
+        md_content.append("Each function's lines are split evenly between the `rust/` functions that call it "
+                          "(directly, or through the `deps/` functions they call).")
+        md_content.append("")
+        md_content.append("| Rank | Lines | % | Caller | Path | Largest Contributors |")
+        md_content.append("|------|-------|---|--------|------|----------------------|")
+        for i, (caller, lines) in enumerate(result['caller_lines'].most_common(top), 1):
+            info = function_info.get(caller, {})
+            contributors = ', '.join(f"`{function_info.get(c, {}).get('display_name', c)}` {share:,.0f}"
+                                     for c, share in result['caller_functions'][caller].most_common(3))
+            md_content.append(f"| {i} | {lines:,.0f} | {percent(lines, total)} | `{info.get('display_name', caller)}` "
+                              f"| `{info.get('relative_path', 'unknown')}` | {contributors} |")
+        md_content.append("")
+
+    if suggested:
+        md_content.append("## 🔧 De-generification Suggestions")
+        md_content.append("")
+        md_content.append("Savings assume every copy but one goes away, so they are upper bounds.")
+        md_content.append("")
+        md_content.append("| Up to | Copies | Kind | Function | Where | Suggestion |")
+        md_content.append("|-------|--------|------|----------|-------|------------|")
+        for s in suggested[:top]:
+            md_content.append(f"| {s['saving']:,.0f} | {s['copies']} | {s['kind']} | `{s['name']}` "
+                              f"| {s['where']} | {s['advice']} |")
+        md_content.append("")
+
+    if result['unmatched']:
+        md_content.append("## ❓ Workspace Functions Without a Corpus Match")
+        md_content.append("")
+        md_content.append("These belong to a `rust/` or `deps/` crate but matched no corpus function (often macro-generated "
+                          "or trait-default code).")
+        md_content.append("")
+        md_content.append("| Lines | Function |")
+        md_content.append("|-------|----------|")
+        for name, lines in result['unmatched'].most_common(10):
+            md_content.append(f"| {lines:,} | `{name}` |")
+        md_content.append("")
+
+    md_content.append("## Technical Details")
+    md_content.append("")
+    md_content.append("- Input is `cargo llvm-lines` text output; rows for the same function in several reports are summed")
+    md_content.append("- `<T as Trait>::method` is attributed to the trait's crate when `T` is a type parameter, a primitive or outside the workspace, otherwise to the type's crate")
+    md_content.append("- Call sites come from `rust_to_deps_calls` in `analyze_deps.py`; `deps/` functions with no `rust/` caller inherit the callers of the `deps/` functions above them")
+    md_content.append("- Caller attribution splits lines evenly, since llvm-lines doesn't say which caller requested which instantiation")
+    md_content.append("- Kinds are read from the corpus signature: iterator, conversion, closure, rng, io, block-cipher, const or trait bounds")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('reports', nargs='+', help='saved `cargo llvm-lines` output, one file per crate')
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--depth', type=int, default=3,
+                        help='deps/ calls to walk up looking for rust/ callers (default: %(default)s)')
+    parser.add_argument('--min-copies', type=int, default=2,
+                        help='copies for a function to count as generic (default: %(default)s)')
+    parser.add_argument('--min-lines', type=int, default=200,
+                        help='lines for a function to get a suggestion (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=20, help='rows per ranked table (default: %(default)s)')
+    parser.add_argument('--output', default='MONO_BLOAT_REPORT.md', help='markdown report (default: %(default)s)')
+    parser.add_argument('--json', help='also write the rankings to this JSON file')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+    for path in args.reports:
+        if not Path(path).exists():
+            print(f"Error: {path} not found")
+            sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    print(f"Reading {len(args.reports)} llvm-lines report(s)...")
+    result = analyze([(Path(path).stem, path) for path in args.reports], data, args.depth)
+    suggested = suggestions(result, args.min_copies, args.min_lines)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(result, suggested, args.top, args.min_copies))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'total_lines': result['total_lines'],
+                'owner_lines': dict(result['owner_lines']),
+                'functions': [{
+                    'name': e['name'],
+                    'identifier': e['identifier'],
+                    'owner': e['owner'],
+                    'lines': e['lines'],
+                    'copies': e['copies'],
+                    'reports': dict(e['reports']),
+                    'callers': e['callers'],
+                } for e in sorted(result['functions'].values(), key=lambda e: -e['lines'])],
+                'callers': {caller: round(lines, 1) for caller, lines in result['caller_lines'].most_common()},
+                'suggestions': suggested,
+            }, f, indent=2)
+
+    total = result['total_lines']
+    print(f"\n📊 {total:,} LLVM lines in {len(result['functions']):,} functions")
+    for owner, lines in result['owner_lines'].most_common(8):
+        print(f"  {owner:<30} {lines:>10,} {percent(lines, total):>6}")
+    for s in suggested[:5]:
+        print(f"  🔧 {s['name']}: up to {s['saving']:,.0f} lines ({s['kind']})")
+    print(f"\n📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
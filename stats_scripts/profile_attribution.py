@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Attribute sampled CPU profiles of libsignal to deps crates, rust modules and bridge exports.
+
+Reads folded stacks (`perf script | inferno-collapse-perf`, or any `frame;frame;frame count`
+text) and maps each frame to a function in libsignal_with_deps.json using the `relative_path` and
+`display_name` fields, streaming the input so that multi-gigabyte profiles can be processed.
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import tomllib
+from collections import defaultdict, Counter
+from pathlib import Path
+
+from analyze_deps import load_data, get_dep_crate_name
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Trailing legacy-mangling hash and perf's annotations for kernel/JIT frames.
+SYMBOL_HASH = re.compile(r'::h[0-9a-f]{16}$')
+PERF_ANNOTATION = re.compile(r'_\[[kjwi]\]$')
+LEADING_CRATE = re.compile(r'^[<&\s]*(?:mut\s+|dyn\s+)?([A-Za-z_]\w*)::')
+TRAILING_FN = re.compile(r'([A-Za-z_]\w*)(?:::\{\{closure\}\})*$')
+IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+
+JNI_EXPORT = re.compile(r'^Java_org_signal_libsignal_internal_Native(?:Testing)?_(\w+)$')
+FFI_EXPORT = re.compile(r'^signal_(\w+)$')
+NODE_EXPORT = re.compile(r'^node_(\w+)$')
+
+STD_CRATES = {'std', 'core', 'alloc', 'proc_macro'}
+
+# BoringSSL's C and assembly code shows up with unqualified symbols; attribute it to the crate
+# that wraps it.
+BORINGSSL_SYMBOL_PREFIXES = (
+    'AES_', 'aes_', 'aes_hw_', 'aes_nohw_', 'vpaes_', 'BN_', 'bn_', 'CRYPTO_', 'ChaCha20', 'chacha20_',
+    'EC_', 'ec_', 'ECDSA_', 'ecdsa_', 'ecp_nistz256_', 'ED25519_', 'EVP_', 'gcm_', 'HKDF', 'HMAC',
+    'md5_', 'poly1305_', 'RSA_', 'rsa_', 'SHA1', 'SHA256', 'SHA384', 'SHA512', 'sha1_', 'sha256_',
+    'sha512_', 'SSL_', 'ssl_', 'X509', 'x509_', 'X25519', 'x25519_',
+)
+
+def load_crate_dirs(repo_root):
+    """Map library names (as they appear in symbols) to their directory under rust/ or deps/."""
+    crate_dirs = {}
+    for top in ('rust', 'deps'):
+        for cargo_toml in sorted((repo_root / top).glob('**/Cargo.toml')):
+            if 'target' in cargo_toml.parts:
+                continue
+            with open(cargo_toml, 'rb') as f:
+                manifest = tomllib.load(f)
+            package = manifest.get('package', {}).get('name')
+            if not package:
+                continue
+            lib_name = manifest.get('lib', {}).get('name', package.replace('-', '_'))
+            crate_dirs[lib_name] = str(cargo_toml.parent.relative_to(repo_root))
+    return crate_dirs
+
+def build_function_index(data):
+    """Index rust/ and deps/ functions by display name."""
+    by_name = defaultdict(list)
+    for item in data:
+        relative_path = item.get('relative_path', '')
+        if not relative_path.startswith(('rust/', 'deps/')):
+            continue
+        name = item.get('display_name', '')
+        if not name:
+            continue
+        # Tokens used to pick between functions that share a name.
+        tokens = set(item.get('identifier', '').split('/'))
+        tokens.update(Path(relative_path).with_suffix('').parts)
+        by_name[name].append((item.get('identifier', ''), relative_path, tokens))
+    return by_name
+
+def owner_of_path(relative_path):
+    """Group a corpus path by deps crate or rust module."""
+    if relative_path.startswith('deps/'):
+        return f"deps/{get_dep_crate_name(relative_path)}"
+    parts = relative_path.split('/')
+    if relative_path.startswith('rust/') and len(parts) >= 2:
+        return f"rust/{parts[1]}"
+    return '[unknown]'
+
+class FrameResolver:
+    """Resolve folded-stack frames to corpus functions, owners and bridge exports (memoized)."""
+
+    def __init__(self, function_index, crate_dirs):
+        self.function_index = function_index
+        self.crate_dirs = crate_dirs
+        self.cache = {}
+
+    def resolve(self, frame):
+        """Return (function identifier or None, owner, bridge export or None) for one frame."""
+        resolved = self.cache.get(frame)
+        if resolved is None:
+            resolved = self._resolve(frame)
+            self.cache[frame] = resolved
+        return resolved
+
+    def _resolve(self, frame):
+        symbol = SYMBOL_HASH.sub('', PERF_ANNOTATION.sub('', frame.strip()))
+
+        crate_match = LEADING_CRATE.match(symbol)
+        if crate_match is None:
+            # An unqualified (C, assembly or exported) symbol.
+            export = None
+            if (m := JNI_EXPORT.match(symbol)):
+                export = f"jni:{m.group(1).replace('_1', '_')}"
+            elif (m := FFI_EXPORT.match(symbol)):
+                export = f"ffi:{m.group(1)}"
+            if export:
+                return (None, 'rust/bridge', export)
+            if symbol.startswith(BORINGSSL_SYMBOL_PREFIXES):
+                return (None, 'deps/boring-signal', None)
+            return (None, '[native]', None)
+
+        crate = crate_match.group(1)
+        crate_dir = self.crate_dirs.get(crate)
+        fn_match = TRAILING_FN.search(symbol)
+        fn_name = fn_match.group(1) if fn_match else None
+
+        export = None
+        if crate_dir and crate_dir.startswith('rust/bridge') and fn_name and (m := NODE_EXPORT.match(fn_name)):
+            export = f"node:{m.group(1)}"
+
+        if crate_dir is None:
+            owner = '[std]' if crate in STD_CRATES else f"[external] {crate}"
+            return (None, owner, None)
+
+        identifier = self._match_function(symbol, fn_name, crate_dir)
+        return (identifier, owner_of_path(crate_dir + '/'), export)
+
+    def _match_function(self, symbol, fn_name, crate_dir):
+        candidates = [c for c in self.function_index.get(fn_name, ())
+                      if c[1].startswith(crate_dir + '/')]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0][0]
+        frame_tokens = set(IDENTIFIER.findall(symbol))
+        best = max(candidates, key=lambda c: len(frame_tokens & c[2]))
+        return best[0]
+
+def open_folded(path):
+    """Open a folded-stacks file, transparently decompressing .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', errors='replace')
+    return open(path, 'r', errors='replace')
+
+def attribute_profile(paths, resolver):
+    """Stream folded stacks and aggregate self and inclusive samples."""
+    stats = {
+        'total_samples': 0,
+        'owner_self': Counter(),
+        'owner_inclusive': Counter(),
+        'function_self': Counter(),
+        'function_inclusive': Counter(),
+        'export_inclusive': Counter(),
+        'export_owner_self': defaultdict(Counter),
+        'unmatched_frames': Counter(),
+    }
+    for path in paths:
+        with open_folded(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if not stack:
+                    continue
+                try:
+                    samples = int(count)
+                except ValueError:
+                    continue
+                stats['total_samples'] += samples
+
+                owners = set()
+                functions = set()
+                exports = set()
+                frames = stack.split(';')
+                for frame in frames:
+                    function, owner, export = resolver.resolve(frame)
+                    owners.add(owner)
+                    if function:
+                        functions.add(function)
+                    if export:
+                        exports.add(export)
+
+                # Sets, so that recursion doesn't count a sample twice.
+                for owner in owners:
+                    stats['owner_inclusive'][owner] += samples
+                for function in functions:
+                    stats['function_inclusive'][function] += samples
+                for export in exports:
+                    stats['export_inclusive'][export] += samples
+
+                leaf_function, leaf_owner, _ = resolver.resolve(frames[-1])
+                stats['owner_self'][leaf_owner] += samples
+                if leaf_function:
+                    stats['function_self'][leaf_function] += samples
+                elif leaf_owner.startswith(('rust/', 'deps/')):
+                    stats['unmatched_frames'][frames[-1]] += samples
+                for export in exports:
+                    stats['export_owner_self'][export][leaf_owner] += samples
+    return stats
+
+def percent(samples, total):
+    return f"{samples / total * 100:.1f}%" if total else "0.0%"
+
+def generate_markdown_report(stats, function_info, top, distinct_frames):
+    """Generate a markdown report of where the profiled time went."""
+    total = stats['total_samples']
+    md_content = []
+    md_content.append("# LibSignal Profile Attribution Report")
+    md_content.append("")
+    md_content.append("This report attributes sampled CPU time to `deps/` crates, `rust/` modules and bridge exports.")
+    md_content.append("")
+
+    md_content.append("## 📊 Overall Statistics")
+    md_content.append("")
+    md_content.append(f"- **Total samples:** {total}")
+    md_content.append(f"- **Distinct frames resolved:** {distinct_frames}")
+    md_content.append(f"- **Corpus functions seen:** {len(stats['function_inclusive'])}")
+    md_content.append(f"- **Bridge exports seen:** {len(stats['export_inclusive'])}")
+    md_content.append("")
+
+    md_content.append("## 📦 Time by Crate / Module")
+    md_content.append("")
+    md_content.append("| Owner | Self | Self % | Inclusive | Inclusive % |")
+    md_content.append("|-------|------|--------|-----------|-------------|")
+    for owner, inclusive in stats['owner_inclusive'].most_common():
+        self_samples = stats['owner_self'][owner]
+        md_content.append(f"| `{owner}` | {self_samples} | {percent(self_samples, total)} "
+                          f"| {inclusive} | {percent(inclusive, total)} |")
+    md_content.append("")
+
+    md_content.append(f"## 🔥 Top {top} Functions by Self Time")
+    md_content.append("")
+    md_content.append("| Rank | Self | Self % | Inclusive % | Function | Path |")
+    md_content.append("|------|------|--------|-------------|----------|------|")
+    for i, (func, self_samples) in enumerate(stats['function_self'].most_common(top), 1):
+        info = function_info.get(func, {})
+        md_content.append(f"| {i} | {self_samples} | {percent(self_samples, total)} "
+                          f"| {percent(stats['function_inclusive'][func], total)} "
+                          f"| `{info.get('display_name', func)}` | `{info.get('relative_path', 'unknown')}` |")
+    md_content.append("")
+
+    if stats['export_inclusive']:
+        md_content.append(f"## 🌉 Top {top} Bridge Exports by Inclusive Time")
+        md_content.append("")
+        md_content.append("| Export | Inclusive | Inclusive % | Where the time goes (self) |")
+        md_content.append("|--------|-----------|-------------|----------------------------|")
+        for export, inclusive in stats['export_inclusive'].most_common(top):
+            breakdown = ', '.join(f"{owner} {percent(samples, inclusive)}"
+                                  for owner, samples in stats['export_owner_self'][export].most_common(4))
+            md_content.append(f"| `{export}` | {inclusive} | {percent(inclusive, total)} | {breakdown} |")
+        md_content.append("")
+
+    if stats['unmatched_frames']:
+        md_content.append("## ❓ Hottest Frames Without a Corpus Function")
+        md_content.append("")
+        md_content.append("These frames belong to a known crate but did not match any function in the corpus (often inlined or generic code).")
+        md_content.append("")
+        md_content.append("| Self | Frame |")
+        md_content.append("|------|-------|")
+        for frame, samples in stats['unmatched_frames'].most_common(10):
+            md_content.append(f"| {samples} | `{frame}` |")
+        md_content.append("")
+
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('folded', nargs='+', help='folded stack files (optionally .gz)')
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=20, help='rows per ranked table (default: %(default)s)')
+    parser.add_argument('--output', default='PROFILE_ATTRIBUTION_REPORT.md', help='markdown report (default: %(default)s)')
+    parser.add_argument('--json', help='also write the aggregated numbers to this JSON file')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    function_info = {item.get('identifier', ''): item for item in data}
+    resolver = FrameResolver(build_function_index(data), load_crate_dirs(REPO_ROOT))
+
+    print(f"Attributing {len(args.folded)} folded profile(s)...")
+    stats = attribute_profile(args.folded, resolver)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(stats, function_info, args.top, len(resolver.cache)))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'total_samples': stats['total_samples'],
+                'owner_self': dict(stats['owner_self']),
+                'owner_inclusive': dict(stats['owner_inclusive']),
+                'function_self': dict(stats['function_self']),
+                'function_inclusive': dict(stats['function_inclusive']),
+                'export_inclusive': dict(stats['export_inclusive']),
+                'export_owner_self': {k: dict(v) for k, v in stats['export_owner_self'].items()},
+            }, f, indent=2)
+
+    total = stats['total_samples']
+    print(f"\n📊 {total} samples, {len(resolver.cache)} distinct frames")
+    for owner, inclusive in stats['owner_inclusive'].most_common(10):
+        print(f"  {owner:<30} self {percent(stats['owner_self'][owner], total):>6}  inclusive {percent(inclusive, total):>6}")
+    print(f"\n📄 Report saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
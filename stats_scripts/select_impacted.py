@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Select the benchmarks and tests that can observe a source change.
+
+Changed lines from a git diff are mapped to corpus functions (by locating each function's body in
+its file), and the functions' transitive callers are looked up in a precomputed index of which
+bench targets (`benches/` under rust/ and deps/) and `#[test]` functions can reach them. The index
+is built once per corpus and cached next to it, so a selection only reads the changed files.
+
+    python3 select_impacted.py --base origin/main
+    git diff HEAD~3 | python3 select_impacted.py --diff -
+"""
+
+import argparse
+import json
+import os
+import pickle
+import re
+import subprocess
+import sys
+import time
+import tomllib
+from collections import defaultdict
+from pathlib import Path
+
+from analyze_deps import load_data, propagate_reach
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+INDEX_VERSION = 1
+
+TEST_ATTRIBUTE = re.compile(r'#\[(?:[\w:]+::)?test\b|#\[test_case\b|#\[wasm_bindgen_test\b')
+HUNK_HEADER = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@')
+
+def first_line(body):
+    """The first non-empty line of a body, used to find the function again after edits."""
+    for line in body.splitlines():
+        if line.strip():
+            return line.strip()
+    return ''
+
+def locate_spans(text, functions):
+    """
+    Find the 1-based (first, last) line span of each function in a file's text.
+
+    `functions` is a list of (key, body or None, anchor, line count). Exact bodies are located
+    first; otherwise the function is found by its first line, taking occurrences in order when
+    several functions share one. Functions that can't be found are left out.
+    """
+    lines = text.splitlines()
+    spans = {}
+    used = set()
+    for key, body, anchor, line_count in functions:
+        start = -1
+        if body:
+            position = text.find(body)
+            while position != -1 and position in used:
+                position = text.find(body, position + 1)
+            if position != -1:
+                used.add(position)
+                start = text.count('\n', 0, position)
+        if start == -1:
+            for number, line in enumerate(lines):
+                if line.strip() == anchor and ('line', number) not in used:
+                    used.add(('line', number))
+                    start = number
+                    break
+        if start != -1:
+            spans[key] = (start + 1, start + line_count)
+    return spans
+
+def is_test_function(lines, first):
+    """Whether the attributes just above a function's first line mark it as a test."""
+    number = first - 2
+    while number >= 0:
+        line = lines[number].strip()
+        if TEST_ATTRIBUTE.search(line):
+            return True
+        if line and not line.startswith(('#[', '//', ')', ']')) and not line.endswith((',', '(')):
+            return False
+        number -= 1
+    return False
+
+class CrateLookup:
+    """Memoized owning package and bench targets for paths in the repository."""
+
+    def __init__(self, repo_root):
+        self.repo_root = repo_root
+        self.cache = {}
+
+    def package_for(self, relative_path):
+        """(package name, crate directory, {bench file: bench target}) of the nearest Cargo.toml."""
+        directory = str(Path(relative_path).parent)
+        while directory not in ('', '.'):
+            if directory not in self.cache:
+                self.cache[directory] = self._read(directory)
+            if self.cache[directory]:
+                return self.cache[directory]
+            directory = str(Path(directory).parent)
+        return None
+
+    def _read(self, directory):
+        manifest_file = self.repo_root / directory / 'Cargo.toml'
+        if not manifest_file.exists():
+            return None
+        with open(manifest_file, 'rb') as f:
+            manifest = tomllib.load(f)
+        name = manifest.get('package', {}).get('name')
+        if not name:
+            return None
+        benches = {}
+        for bench in manifest.get('bench', []):
+            if 'name' in bench:
+                path = bench.get('path', f"benches/{bench['name']}.rs")
+                benches[f'{directory}/{path}'] = bench['name']
+        return name, directory, benches
+
+    def bench_target(self, relative_path):
+        """The `cargo bench --bench` target a file is the root of, if any."""
+        owner = self.package_for(relative_path)
+        if not owner:
+            return None
+        package, crate_dir, benches = owner
+        if relative_path in benches:
+            return package, benches[relative_path]
+        parts = Path(relative_path).relative_to(crate_dir).parts
+        if len(parts) == 2 and parts[0] == 'benches':
+            return package, Path(parts[1]).stem
+        if len(parts) == 3 and parts[0] == 'benches' and parts[2] == 'main.rs':
+            return package, parts[1]
+        return None
+
+def build_index(data, repo_root, signature=None):
+    """Precompute, for every function, the set of bench targets and tests that reach it."""
+    identifiers = [item.get('identifier', '') for item in data]
+    position = {identifier: i for i, identifier in enumerate(identifiers)}
+    paths = [item.get('relative_path', '') for item in data]
+    anchors = [first_line(item.get('body', '')) for item in data]
+    line_counts = [item.get('body', '').count('\n') + 1 for item in data]
+    edges = [[(position[dep],) for dep in set(item.get('deps', [])) if dep in position] for item in data]
+
+    files = defaultdict(list)
+    for i, path in enumerate(paths):
+        files[path].append(i)
+
+    lookup = CrateLookup(repo_root)
+    observers = []
+    observer_of_target = {}
+    own = defaultdict(int)
+    for path, members in files.items():
+        source = repo_root / path
+        if not source.exists():
+            continue
+        text = source.read_text(errors='replace')
+        lines = text.splitlines()
+        spans = locate_spans(text, [(i, data[i].get('body', ''), anchors[i], line_counts[i]) for i in members])
+        target = lookup.bench_target(path)
+        owner = lookup.package_for(path)
+        for i in members:
+            if target:
+                if target not in observer_of_target:
+                    observer_of_target[target] = len(observers)
+                    observers.append({'kind': 'bench', 'package': target[0], 'target': target[1]})
+                own[i] |= 1 << observer_of_target[target]
+            elif i in spans and is_test_function(lines, spans[i][0]):
+                crate_dir = owner[1] if owner else ''
+                parts = Path(path).relative_to(crate_dir).parts if owner else ()
+                observers.append({
+                    'kind': 'test',
+                    'package': owner[0] if owner else None,
+                    'target': Path(parts[1]).stem if len(parts) >= 2 and parts[0] == 'tests' else None,
+                    'name': data[i].get('display_name', ''),
+                    'path': path,
+                })
+                own[i] |= 1 << (len(observers) - 1)
+
+    # Observers reach a component if they reach any of its callers.
+    component, reached = propagate_reach(edges, [own.get(i, 0) for i in range(len(data))], toward='callees')
+
+    return {
+        'signature': signature,
+        'paths': paths,
+        'anchors': anchors,
+        'line_counts': line_counts,
+        'files': dict(files),
+        'component': component,
+        'reached': reached,
+        'observers': observers,
+    }
+
+def load_or_build_index(corpus_file, index_file=None, rebuild=False):
+    """Load the cached selection index for a corpus, rebuilding it if missing or stale."""
+    index_file = index_file or str(Path(corpus_file).with_suffix('.impact.pickle'))
+    stat = os.stat(corpus_file)
+    signature = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+    if not rebuild and Path(index_file).exists():
+        with open(index_file, 'rb') as f:
+            index = pickle.load(f)
+        if index.get('signature') == signature:
+            return index
+
+    print(f"Indexing bench and test reachability for {corpus_file}...", file=sys.stderr)
+    index = build_index(load_data(corpus_file), REPO_ROOT, signature)
+    with open(index_file, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return index
+
+def parse_diff(lines):
+    """
+    Map each file of a unified diff to the new-side line numbers it touches.
+
+    Removed lines are recorded at the line they were removed before. Deleted files map to None.
+    """
+    changed = {}
+    current = None
+    # None outside a hunk; a hunk that deletes the top of a file starts at new-side line 0.
+    new_line = None
+    old_path = None
+    for line in lines:
+        if line.startswith('--- '):
+            old_path = line[4:].strip()
+            old_path = old_path[2:] if old_path.startswith('a/') else old_path
+        elif line.startswith('+++ '):
+            new_path = line[4:].strip()
+            if new_path == '/dev/null':
+                changed[old_path] = None
+                current = None
+            else:
+                current = changed.setdefault(new_path[2:] if new_path.startswith('b/') else new_path, set())
+            new_line = None
+        elif line.startswith('@@'):
+            match = HUNK_HEADER.match(line)
+            new_line = int(match.group(3)) if match else None
+        elif current is not None and new_line is not None:
+            if line.startswith('+'):
+                current.add(new_line)
+                new_line += 1
+            elif line.startswith('-'):
+                current.add(max(new_line, 1))
+            elif not line.startswith('\\'):
+                new_line += 1
+    return changed
+
+def changed_functions(index, changed, repo_root, ignore_unmapped=False):
+    """Functions touched by the changed lines, plus the changes that couldn't be mapped to one."""
+    touched = set()
+    unmapped = []
+    for path, line_numbers in changed.items():
+        members = index['files'].get(path)
+        if members is None:
+            unmapped.append((path, 'not in corpus'))
+            continue
+        source = repo_root / path
+        if line_numbers is None or not source.exists():
+            touched.update(members)
+            unmapped.append((path, 'file deleted'))
+            continue
+        spans = locate_spans(source.read_text(errors='replace'),
+                             [(i, None, index['anchors'][i], index['line_counts'][i]) for i in members])
+        outside = set(line_numbers)
+        for i, (first, last) in spans.items():
+            hit = {n for n in line_numbers if first <= n <= last}
+            if hit:
+                touched.add(i)
+                outside -= hit
+        lost = [i for i in members if i not in spans]
+        if lost:
+            # A function whose first line changed can't be found; it may be among the edits.
+            touched.update(lost)
+        if outside:
+            unmapped.append((path, f"{len(outside)} changed lines outside corpus functions"))
+            if not ignore_unmapped:
+                touched.update(members)
+    return touched, unmapped
+
+def select(index, touched):
+    """The observers reaching any of the touched functions."""
+    bits = 0
+    for i in touched:
+        bits |= index['reached'][index['component'][i]]
+    return [observer for number, observer in enumerate(index['observers']) if bits >> number & 1]
+
+def observer_command(observer):
+    if observer['kind'] == 'bench':
+        return f"cargo bench -p {observer['package']} --bench {observer['target']}"
+    target = f" --test {observer['target']}" if observer['target'] else ''
+    return f"cargo test -p {observer['package']}{target} -- {observer['name']}"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--base', default='HEAD', help='diff the working tree against this revision (default: %(default)s)')
+    parser.add_argument('--diff', help="read a unified diff from this file ('-' for stdin) instead of running git")
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--index', help='index file (default: next to the corpus)')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild the index even if it looks current')
+    parser.add_argument('--ignore-unmapped', action='store_true',
+                        help="don't treat changes outside functions (types, imports, ...) as touching the whole file")
+    parser.add_argument('--json', action='store_true', help='print the selection as JSON')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    index = load_or_build_index(args.corpus, args.index, args.rebuild)
+
+    started = time.perf_counter()
+    if args.diff == '-':
+        diff = sys.stdin.read().splitlines()
+    elif args.diff:
+        with open(args.diff, 'r') as f:
+            diff = f.read().splitlines()
+    else:
+        try:
+            diff = subprocess.run(['git', 'diff', '-U0', args.base, '--', '*.rs'], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.splitlines()
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error: git diff against {args.base} failed: {e}")
+            sys.exit(1)
+
+    changed = parse_diff(diff)
+    touched, unmapped = changed_functions(index, changed, REPO_ROOT, args.ignore_unmapped)
+    selected = select(index, touched)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps({
+            'changed_functions': len(touched),
+            'unmapped': [{'path': path, 'reason': reason} for path, reason in unmapped],
+            'benches': [o for o in selected if o['kind'] == 'bench'],
+            'tests': [o for o in selected if o['kind'] == 'test'],
+        }, indent=2))
+    else:
+        benches = [o for o in selected if o['kind'] == 'bench']
+        tests = [o for o in selected if o['kind'] == 'test']
+        print(f"# {len(touched)} changed functions → {len(benches)} bench targets, {len(tests)} tests")
+        for observer in benches:
+            print(observer_command(observer))
+        for observer in tests:
+            print(observer_command(observer))
+        for path, reason in unmapped:
+            print(f"# {path}: {reason}")
+    print(f"⏱️  selected in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Mergeable streaming sketches with known error bounds.
+
+- `CountMinSketch` estimates how often each key was added. Estimates never undercount, and
+  overcount by at most `epsilon × total` with probability `1 - delta`.
+- `HeavyHitters` keeps the keys with the largest count-min estimates.
+- `HyperLogLog` estimates the number of distinct keys, with a relative standard error of
+  `1.04 / sqrt(registers)`.
+- `ReservoirSample` keeps a uniform random sample of everything added.
+
+Sketches of the same shape can be merged, so shards and snapshots can be sketched separately and
+combined later. Each one round-trips through `to_dict`/`from_dict` as plain JSON.
+"""
+
+import base64
+import hashlib
+import heapq
+import math
+import random
+from array import array
+
+def _hash64(key, person):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8, person=person).digest(), 'little')
+
+def _encode(data):
+    return base64.b64encode(bytes(data)).decode('ascii')
+
+def _decode(text):
+    return base64.b64decode(text.encode('ascii'))
+
+class CountMinSketch:
+    """Approximate counts per key in `width × depth` counters."""
+
+    def __init__(self, width=8192, depth=4):
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self.counters = array('Q', bytes(8 * width * depth))
+
+    @classmethod
+    def for_error(cls, epsilon, delta):
+        """A sketch overcounting by at most `epsilon × total` with probability `1 - delta`."""
+        return cls(math.ceil(math.e / epsilon), math.ceil(math.log(1 / delta)))
+
+    def _cells(self, key):
+        # Kirsch-Mitzenmacher: two halves of one hash give every row's index.
+        h = _hash64(key, b'cms')
+        h1, h2 = h & 0xffffffff, h >> 32
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, key, count=1):
+        """Count `key` and return its new estimate."""
+        self.total += count
+        estimate = None
+        for cell in self._cells(key):
+            self.counters[cell] += count
+            if estimate is None or self.counters[cell] < estimate:
+                estimate = self.counters[cell]
+        return estimate
+
+    def estimate(self, key):
+        return min(self.counters[cell] for cell in self._cells(key))
+
+    @property
+    def epsilon(self):
+        return math.e / self.width
+
+    @property
+    def delta(self):
+        return math.exp(-self.depth)
+
+    def error_bound(self):
+        """The most any estimate overcounts by, with probability `1 - delta`."""
+        return math.ceil(self.epsilon * self.total)
+
+    def merge(self, other):
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError(f"cannot merge count-min sketches of shape {self.width}×{self.depth} "
+                             f"and {other.width}×{other.depth}")
+        self.total += other.total
+        for i, count in enumerate(other.counters):
+            if count:
+                self.counters[i] += count
+        return self
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'total': self.total,
+                'counters': _encode(self.counters.tobytes())}
+
+    @classmethod
+    def from_dict(cls, value):
+        sketch = cls(value['width'], value['depth'])
+        sketch.total = value['total']
+        sketch.counters = array('Q')
+        sketch.counters.frombytes(_decode(value['counters']))
+        return sketch
+
+class HeavyHitters:
+    """The `capacity` keys with the largest estimates in a count-min sketch shared with others."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.candidates = {}
+        self.floor = 0
+
+    def offer(self, key, estimate):
+        """Consider `key` with its current estimate in the shared sketch."""
+        if key in self.candidates or len(self.candidates) < self.capacity:
+            self.candidates[key] = estimate
+        elif estimate > self.floor:
+            del self.candidates[min(self.candidates, key=self.candidates.get)]
+            self.candidates[key] = estimate
+        else:
+            return
+        if len(self.candidates) == self.capacity:
+            self.floor = min(self.candidates.values())
+
+    def top(self, sketch, count=None):
+        """(key, estimate) pairs, largest first, re-estimated against `sketch`."""
+        estimates = [(key, sketch.estimate(key)) for key in self.candidates]
+        return heapq.nlargest(count or self.capacity, estimates, key=lambda pair: pair[1])
+
+    def merge(self, other, sketch):
+        """Merge candidates; `sketch` must already include both sides' counts."""
+        self.capacity = max(self.capacity, other.capacity)
+        keys = dict.fromkeys([*self.candidates, *other.candidates])
+        self.candidates = dict(heapq.nlargest(self.capacity, ((key, sketch.estimate(key)) for key in keys),
+                                              key=lambda pair: pair[1]))
+        self.floor = min(self.candidates.values()) if len(self.candidates) == self.capacity else 0
+        return self
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'candidates': self.candidates}
+
+    @classmethod
+    def from_dict(cls, value):
+        hitters = cls(value['capacity'])
+        hitters.candidates = dict(value['candidates'])
+        if len(hitters.candidates) == hitters.capacity:
+            hitters.floor = min(hitters.candidates.values())
+        return hitters
+
+class HyperLogLog:
+    """Approximate count of distinct keys in `2 ** precision` one-byte registers."""
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, key):
+        h = _hash64(key, b'hll')
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Small-range correction: linear counting.
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def relative_error(self):
+        """One standard error of `estimate()`, relative to the true count."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def merge(self, other):
+        if self.precision != other.precision:
+            raise ValueError(f"cannot merge HyperLogLogs of precision {self.precision} and {other.precision}")
+        for i, register in enumerate(other.registers):
+            if register > self.registers[i]:
+                self.registers[i] = register
+        return self
+
+    def to_dict(self):
+        return {'precision': self.precision, 'registers': _encode(self.registers)}
+
+    @classmethod
+    def from_dict(cls, value):
+        sketch = cls(value['precision'])
+        sketch.registers = bytearray(_decode(value['registers']))
+        return sketch
+
+class ReservoirSample:
+    """A uniform sample of up to `size` of the items added (Algorithm R)."""
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.seen = 0
+        self.items = []
+        self.random = random.Random(seed)
+
+    def add(self, item):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+        else:
+            slot = self.random.randrange(self.seen)
+            if slot < self.size:
+                self.items[slot] = item
+
+    def merge(self, other):
+        """A uniform sample of the union of both streams."""
+        ours, theirs = list(self.items), list(other.items)
+        self.random.shuffle(ours)
+        self.random.shuffle(theirs)
+        # Each slot comes from either side in proportion to how many items that side stands for.
+        remaining_ours, remaining_theirs = self.seen, other.seen
+        merged = []
+        while len(merged) < self.size and (ours or theirs):
+            if theirs and (not ours or self.random.randrange(remaining_ours + remaining_theirs) >= remaining_ours):
+                merged.append(theirs.pop())
+                remaining_theirs -= 1
+            else:
+                merged.append(ours.pop())
+                remaining_ours -= 1
+        self.items = merged
+        self.seen += other.seen
+        return self
+
+    def to_dict(self):
+        return {'size': self.size, 'seen': self.seen, 'items': self.items}
+
+    @classmethod
+    def from_dict(cls, value, seed=None):
+        sample = cls(value['size'], seed)
+        sample.seen = value['seen']
+        sample.items = list(value['items'])
+        return sample
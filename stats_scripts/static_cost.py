@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Estimate how heavy libsignal functions are from their source alone.
+
+Each function body is tokenized once for cost proxies (tokens, loop nesting, calls and
+allocations inside loops, arithmetic and curve/bignum operations), and the metrics are kept in
+one numpy matrix. A function's inclusive "static cost" adds the self cost of every distinct
+function it can reach over the call graph, condensed into strongly connected components so that
+recursion is counted once; each reached function is weighted by the deepest loop nesting on any
+path to it. The totals are reported per function, bridge export and rust module.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from analyze_deps import (load_data, strongly_connected_components, propagate_reach, TOKEN, ALLOC_PATHS, ALLOC_METHODS, ALLOC_MACROS,
+                          LOOP_FACTOR, BRIDGE_EXPORT_PREFIX)
+
+try:
+    import numpy as np
+except ImportError:
+    print("Error: static_cost.py needs numpy (pip install numpy)")
+    sys.exit(1)
+
+METRICS = ('tokens', 'max_loop_depth', 'calls_in_loops', 'allocations', 'allocations_in_loops',
+           'arith_ops', 'group_ops')
+
+# How much each metric contributes to the single "cost" score.
+COST_WEIGHTS = {
+    'tokens': 1.0,
+    'max_loop_depth': 0.0,
+    'calls_in_loops': 10.0,
+    'allocations': 20.0,
+    'allocations_in_loops': 80.0,
+    'arith_ops': 2.0,
+    'group_ops': 50.0,
+}
+
+NOT_CALLS = {'if', 'while', 'for', 'match', 'loop', 'fn', 'return', 'in', 'as', 'Some', 'Ok', 'Err'}
+GROUP_TYPES = {'Scalar', 'RistrettoPoint', 'EdwardsPoint', 'MontgomeryPoint', 'FieldElement',
+               'BigNum', 'BigNumRef', 'EcPoint', 'EcPointRef'}
+GROUP_METHODS = {'invert', 'pow', 'mul_base', 'mul_clamped', 'vartime_multiscalar_mul',
+                 'vartime_double_scalar_mul_basepoint', 'multiscalar_mul', 'compress', 'decompress',
+                 'from_uniform_bytes', 'hash_from_bytes', 'mod_exp', 'mod_mul'}
+ARITH_OPS = {'+', '-', '*', '/', '%', '+=', '-=', '*=', '/=', '%=', '^'}
+
+def scan_body(body):
+    """Return (metric values, {callee name: loop depth of its deepest call}) for one body."""
+    values = dict.fromkeys(METRICS, 0)
+    loop_calls = {}
+    tokens = [(m.lastgroup, m.group(m.lastgroup)) for m in TOKEN.finditer(body) if m.lastgroup]
+    values['tokens'] = len(tokens)
+
+    brace_stack = []  # True for braces that open a loop body
+    pending_loop = False
+    depth = 0
+    previous = (None, None)
+    for i, (kind, text) in enumerate(tokens):
+        nxt = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        if kind == 'ident':
+            # `Vec::new()` is called, but `Vec::new` can also be passed as a constructor.
+            alloc_path = previous[1] == '::' and i >= 2 and (tokens[i - 2][1], text) in ALLOC_PATHS
+            if text in ('for', 'while', 'loop'):
+                pending_loop = True
+            elif nxt == '(' and text not in NOT_CALLS:
+                if depth:
+                    values['calls_in_loops'] += 1
+                    loop_calls[text] = max(loop_calls.get(text, 0), depth)
+                if previous[1] == '.' and text in ALLOC_METHODS or alloc_path:
+                    values['allocations'] += 1
+                    values['allocations_in_loops'] += bool(depth)
+                if previous[1] == '.' and text in GROUP_METHODS:
+                    values['group_ops'] += 1
+            elif nxt == '!' and text in ALLOC_MACROS or alloc_path:
+                values['allocations'] += 1
+                values['allocations_in_loops'] += bool(depth)
+            if text in GROUP_TYPES:
+                values['group_ops'] += 1
+        elif text == '{':
+            brace_stack.append(pending_loop)
+            depth += pending_loop
+            values['max_loop_depth'] = max(values['max_loop_depth'], depth)
+            pending_loop = False
+        elif text == '}':
+            if brace_stack and brace_stack.pop():
+                depth -= 1
+        elif text in ARITH_OPS and previous[0] in ('ident', 'number') or (text in ARITH_OPS and previous[1] == ')'):
+            values['arith_ops'] += 1
+        previous = (kind, text)
+    return values, loop_calls
+
+def merge_reach(a, b):
+    """Union two {loop depth: component bitset} maps, keeping each component at its deepest level."""
+    merged = dict(a)
+    for depth, bits in b.items():
+        merged[depth] = merged.get(depth, 0) | bits
+    covered = 0
+    for depth in sorted(merged, reverse=True):
+        merged[depth] &= ~covered
+        covered |= merged[depth]
+    return {depth: bits for depth, bits in merged.items() if bits}
+
+def compute_static_costs(data):
+    """
+    Compute self and inclusive cost metrics for every function in the corpus.
+
+    Returns (identifiers, self matrix, inclusive matrix, component per function), with one row
+    per function and one column per entry in METRICS plus a final 'cost' column.
+    """
+    identifiers = [item.get('identifier', '') for item in data]
+    position = {identifier: i for i, identifier in enumerate(identifiers)}
+    names = [item.get('display_name', '') for item in data]
+
+    self_costs = np.zeros((len(data), len(METRICS) + 1))
+    edges = [[] for _ in data]
+    for i, item in enumerate(data):
+        values, loop_calls = scan_body(item.get('body', ''))
+        self_costs[i, :len(METRICS)] = [values[metric] for metric in METRICS]
+        for dep in item.get('deps', []):
+            j = position.get(dep)
+            if j is None or j == i:
+                continue
+            # Calls made inside loops are weighted by how deeply they are nested.
+            edges[i].append((j, loop_calls.get(names[j], 0)))
+    weights = np.array([COST_WEIGHTS[metric] for metric in METRICS])
+    self_costs[:, -1] = self_costs[:, :len(METRICS)] @ weights
+
+    # Roll costs up over the condensation: every reached component counts once, however many
+    # paths lead to it, and within a cycle each function counts once.
+    components = strongly_connected_components(len(data), edges)
+    component, count = components
+    component_self = np.zeros((count, self_costs.shape[1]))
+    np.add.at(component_self, component, self_costs)
+    _, reach = propagate_reach(
+        edges, [{0: 1 << c} for c in component], merge=merge_reach,
+        carry=lambda calls, levels: {depth + max(d for _, d in calls): bits for depth, bits in levels.items()},
+        components=components)
+    size = (count + 7) // 8
+    component_inclusive = np.zeros_like(component_self)
+    for c, levels in enumerate(reach):
+        weights = np.zeros(count)
+        for depth, bits in levels.items():
+            members = np.unpackbits(np.frombuffer(bits.to_bytes(size, 'little'), dtype=np.uint8),
+                                    count=count, bitorder='little')
+            weights += LOOP_FACTOR ** depth * members
+        component_inclusive[c] = weights @ component_self
+
+    # Max-loop-depth doesn't add up along calls; report the function's own value.
+    inclusive = component_inclusive[component]
+    inclusive[:, METRICS.index('max_loop_depth')] = self_costs[:, METRICS.index('max_loop_depth')]
+    return identifiers, self_costs, inclusive, component
+
+def rust_module(relative_path):
+    parts = relative_path.split('/')
+    return parts[1] if relative_path.startswith('rust/') and len(parts) >= 2 else None
+
+def summarize(data, identifiers, self_costs, inclusive, component):
+    """Aggregate per-function costs into bridge export and rust module tables."""
+    position = {identifier: i for i, identifier in enumerate(identifiers)}
+    module_of = [rust_module(item.get('relative_path', '')) for item in data]
+
+    # A module's entry points are its call-graph components that no other component in the same
+    # module calls; each is counted once, however many functions it contains.
+    called_within_module = set()
+    for i, item in enumerate(data):
+        for dep in item.get('deps', []):
+            j = position.get(dep)
+            if (j is not None and component[i] != component[j]
+                    and module_of[i] and module_of[i] == module_of[j]):
+                called_within_module.add(component[j])
+    counted_components = set()
+
+    modules = defaultdict(lambda: {'functions': 0, 'self': np.zeros(self_costs.shape[1]),
+                                   'inclusive': np.zeros(self_costs.shape[1])})
+    for i, module in enumerate(module_of):
+        if module is None:
+            continue
+        modules[module]['functions'] += 1
+        modules[module]['self'] += self_costs[i]
+        if component[i] not in called_within_module and (module, component[i]) not in counted_components:
+            counted_components.add((module, component[i]))
+            modules[module]['inclusive'] += inclusive[i]
+
+    exports = [i for i, item in enumerate(data)
+               if item.get('relative_path', '').startswith(BRIDGE_EXPORT_PREFIX)]
+    return dict(modules), exports
+
+def generate_markdown_report(data, identifiers, self_costs, inclusive, modules, exports, top):
+    """Generate a markdown report of static cost estimates."""
+    cost = -1
+    md_content = []
+    md_content.append("# LibSignal Static Cost Report")
+    md_content.append("")
+    md_content.append("Static cost estimates derived from function bodies and rolled up over the call graph. "
+                      "Costs are unitless proxies for ranking, not time predictions.")
+    md_content.append("")
+    md_content.append("**Cost score:** " + " + ".join(f"{w:g}×{m}" for m, w in COST_WEIGHTS.items() if w) +
+                      f"; calls made inside loops are weighted ×{LOOP_FACTOR:g} per loop level.")
+    md_content.append("")
+
+    md_content.append(f"## 🌉 Top {top} Bridge Exports by Inclusive Cost")
+    md_content.append("")
+    md_content.append("| Rank | Inclusive Cost | Self Cost | Allocations | Group Ops | Function | Path |")
+    md_content.append("|------|----------------|-----------|-------------|-----------|----------|------|")
+    for rank, i in enumerate(sorted(exports, key=lambda i: inclusive[i, cost], reverse=True)[:top], 1):
+        item = data[i]
+        md_content.append(f"| {rank} | {inclusive[i, cost]:,.0f} | {self_costs[i, cost]:,.0f} "
+                          f"| {inclusive[i, METRICS.index('allocations')]:,.0f} "
+                          f"| {inclusive[i, METRICS.index('group_ops')]:,.0f} "
+                          f"| `{item.get('display_name', '')}` | `{item.get('relative_path', '')}` |")
+    md_content.append("")
+
+    md_content.append("## 📦 Rust Modules")
+    md_content.append("")
+    md_content.append("| Module | Functions | Self Cost | Inclusive Cost (entry points) | Allocations in Loops |")
+    md_content.append("|--------|-----------|-----------|-------------------------------|----------------------|")
+    for module, totals in sorted(modules.items(), key=lambda kv: kv[1]['inclusive'][cost], reverse=True):
+        md_content.append(f"| `rust/{module}/` | {totals['functions']} | {totals['self'][cost]:,.0f} "
+                          f"| {totals['inclusive'][cost]:,.0f} "
+                          f"| {totals['self'][METRICS.index('allocations_in_loops')]:,.0f} |")
+    md_content.append("")
+
+    md_content.append(f"## 🔥 Top {top} Functions by Self Cost")
+    md_content.append("")
+    md_content.append("| Rank | Self Cost | Tokens | Loop Depth | Calls in Loops | Allocations | Function | Path |")
+    md_content.append("|------|-----------|--------|------------|----------------|-------------|----------|------|")
+    ranked = np.argsort(-self_costs[:, cost])[:top]
+    for rank, i in enumerate(ranked, 1):
+        item = data[i]
+        row = self_costs[i]
+        md_content.append(f"| {rank} | {row[cost]:,.0f} | {row[0]:.0f} | {row[1]:.0f} | {row[2]:.0f} | {row[3]:.0f} "
+                          f"| `{item.get('display_name', '')}` | `{item.get('relative_path', '')}` |")
+    md_content.append("")
+    return "\n".join(md_content)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--corpus', default='libsignal_with_deps.json', help='corpus JSON (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=25, help='rows per ranked table (default: %(default)s)')
+    parser.add_argument('--output', default='STATIC_COST_REPORT.md', help='markdown report (default: %(default)s)')
+    parser.add_argument('--json', default='static_costs.json', help='per-function metrics (default: %(default)s)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not Path(args.corpus).exists():
+        print(f"Error: {args.corpus} not found in current directory")
+        sys.exit(1)
+
+    print("Loading corpus...")
+    data = load_data(args.corpus)
+    print("Scanning bodies and rolling costs up the call graph...")
+    identifiers, self_costs, inclusive, component = compute_static_costs(data)
+    modules, exports = summarize(data, identifiers, self_costs, inclusive, component)
+
+    with open(args.output, 'w') as f:
+        f.write(generate_markdown_report(data, identifiers, self_costs, inclusive, modules, exports, args.top))
+
+    columns = list(METRICS) + ['cost']
+    with open(args.json, 'w') as f:
+        json.dump({
+            identifier: {
+                'self': dict(zip(columns, self_costs[i].tolist())),
+                'inclusive': dict(zip(columns, inclusive[i].tolist())),
+            }
+            for i, identifier in enumerate(identifiers)
+        }, f)
+
+    print(f"\n📄 Report saved to: {args.output}")
+    print(f"💾 Per-function metrics saved to: {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Check the call-graph helpers analyze_deps.py shares with the other scripts.
+"""
+
+import io
+import json
+import operator
+import tempfile
+import unittest
+from pathlib import Path
+
+from analyze_deps import (propagate_reach, analyze_dependencies, analyze_dependencies_out_of_core, report_summary,
+                          out_of_core_summary, exportable_stats, write_out_of_core_json)
+
+# 0 -> 1 <-> 2 -> 3, and 4 -> 3 (called twice).
+EDGES = [[(1, 1)], [(2, 1)], [(1, 1), (3, 1)], [], [(3, 2)]]
+
+class PropagateReach(unittest.TestCase):
+    def test_callers_collect_what_they_call(self):
+        component, values = propagate_reach(EDGES, [1 << i for i in range(5)])
+        self.assertEqual(component[1], component[2])
+        self.assertEqual([values[component[i]] for i in range(5)], [0b1111, 0b1110, 0b1110, 0b1000, 0b11000])
+
+    def test_callees_collect_their_callers(self):
+        component, values = propagate_reach(EDGES, [1 << i for i in range(5)], toward='callees')
+        self.assertEqual([values[component[i]] for i in range(5)], [0b1, 0b111, 0b111, 0b11111, 0b10000])
+
+    def test_carry_weights_values_crossing_components(self):
+        # How often each function runs when 0 and 4 are each called once; the cycle counts once.
+        component, runs = propagate_reach(
+            EDGES, [1, 0, 0, 0, 1], toward='callees', merge=operator.add,
+            carry=lambda calls, value: value * sum(count for _, count in calls))
+        self.assertEqual([runs[component[i]] for i in range(5)], [1, 1, 1, 3, 1])
+
+def corpus_with_duplicates():
+    """Callers and callees that share identifiers across files, as generated code and tests do."""
+    def item(identifier, relative_path, deps=(), body=''):
+        return {'identifier': identifier, 'relative_path': relative_path, 'display_name': identifier.split('/')[-1],
+                'deps': list(deps), 'body': body}
+    return [
+        item('sha2/digest', 'deps/sha2/src/old.rs'),
+        item('protocol/encrypt', 'rust/protocol/src/a.rs', ['sha2/digest', 'hmac/mac', 'protocol/helper']),
+        item('hmac/mac', 'deps/hmac/src/lib.rs'),
+        item('protocol/encrypt', 'rust/protocol/src/b.rs', ['hmac/mac'], body='use sha2::Sha256;'),
+        item('protocol/helper', 'rust/protocol/src/a.rs', ['sha2/digest', 'sha2/digest']),
+        item('sha2/digest', 'deps/sha2/src/lib.rs'),
+        item('net/encrypt', 'rust/net/src/c.rs', ['hmac/mac', 'aes/missing']),
+        item('protocol/encrypt', 'rust/protocol/tests/d.rs', ['sha2/digest']),
+    ]
+
+class OutOfCoreMatchesInMemory(unittest.TestCase):
+    def test_duplicate_identifiers(self):
+        corpus = corpus_with_duplicates()
+        stats = analyze_dependencies(corpus)
+        expected = json.dumps(exportable_stats(stats), indent=2)
+        with tempfile.TemporaryDirectory() as work_dir:
+            corpus_file = Path(work_dir) / 'corpus.json'
+            corpus_file.write_text(json.dumps(corpus))
+            # Tiny runs, so that every sorter spills to disk and merges.
+            result = analyze_dependencies_out_of_core(str(corpus_file), work_dir, run_size=2)
+            streamed = io.StringIO()
+            write_out_of_core_json(streamed, result)
+            self.assertEqual(streamed.getvalue(), expected)
+            self.assertEqual(out_of_core_summary(result), report_summary(stats))
+        details = json.loads(expected)['deps_function_details']
+        self.assertEqual(details['hmac/mac']['called_from_rust_files'],
+                         ['rust/net/src/c.rs', 'rust/protocol/src/a.rs', 'rust/protocol/src/b.rs'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Check that approx_deps.py's sketches reproduce analyze_deps.py's exact figures on a small corpus.
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from analyze_deps import analyze_dependencies, report_summary
+from approx_deps import DependencySketch, load_callee_index
+
+def small_corpus():
+    """rust/ callers of deps/ functions with distinct call counts, so that the top lists are ordered."""
+    deps = [
+        ('impl//T//ConstantTimeEq/ct_eq', 'deps/subtle/src/lib.rs', 'ct_eq'),
+        ('impl/HmacCore/clone', 'deps/hmac/src/optim.rs', 'clone'),
+        ('impl/Scalar/from_bytes_mod_order', 'deps/curve25519-dalek/src/scalar.rs', 'from_bytes_mod_order'),
+        ('x509/impl/X509Ref/serial_number', 'deps/boring-signal/boring/src/x509/mod.rs', 'serial_number'),
+    ]
+    items = [{'identifier': identifier, 'relative_path': relative_path, 'display_name': name, 'deps': []}
+             for identifier, relative_path, name in deps]
+    for i in range(12):
+        # Caller i calls deps function j if j <= i % 4, giving 12, 9, 6 and 3 calls.
+        items.append({
+            'identifier': f"protocol/caller_{i}",
+            'relative_path': f"rust/protocol/src/file_{min(i // 5, 2)}.rs",
+            'display_name': f"caller_{i}",
+            'body': 'use hmac::Hmac;',
+            'deps': [deps[j][0] for j in range(i % 4 + 1)] + ['protocol/helper'],
+        })
+    items.append({'identifier': 'protocol/helper', 'relative_path': 'rust/protocol/src/helper.rs',
+                  'display_name': 'helper', 'deps': []})
+    return items
+
+class ApproximateMatchesExact(unittest.TestCase):
+    def test_sharded_sketches_match_exact_summary(self):
+        corpus = small_corpus()
+        with tempfile.TemporaryDirectory() as work_dir:
+            corpus_file = Path(work_dir) / 'corpus.json'
+            corpus_file.write_text(json.dumps(corpus))
+            callee_index = load_callee_index(str(corpus_file))
+
+        shards = [DependencySketch() for _ in range(2)]
+        for i, item in enumerate(corpus):
+            shards[i % 2].add_item(item, callee_index)
+        # Round-trip through the saved format, as `build` and `report` do.
+        shards = [DependencySketch.from_dict(json.loads(json.dumps(shard.to_dict()))) for shard in shards]
+        approximate = shards[0].merge(shards[1]).summary()
+        exact = report_summary(analyze_dependencies(corpus))
+
+        self.assertEqual(approximate['total_calls'], exact['total_calls'])
+        self.assertEqual(approximate['crate_usage'], exact['crate_usage'])
+        self.assertEqual([(name, path, f"≈{count}") for name, path, count in exact['top_functions']],
+                         approximate['top_functions'])
+        self.assertEqual([(path, f"≈{count}") for path, count in exact['top_files']],
+                         approximate['top_files'])
+        for crate_name, details in exact['crate_details'].items():
+            self.assertEqual([(name, path, f"≈{count}") for name, path, count in details['top']],
+                             approximate['crate_details'][crate_name]['top'])
+            self.assertEqual(approximate['crate_details'][crate_name]['function_count'], details['function_count'])
+            self.assertEqual(approximate['crate_details'][crate_name]['marker'], '≈')
+
+if __name__ == "__main__":
+    unittest.main()
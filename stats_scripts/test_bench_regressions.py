@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Check which runs bench_regressions.py compares by default.
+"""
+
+import unittest
+
+from bench_regressions import open_store, record_results, select_runs
+
+RESULT = {'bench_id': 'sha256', 'median_ns': 10.0, 'median_lower_ns': 9.0, 'median_upper_ns': 11.0,
+          'samples': None}
+
+class SelectRuns(unittest.TestCase):
+    def setUp(self):
+        self.conn = open_store(':memory:')
+        # Recorded in this order, some within the same clock tick.
+        for commit_sha in ['aaaa', 'bbbb', 'cccc', 'dddd']:
+            record_results(self.conn, commit_sha, '', [RESULT])
+
+    def test_latest_run_against_previous(self):
+        self.assertEqual(select_runs(self.conn), ('dddd', 'cccc', ['aaaa', 'bbbb', 'cccc', 'dddd']))
+
+    def test_older_commit_against_the_run_before_it(self):
+        self.assertEqual(select_runs(self.conn, commit='bbbb'), ('bbbb', 'aaaa', ['aaaa', 'bbbb']))
+
+    def test_commit_older_than_the_history_window(self):
+        self.assertEqual(select_runs(self.conn, commit='bbbb', history=2), ('bbbb', 'aaaa', ['aaaa', 'bbbb']))
+        self.assertEqual(select_runs(self.conn, commit='cccc', history=2), ('cccc', 'bbbb', ['bbbb', 'cccc']))
+
+    def test_explicit_baseline(self):
+        self.assertEqual(select_runs(self.conn, commit='bbbb', baseline='dddd')[:2], ('bbbb', 'dddd'))
+
+    def test_first_run_has_no_baseline(self):
+        self.assertEqual(select_runs(self.conn, commit='aaaa'), ('aaaa', None, ['aaaa']))
+
+if __name__ == "__main__":
+    unittest.main()
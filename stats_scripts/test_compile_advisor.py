@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Check which dependent crates compile_advisor.py counts towards a rebuild.
+"""
+
+import unittest
+
+from compile_advisor import transitive_dependents
+
+def crate(member, *dependencies):
+    return {'dir': '', 'member': member, 'dependencies': set(dependencies)}
+
+class Dependents(unittest.TestCase):
+    def test_crates_outside_the_workspace_build_are_not_rebuilt(self):
+        crates = {
+            'core': crate(True),
+            'protocol': crate(True, 'core'),
+            'bridge': crate(False, 'protocol'),  # a path dependency of a member
+            'ffi': crate(True, 'bridge'),
+            'protocol-fuzz': crate(False, 'protocol'),
+        }
+        direct, closure = transitive_dependents(crates)
+        self.assertEqual(direct['protocol'], {'bridge'})
+        self.assertEqual(closure['core'], {'protocol', 'bridge', 'ffi'})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check that dependency_history.py rebuilds every stored snapshot exactly.
+"""
+
+import copy
+import json
+import tempfile
+import unittest
+
+from dependency_history import HistoryStore, corpus_by_identifier
+
+def releases():
+    """Four corpus snapshots exercising each kind of change a delta has to carry."""
+    first = [
+        {'identifier': 'protocol/encrypt', 'relative_path': 'rust/protocol/src/lib.rs', 'display_name': 'encrypt',
+         'deps': ['impl/HmacCore/clone', 'impl/Scalar/from_bytes_mod_order', 'impl/HmacCore/clone']},
+        {'identifier': 'impl/HmacCore/clone', 'relative_path': 'deps/hmac/src/optim.rs', 'display_name': 'clone',
+         'deps': []},
+        {'identifier': 'impl/Scalar/from_bytes_mod_order', 'relative_path': 'deps/curve25519-dalek/src/scalar.rs',
+         'display_name': 'from_bytes_mod_order', 'deps': [], 'doc': 'Reduce modulo ℓ.'},
+    ]
+    second = copy.deepcopy(first)
+    # Same calls, different order; a field set to null; a field removed.
+    second[0]['deps'] = ['impl/Scalar/from_bytes_mod_order', 'impl/HmacCore/clone', 'impl/HmacCore/clone']
+    second[1]['doc'] = None
+    del second[2]['doc']
+    third = copy.deepcopy(second)
+    # A new function in the middle, and fields reordered.
+    third.insert(1, {'identifier': 'protocol/decrypt', 'relative_path': 'rust/protocol/src/lib.rs',
+                     'display_name': 'decrypt', 'deps': ['impl/HmacCore/clone']})
+    third[0] = {key: third[0][key] for key in reversed(list(third[0]))}
+    fourth = copy.deepcopy(third)
+    # A function removed, the rest reordered, a call dropped and a null field filled in again.
+    fourth = [fourth[2], fourth[1], fourth[3]]
+    fourth[0]['doc'] = 'Clone the HMAC state.'
+    fourth[1]['deps'] = []
+    return [first, second, third, fourth]
+
+class RoundTrip(unittest.TestCase):
+    def test_base_plus_deltas_reproduces_every_snapshot(self):
+        snapshots = releases()
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = HistoryStore(store_dir)
+            for i, data in enumerate(snapshots):
+                store.add(f"v{i}", data, checkpoint_every=8)
+            self.assertEqual([entry['kind'] for entry in store.snapshots],
+                             ['checkpoint', 'delta', 'delta', 'delta'])
+            # Read back through a fresh store, as the command line does.
+            store = HistoryStore(store_dir)
+            for i, data in enumerate(snapshots):
+                rebuilt = store.reconstruct(i)
+                self.assertEqual(json.dumps(list(rebuilt.values())),
+                                 json.dumps(list(corpus_by_identifier(data).values())),
+                                 f"snapshot v{i}")
+
+if __name__ == "__main__":
+    unittest.main()
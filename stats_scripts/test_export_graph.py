@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Check how export_graph.py aggregates the corpus and cuts views from it.
+"""
+
+import unittest
+
+from export_graph import build_graph_index, select_view, ego_view
+
+def function(identifier, relative_path, deps=()):
+    return {'identifier': identifier, 'relative_path': relative_path, 'display_name': identifier,
+            'deps': list(deps), 'body': 'fn f() {}'}
+
+CORPUS = [
+    # Two items sharing an identifier, in different crates.
+    function('new', 'rust/protocol/src/a.rs', ['digest']),
+    function('new', 'rust/net/src/b.rs', ['connect']),
+    function('connect', 'rust/net/src/c.rs', ['digest', 'digest']),
+    function('digest', 'deps/sha2/src/lib.rs'),
+    function('unused', 'rust/core/src/d.rs'),
+]
+
+class GraphIndex(unittest.TestCase):
+    def test_duplicate_identifiers_keep_their_own_paths(self):
+        index = build_graph_index(CORPUS)
+        self.assertEqual(index['nodes']['crate']['rust/protocol']['functions'], 1)
+        self.assertEqual(index['edges']['crate'], {
+            ('rust/protocol', 'deps/sha2'): 1,
+            ('rust/net', 'rust/net'): 1,
+            ('rust/net', 'deps/sha2'): 2,
+        })
+
+class Views(unittest.TestCase):
+    def test_nodes_without_edges_are_kept(self):
+        nodes, edges = select_view(build_graph_index(CORPUS), 'crate', min_weight=2)
+        self.assertEqual(nodes, {'rust/protocol', 'rust/net', 'deps/sha2', 'rust/core'})
+        self.assertEqual(edges, [('rust/net', 'deps/sha2', 2)])
+
+    def test_ego_view_follows_only_edges_within_scope(self):
+        index = build_graph_index(CORPUS)
+        nodes, edges = ego_view(index, 'file', 'rust/net/src/c.rs', radius=2, within=['rust/'])
+        self.assertEqual(nodes, {'rust/net/src/c.rs', 'rust/net/src/b.rs'})
+        self.assertEqual(edges, [('rust/net/src/b.rs', 'rust/net/src/c.rs', 1)])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Check how select_impacted.py maps a unified diff to changed lines.
+"""
+
+import unittest
+
+from select_impacted import parse_diff
+
+def diff_lines(text):
+    return text.strip('\n').split('\n')
+
+class ParseDiff(unittest.TestCase):
+    def test_additions_and_removals(self):
+        changed = parse_diff(diff_lines("""
+--- a/rust/protocol/src/lib.rs
++++ b/rust/protocol/src/lib.rs
+@@ -10,3 +10,3 @@
+ fn keep() {}
+-fn old() {}
++fn new() {}
+ fn also_keep() {}
+"""))
+        self.assertEqual(changed, {'rust/protocol/src/lib.rs': {11}})
+
+    def test_deleting_the_top_of_a_file(self):
+        changed = parse_diff(diff_lines("""
+--- a/rust/protocol/src/lib.rs
++++ b/rust/protocol/src/lib.rs
+@@ -1,2 +0,0 @@
+-use std::fmt;
+-
+@@ -20,2 +18,3 @@
+ fn keep() {}
++fn added() {}
+ fn also_keep() {}
+"""))
+        self.assertEqual(changed, {'rust/protocol/src/lib.rs': {1, 19}})
+
+    def test_emptying_and_deleting_files(self):
+        changed = parse_diff(diff_lines("""
+--- a/rust/protocol/src/empty.rs
++++ b/rust/protocol/src/empty.rs
+@@ -1,2 +0,0 @@
+-fn only() {}
+-fn two() {}
+--- a/rust/protocol/src/gone.rs
++++ /dev/null
+@@ -1 +0,0 @@
+-fn gone() {}
+"""))
+        self.assertEqual(changed, {'rust/protocol/src/empty.rs': {1}, 'rust/protocol/src/gone.rs': None})
+
+if __name__ == "__main__":
+    unittest.main()
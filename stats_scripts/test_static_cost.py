@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Check the cost proxies static_cost.py reads from a function body, and how it rolls them up.
+"""
+
+import unittest
+
+from static_cost import scan_body, compute_static_costs, METRICS
+
+class ScanBody(unittest.TestCase):
+    def test_counts_constructor_allocations(self):
+        values, loop_calls = scan_body("""
+            fn build(items: &[Item]) -> Vec<Box<Item>> {
+                let mut out = Vec::new();
+                let boxed = Box::new(items[0].clone());
+                let mut buffer = Vec::with_capacity(items.len());
+                for item in items {
+                    buffer.push(item.clone());
+                }
+                out
+            }
+        """)
+        self.assertEqual(values['allocations'], 5)
+        self.assertEqual(values['allocations_in_loops'], 1)
+        self.assertEqual(loop_calls, {'push': 1, 'clone': 1})
+
+    def test_counts_constructors_passed_by_name(self):
+        values, _ = scan_body("fn f(x: Option<Vec<u8>>) -> Vec<u8> { x.unwrap_or_else(Vec::new) }")
+        self.assertEqual(values['allocations'], 1)
+
+    def test_plain_paths_are_not_allocations(self):
+        values, _ = scan_body("fn f() -> u32 { Foo::new(); Vec::len(&v) as u32 }")
+        self.assertEqual(values['allocations'], 0)
+
+def function(name, calls=(), looped=()):
+    body = ' '.join(f'{callee}();' for callee in calls)
+    if looped:
+        body += ' for x in xs { ' + ' '.join(f'{callee}();' for callee in looped) + ' }'
+    return {'identifier': name, 'display_name': name, 'relative_path': 'rust/protocol/src/lib.rs',
+            'deps': list(calls) + list(looped), 'body': f'fn {name}() {{ {body} }}'}
+
+class InclusiveCost(unittest.TestCase):
+    def test_shared_callees_count_once(self):
+        # A chain of diamonds: the last function is reachable from d0 along 2**12 paths.
+        data = []
+        for k in range(12):
+            data += [function(f'd{k}', calls=[f'l{k}', f'r{k}']),
+                     function(f'l{k}', calls=[f'd{k + 1}']), function(f'r{k}', calls=[f'd{k + 1}'])]
+        data.append(function('d12'))
+        _, self_costs, inclusive, _ = compute_static_costs(data)
+        tokens = METRICS.index('tokens')
+        self.assertEqual(inclusive[0, tokens], self_costs[:, tokens].sum())
+
+    def test_reached_functions_take_their_deepest_loop(self):
+        data = [function('outer', calls=['helper'], looped=['leaf']), function('helper', calls=['leaf']),
+                function('leaf')]
+        _, self_costs, inclusive, _ = compute_static_costs(data)
+        tokens = METRICS.index('tokens')
+        outer, helper, leaf = self_costs[:, tokens]
+        self.assertEqual(inclusive[0, tokens], outer + helper + 4 * leaf)
+
+if __name__ == "__main__":
+    unittest.main()